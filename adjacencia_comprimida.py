@@ -0,0 +1,504 @@
+# -*- coding: utf-8 -*-
+"""
+Listas de Adjacência Comprimidas
+Representação somente leitura do grafo que ocupa uma fração da memória do
+GrafoBipartido, para manter grafos grandes residentes na RAM
+
+Cada vértice recebe um índice inteiro; a lista de adjacência é ordenada e
+gravada como o primeiro índice seguido das diferenças entre índices
+consecutivos, cada número em varint (LEB128: 7 bits por byte, o bit alto
+indica que o número continua). Todas as listas ficam em um único bloco de bytes, com um
+array de deslocamentos para acessar qualquer uma delas direto.
+
+Os nomes também ficam em um único bloco UTF-8 com deslocamentos, ordenados
+por papel (só filmes, filmes que também são usuários, só usuários) e por
+nome dentro de cada grupo. Assim usuários e filmes são intervalos de índices,
+e o índice de um nome é encontrado por busca binária.
+
+Em distribuições de cauda longa, as listas grandes (filmes de sucesso e
+usuários que assistem muito) têm diferenças pequenas: cabem em um byte cada,
+e, depois do primeiro índice, essas listas são decodificadas em C com
+itertools.accumulate.
+
+Uso:
+    python adjacencia_comprimida.py arquivo_grafo
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import sys
+from array import array
+from collections import Counter, deque
+from collections.abc import Sequence, Set as ConjuntoAbstrato
+from itertools import accumulate, islice, repeat
+from operator import add, floordiv, mod, mul, sub
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import instrumentacao
+from grafo_bipartido import (COLORIR, CONFLITO, DESENFILEIRAR, FIM, INICIO_COMPONENTE,
+                             EventoBFS, GrafoBipartido, LimitesRecomendacao, ler_campos)
+
+
+# Grupo de cada papel (0: sem papel, 1: usuário, 2: filme, 3: ambos) na ordem dos índices
+GRUPO_PAPEL = (3, 2, 0, 1)
+
+
+def _varint(valor: int, saida: bytearray):
+    while valor >= 0x80:
+        saida.append(valor & 0x7F | 0x80)
+        valor >>= 7
+    saida.append(valor)
+
+
+def codificar_lista(valores: List[int]) -> bytes:
+    """Codifica uma lista crescente de inteiros não negativos como diferenças em varint"""
+    if not valores:
+        return b''
+    saida = bytearray()
+    _varint(valores[0], saida)
+    diferencas = list(map(sub, islice(valores, 1, None), valores))
+    if not diferencas or max(diferencas) < 0x80:
+        saida += bytes(diferencas)
+    else:
+        for diferenca in diferencas:
+            _varint(diferenca, saida)
+    return bytes(saida)
+
+
+def decodificar_lista(dados: bytes) -> List[int]:
+    """Inverso de codificar_lista"""
+    # O primeiro valor (absoluto) costuma ter vários bytes; as diferenças, um só
+    atual = deslocamento = posicao = 0
+    for posicao, byte in enumerate(dados, 1):
+        atual |= (byte & 0x7F) << deslocamento
+        deslocamento += 7
+        if byte < 0x80:
+            break
+    else:
+        return []
+    resto = dados[posicao:]
+    if resto.isascii():
+        # Todas as diferenças têm um byte: soma acumulada em C
+        return list(accumulate(resto, initial=atual))
+
+    valores = [atual]
+    valor = deslocamento = 0
+    for byte in resto:
+        if byte & 0x80:
+            valor |= (byte & 0x7F) << deslocamento
+            deslocamento += 7
+        else:
+            atual += valor | byte << deslocamento
+            valores.append(atual)
+            valor = deslocamento = 0
+    return valores
+
+
+def _deslocamentos(tamanhos: Iterable[int]) -> array:
+    """Array com o início de cada trecho e o fim do último (4 bytes por entrada se couber)"""
+    fins = list(accumulate(tamanhos, initial=0))
+    return array('I' if fins[-1] < 1 << 32 else 'Q', fins)
+
+
+class NomesComprimidos(Sequence):
+    """Nomes dos vértices em ordem de índice, guardados em um único bloco UTF-8"""
+
+    def __init__(self, codificados: List[bytes]):
+        self.bloco = b''.join(codificados)
+        self.deslocamentos = _deslocamentos(map(len, codificados))
+
+    def __len__(self):
+        return len(self.deslocamentos) - 1
+
+    def __getitem__(self, indice: int) -> str:
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError("índice de vértice fora do intervalo")
+        return self.bloco[self.deslocamentos[indice]:self.deslocamentos[indice + 1]].decode('utf-8')
+
+    def __iter__(self) -> Iterator[str]:
+        return self.intervalo(0, len(self))
+
+    def intervalo(self, inicio: int, fim: int) -> Iterator[str]:
+        """Nomes dos índices de `inicio` a `fim` - 1"""
+        bloco, deslocamentos = self.bloco, self.deslocamentos
+        for a, b in zip(islice(deslocamentos, inicio, fim), islice(deslocamentos, inicio + 1, fim + 1)):
+            yield bloco[a:b].decode('utf-8')
+
+    def buscar(self, chave: bytes, inicio: int, fim: int) -> Optional[int]:
+        """Busca binária do nome (em UTF-8) entre os índices `inicio` e `fim` - 1"""
+        bloco, deslocamentos = self.bloco, self.deslocamentos
+        limite = fim
+        while inicio < fim:
+            meio = (inicio + fim) // 2
+            if bloco[deslocamentos[meio]:deslocamentos[meio + 1]] < chave:
+                inicio = meio + 1
+            else:
+                fim = meio
+        if inicio < limite and bloco[deslocamentos[inicio]:deslocamentos[inicio + 1]] == chave:
+            return inicio
+        return None
+
+
+class ConjuntoComprimido(ConjuntoAbstrato):
+    """Conjunto somente leitura dos nomes dos vértices com índice em [inicio, fim)"""
+
+    def __init__(self, grafo, inicio: int, fim: int):
+        self.grafo = grafo
+        self.inicio = inicio
+        self.fim = fim
+
+    @classmethod
+    def _from_iterable(cls, elementos):
+        # Resultados de &, |, - etc. são conjuntos comuns em memória
+        return set(elementos)
+
+    def __contains__(self, nome):
+        indice = self.grafo.indice(nome)
+        return indice is not None and self.inicio <= indice < self.fim
+
+    def __len__(self):
+        return self.fim - self.inicio
+
+    def __iter__(self):
+        return self.grafo.nomes.intervalo(self.inicio, self.fim)
+
+    def __repr__(self):
+        return f"ConjuntoComprimido({len(self)} elementos)"
+
+
+class GrafoComprimido(GrafoBipartido):
+    """
+    GrafoBipartido somente leitura com nomes e listas de adjacência comprimidos
+
+    Criado a partir de um grafo (GrafoComprimido.de_grafo ou
+    grafo.comprimir()) ou carregado direto de um arquivo texto ou snapshot
+    em um GrafoComprimido vazio. O BFS e as recomendações trabalham com os
+    índices e só convertem em nomes o que devolvem. Para alterar o grafo,
+    use para_grafo().
+    """
+
+    def __init__(self, metricas=None):
+        super().__init__(metricas)
+        self.grafo = None
+        self._montar([], bytearray(), array('i'), array('i'))
+
+    @classmethod
+    def de_grafo(cls, grafo: GrafoBipartido) -> 'GrafoComprimido':
+        """Comprime um grafo (sem as arestas e vértices removidos)"""
+        comprimido = cls(grafo.metricas)
+        comprimido._carregar_grafo(grafo)
+        return comprimido
+
+    def _carregar_grafo(self, grafo: GrafoBipartido):
+        nomes = list(grafo.vertices)
+        indice = {nome: i for i, nome in enumerate(nomes)}
+        usuarios, filmes = grafo.usuarios, grafo.filmes
+        papeis = bytearray((nome in usuarios) | (nome in filmes) << 1 for nome in nomes)
+        origens, destinos = array('i'), array('i')
+        for i, nome in enumerate(nomes):
+            adjacencia = grafo.vizinhos(nome)
+            origens.extend(repeat(i, len(adjacencia)))
+            destinos.extend(map(indice.__getitem__, adjacencia))
+        self._montar(nomes, papeis, origens, destinos)
+
+    def _montar(self, nomes: List[str], papeis: bytearray, origens: array, destinos: array):
+        """
+        Constrói as estruturas comprimidas a partir dos nomes, dos papéis
+        (1: usuário, 2: filme) e das entradas de adjacência (origem -> destino,
+        cada aresta nos dois sentidos), numerados pela posição em `nomes`
+        """
+        num_vertices = len(nomes)
+        with self.metricas.cronometro(instrumentacao.INTERNACAO):
+            codificados = [nome.encode('utf-8') for nome in nomes]
+            chaves = [(GRUPO_PAPEL[papel], nome) for papel, nome in zip(papeis, codificados)]
+            ordem = sorted(range(num_vertices), key=chaves.__getitem__)
+            del chaves
+            novo = array('i', [0]) * num_vertices
+            for posicao, i in enumerate(ordem):
+                novo[i] = posicao
+            self.nomes = NomesComprimidos(list(map(codificados.__getitem__, ordem)))
+            del codificados, ordem
+
+        quantidades = Counter(papeis)
+        self.inicio_usuarios = quantidades[2]
+        self.fim_filmes = quantidades[2] + quantidades[3]
+        self.fim_usuarios = self.fim_filmes + quantidades[1]
+        self.grupos = [(inicio, fim) for inicio, fim in ((0, self.inicio_usuarios),
+                                                         (self.inicio_usuarios, self.fim_filmes),
+                                                         (self.fim_filmes, self.fim_usuarios),
+                                                         (self.fim_usuarios, num_vertices))
+                       if inicio < fim]
+        self.vertices = ConjuntoComprimido(self, 0, num_vertices)
+        self.usuarios = ConjuntoComprimido(self, self.inicio_usuarios, self.fim_usuarios)
+        self.filmes = ConjuntoComprimido(self, 0, self.fim_filmes)
+
+        # Ordena as entradas por (origem, destino) de uma vez, com chaves inteiras
+        chaves = sorted(map(add, map(mul, map(novo.__getitem__, origens), repeat(num_vertices)),
+                            map(novo.__getitem__, destinos)))
+        graus = Counter(map(floordiv, chaves, repeat(num_vertices)))
+        vizinhos = list(map(mod, chaves, repeat(num_vertices)))
+        del chaves, novo
+
+        dados = bytearray()
+        tamanhos = []
+        inicio = 0
+        for i in range(num_vertices):
+            fim = inicio + graus[i]
+            trecho = codificar_lista(vizinhos[inicio:fim])
+            dados += trecho
+            tamanhos.append(len(trecho))
+            inicio = fim
+        self.dados = bytes(dados)
+        self.inicios = _deslocamentos(tamanhos)
+        self.entradas = len(vizinhos)
+
+    def indice(self, vertice: str) -> Optional[int]:
+        """Índice do vértice, ou None se ele não existir"""
+        if not isinstance(vertice, str):
+            return None
+        chave = vertice.encode('utf-8')
+        for inicio, fim in self.grupos:
+            encontrado = self.nomes.buscar(chave, inicio, fim)
+            if encontrado is not None:
+                return encontrado
+        return None
+
+    def vizinhos_indices(self, indice: int) -> List[int]:
+        """Índices dos adjacentes do vértice, em ordem crescente"""
+        return decodificar_lista(self.dados[self.inicios[indice]:self.inicios[indice + 1]])
+
+    def vizinhos(self, vertice: str) -> List[str]:
+        """Adjacentes do vértice (lista nova a cada chamada)"""
+        indice = self.indice(vertice)
+        if indice is None:
+            return []
+        return list(map(self.nomes.__getitem__, self.vizinhos_indices(indice)))
+
+    def _leitor_vizinhos(self):
+        return self.vizinhos
+
+    def total_arestas(self) -> int:
+        """Retorna o número de arestas do grafo"""
+        return self.entradas // 2
+
+    def eventos_bfs(self, cor: Optional[Dict[str, int]] = None) -> Iterator[EventoBFS]:
+        """Mesmos eventos de GrafoBipartido.eventos_bfs, percorrendo os índices"""
+        if cor is None:
+            cor = {}
+        nomes = self.nomes
+        cor.update(zip(nomes, repeat(0)))
+        cores = bytearray(len(nomes))
+        vizinhos = self.vizinhos_indices
+        desenfileirados = percorridas = 0
+
+        for inicial in range(len(nomes)):
+            if cores[inicial] == 0:
+                fila = deque([inicial])
+                cores[inicial] = 1
+                nome = nomes[inicial]
+                cor[nome] = 1
+                yield EventoBFS(INICIO_COMPONENTE, nome, 1)
+
+                while fila:
+                    u = fila.popleft()
+                    nome_u = nomes[u]
+                    yield EventoBFS(DESENFILEIRAR, nome_u, cores[u])
+                    adjacentes = vizinhos(u)
+                    desenfileirados += 1
+                    percorridas += len(adjacentes)
+
+                    for v in adjacentes:
+                        if cores[v] == 0:
+                            cores[v] = 3 - cores[u]
+                            fila.append(v)
+                            nome = nomes[v]
+                            cor[nome] = cores[v]
+                            yield EventoBFS(COLORIR, nome, cores[v], nome_u)
+                        elif cores[v] == cores[u]:
+                            yield EventoBFS(CONFLITO, nomes[v], cores[v], nome_u)
+                            self._contar_bfs(desenfileirados, percorridas)
+                            yield EventoBFS(FIM, bipartido=False)
+                            return
+
+        self._contar_bfs(desenfileirados, percorridas)
+        yield EventoBFS(FIM, bipartido=True)
+
+    def eh_bipartido_bfs(self, registrar_passos: bool = True) -> Tuple[bool, Dict[str, int], List[str]]:
+        """
+        Verifica se o grafo é bipartido; sem registrar_passos, colore só os
+        índices e monta o dicionário de cores no fim
+        """
+        if registrar_passos:
+            return super().eh_bipartido_bfs(registrar_passos)
+        with self.metricas.cronometro(instrumentacao.BFS):
+            bipartido, cores = self._colorir()
+            cor = dict(zip(self.nomes, cores))
+        return bipartido, cor, []
+
+    def _colorir(self) -> Tuple[bool, bytearray]:
+        """BFS sobre os índices; retorna (bipartido, cor de cada índice)"""
+        cores = bytearray(len(self.nomes))
+        vizinhos = self.vizinhos_indices
+        desenfileirados = percorridas = 0
+        for inicial in range(len(cores)):
+            if cores[inicial]:
+                continue
+            fila = deque([inicial])
+            cores[inicial] = 1
+            while fila:
+                u = fila.popleft()
+                adjacentes = vizinhos(u)
+                desenfileirados += 1
+                percorridas += len(adjacentes)
+                oposta = 3 - cores[u]
+                for v in adjacentes:
+                    if cores[v] == 0:
+                        cores[v] = oposta
+                        fila.append(v)
+                    elif cores[v] != oposta:
+                        self._contar_bfs(desenfileirados, percorridas)
+                        return False, cores
+        self._contar_bfs(desenfileirados, percorridas)
+        return True, cores
+
+    def pontuar_recomendacoes(self, usuario: str,
+                              limites: Optional[LimitesRecomendacao] = None) -> Dict[str, float]:
+        """
+        Pontuação de GrafoBipartido.pontuar_recomendacoes, calculada sobre os índices
+
+        Sem limites, o resultado é o mesmo do GrafoBipartido. Com
+        max_espectadores ou orcamento, a amostra e o corte seguem a ordem das
+        listas de adjacência, que aqui é a dos índices (nomes em ordem) e no
+        GrafoBipartido a de inserção: o resultado é determinístico, mas pode
+        diferir do obtido no grafo original.
+        """
+        indice = self.indice(usuario)
+        if indice is None or not self.inicio_usuarios <= indice < self.fim_usuarios:
+            return {}
+        pontuacao = self._pontuar(indice, self.vizinhos_indices,
+                                  range(self.inicio_usuarios, self.fim_usuarios), range(self.fim_filmes),
+                                  limites or self.limites_recomendacao)
+        nomes = self.nomes
+        return {nomes[filme]: pontos for filme, pontos in pontuacao.items()}
+
+    def para_grafo(self) -> GrafoBipartido:
+        """GrafoBipartido (alterável) com o mesmo conteúdo; cada nome é criado uma única vez"""
+        grafo = GrafoBipartido(self.metricas)
+        nomes = list(self.nomes)
+        for i, nome in enumerate(nomes):
+            adjacencia = self.vizinhos_indices(i)
+            if adjacencia:
+                grafo.grafo[nome] = list(map(nomes.__getitem__, adjacencia))
+        grafo.entradas = self.entradas
+        grafo.vertices.update(nomes)
+        grafo.usuarios.update(islice(nomes, self.inicio_usuarios, self.fim_usuarios))
+        grafo.filmes.update(islice(nomes, 0, self.fim_filmes))
+        return grafo
+
+    def comprimir(self) -> 'GrafoComprimido':
+        return self
+
+    def _somente_leitura(self, *args):
+        raise ValueError("o GrafoComprimido é somente leitura; use para_grafo() para alterá-lo")
+
+    adicionar_aresta = remover_aresta = remover_vertice = _somente_leitura
+
+    def compactar(self):
+        """Nada a fazer: o grafo comprimido não tem lápides"""
+
+    def carregar_de_linhas(self, linhas: Iterable[str]) -> int:
+        """
+        Carrega arestas no formato USUARIO,FILME em um GrafoComprimido vazio,
+        sem criar as listas de adjacência do GrafoBipartido; retorna quantas foram lidas
+        """
+        if len(self.nomes):
+            self._somente_leitura()
+        ids = {}
+        papeis = bytearray()
+        origens, destinos = array('i'), array('i')
+        total = 0
+        with self.metricas.cronometro(instrumentacao.CARGA):
+            for campos in ler_campos(linhas):
+                usuario = ids.setdefault(campos[0], len(ids))
+                if usuario == len(papeis):
+                    papeis.append(0)
+                filme = ids.setdefault(campos[1], len(ids))
+                if filme == len(papeis):
+                    papeis.append(0)
+                papeis[usuario] |= 1
+                papeis[filme] |= 2
+                origens.append(usuario)
+                destinos.append(filme)
+                origens.append(filme)
+                destinos.append(usuario)
+                total += 1
+            self._montar(list(ids), papeis, origens, destinos)
+        self.metricas.contar(instrumentacao.ARESTAS_CARREGADAS, total)
+        return total
+
+    def carregar_snapshot(self, arquivo: str):
+        """Carrega um snapshot em um GrafoComprimido vazio"""
+        if len(self.nomes):
+            self._somente_leitura()
+        grafo = GrafoBipartido(self.metricas)
+        grafo.carregar_snapshot(arquivo)
+        self._carregar_grafo(grafo)
+
+    def salvar_snapshot(self, arquivo: str):
+        """Salva no mesmo formato de snapshot do GrafoBipartido"""
+        self.para_grafo().salvar_snapshot(arquivo)
+
+    def relatorio_memoria(self, cor: Optional[Dict[str, int]] = None,
+                          passos: Optional[List[str]] = None, **opcoes):
+        """Bytes de cada estrutura comprimida (e de `cor` e `passos`, se informados)"""
+        from memoria import ItemMemoria, itens_execucao
+        itens = [
+            ItemMemoria('nomes (bloco UTF-8)', sys.getsizeof(self.nomes.bloco), len(self.nomes)),
+            ItemMemoria('deslocamentos dos nomes', sys.getsizeof(self.nomes.deslocamentos),
+                        len(self.nomes.deslocamentos)),
+            ItemMemoria('listas (varints)', sys.getsizeof(self.dados), self.entradas),
+            ItemMemoria('deslocamentos das listas', sys.getsizeof(self.inicios), len(self.inicios)),
+        ]
+        itens.extend(itens_execucao(cor, passos, **opcoes))
+        return itens
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python adjacencia_comprimida.py arquivo_grafo")
+        return 1
+
+    from memoria import exibir_relatorio, formatar_bytes
+
+    grafo = GrafoBipartido()
+    grafo.carregar_de_arquivo(sys.argv[1])
+    comprimido = grafo.comprimir()
+    arestas = grafo.total_arestas()
+
+    original = sum(item.bytes for item in grafo.relatorio_memoria())
+    exibir_relatorio(comprimido.relatorio_memoria(), arestas)
+    total = sum(item.bytes for item in comprimido.relatorio_memoria())
+    if total:
+        print(f"\nGrafoBipartido: {formatar_bytes(original)} ({original / total:.1f}× o comprimido)")
+
+    eh_bipartido, cor, _ = comprimido.eh_bipartido_bfs(registrar_passos=False)
+    print("\n" + "="*50)
+    print(f"RESULTADO: {'BIPARTIDO' if eh_bipartido else 'NÃO BIPARTIDO'}")
+    print("="*50)
+    if eh_bipartido:
+        for usuario in sorted(comprimido.usuarios):
+            recomendacoes = comprimido.recomendar_filmes(usuario, cor, k=3)
+            print(f"  {usuario}: {', '.join(recomendacoes) or '(nenhuma recomendação)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,38 +11,390 @@ Ano: 2024
 
 
 
-import matplotlib.pyplot as plt
-import matplotlib.animation as animation
-from matplotlib.patches import Rectangle
-import networkx as nx
-from grafo_bipartido import GrafoBipartido
+import os
+import shutil
+import subprocess
+import tempfile
+from array import array
+
+# matplotlib, numpy e Pillow são importados apenas ao desenhar ou gravar,
+# para que construir os estados da animação não pague essa importação
+from grafo_bipartido import COLORIR, CONFLITO, FIM, INICIO_COMPONENTE, GrafoBipartido
+
+
+# Cor de desenho para cada cor do algoritmo (0 = não visitado)
+CORES_ANIMACAO = {0: 'lightgray', 1: '#FF6B6B', 2: '#4ECDC4', 3: '#FFD93D'}
+
+# Cor dos deltas de conflito: vértice com a mesma cor de um adjacente
+COR_CONFLITO = 3
+
+
+class EstadosAnimacao:
+    """
+    Estados da animação armazenados de forma compacta
+
+    Cada passo guarda apenas o delta (vértice, cor) em vez de uma cópia de
+    todas as cores. A cada `intervalo_keyframe` deltas é guardado um keyframe
+    com as cores de todos os vértices, o que permite reconstruir qualquer
+    frame aplicando no máximo `intervalo_keyframe` deltas.
+
+    Frames: 0 = estado inicial, 1..n = um por delta, n+1 = resultado final
+    """
+
+    def __init__(self, vertices, intervalo_keyframe=4096):
+        self.vertices = list(vertices)
+        self.indice = {v: i for i, v in enumerate(self.vertices)}
+        self.intervalo_keyframe = intervalo_keyframe
+        self.eh_bipartido = None
+
+        self.delta_vertice = array('l')  # Vértice colorido em cada passo
+        self.delta_cor = array('b')      # Cor atribuída (1 ou 2, ou COR_CONFLITO)
+        self.delta_origem = array('l')   # Vértice sendo processado (-1 = início de BFS)
+
+        self._cores = bytearray(len(self.vertices))  # Cores após o último delta
+        self.keyframes = [bytes(self._cores)]         # Keyframe k = após k*intervalo deltas
+
+    def registrar(self, vertice, cor, origem=None):
+        """Registra que `vertice` recebeu `cor` ao processar `origem`"""
+        vid = self.indice[vertice]
+        self.delta_vertice.append(vid)
+        self.delta_cor.append(cor)
+        self.delta_origem.append(-1 if origem is None else self.indice[origem])
+        self._cores[vid] = cor
+
+        if len(self.delta_vertice) % self.intervalo_keyframe == 0:
+            self.keyframes.append(bytes(self._cores))
+
+    def __len__(self):
+        return len(self.delta_vertice) + 2
+
+    def cores_no_frame(self, frame):
+        """Reconstrói as cores (0/1/2 por id de vértice) de um frame qualquer"""
+        n = min(frame, len(self.delta_vertice))  # Frame final repete o último estado
+        k = n // self.intervalo_keyframe
+        cores = bytearray(self.keyframes[k])
+        for i in range(k * self.intervalo_keyframe, n):
+            cores[self.delta_vertice[i]] = self.delta_cor[i]
+        return cores
+
+    def delta_do_frame(self, frame):
+        """Retorna (id_vertice, cor) alterado no frame, ou None se não houver"""
+        if 1 <= frame <= len(self.delta_vertice):
+            return self.delta_vertice[frame - 1], self.delta_cor[frame - 1]
+        return None
+
+    def texto_do_frame(self, frame):
+        """Gera o texto explicativo do frame sob demanda"""
+        if frame == 0:
+            return "Estado Inicial\nTodos os vértices não visitados"
+
+        if frame > len(self.delta_vertice):
+            if self.eh_bipartido:
+                return "✓ GRAFO É BIPARTIDO!\n\nV1 (vermelho) e V2 (azul)"
+            return "✗ GRAFO NÃO É BIPARTIDO!\n\nEncontrado ciclo ímpar"
+
+        v = self.vertices[self.delta_vertice[frame - 1]]
+        origem = self.delta_origem[frame - 1]
+        if self.delta_cor[frame - 1] == COR_CONFLITO:
+            return (f"✗ CONFLITO ao processar '{self.vertices[origem]}'\n"
+                    f"'{v}' tem a mesma cor que seu adjacente")
+        if origem < 0:
+            return f"Iniciando BFS em '{v}'\nCor 1 (V1) atribuída"
+        return (f"Processando '{self.vertices[origem]}'\n"
+                f"Colorindo '{v}' com cor {self.delta_cor[frame - 1]}")
+
+
+def construir_estados_animacao(grafo, intervalo_keyframe=4096, cor=None):
+    """
+    Constrói os estados da animação a partir dos eventos do BFS
+
+    Consome o mesmo fluxo de eventos de GrafoBipartido.eventos_bfs, sem
+    simular a travessia novamente. Se `cor` for informado, recebe as cores finais.
+    """
+    estados = EstadosAnimacao(sorted(grafo.vertices), intervalo_keyframe)
+
+    for evento in grafo.eventos_bfs(cor):
+        if evento.tipo == INICIO_COMPONENTE:
+            estados.registrar(evento.vertice, evento.cor)
+        elif evento.tipo == COLORIR:
+            estados.registrar(evento.vertice, evento.cor, origem=evento.origem)
+        elif evento.tipo == CONFLITO:
+            estados.registrar(evento.vertice, COR_CONFLITO, origem=evento.origem)
+        elif evento.tipo == FIM:
+            estados.eh_bipartido = evento.bipartido
+
+    return estados
+
+
+class GravadorQuadros:
+    """Grava quadros RGBA já renderizados em MP4 (ffmpeg) ou GIF (Pillow)"""
+
+    def __init__(self, arquivo, largura, altura, fps):
+        self.arquivo = arquivo
+        self.tamanho = (largura, altura)
+        self.fps = fps
+        self._quadros = []
+        self._proc = None
+
+        if not arquivo.lower().endswith('.gif'):
+            from matplotlib import rcParams
+
+            ffmpeg = shutil.which(rcParams['animation.ffmpeg_path'])
+            if ffmpeg is None:
+                raise RuntimeError("ffmpeg não encontrado")
+            self._proc = subprocess.Popen(
+                [ffmpeg, '-y', '-loglevel', 'error',
+                 '-f', 'rawvideo', '-pix_fmt', 'rgba',
+                 '-s', f'{largura}x{altura}', '-r', str(fps), '-i', '-',
+                 '-vcodec', rcParams['animation.codec'], '-pix_fmt', 'yuv420p',
+                 arquivo],
+                stdin=subprocess.PIPE)
+
+    def gravar(self, buffer_rgba):
+        """Adiciona um quadro (buffer RGBA do canvas)"""
+        if self._proc is not None:
+            self._proc.stdin.write(buffer_rgba)
+        else:
+            from PIL import Image
+
+            imagem = Image.frombuffer('RGBA', self.tamanho, bytes(buffer_rgba), 'raw', 'RGBA', 0, 1)
+            self._quadros.append(imagem.convert('RGB').quantize())
+
+    def fechar(self):
+        """Finaliza o arquivo de saída"""
+        if self._proc is not None:
+            self._proc.stdin.close()
+            if self._proc.wait() != 0:
+                raise RuntimeError(f"ffmpeg terminou com código {self._proc.returncode}")
+        elif self._quadros:
+            self._quadros[0].save(self.arquivo, save_all=True, append_images=self._quadros[1:],
+                                  duration=int(1000 / self.fps), loop=0)
+
+
+class CenaAnimacao:
+    """
+    Figura da animação
+
+    Arestas, rótulos e legenda são desenhados uma única vez. A cada frame só
+    mudam as cores dos vértices tocados pelo passo e os textos do painel
+    direito, de modo que o custo de um frame depende do delta e não do
+    tamanho do grafo.
+    """
+
+    def __init__(self, estados, pos, arestas):
+        import numpy as np
+        import matplotlib.pyplot as plt
+        from matplotlib.collections import LineCollection
+        from matplotlib.colors import to_rgba
+
+        self.estados = estados
+        self.frame = None
+
+        self.fig, (self.ax1, self.ax2) = plt.subplots(1, 2, figsize=(16, 8), dpi=100)
+        self.fig.suptitle('Algoritmo de Verificação de Grafo Bipartido - BFS', fontsize=16, weight='bold')
+
+        # Painel esquerdo - Grafo (estático)
+        self._tabela_rgba = np.array([to_rgba(CORES_ANIMACAO[c]) for c in range(len(CORES_ANIMACAO))])
+        self._rgba = np.tile(self._tabela_rgba[0], (len(estados.vertices), 1))
+        self._xy = np.array([pos[v] for v in estados.vertices], dtype=float).reshape(-1, 2)
+
+        self.ax1.add_collection(LineCollection([(pos[u], pos[v]) for u, v in arestas],
+                                               colors='k', linewidths=2, alpha=0.5, zorder=1))
+        self.nos = self.ax1.scatter(self._xy[:, 0], self._xy[:, 1], s=1200,
+                                    c=self._rgba, zorder=2)
+        for v, (x, y) in zip(estados.vertices, self._xy):
+            self.ax1.text(x, y, v, fontsize=9, weight='bold', ha='center', va='center', zorder=3)
+
+        legend_elements = [
+            plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=CORES_ANIMACAO[0],
+                       markersize=10, label='Não visitado'),
+            plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=CORES_ANIMACAO[1],
+                       markersize=10, label='Conjunto V1'),
+            plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=CORES_ANIMACAO[2],
+                       markersize=10, label='Conjunto V2'),
+            plt.Line2D([0], [0], marker='o', color='w', markerfacecolor=CORES_ANIMACAO[COR_CONFLITO],
+                       markersize=10, label='Conflito')
+        ]
+        self.ax2.legend(handles=legend_elements, loc='lower center')
+        self.ax1.margins(0.1, 0.05)
+        self.ax1.set_title('Visualização do Grafo', fontsize=12, weight='bold')
+        self.ax1.axis('off')
+
+        # Vértice recém-colorido, desenhado por cima do fundo já renderizado
+        self.destaque = self.ax1.scatter([0], [0], s=1200, zorder=2, animated=True)
+        self.rotulo_destaque = self.ax1.text(0, 0, '', fontsize=9, weight='bold', ha='center',
+                                             va='center', zorder=3, animated=True)
+
+        # Painel direito - Explicação
+        self.contador = self.ax2.text(0.5, 0.9, '', ha='center', va='center', fontsize=12,
+                                      weight='bold', animated=True)
+        self.texto = self.ax2.text(0.5, 0.5, '', ha='center', va='center', fontsize=14,
+                                   bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5),
+                                   wrap=True, animated=True)
+        self.ax2.set_xlim(0, 1)
+        self.ax2.set_ylim(0, 1)
+        self.ax2.axis('off')
+        self.ax2.set_title('Explicação do Passo', fontsize=12, weight='bold')
+
+    def _aplicar_frame(self, frame):
+        """
+        Atualiza as cores internas para o frame
+
+        Retorna None se foi preciso reconstruir todas as cores (salto para um
+        frame não consecutivo) ou o delta (id_vertice, cor) do passo.
+        """
+        sequencial = self.frame is not None and frame == self.frame + 1
+        self.frame = frame
+
+        if not sequencial:
+            import numpy as np
+
+            cores = np.frombuffer(self.estados.cores_no_frame(frame), dtype=np.uint8)
+            self._rgba[:] = self._tabela_rgba[cores]
+            return None
+
+        delta = self.estados.delta_do_frame(frame)
+        if delta is not None:
+            self._rgba[delta[0]] = self._tabela_rgba[delta[1]]
+        return delta or ()
+
+    def _atualizar_textos(self, frame):
+        self.contador.set_text(f'Passo {frame}/{len(self.estados) - 1}')
+        self.texto.set_text(self.estados.texto_do_frame(frame))
+
+    def atualizar(self, frame):
+        """Função de frame para FuncAnimation com blit=True"""
+        self._aplicar_frame(frame)
+        self.nos.set_facecolor(self._rgba)
+        self._atualizar_textos(frame)
+        return self.nos, self.contador, self.texto
+
+    def renderizar(self, frames):
+        """
+        Gera o buffer RGBA de cada frame
+
+        O painel do grafo fica acumulado no fundo: a cada passo só o vértice
+        alterado é desenhado por cima e o resultado vira o novo fundo.
+        """
+        canvas = self.fig.canvas
+        self.nos.set_animated(False)
+        fundo_grafo = fundo_texto = None
+
+        for frame in frames:
+            delta = self._aplicar_frame(frame)
+
+            if delta is None:
+                # Redesenho completo (primeiro frame ou salto)
+                self.nos.set_facecolor(self._rgba)
+                canvas.draw()
+                fundo_texto = canvas.copy_from_bbox(self.ax2.bbox)
+            elif delta:
+                vid, cor = delta
+                canvas.restore_region(fundo_grafo)
+                self.destaque.set_offsets(self._xy[vid:vid + 1])
+                self.destaque.set_facecolor(self._tabela_rgba[cor])
+                self.rotulo_destaque.set_position(self._xy[vid])
+                self.rotulo_destaque.set_text(self.estados.vertices[vid])
+                self.ax1.draw_artist(self.destaque)
+                self.ax1.draw_artist(self.rotulo_destaque)
+            fundo_grafo = canvas.copy_from_bbox(self.ax1.bbox)
+
+            canvas.restore_region(fundo_texto)
+            self._atualizar_textos(frame)
+            self.ax2.draw_artist(self.contador)
+            self.ax2.draw_artist(self.texto)
+
+            yield canvas.buffer_rgba()
+
+    def salvar(self, arquivo, fps, frames):
+        """Renderiza os frames e grava em arquivo"""
+        largura, altura = self.fig.canvas.get_width_height()
+        gravador = GravadorQuadros(arquivo, largura, altura, fps)
+        try:
+            for buffer_rgba in self.renderizar(frames):
+                gravador.gravar(buffer_rgba)
+        finally:
+            gravador.fechar()
+
+    def mostrar(self, fps):
+        """Exibe a animação na tela usando blit"""
+        import matplotlib.pyplot as plt
+        import matplotlib.animation as animation
+
+        self.nos.set_animated(True)
+        self.frame = None
+        anim = animation.FuncAnimation(self.fig, self.atualizar, frames=len(self.estados),
+                                       interval=1000/fps, repeat=True, blit=True)
+        plt.show()
+        return anim
+
+
+def _renderizar_segmento(estados, pos, arestas, arquivo, fps, inicio, fim):
+    """Executado em um processo separado: reconstrói a figura e grava um trecho"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+    import matplotlib.pyplot as plt
+
+    cena = CenaAnimacao(estados, pos, arestas)
+    cena.salvar(arquivo, fps, range(inicio, fim))
+    plt.close(cena.fig)
+    return arquivo
+
+
+def concatenar_segmentos(segmentos, arquivo_saida, fps):
+    """Junta os trechos gravados (na ordem) em um único arquivo"""
+    if arquivo_saida.lower().endswith('.gif'):
+        from PIL import Image
+
+        quadros = []
+        for segmento in segmentos:
+            with Image.open(segmento) as imagem:
+                for i in range(imagem.n_frames):
+                    imagem.seek(i)
+                    quadros.append(imagem.copy())
+        quadros[0].save(arquivo_saida, save_all=True, append_images=quadros[1:],
+                        duration=int(1000 / fps), loop=0)
+        return
+
+    from matplotlib import rcParams
+
+    ffmpeg = shutil.which(rcParams['animation.ffmpeg_path'])
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg não encontrado")
+    lista = os.path.join(os.path.dirname(segmentos[0]), 'segmentos.txt')
+    with open(lista, 'w', encoding='utf-8') as f:
+        for segmento in segmentos:
+            f.write(f"file '{os.path.abspath(segmento)}'\n")
+    subprocess.run([ffmpeg, '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                    '-i', lista, '-c', 'copy', arquivo_saida], check=True)
 
 
 class AnimadorBipartido:
-    """Cria animação da execução do algoritmo"""
+    """
+    Cria animação da execução do algoritmo
 
-    def __init__(self, arquivo_grafo):
+    Com `centro`, anima só a visão ego desse usuário ou filme (até `saltos`
+    saltos, no máximo `max_vizinhos` vizinhos por vértice em cada salto; veja
+    GrafoBipartido.subgrafo_ego), o que viabiliza arquivos grandes.
+    """
+
+    def __init__(self, arquivo_grafo, centro=None, saltos=2, max_vizinhos=None):
         self.grafo = GrafoBipartido()
         self.grafo.carregar_de_arquivo(arquivo_grafo)
+        if centro is not None:
+            self.grafo = self.grafo.subgrafo_ego(centro, saltos, max_vizinhos)
 
-        # Executa o algoritmo para obter os passos
-        self.eh_bipartido, self.cores_finais, self.passos = self.grafo.eh_bipartido_bfs()
-
-        # Cria grafo NetworkX
-        self.G = nx.Graph()
-        for vertice in self.grafo.vertices:
-            self.G.add_node(vertice)
-        for u in self.grafo.grafo:
-            for v in self.grafo.grafo[u]:
-                self.G.add_edge(u, v)
+        # Arestas (cada aresta tem um usuário em uma das pontas)
+        self.arestas = [(u, f) for u in self.grafo.usuarios for f in self.grafo.vizinhos(u)]
 
         # Layout
         self.pos = self._criar_layout()
 
-        # Estados para animação
-        self.estados_cores = []
-        self.textos_passos = []
-        self._processar_passos()
+        # Executa o algoritmo registrando os estados da animação
+        # (deltas compactos + keyframes)
+        self.cores_finais = {}
+        self.estados = construir_estados_animacao(self.grafo, cor=self.cores_finais)
+        self.eh_bipartido = self.estados.eh_bipartido
 
     def _criar_layout(self):
         """Cria layout bipartido"""
@@ -60,119 +412,63 @@ class AnimadorBipartido:
 
         return pos
 
-    def _processar_passos(self):
-        """Processa os passos do algoritmo para criar estados de animação"""
-        cores_atuais = {v: 'lightgray' for v in self.G.nodes()}
-
-        # Estado inicial
-        self.estados_cores.append(cores_atuais.copy())
-        self.textos_passos.append("Estado Inicial\nTodos os vértices não visitados")
-
-        # Simula a execução novamente para capturar estados
-        cor_num = {v: 0 for v in self.grafo.vertices}
-        fila = []
-
-        for vertice_inicial in sorted(self.grafo.vertices):
-            if cor_num[vertice_inicial] == 0:
-                # Começa BFS
-                fila = [vertice_inicial]
-                cor_num[vertice_inicial] = 1
-                cores_atuais[vertice_inicial] = '#FF6B6B'
-
-                self.estados_cores.append(cores_atuais.copy())
-                self.textos_passos.append(f"Iniciando BFS em '{vertice_inicial}'\nCor 1 (V1) atribuída")
-
-                while fila:
-                    u = fila.pop(0)
-
-                    for v in self.grafo.grafo[u]:
-                        if cor_num[v] == 0:
-                            cor_num[v] = 3 - cor_num[u]
-                            cores_atuais[v] = '#FF6B6B' if cor_num[v] == 1 else '#4ECDC4'
-                            fila.append(v)
-
-                            self.estados_cores.append(cores_atuais.copy())
-                            self.textos_passos.append(
-                                f"Processando '{u}'\n"
-                                f"Colorindo '{v}' com cor {cor_num[v]}"
-                            )
-
-        # Estado final
-        if self.eh_bipartido:
-            self.textos_passos.append("✓ GRAFO É BIPARTIDO!\n\nV1 (vermelho) e V2 (azul)")
-        else:
-            self.textos_passos.append("✗ GRAFO NÃO É BIPARTIDO!\n\nEncontrado ciclo ímpar")
-
-    def criar_animacao(self, arquivo_saida='animacao_bipartido.mp4', fps=1):
-        """Cria a animação e salva em arquivo"""
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 8))
-        fig.suptitle('Algoritmo de Verificação de Grafo Bipartido - BFS', fontsize=16, weight='bold')
-
-        def atualizar_frame(frame):
-            ax1.clear()
-            ax2.clear()
-
-            # Painel esquerdo - Grafo
-            if frame < len(self.estados_cores):
-                cores_frame = [self.estados_cores[frame][node] for node in self.G.nodes()]
-
-                nx.draw_networkx_nodes(self.G, self.pos, node_color=cores_frame,
-                                       node_size=1200, ax=ax1)
-                nx.draw_networkx_labels(self.G, self.pos, font_size=9,
-                                        font_weight='bold', ax=ax1)
-                nx.draw_networkx_edges(self.G, self.pos, width=2, alpha=0.5, ax=ax1)
-
-                ax1.set_title(f'Visualização do Grafo - Passo {frame}/{len(self.estados_cores)-1}',
-                              fontsize=12, weight='bold')
-                ax1.axis('off')
-
-                # Legendas
-                legend_elements = [
-                    plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='lightgray',
-                               markersize=10, label='Não visitado'),
-                    plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='#FF6B6B',
-                               markersize=10, label='Conjunto V1'),
-                    plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='#4ECDC4',
-                               markersize=10, label='Conjunto V2')
+    def _salvar(self, arquivo, fps, processos):
+        """Salva a animação serialmente ou dividindo os frames entre processos"""
+        import matplotlib.pyplot as plt
+
+        num_frames = len(self.estados)
+        processos = min(processos, num_frames)
+
+        if processos <= 1:
+            cena = CenaAnimacao(self.estados, self.pos, self.arestas)
+            try:
+                cena.salvar(arquivo, fps, range(num_frames))
+            finally:
+                plt.close(cena.fig)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        _, extensao = os.path.splitext(arquivo)
+        limites = [num_frames * i // processos for i in range(processos + 1)]
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(arquivo))) as pasta:
+            with ProcessPoolExecutor(processos) as executor:
+                futuros = [
+                    executor.submit(_renderizar_segmento, self.estados, self.pos, self.arestas,
+                                    os.path.join(pasta, f'segmento_{i:04d}{extensao}'),
+                                    fps, limites[i], limites[i + 1])
+                    for i in range(processos)
                 ]
-                ax1.legend(handles=legend_elements, loc='upper left')
-
-                # Painel direito - Explicação
-                ax2.text(0.5, 0.5, self.textos_passos[frame],
-                         ha='center', va='center', fontsize=14,
-                         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5),
-                         wrap=True)
-                ax2.set_xlim(0, 1)
-                ax2.set_ylim(0, 1)
-                ax2.axis('off')
-                ax2.set_title('Explicação do Passo', fontsize=12, weight='bold')
-
-            return ax1, ax2
-
-        # Cria animação
-        num_frames = len(self.estados_cores)
-        anim = animation.FuncAnimation(fig, atualizar_frame, frames=num_frames,
-                                       interval=1000/fps, repeat=True)
-
-        # Salva
+                segmentos = [futuro.result() for futuro in futuros]
+            concatenar_segmentos(segmentos, arquivo, fps)
+
+    def criar_animacao(self, arquivo_saida='animacao_bipartido.mp4', fps=1, processos=1):
+        """
+        Cria a animação e salva em arquivo
+
+        Com processos > 1, os frames são divididos em trechos renderizados e
+        codificados em paralelo, e os trechos são concatenados no final.
+        """
+        num_frames = len(self.estados)
+
         print(f"Gerando animação com {num_frames} frames...")
         print("Isso pode levar alguns minutos...")
 
         try:
             # Tenta salvar como MP4
-            anim.save(arquivo_saida, writer='ffmpeg', fps=fps, dpi=100)
+            self._salvar(arquivo_saida, fps, processos)
             print(f"✓ Animação salva em: {arquivo_saida}")
         except Exception as e:
             print(f"Erro ao salvar MP4: {e}")
             print("Tentando salvar como GIF...")
             try:
                 arquivo_gif = arquivo_saida.replace('.mp4', '.gif')
-                anim.save(arquivo_gif, writer='pillow', fps=fps)
+                self._salvar(arquivo_gif, fps, processos)
                 print(f"✓ Animação salva em: {arquivo_gif}")
             except Exception as e2:
                 print(f"Erro ao salvar GIF: {e2}")
                 print("Mostrando animação na tela...")
-                plt.show()
+                CenaAnimacao(self.estados, self.pos, self.arestas).mostrar(fps)
 
 
 def main():
@@ -185,13 +481,25 @@ def main():
     if not arquivo:
         arquivo = "exemplo1.txt"
 
+    centro = input("Centro da visão ego (usuário ou filme; vazio = grafo inteiro): ").strip() or None
+    saltos, max_vizinhos = 2, None
+    if centro:
+        saltos_input = input("Saltos a partir do centro (padrão: 2): ").strip()
+        saltos = int(saltos_input) if saltos_input else 2
+        max_input = input("Máximo de vizinhos por vértice em cada salto (padrão: sem limite): ").strip()
+        max_vizinhos = int(max_input) if max_input else None
+
     print(f"\nCarregando grafo de '{arquivo}'...")
-    animador = AnimadorBipartido(arquivo)
+    try:
+        animador = AnimadorBipartido(arquivo, centro, saltos, max_vizinhos)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        return
 
-    print(f"\nGrafo carregado:")
+    print("\nGrafo carregado:")
     print(f"  - {len(animador.grafo.usuarios)} usuários")
     print(f"  - {len(animador.grafo.filmes)} filmes")
-    print(f"  - {len(animador.estados_cores)} passos de animação")
+    print(f"  - {len(animador.estados)} passos de animação")
 
     arquivo_saida = input("\nNome do arquivo de saída (padrão: animacao_bipartido.mp4): ").strip()
     if not arquivo_saida:
@@ -200,7 +508,10 @@ def main():
     fps_input = input("FPS (quadros por segundo, padrão: 1): ").strip()
     fps = float(fps_input) if fps_input else 1.0
 
-    animador.criar_animacao(arquivo_saida, fps)
+    processos_input = input(f"Processos para renderizar (padrão: 1, disponíveis: {os.cpu_count()}): ").strip()
+    processos = int(processos_input) if processos_input else 1
+
+    animador.criar_animacao(arquivo_saida, fps, processos)
 
     print("\n" + "="*60)
     print("Processo concluído!")
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento do Grafo em SQLite (fora da memória)
+Permite usar grafos cujas arestas não cabem na RAM: vértices e listas de
+adjacência ficam em um banco SQLite local, e só as listas mais usadas
+ficam em memória, em um cache LRU de tamanho limitado
+
+Esquema:
+- vertices(id, nome, usuario, filme): cada nome é gravado uma única vez e
+  identificado por um inteiro;
+- arestas(origem, destino): cada aresta é gravada nos dois sentidos, com um
+  índice (origem, destino) que responde a consulta de vizinhos sem ler a tabela.
+
+GrafoSQLite tem a mesma interface do GrafoBipartido: vizinhos(), vertices,
+usuarios e filmes (consultados no banco), eh_bipartido_bfs, recomendar_filmes,
+estatísticas e remoções funcionam sem alteração.
+
+Uso:
+    python armazenamento_sqlite.py banco.db [arquivo_grafo]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import sqlite3
+import sys
+from collections import OrderedDict
+from collections.abc import Set as ConjuntoAbstrato
+from itertools import islice
+from typing import Iterable, List
+
+import instrumentacao
+from grafo_bipartido import GrafoBipartido, ler_campos
+
+
+# Assinatura dos arquivos SQLite
+MAGICO_SQLITE = b'SQLite format 3\x00'
+
+# Entradas (vizinhos) mantidas no cache de listas de adjacência
+CACHE_PADRAO = 1_000_000
+
+# Arestas inseridas por transação no carregamento em lote
+TAMANHO_LOTE = 50000
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS vertices (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE,
+    usuario INTEGER NOT NULL DEFAULT 0,
+    filme INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS arestas (
+    origem INTEGER NOT NULL,
+    destino INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS arestas_origem ON arestas(origem, destino);
+CREATE INDEX IF NOT EXISTS vertices_usuarios ON vertices(nome) WHERE usuario = 1;
+CREATE INDEX IF NOT EXISTS vertices_filmes ON vertices(nome) WHERE filme = 1;
+"""
+
+SQL_VIZINHOS = """
+SELECT d.nome, d.usuario, d.filme FROM vertices o
+JOIN arestas a ON a.origem = o.id
+JOIN vertices d ON d.id = a.destino
+WHERE o.nome = ?
+"""
+
+
+def eh_sqlite(arquivo: str) -> bool:
+    """Indica se o arquivo é um banco SQLite"""
+    with open(arquivo, 'rb') as f:
+        return f.read(len(MAGICO_SQLITE)) == MAGICO_SQLITE
+
+
+class ConjuntoSQLite(ConjuntoAbstrato):
+    """
+    Conjunto somente leitura dos nomes de vértices que satisfazem uma
+    condição da tabela vertices
+
+    Cada operação consulta o banco, exceto os testes de pertinência de
+    vértices cujos papéis (usuário, filme) já estão em `papeis`.
+    """
+
+    def __init__(self, conexao, condicao, papeis, papel=None):
+        self.conexao = conexao
+        self.condicao = condicao
+        self.papeis = papeis
+        self.papel = papel
+
+    @classmethod
+    def _from_iterable(cls, elementos):
+        # Resultados de &, |, - etc. são conjuntos comuns em memória
+        return set(elementos)
+
+    def __contains__(self, nome):
+        papeis = self.papeis.get(nome)
+        if papeis is not None:
+            return True if self.papel is None else papeis[self.papel]
+        consulta = f"SELECT 1 FROM vertices WHERE nome = ? AND {self.condicao}"
+        return self.conexao.execute(consulta, (nome,)).fetchone() is not None
+
+    def __len__(self):
+        return self.conexao.execute(f"SELECT COUNT(*) FROM vertices WHERE {self.condicao}").fetchone()[0]
+
+    def __iter__(self):
+        for (nome,) in self.conexao.execute(f"SELECT nome FROM vertices WHERE {self.condicao}"):
+            yield nome
+
+    def __repr__(self):
+        return f"ConjuntoSQLite({self.condicao!r}, {len(self)} elementos)"
+
+
+class GrafoSQLite(GrafoBipartido):
+    """
+    GrafoBipartido guardado em um banco SQLite, com cache LRU das listas de
+    adjacência mais usadas (até `cache_entradas` vizinhos no total)
+
+    As alterações são confirmadas no banco ao fim de cada carregamento, em
+    salvar() e em fechar(). `acertos_cache` e `falhas_cache` contam as
+    consultas de vizinhos atendidas pelo cache e pelo banco.
+    """
+
+    def __init__(self, caminho: str, cache_entradas: int = CACHE_PADRAO, metricas=None):
+        super().__init__(metricas)
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute("PRAGMA journal_mode = WAL")
+        self.conexao.execute("PRAGMA synchronous = NORMAL")
+        self.conexao.executescript(ESQUEMA)
+        self.conexao.commit()
+
+        # As estruturas em memória do GrafoBipartido dão lugar ao banco
+        self.grafo = None
+        self.papeis = {}   # nome -> (é usuário, é filme), dos vértices vistos em listas lidas
+        self.vertices = ConjuntoSQLite(self.conexao, '1', self.papeis)
+        self.usuarios = ConjuntoSQLite(self.conexao, 'usuario = 1', self.papeis, 0)
+        self.filmes = ConjuntoSQLite(self.conexao, 'filme = 1', self.papeis, 1)
+
+        self.cache_entradas = cache_entradas
+        self.cache = OrderedDict()
+        self.entradas_cache = 0
+        self.acertos_cache = 0
+        self.falhas_cache = 0
+
+    def vizinhos(self, vertice: str) -> List[str]:
+        """Adjacentes do vértice, do cache ou do banco (não alterar a lista)"""
+        adjacencia = self.cache.get(vertice)
+        if adjacencia is not None:
+            self.cache.move_to_end(vertice)
+            self.acertos_cache += 1
+            self.metricas.contar(instrumentacao.CACHE_ACERTOS)
+            return adjacencia
+
+        self.falhas_cache += 1
+        self.metricas.contar(instrumentacao.CACHE_FALHAS)
+        linhas = self.conexao.execute(SQL_VIZINHOS, (vertice,)).fetchall()
+        adjacencia = [nome for nome, _, _ in linhas]
+
+        # Os papéis dos vizinhos vêm na mesma consulta; o cache de papéis é
+        # esvaziado de uma vez quando passa do limite
+        if len(self.papeis) > self.cache_entradas:
+            self.papeis.clear()
+        for nome, usuario, filme in linhas:
+            self.papeis[nome] = (usuario == 1, filme == 1)
+
+        if len(adjacencia) < self.cache_entradas:
+            self.cache[vertice] = adjacencia
+            self.entradas_cache += len(adjacencia) + 1
+            while self.entradas_cache > self.cache_entradas:
+                _, antiga = self.cache.popitem(last=False)
+                self.entradas_cache -= len(antiga) + 1
+        return adjacencia
+
+    def _leitor_vizinhos(self):
+        return self.vizinhos
+
+    def _descartar_do_cache(self, *vertices):
+        for vertice in vertices:
+            self.papeis.pop(vertice, None)
+            adjacencia = self.cache.pop(vertice, None)
+            if adjacencia is not None:
+                self.entradas_cache -= len(adjacencia) + 1
+
+    def _id(self, nome: str):
+        linha = self.conexao.execute("SELECT id FROM vertices WHERE nome = ?", (nome,)).fetchone()
+        return None if linha is None else linha[0]
+
+    def adicionar_aresta(self, usuario: str, filme: str):
+        """Adiciona uma aresta entre usuário e filme"""
+        executar = self.conexao.execute
+        executar("INSERT INTO vertices(nome, usuario) VALUES (?, 1) "
+                 "ON CONFLICT(nome) DO UPDATE SET usuario = 1", (usuario,))
+        executar("INSERT INTO vertices(nome, filme) VALUES (?, 1) "
+                 "ON CONFLICT(nome) DO UPDATE SET filme = 1", (filme,))
+        id_usuario, id_filme = self._id(usuario), self._id(filme)
+        self.conexao.executemany("INSERT INTO arestas VALUES (?, ?)",
+                                 [(id_usuario, id_filme), (id_filme, id_usuario)])
+        self._descartar_do_cache(usuario, filme)
+        for observador in self.observadores:
+            observador.aresta_adicionada(usuario, filme)
+
+    def carregar_de_linhas(self, linhas: Iterable[str]) -> int:
+        """
+        Carrega arestas no formato USUARIO,FILME em lotes de TAMANHO_LOTE,
+        resolvendo nomes e ids dentro do banco; retorna quantas foram lidas
+        """
+        if self.observadores:
+            # Observadores precisam ser avisados aresta a aresta
+            total = super().carregar_de_linhas(linhas)
+            self.salvar()
+            return total
+
+        executar = self.conexao.execute
+        executar("CREATE TEMP TABLE IF NOT EXISTS carga (usuario TEXT, filme TEXT)")
+        total = 0
+        campos = ((c[0], c[1]) for c in ler_campos(linhas))
+        with self.metricas.cronometro(instrumentacao.CARGA):
+            while True:
+                lote = list(islice(campos, TAMANHO_LOTE))
+                if not lote:
+                    break
+                self.conexao.executemany("INSERT INTO carga VALUES (?, ?)", lote)
+                executar("INSERT INTO vertices(nome, usuario) SELECT DISTINCT usuario, 1 FROM carga "
+                         "WHERE true ON CONFLICT(nome) DO UPDATE SET usuario = 1")
+                executar("INSERT INTO vertices(nome, filme) SELECT DISTINCT filme, 1 FROM carga "
+                         "WHERE true ON CONFLICT(nome) DO UPDATE SET filme = 1")
+                executar("INSERT INTO arestas SELECT u.id, f.id FROM carga "
+                         "JOIN vertices u ON u.nome = carga.usuario JOIN vertices f ON f.nome = carga.filme")
+                executar("INSERT INTO arestas SELECT f.id, u.id FROM carga "
+                         "JOIN vertices u ON u.nome = carga.usuario JOIN vertices f ON f.nome = carga.filme")
+                executar("DELETE FROM carga")
+                self.conexao.commit()
+                total += len(lote)
+        self.metricas.contar(instrumentacao.ARESTAS_CARREGADAS, total)
+        self.cache.clear()
+        self.entradas_cache = 0
+        self.papeis.clear()
+        return total
+
+    def remover_aresta(self, usuario: str, filme: str) -> bool:
+        """Apaga a aresta do banco; retorna False se ela não existir"""
+        id_usuario, id_filme = self._id(usuario), self._id(filme)
+        if id_usuario is None or id_filme is None:
+            return False
+        apagadas = self.conexao.execute(
+            "DELETE FROM arestas WHERE (origem = ? AND destino = ?) OR (origem = ? AND destino = ?)",
+            (id_usuario, id_filme, id_filme, id_usuario)).rowcount
+        if not apagadas:
+            return False
+        self._descartar_do_cache(usuario, filme)
+        for observador in self.observadores:
+            observador.aresta_removida(usuario, filme)
+        return True
+
+    def remover_vertice(self, vertice: str) -> bool:
+        """Apaga o vértice e suas arestas do banco; retorna False se ele não existir"""
+        id_vertice = self._id(vertice)
+        if id_vertice is None:
+            return False
+        vizinhos = set(self.vizinhos(vertice))
+        self.conexao.execute("DELETE FROM arestas WHERE origem IN "
+                             "(SELECT destino FROM arestas WHERE origem = ?) AND destino = ?",
+                             (id_vertice, id_vertice))
+        self.conexao.execute("DELETE FROM arestas WHERE origem = ?", (id_vertice,))
+        self.conexao.execute("DELETE FROM vertices WHERE id = ?", (id_vertice,))
+        self._descartar_do_cache(vertice, *vizinhos)
+        for observador in self.observadores:
+            observador.vertice_removido(vertice, vizinhos)
+        return True
+
+    def compactar(self):
+        """Nada a fazer: as remoções apagam as linhas do banco na hora"""
+
+    def total_arestas(self) -> int:
+        """Retorna o número de arestas do grafo"""
+        return self.conexao.execute("SELECT COUNT(*) FROM arestas").fetchone()[0] // 2
+
+    def salvar_snapshot(self, arquivo: str):
+        raise ValueError("o snapshot binário é para grafos em memória; o banco SQLite já é persistente")
+
+    def carregar_snapshot(self, arquivo: str):
+        raise ValueError("carregue o texto com carregar_de_linhas; snapshots são para grafos em memória")
+
+    def salvar(self):
+        """Confirma no banco as alterações pendentes"""
+        self.conexao.commit()
+
+    def fechar(self):
+        """Confirma as alterações e fecha o banco"""
+        if self.conexao is not None:
+            self.conexao.commit()
+            self.conexao.close()
+            self.conexao = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python armazenamento_sqlite.py banco.db [arquivo_grafo]")
+        return 1
+
+    with GrafoSQLite(sys.argv[1]) as grafo:
+        if len(sys.argv) > 2:
+            grafo.carregar_de_arquivo(sys.argv[2])
+        grafo.exibir_estatisticas()
+
+        eh_bipartido, cor, _ = grafo.eh_bipartido_bfs(registrar_passos=False)
+        print("\n" + "="*50)
+        print(f"RESULTADO: {'BIPARTIDO' if eh_bipartido else 'NÃO BIPARTIDO'}")
+        print("="*50)
+        if eh_bipartido:
+            for usuario in sorted(grafo.usuarios):
+                recomendacoes = grafo.recomendar_filmes(usuario, cor, k=3)
+                print(f"  {usuario}: {', '.join(recomendacoes) or '(nenhuma recomendação)'}")
+        print(f"\nCache: {grafo.acertos_cache} acertos, {grafo.falhas_cache} consultas ao banco")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
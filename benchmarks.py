@@ -0,0 +1,857 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks do Projeto
+Mede tempo e memória das principais operações em grafos sintéticos grandes
+
+Uso:
+    python benchmarks.py                  # executa todos
+    python benchmarks.py estados_animacao # executa apenas os indicados
+
+Benchmarks que verificam limites (como `importacao`) fazem o script
+terminar com código 1 quando o limite é ultrapassado.
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from grafo_bipartido import GrafoBipartido
+from memoria import formatar_bytes
+
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Módulos do projeto que não podem carregar bibliotecas de terceiros ao serem importados
+MODULOS_PROJETO = ('grafo_bipartido', 'exportacao', 'animacao', 'criar_excel_completo',
+                   'visualizador')
+
+# Tempo máximo de importação do núcleo (cumulativo, em ms)
+ORCAMENTO_IMPORTACAO_NUCLEO_MS = 100
+
+
+def gerar_grafo_sintetico(num_usuarios, num_filmes, filmes_por_usuario,
+                          expoente=2.0, semente=42):
+    """
+    Gera um grafo usuários-filmes aleatório (e bipartido)
+
+    A popularidade dos filmes é enviesada por `expoente`: quanto maior,
+    mais concentradas as arestas nos primeiros filmes (distribuição de cauda longa).
+    """
+    rng = random.Random(semente)
+    grafo = GrafoBipartido()
+    for u in range(num_usuarios):
+        usuario = f"U{u}"
+        escolhidos = set()
+        while len(escolhidos) < filmes_por_usuario:
+            escolhidos.add(int(num_filmes * rng.random() ** expoente))
+        for f in escolhidos:
+            grafo.adicionar_aresta(usuario, f"F{f}")
+    return grafo
+
+
+def gerar_grafo_agrupado(num_usuarios, num_filmes, num_grupos, filmes_por_grupo=12,
+                         manter=0.8, ruido=2, semente=42):
+    """
+    Gera um grafo em que os usuários formam grupos de gosto parecido
+
+    Cada grupo tem um conjunto base de filmes; cada usuário fica com cada
+    filme da base com probabilidade `manter` e ganha `ruido` filmes aleatórios.
+    """
+    rng = random.Random(semente)
+    bases = [rng.sample(range(num_filmes), filmes_por_grupo) for _ in range(num_grupos)]
+    grafo = GrafoBipartido()
+    for u in range(num_usuarios):
+        base = bases[rng.randrange(num_grupos)]
+        escolhidos = {f for f in base if rng.random() < manter}
+        escolhidos.update(rng.randrange(num_filmes) for _ in range(ruido))
+        for f in escolhidos:
+            grafo.adicionar_aresta(f"U{u}", f"F{f}")
+    return grafo
+
+
+def medir(funcao, *args, **kwargs):
+    """Executa a função medindo tempo e pico de memória alocada"""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    tempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, tempo, pico
+
+
+def benchmark_estados_animacao():
+    """Construção dos estados da animação para um grafo de ~100k vértices"""
+    from animacao import construir_estados_animacao
+
+    grafo = gerar_grafo_sintetico(50000, 50000, 3)
+    print(f"  Grafo: {len(grafo.vertices)} vértices")
+
+    estados, tempo, pico = medir(construir_estados_animacao, grafo)
+    print(f"  Frames: {len(estados)}")
+    print(f"  Keyframes: {len(estados.keyframes)}")
+    print(f"  Tempo: {tempo:.2f} s")
+    print(f"  Pico de memória: {formatar_bytes(pico)}")
+
+    _, tempo_acesso, _ = medir(estados.cores_no_frame, len(estados) // 2)
+    print(f"  Acesso aleatório a um frame: {tempo_acesso * 1000:.2f} ms")
+
+
+def benchmark_renderizacao_animacao():
+    """Tempo por frame da renderização incremental da animação"""
+    import matplotlib
+    matplotlib.use('Agg')
+    from animacao import CenaAnimacao, construir_estados_animacao
+
+    for num_usuarios in (100, 1000, 5000):
+        grafo = gerar_grafo_sintetico(num_usuarios, num_usuarios, 2)
+        estados = construir_estados_animacao(grafo)
+        usuarios, filmes = sorted(grafo.usuarios), sorted(grafo.filmes)
+        pos = {v: (0, i) for i, v in enumerate(usuarios)}
+        pos.update({v: (5, i) for i, v in enumerate(filmes)})
+        arestas = [(u, f) for u in usuarios for f in grafo.vizinhos(u)]
+        cena = CenaAnimacao(estados, pos, arestas)
+
+        frames = cena.renderizar(range(len(estados)))
+        inicio = time.perf_counter()
+        next(frames)
+        tempo_inicial = time.perf_counter() - inicio
+
+        num_frames = min(200, len(estados) - 1)
+        inicio = time.perf_counter()
+        for _ in range(num_frames):
+            next(frames)
+        tempo_frame = (time.perf_counter() - inicio) / num_frames
+        print(f"  {len(grafo.vertices):6d} vértices: primeiro frame {tempo_inicial * 1000:8.1f} ms, "
+              f"demais {tempo_frame * 1000:6.2f} ms/frame")
+
+
+def benchmark_emparelhamento():
+    """Emparelhamento máximo (Hopcroft-Karp) em grafos com milhões de arestas"""
+    from emparelhamento import hopcroft_karp, indexar_grafo
+
+    for num_usuarios, vagas in ((200000, 1), (400000, 1), (200000, 2)):
+        grafo = gerar_grafo_sintetico(num_usuarios, num_usuarios // 2, 5)
+        inicio_tempo = time.perf_counter()
+        usuarios, filmes, inicio, destinos = indexar_grafo(grafo)
+        tempo_indice = time.perf_counter() - inicio_tempo
+        del grafo
+
+        inicio_tempo = time.perf_counter()
+        par = hopcroft_karp(len(usuarios), len(filmes), inicio, destinos, [vagas] * len(filmes))
+        tempo = time.perf_counter() - inicio_tempo
+
+        atendidos = sum(1 for r in par if r != -1)
+        print(f"  {len(destinos):8d} arestas, {vagas} vaga(s)/filme: "
+              f"indexação {tempo_indice:5.2f} s, emparelhamento {tempo:6.2f} s, "
+              f"{atendidos} de {len(usuarios)} usuários atendidos")
+
+    # Filme "hub" com muitas vagas: cada fase visita seus ocupantes uma única vez
+    num_usuarios = 200000
+    inicio = list(range(0, 2 * num_usuarios + 1, 2))
+    destinos = [r for u in range(num_usuarios) for r in (0, 1 + u % 50)]
+    inicio_tempo = time.perf_counter()
+    par = hopcroft_karp(num_usuarios, 51, inicio, destinos, [20000] + [1] * 50)
+    tempo = time.perf_counter() - inicio_tempo
+    print(f"  filme com 20000 vagas e {num_usuarios} espectadores: emparelhamento {tempo:6.2f} s, "
+          f"{sum(1 for r in par if r != -1)} usuários atendidos")
+
+
+def benchmark_projecao():
+    """Projeção usuário-usuário top-20 com hubs, sob diferentes orçamentos de memória"""
+    from projecao import construir_projecao
+
+    grafo = gerar_grafo_sintetico(50000, 50000, 5)
+    print(f"  Grafo: {len(grafo.vertices)} vértices, {grafo.total_arestas()} arestas "
+          f"({os.cpu_count()} CPUs)")
+
+    paralelo = max(2, os.cpu_count() or 1)
+    for memoria, processos in ((256 * 1024 * 1024, 1), (8 * 1024 * 1024, 1), (8 * 1024 * 1024, paralelo)):
+        projecao, tempo, pico = medir(construir_projecao, grafo, 'usuarios', top_n=20,
+                                      memoria_maxima=memoria, processos=processos)
+        with projecao:
+            print(f"  orçamento {formatar_bytes(memoria):>9}, {processos} processo(s): "
+                  f"{tempo:6.2f} s, pico {formatar_bytes(pico):>9}, "
+                  f"{projecao.total_entradas} entradas ({projecao.linhas_em_disco} linhas em disco)")
+
+
+def benchmark_similaridade():
+    """Recall e latência do índice MinHash/LSH contra o método exato"""
+    from similaridade import IndiceMinHash, similares_exatos
+
+    grafo = gerar_grafo_agrupado(100000, 20000, 2000)
+    print(f"  Grafo: {len(grafo.vertices)} vértices, {grafo.total_arestas()} arestas")
+
+    inicio = time.perf_counter()
+    indice = IndiceMinHash(grafo, acompanhar=False)
+    print(f"  Construção do índice: {time.perf_counter() - inicio:.2f} s "
+          f"({indice.num_permutacoes} permutações, {indice.bandas} bandas, "
+          f"limiar do LSH ≈ {indice.limiar_lsh:.2f})")
+
+    limiar = 0.5
+    consultas = random.Random(7).sample(sorted(grafo.usuarios), 300)
+    exatos = {}
+    inicio = time.perf_counter()
+    for usuario in consultas:
+        exatos[usuario] = {outro for outro, _ in similares_exatos(grafo, usuario, limiar)}
+    print(f"  Método exato: {(time.perf_counter() - inicio) / len(consultas) * 1000:.2f} ms por consulta")
+
+    relevantes = sum(map(len, exatos.values()))
+    for exato in (False, True):
+        encontrados = retornados = 0
+        inicio = time.perf_counter()
+        for usuario in consultas:
+            aproximados = {outro for outro, _ in indice.similares(usuario, limiar, exato=exato)}
+            retornados += len(aproximados)
+            encontrados += len(exatos[usuario] & aproximados)
+        tempo = (time.perf_counter() - inicio) / len(consultas)
+        print(f"  LSH ({'Jaccard exato' if exato else 'Jaccard estimado'}): {tempo * 1000:.3f} ms "
+              f"por consulta, recall {encontrados / max(relevantes, 1):.1%}, "
+              f"precisão {encontrados / max(retornados, 1):.1%} (Jaccard ≥ {limiar})")
+
+    inicio = time.perf_counter()
+    grafo.registrar_observador(indice)
+    for i in range(10000):
+        grafo.adicionar_aresta(f"U{i}", f"F{i % 20000}")
+    print(f"  Atualização incremental: "
+          f"{(time.perf_counter() - inicio) / 10000 * 1e6:.1f} µs por aresta")
+
+
+def benchmark_distribuido():
+    """Grafo particionado entre processos: carga, BFS por nível e recomendações em lote"""
+    from distribuido import GrafoDistribuido
+
+    grafo = gerar_grafo_sintetico(50000, 50000, 4)
+    arestas = [(u, f) for u in grafo.usuarios for f in grafo.vizinhos(u)]
+    consultas = sorted(grafo.usuarios)[:2000]
+    print(f"  Grafo: {len(grafo.vertices)} vértices, {len(arestas)} arestas ({os.cpu_count()} CPUs)")
+
+    inicio = time.perf_counter()
+    grafo.eh_bipartido_bfs(registrar_passos=False)
+    tempo_bfs = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for usuario in consultas:
+        grafo.ranquear_filmes(usuario, 10)
+    tempo_rec = time.perf_counter() - inicio
+    print(f"  1 processo (GrafoBipartido): BFS {tempo_bfs:.2f} s, "
+          f"{len(consultas)} recomendações {tempo_rec:.2f} s")
+
+    for num_particoes in (2, 4):
+        with GrafoDistribuido(num_particoes) as distribuido:
+            inicio = time.perf_counter()
+            for usuario, filme in arestas:
+                distribuido.adicionar_aresta(usuario, filme)
+            distribuido.estatisticas()
+            tempo_carga = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            resultado = distribuido.eh_bipartido()
+            tempo_bfs = time.perf_counter() - inicio
+
+            mensagens = distribuido.mensagens
+            inicio = time.perf_counter()
+            distribuido.recomendar_lote(consultas, 10)
+            tempo_rec = time.perf_counter() - inicio
+            mensagens_rec = distribuido.mensagens - mensagens
+
+        print(f"  {num_particoes} partições: carga {tempo_carga:.2f} s, "
+              f"BFS {tempo_bfs:.2f} s ({resultado.componentes} componentes, {resultado.niveis} níveis, "
+              f"{resultado.mensagens} mensagens), "
+              f"{len(consultas)} recomendações {tempo_rec:.2f} s ({mensagens_rec} mensagens)")
+
+    # Muitos componentes pequenos (usuários com filmes só deles): vários por rodada
+    with GrafoDistribuido(4) as distribuido:
+        for u in range(20000):
+            distribuido.adicionar_aresta(f"U{u}", f"F{u}")
+            distribuido.adicionar_aresta(f"U{u}", f"G{u}")
+        distribuido.estatisticas()
+        inicio = time.perf_counter()
+        resultado = distribuido.eh_bipartido()
+        print(f"  4 partições, {resultado.componentes} componentes pequenos: "
+              f"BFS {time.perf_counter() - inicio:.2f} s ({resultado.niveis} níveis, "
+              f"{resultado.mensagens} mensagens)")
+
+
+def benchmark_remocao():
+    """Remoções com lápides: custo por remoção, BFS com lápides e compactação"""
+    import grafo_bipartido
+
+    grafo = gerar_grafo_sintetico(50000, 50000, 4)
+    arestas = [(u, f) for u in grafo.usuarios for f in grafo.vizinhos(u)]
+    random.Random(1).shuffle(arestas)
+    print(f"  Grafo: {len(grafo.vertices)} vértices, {len(arestas)} arestas")
+
+    inicio = time.perf_counter()
+    grafo.eh_bipartido_bfs(registrar_passos=False)
+    print(f"  BFS sem remoções: {time.perf_counter() - inicio:.2f} s")
+
+    # Remove 20% das arestas sem deixar compactar, para medir o BFS com lápides
+    limiar = grafo_bipartido.LIMIAR_COMPACTACAO
+    grafo_bipartido.LIMIAR_COMPACTACAO = 1.0
+    try:
+        removidas = arestas[:len(arestas) // 5]
+        inicio = time.perf_counter()
+        for usuario, filme in removidas:
+            grafo.remover_aresta(usuario, filme)
+        tempo = time.perf_counter() - inicio
+    finally:
+        grafo_bipartido.LIMIAR_COMPACTACAO = limiar
+    print(f"  {len(removidas)} remoções: {tempo / len(removidas) * 1e6:.2f} µs por remoção")
+
+    inicio = time.perf_counter()
+    grafo.eh_bipartido_bfs(registrar_passos=False)
+    print(f"  BFS com {len(grafo.arestas_removidas)} lápides: {time.perf_counter() - inicio:.2f} s")
+
+    inicio = time.perf_counter()
+    grafo.compactar()
+    print(f"  Compactação: {time.perf_counter() - inicio:.2f} s")
+
+    inicio = time.perf_counter()
+    grafo.eh_bipartido_bfs(registrar_passos=False)
+    print(f"  BFS após compactar: {time.perf_counter() - inicio:.2f} s")
+
+    # Com o limiar padrão, as compactações automáticas entram no custo amortizado
+    inicio = time.perf_counter()
+    restantes = arestas[len(removidas):]
+    for usuario, filme in restantes:
+        grafo.remover_aresta(usuario, filme)
+    tempo = time.perf_counter() - inicio
+    print(f"  Removendo as {len(restantes)} restantes (com compactação automática): "
+          f"{tempo / len(restantes) * 1e6:.2f} µs por remoção")
+
+
+def benchmark_janela_temporal():
+    """Fluxo de um ano de visualizações em uma janela de 30 dias: vazão e tamanho do grafo"""
+    from grafo_temporal import DIA, GrafoTemporal
+
+    rng = random.Random(1)
+    total = 300000
+    eventos = sorted((rng.random() * 365 * DIA, f"U{rng.randrange(50000)}", f"F{rng.randrange(20000)}")
+                     for _ in range(total))
+
+    grafo = GrafoTemporal(janela=30 * DIA)
+    inicio = time.perf_counter()
+    for instante, usuario, filme in eventos:
+        grafo.adicionar_aresta(usuario, filme, instante)
+    tempo = time.perf_counter() - inicio
+    print(f"  {total} arestas em 365 dias: {total / tempo:,.0f} arestas/s "
+          f"({tempo / total * 1e6:.2f} µs por aresta, com expiração)")
+    print(f"  Na janela de 30 dias: {grafo.total_arestas()} arestas, {len(grafo.vertices)} vértices "
+          f"(sem janela: {total} arestas)")
+
+    inicio = time.perf_counter()
+    grafo.eh_bipartido_bfs(registrar_passos=False)
+    print(f"  BFS na janela: {time.perf_counter() - inicio:.2f} s")
+
+    usuarios = sorted(grafo.usuarios)[:2000]
+    inicio = time.perf_counter()
+    for usuario in usuarios:
+        grafo.ranquear_filmes(usuario, 10)
+    print(f"  Recomendações na janela: {(time.perf_counter() - inicio) / len(usuarios) * 1e3:.3f} ms por usuário")
+
+
+def benchmark_instrumentacao():
+    """Custo das métricas desligadas e ligadas no BFS e nas recomendações"""
+    from instrumentacao import METRICAS_NULAS, Metricas
+
+    grafo = gerar_grafo_sintetico(50000, 50000, 4)
+    usuarios = sorted(grafo.usuarios)[:3000]
+    for descricao, metricas in (('desligadas', METRICAS_NULAS), ('ligadas', Metricas())):
+        grafo.metricas = metricas
+        melhor_bfs = melhor_recomendacao = float('inf')
+        for _ in range(3):
+            inicio = time.perf_counter()
+            grafo.eh_bipartido_bfs(registrar_passos=False)
+            melhor_bfs = min(melhor_bfs, time.perf_counter() - inicio)
+            inicio = time.perf_counter()
+            for usuario in usuarios:
+                grafo.ranquear_filmes(usuario, 10)
+            melhor_recomendacao = min(melhor_recomendacao, time.perf_counter() - inicio)
+        print(f"  Métricas {descricao}: BFS {melhor_bfs:.3f} s, "
+              f"{len(usuarios)} recomendações {melhor_recomendacao:.3f} s")
+    grafo.metricas = METRICAS_NULAS
+
+
+def benchmark_memoria():
+    """Relatório de memória por amostragem contra a medição exata e o tracemalloc"""
+    import tempfile
+    from memoria import medir_pico, relatorio_memoria
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'grafo.txt')
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            for _ in range(200000):
+                f.write(f"U{rng.randrange(50000)},F{rng.randrange(20000)}\n")
+
+        grafo = GrafoBipartido()
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            grafo.carregar_de_linhas(f)
+        for descricao, amostra in (('amostragem', 10000), ('exato', sys.maxsize)):
+            inicio = time.perf_counter()
+            itens = relatorio_memoria(grafo, amostra=amostra)
+            tempo = time.perf_counter() - inicio
+            print(f"  Relatório ({descricao}): {formatar_bytes(sum(item.bytes for item in itens))} "
+                  f"em {tempo:.2f} s")
+        maior = max(itens, key=lambda item: item.bytes)
+        print(f"  Maior estrutura: {maior.estrutura} ({formatar_bytes(maior.bytes)})")
+
+        pico = medir_pico(arquivo)
+        print(f"  tracemalloc: {formatar_bytes(pico.apos_carga)} após a carga, "
+              f"pico {formatar_bytes(pico.pico_carga)}; pico no BFS {formatar_bytes(pico.pico_bfs)}")
+
+
+def benchmark_adjacencia_comprimida():
+    """Listas comprimidas (varints) contra o GrafoBipartido: memória residente, decodificação, BFS e recomendação"""
+    import tempfile
+
+    # Cauda longa: poucos filmes de sucesso e poucos usuários muito ativos concentram as arestas
+    rng = random.Random(1)
+    linhas = [f"U{int(50000 * rng.random() ** 2)},F{int(20000 * rng.random() ** 3)}\n"
+              for _ in range(200000)]
+    texto = GrafoBipartido()
+    texto.carregar_de_linhas(linhas)
+    snapshot = GrafoBipartido()
+    with tempfile.TemporaryDirectory() as diretorio:
+        texto.salvar_snapshot(os.path.join(diretorio, 'grafo.snap'))
+        snapshot.carregar_snapshot(os.path.join(diretorio, 'grafo.snap'))
+
+    inicio = time.perf_counter()
+    comprimido = texto.comprimir()
+    print(f"  {texto.total_arestas()} arestas, {len(comprimido.vertices)} vértices; "
+          f"compressão em {time.perf_counter() - inicio:.2f} s")
+
+    bytes_comprimido = sum(item.bytes for item in comprimido.relatorio_memoria())
+    print(f"  Comprimido: {formatar_bytes(bytes_comprimido)} "
+          f"({len(comprimido.dados) / comprimido.entradas:.2f} bytes por entrada de adjacência)")
+    for descricao, grafo in (('carregado do texto', texto), ('carregado do snapshot', snapshot)):
+        total = sum(item.bytes for item in grafo.relatorio_memoria())
+        print(f"  GrafoBipartido {descricao}: {formatar_bytes(total)} "
+              f"({total / bytes_comprimido:.1f}× o comprimido)")
+
+    inicio = time.perf_counter()
+    decodificadas = sum(len(comprimido.vizinhos_indices(i)) for i in range(len(comprimido.vertices)))
+    tempo = time.perf_counter() - inicio
+    print(f"  Decodificação de todas as listas: {decodificadas / tempo / 1e6:.1f} milhões de entradas/s")
+
+    usuarios = rng.sample(sorted(texto.usuarios), 300)
+    for descricao, grafo in (('GrafoBipartido', snapshot), ('comprimido', comprimido)):
+        inicio = time.perf_counter()
+        grafo.eh_bipartido_bfs(registrar_passos=False)
+        bfs = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        for usuario in usuarios:
+            grafo.ranquear_filmes(usuario, 10)
+        recomendacao = (time.perf_counter() - inicio) / len(usuarios) * 1e3
+        print(f"  {descricao:15} BFS {bfs:5.2f} s, recomendação {recomendacao:6.2f} ms por usuário")
+
+
+def benchmark_limites_recomendacao():
+    """Latência das recomendações de quem assistiu um filme muito popular, com e sem limites de fan-out"""
+    from grafo_bipartido import LimitesRecomendacao
+
+    limites = LimitesRecomendacao(max_espectadores=500, orcamento=20000)
+    rng = random.Random(1)
+    for grau_hub in (1000, 10000, 100000):
+        # Todos os usuários assistiram o hub e mais três filmes quaisquer
+        grafo = GrafoBipartido()
+        for i in range(grau_hub):
+            grafo.adicionar_aresta(f"U{i}", "Hub")
+            for _ in range(3):
+                grafo.adicionar_aresta(f"U{i}", f"F{rng.randrange(5000)}")
+        usuarios = [f"U{i}" for i in rng.sample(range(grau_hub), 50)]
+
+        for descricao, configuracao in (('sem limites', None), ('com limites', limites)):
+            tempos = []
+            for usuario in usuarios:
+                inicio = time.perf_counter()
+                grafo.ranquear_filmes(usuario, 10, configuracao)
+                tempos.append((time.perf_counter() - inicio) * 1e3)
+            tempos.sort()
+            print(f"  hub com {grau_hub:6} espectadores, {descricao}: "
+                  f"p50 {tempos[len(tempos) // 2]:8.2f} ms, p99 {tempos[len(tempos) * 99 // 100]:8.2f} ms")
+
+
+def benchmark_pagerank():
+    """PageRank personalizado (lote e Monte Carlo) contra a recomendação a dois saltos: cobertura e latência"""
+    from pagerank import RecomendadorPageRank
+
+    # Usuários de nicho (1 filme raro) têm poucos ou nenhum vizinho a dois saltos
+    rng = random.Random(1)
+    grafo = GrafoBipartido()
+    for i in range(20000):
+        for _ in range(rng.choice((1, 2, 3, 5, 10, 30))):
+            grafo.adicionar_aresta(f"U{i}", f"F{int(rng.paretovariate(1.1)) % 5000}")
+    for i in range(200):
+        grafo.adicionar_aresta(f"Nicho{i}", f"Raro{i}")
+        grafo.adicionar_aresta(f"Fa{i}", f"Raro{i}")
+        grafo.adicionar_aresta(f"Fa{i}", f"F{rng.randrange(50)}")
+    esparsos = [f"Nicho{i}" for i in range(200)]
+    amostra = [f"U{i}" for i in rng.sample(range(20000), 200)] + esparsos
+
+    inicio = time.perf_counter()
+    recomendador = RecomendadorPageRank(grafo)
+    indexacao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    recomendador.preparar_passeios()
+    preparo = time.perf_counter() - inicio
+    print(f"  {grafo.total_arestas()} arestas; NumPy: {'sim' if recomendador.usar_numpy else 'não'}; "
+          f"indexação {indexacao:.2f} s, segmentos de passeio {preparo:.2f} s")
+
+    def medir(descricao, recomendar, usuarios, em_lote=1):
+        vazios, tempos = 0, []
+        for i in range(0, len(usuarios), em_lote):
+            grupo = usuarios[i:i + em_lote]
+            inicio = time.perf_counter()
+            resultados = recomendar(grupo)
+            tempos.append((time.perf_counter() - inicio) / len(grupo) * 1e3)
+            vazios += sum(1 for resultado in resultados if len(resultado) < 10)
+        tempos.sort()
+        print(f"  {descricao:26} {tempos[len(tempos) // 2]:7.2f} ms/usuário (p50), "
+              f"{vazios / len(usuarios):4.0%} com menos de 10 recomendações")
+
+    for grupo, usuarios in (('todos', amostra), ('nicho', esparsos)):
+        print(f"  Usuários: {grupo} ({len(usuarios)})")
+        medir('dois saltos', lambda g: [grafo.ranquear_filmes(u, 10) for u in g], usuarios)
+        medir('PageRank em lotes de 50', lambda g: list(recomendador.recomendar_lote(g, 10).values()),
+              usuarios, 50)
+        medir('PageRank Monte Carlo', lambda g: [recomendador.recomendar_monte_carlo(u, 10) for u in g],
+              usuarios)
+
+    # Concordância do Monte Carlo com o PageRank exato
+    exatos = recomendador.recomendar_lote(amostra[:50], 10)
+    comuns = [len({f for f, _ in exatos[u]} & {f for f, _ in recomendador.recomendar_monte_carlo(u, 10)})
+              for u in amostra[:50]]
+    print(f"  Monte Carlo acerta em média {sum(comuns) / len(comuns):.1f} dos 10 primeiros do PageRank exato")
+
+
+def benchmark_concorrencia():
+    """Latência das consultas durante a carga: trava única no GrafoBipartido contra versões publicadas"""
+    import threading
+    from concorrencia import GrafoConcorrente
+
+    rng = random.Random(1)
+    linhas = [f"U{rng.randrange(20000)},F{rng.randrange(3000)}\n" for _ in range(200000)]
+    lote = 10000
+
+    def medir(descricao, carregar, consultar):
+        terminou = threading.Event()
+        tempos = []
+
+        def ler():
+            rng_leitor = random.Random(2)
+            while not terminou.is_set():
+                inicio = time.perf_counter()
+                consultar(f"U{rng_leitor.randrange(20000)}")
+                tempos.append((time.perf_counter() - inicio) * 1e3)
+                time.sleep(0.001)
+
+        leitores = [threading.Thread(target=ler) for _ in range(2)]
+        for leitor in leitores:
+            leitor.start()
+        inicio = time.perf_counter()
+        carregar()
+        carga = time.perf_counter() - inicio
+        terminou.set()
+        for leitor in leitores:
+            leitor.join()
+        tempos.sort()
+        print(f"  {descricao:22} carga {carga:5.2f} s; {len(tempos):6} consultas, "
+              f"p50 {tempos[len(tempos) // 2]:7.2f} ms, p99 {tempos[len(tempos) * 99 // 100]:7.2f} ms")
+
+    # Trava única: a escrita de cada lote bloqueia as consultas
+    grafo = GrafoBipartido()
+    trava = threading.Lock()
+
+    def carregar_com_trava():
+        for i in range(0, len(linhas), lote):
+            with trava:
+                grafo.carregar_de_linhas(linhas[i:i + lote])
+
+    def consultar_com_trava(usuario):
+        with trava:
+            grafo.ranquear_filmes(usuario, 10)
+
+    medir('trava única', carregar_com_trava, consultar_com_trava)
+
+    concorrente = GrafoConcorrente(publicar_a_cada=lote)
+    medir('versões (cópia)', lambda: concorrente.carregar_de_linhas(linhas),
+          lambda usuario: concorrente.ranquear_filmes(usuario, 10))
+    print(f"  {concorrente.epoca} versões publicadas")
+
+
+def benchmark_subgrafo_ego():
+    """Extração da visão ego (2 e 3 saltos) ao redor de hubs, com e sem limite de vizinhos por salto"""
+    rng = random.Random(1)
+    for grau_hub in (1000, 10000, 100000):
+        grafo = GrafoBipartido()
+        for i in range(grau_hub):
+            grafo.adicionar_aresta(f"U{i}", "Hub")
+            grafo.adicionar_aresta(f"U{i}", f"F{rng.randrange(5000)}")
+        for saltos, limite in ((2, None), (3, 20), (3, 5)):
+            duracoes = []
+            for _ in range(3):
+                inicio = time.perf_counter()
+                ego = grafo.subgrafo_ego("U0", saltos, limite)
+                duracoes.append((time.perf_counter() - inicio) * 1e3)
+            duracao = min(duracoes)
+            print(f"  hub com {grau_hub:6} espectadores, {saltos} saltos, limite {str(limite):>4}: "
+                  f"{len(ego.vertices):6} vértices, {ego.total_arestas():6} arestas em {duracao:8.2f} ms")
+
+
+def benchmark_wal():
+    """Ingestão com log de escrita antecipada (fsync em lotes) e tempo de recuperação após reinício"""
+    import shutil
+    import tempfile
+    from wal import GrafoDuravel
+
+    rng = random.Random(1)
+    linhas = [f"U{rng.randrange(50000)},F{rng.randrange(20000)}\n" for _ in range(200000)]
+
+    inicio = time.perf_counter()
+    GrafoBipartido().carregar_de_linhas(linhas)
+    base = time.perf_counter() - inicio
+    print(f"  {len(linhas)} arestas; sem log: {base:.2f} s")
+
+    diretorio = tempfile.mkdtemp()
+    try:
+        for fsync_a_cada in (1, 100, 10000):
+            pasta = os.path.join(diretorio, f'fsync_{fsync_a_cada}')
+            quantidade = linhas if fsync_a_cada > 1 else linhas[:5000]
+            inicio = time.perf_counter()
+            with GrafoDuravel(pasta, fsync_a_cada=fsync_a_cada, checkpoint_a_cada=None) as grafo:
+                grafo.carregar_de_linhas(quantidade)
+            duracao = time.perf_counter() - inicio
+            print(f"  log com fsync a cada {fsync_a_cada:5} alterações: "
+                  f"{len(quantidade) / duracao:9.0f} arestas/s ({len(quantidade)} arestas)")
+
+        # Recuperação: todo o histórico no log, contra snapshot + o final do log
+        pasta = os.path.join(diretorio, 'fsync_10000')
+        inicio = time.perf_counter()
+        with GrafoDuravel(pasta, checkpoint_a_cada=None) as grafo:
+            recuperacao_log = time.perf_counter() - inicio
+            grafo.checkpoint()
+            grafo.carregar_de_linhas(linhas[:10000])
+        inicio = time.perf_counter()
+        with GrafoDuravel(pasta, checkpoint_a_cada=None) as grafo:
+            recuperacao_snapshot = time.perf_counter() - inicio
+            reaplicadas = grafo.reaplicadas
+        print(f"  Recuperação só pelo log ({len(linhas)} alterações): {recuperacao_log:.2f} s")
+        print(f"  Recuperação por snapshot + {reaplicadas} alterações do log: {recuperacao_snapshot:.2f} s")
+    finally:
+        shutil.rmtree(diretorio)
+
+
+def benchmark_seguidor():
+    """Acompanhamento de arquivo em crescimento: custo por lote novo contra recarregar o arquivo inteiro"""
+    import shutil
+    import tempfile
+    from seguidor import EstatisticasIncrementais, SeguidorArquivo
+
+    rng = random.Random(1)
+    lote = 5000
+    diretorio = tempfile.mkdtemp()
+    caminho = os.path.join(diretorio, 'arestas.txt')
+    try:
+        open(caminho, 'w').close()
+        grafo = GrafoBipartido()
+        estatisticas = EstatisticasIncrementais(grafo)
+        with SeguidorArquivo(caminho, grafo) as seguidor:
+            for rodada in range(1, 41):
+                with open(caminho, 'a') as arquivo:
+                    arquivo.writelines(f"U{rng.randrange(50000)},F{rng.randrange(20000)}\n"
+                                       for _ in range(lote))
+                inicio = time.perf_counter()
+                seguidor.atualizar()
+                estatisticas.como_dicionario()
+                incremental = time.perf_counter() - inicio
+                if rodada % 10 == 0:
+                    inicio = time.perf_counter()
+                    completo = GrafoBipartido()
+                    with open(caminho, encoding='utf-8') as arquivo:
+                        completo.carregar_de_linhas(arquivo)
+                    sum(len(completo.vizinhos(u)) for u in completo.usuarios)
+                    recarga = time.perf_counter() - inicio
+                    print(f"  {rodada * lote:6} arestas no arquivo; +{lote} novas: "
+                          f"seguidor {incremental * 1000:6.1f} ms, recarga completa {recarga * 1000:7.1f} ms")
+    finally:
+        shutil.rmtree(diretorio)
+
+
+def benchmark_sqlite():
+    """Grafo em SQLite contra o grafo em memória: carga, BFS e recomendações com cache frio e quente"""
+    import tempfile
+    from armazenamento_sqlite import GrafoSQLite
+
+    rng = random.Random(1)
+    linhas = [f"U{rng.randrange(50000)},F{rng.randrange(20000)}\n" for _ in range(200000)]
+    usuarios = [f"U{i}" for i in rng.sample(range(50000), 1000)]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        memoria = GrafoBipartido()
+        sqlite = GrafoSQLite(os.path.join(diretorio, 'grafo.db'), cache_entradas=200000)
+        print(f"  {len(linhas)} arestas; cache do SQLite: {sqlite.cache_entradas} entradas")
+        for descricao, grafo in (('memória', memoria), ('SQLite', sqlite)):
+            inicio = time.perf_counter()
+            grafo.carregar_de_linhas(linhas)
+            carga = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            grafo.eh_bipartido_bfs(registrar_passos=False)
+            bfs = time.perf_counter() - inicio
+
+            tempos = []
+            for _ in range(2):
+                inicio = time.perf_counter()
+                for usuario in usuarios:
+                    grafo.ranquear_filmes(usuario, 10)
+                tempos.append((time.perf_counter() - inicio) / len(usuarios) * 1e3)
+            print(f"  {descricao:8} carga {carga:6.2f} s, BFS {bfs:6.2f} s, recomendação "
+                  f"{tempos[0]:.2f} ms (1ª passada), {tempos[1]:.2f} ms (2ª passada)")
+
+        consultas = sqlite.acertos_cache + sqlite.falhas_cache
+        print(f"  Cache: {sqlite.acertos_cache / consultas:.0%} de acertos em {consultas} consultas")
+        print(f"  Banco: {formatar_bytes(os.path.getsize(sqlite.caminho))}")
+        sqlite.fechar()
+
+
+def benchmark_verificacao_streaming():
+    """Verificação em uma passada contra carga completa + BFS: tempo e pico de memória"""
+    import tempfile
+    from verificacao_streaming import verificar_arquivo
+
+    def carregar_e_verificar(arquivo):
+        grafo = GrafoBipartido()
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            grafo.carregar_de_linhas(f)
+        return grafo.eh_bipartido_bfs(registrar_passos=False)[0]
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo = os.path.join(diretorio, 'grafo.txt')
+        with open(arquivo, 'w', encoding='utf-8') as f:
+            for _ in range(200000):
+                f.write(f"U{rng.randrange(50000)},F{rng.randrange(20000)}\n")
+        print(f"  Arquivo: 200000 arestas, {formatar_bytes(os.path.getsize(arquivo))}")
+
+        for descricao, funcao in (('streaming', verificar_arquivo),
+                                  ('carga + BFS', carregar_e_verificar)):
+            inicio = time.perf_counter()
+            funcao(arquivo)
+            tempo = time.perf_counter() - inicio
+            _, _, pico = medir(funcao, arquivo)
+            print(f"  {descricao:12} {tempo:6.2f} s, pico de memória {formatar_bytes(pico)}")
+
+
+def medir_importacao(modulo):
+    """
+    Importa o módulo em um interpretador novo com -X importtime
+
+    Retorna o tempo cumulativo de importação (ms) e o conjunto de módulos
+    importados, sem contar os já carregados na inicialização do Python.
+    """
+    def importar(codigo):
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', codigo],
+                              capture_output=True, text=True, cwd=DIRETORIO, check=True)
+        tempos = {}
+        for linha in proc.stderr.splitlines():
+            partes = linha[len('import time:'):].split('|')
+            if linha.startswith('import time:') and partes[1].strip().isdigit():
+                tempos[partes[2].strip()] = int(partes[1]) / 1000
+        return tempos
+
+    inicializacao = importar('pass')
+    tempos = importar(f'import {modulo}')
+    return tempos[modulo], set(tempos) - set(inicializacao)
+
+
+def benchmark_importacao():
+    """Tempo de importação dos módulos e bibliotecas de terceiros carregadas (-X importtime)"""
+    locais = {os.path.splitext(nome)[0] for nome in os.listdir(DIRETORIO) if nome.endswith('.py')}
+    sucesso = True
+
+    for modulo in MODULOS_PROJETO:
+        tempo = float('inf')
+        for _ in range(3):
+            tempo_execucao, importados = medir_importacao(modulo)
+            tempo = min(tempo, tempo_execucao)
+
+        terceiros = sorted({nome.split('.')[0] for nome in importados} - locais
+                           - set(sys.stdlib_module_names))
+        ok = not terceiros
+        if modulo == 'grafo_bipartido' and tempo > ORCAMENTO_IMPORTACAO_NUCLEO_MS:
+            ok = False
+
+        status = "[OK]" if ok else "[FALHOU]"
+        print(f"  {status} {modulo:.<25} {tempo:7.1f} ms"
+              + (f"  terceiros: {', '.join(terceiros)}" if terceiros else ""))
+        sucesso = sucesso and ok
+
+    print(f"  (orçamento do núcleo: {ORCAMENTO_IMPORTACAO_NUCLEO_MS} ms, "
+          f"sem bibliotecas de terceiros em nenhum módulo)")
+    return sucesso
+
+
+BENCHMARKS = {
+    'estados_animacao': benchmark_estados_animacao,
+    'renderizacao_animacao': benchmark_renderizacao_animacao,
+    'emparelhamento': benchmark_emparelhamento,
+    'projecao': benchmark_projecao,
+    'similaridade': benchmark_similaridade,
+    'distribuido': benchmark_distribuido,
+    'remocao': benchmark_remocao,
+    'janela_temporal': benchmark_janela_temporal,
+    'instrumentacao': benchmark_instrumentacao,
+    'memoria': benchmark_memoria,
+    'adjacencia_comprimida': benchmark_adjacencia_comprimida,
+    'limites_recomendacao': benchmark_limites_recomendacao,
+    'pagerank': benchmark_pagerank,
+    'concorrencia': benchmark_concorrencia,
+    'subgrafo_ego': benchmark_subgrafo_ego,
+    'wal': benchmark_wal,
+    'seguidor': benchmark_seguidor,
+    'sqlite': benchmark_sqlite,
+    'verificacao_streaming': benchmark_verificacao_streaming,
+    'importacao': benchmark_importacao,
+}
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmarks do grafo bipartido")
+    parser.add_argument('nomes', nargs='*',
+                        help=f"benchmarks a executar (padrão: todos): {', '.join(BENCHMARKS)}")
+    args = parser.parse_args()
+
+    desconhecidos = [nome for nome in args.nomes if nome not in BENCHMARKS]
+    if desconhecidos:
+        parser.error(f"benchmark desconhecido: {', '.join(desconhecidos)}")
+
+    falhas = []
+    for nome in args.nomes or BENCHMARKS:
+        print("\n" + "="*60)
+        print(f"BENCHMARK: {nome}")
+        print(BENCHMARKS[nome].__doc__)
+        print("="*60)
+        if BENCHMARKS[nome]() is False:
+            falhas.append(nome)
+
+    if falhas:
+        print(f"\n[FALHOU] {', '.join(falhas)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
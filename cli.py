@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+"""
+Interface de Linha de Comando (não interativa)
+Executa as operações do grafo em lote, para uso em scripts e pipelines
+
+Cada resultado é escrito em uma linha JSON (JSON Lines) na saída padrão;
+erros vão para a saída de erros. O grafo é carregado uma única vez por
+execução, de um arquivo texto (USUARIO,FILME), de um snapshot binário, de
+um banco SQLite (detectados automaticamente) ou da entrada padrão ('-').
+
+Uso:
+    python cli.py check exemplo1.txt [--coloracao]
+    python cli.py check arestas_grandes.txt --streaming
+    python cli.py stats exemplo1.txt
+    python cli.py recommend exemplo3.txt --users-file usuarios.txt [-k 5]
+    python cli.py recommend grande.txt -u Alice --max-espectadores 500 --orcamento 20000 --idf
+    cat usuarios.txt | python cli.py recommend exemplo3.txt --users-file -
+    python cli.py convert exemplo3.txt --to snapshot -o exemplo3.snap
+    python cli.py recommend exemplo_temporal.txt -u Alice --janela-dias 30
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import argparse
+import json
+import os
+import sys
+
+import instrumentacao
+from grafo_bipartido import (CONFLITO, INICIO_COMPONENTE, GrafoBipartido, LimitesRecomendacao,
+                             eh_snapshot)
+from instrumentacao import METRICAS_NULAS
+
+
+def carregar_grafo(caminho, janela_dias=None, metricas=None):
+    """
+    Carrega o grafo de um arquivo texto, de um snapshot, de um banco SQLite
+    ou da entrada padrão ('-')
+
+    Com janela_dias, o texto é lido em um GrafoTemporal (USUARIO,FILME,INSTANTE)
+    que guarda só as arestas dos últimos dias.
+    """
+    if caminho != '-':
+        from armazenamento_sqlite import GrafoSQLite, eh_sqlite
+        if eh_sqlite(caminho):
+            if janela_dias is not None:
+                raise ValueError("--janela-dias não se aplica a bancos SQLite")
+            return GrafoSQLite(caminho, metricas=metricas)
+
+    if janela_dias is None:
+        grafo = GrafoBipartido(metricas)
+    else:
+        from grafo_temporal import DIA, GrafoTemporal
+        grafo = GrafoTemporal(janela=janela_dias * DIA, metricas=metricas)
+
+    if caminho == '-':
+        grafo.carregar_de_linhas(sys.stdin)
+    elif eh_snapshot(caminho):
+        if janela_dias is not None:
+            raise ValueError("snapshots não guardam instantes; use o arquivo texto com --janela-dias")
+        grafo.carregar_snapshot(caminho)
+    else:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            grafo.carregar_de_linhas(f)
+    return grafo
+
+
+def escrever(registro):
+    """Escreve um registro como uma linha JSON"""
+    sys.stdout.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+def ler_usuarios(caminho):
+    """Gera os nomes de usuário de um arquivo (um por linha) ou da entrada padrão ('-')"""
+    arquivo = sys.stdin if caminho == '-' else open(caminho, 'r', encoding='utf-8')
+    try:
+        for linha in arquivo:
+            usuario = linha.strip()
+            if usuario and not usuario.startswith('#'):
+                yield usuario
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def comando_check(grafo, args):
+    """Verifica a bipartição; com --coloracao, emite antes uma linha por vértice"""
+    cor = {}
+    componentes = 0
+    conflito = None
+    with grafo.metricas.cronometro(instrumentacao.BFS):
+        for evento in grafo.eventos_bfs(cor):
+            if evento.tipo == INICIO_COMPONENTE:
+                componentes += 1
+            elif evento.tipo == CONFLITO:
+                conflito = [evento.origem, evento.vertice]
+    eh_bipartido = evento.bipartido
+
+    if args.coloracao:
+        for vertice, c in cor.items():
+            if c:
+                escrever({'vertice': vertice, 'cor': c})
+
+    v1, v2 = grafo.obter_particao(cor)
+    escrever({
+        'bipartido': eh_bipartido,
+        'vertices': len(grafo.vertices),
+        'arestas': grafo.total_arestas(),
+        'componentes': componentes,
+        'v1': len(v1) if eh_bipartido else None,
+        'v2': len(v2) if eh_bipartido else None,
+        'conflito': conflito,
+    })
+    return 0 if eh_bipartido else 3
+
+
+def comando_check_streaming(args, metricas=METRICAS_NULAS):
+    """
+    Verifica a bipartição em uma passada sobre o arquivo texto, sem carregar
+    o grafo (memória proporcional ao número de vértices)
+    """
+    from verificacao_streaming import verificar_arquivo, verificar_fluxo
+
+    if args.grafo != '-':
+        from armazenamento_sqlite import eh_sqlite
+        if eh_snapshot(args.grafo) or eh_sqlite(args.grafo):
+            raise ValueError("--streaming lê só arquivos texto USUARIO,FILME")
+
+    with metricas.cronometro(instrumentacao.BFS):
+        if args.grafo == '-':
+            resultado = verificar_fluxo(sys.stdin.buffer)
+        else:
+            resultado = verificar_arquivo(args.grafo)
+
+    conflito = None
+    if not resultado.bipartido:
+        usuario, filme = resultado.aresta
+        conflito = {'linha': resultado.linha, 'usuario': usuario, 'filme': filme}
+    escrever({
+        'bipartido': resultado.bipartido,
+        'linhas': resultado.linhas_lidas,
+        'arestas': resultado.arestas,
+        'vertices': resultado.vertices,
+        'componentes': resultado.componentes,
+        'conflito': conflito,
+    })
+    return 0 if resultado.bipartido else 3
+
+
+def comando_stats(grafo, args):
+    """Emite as estatísticas do grafo"""
+    usuarios = grafo.usuarios
+    media = sum(len(grafo.vizinhos(u)) for u in usuarios) / len(usuarios) if usuarios else 0
+    escrever({
+        'vertices': len(grafo.vertices),
+        'usuarios': len(usuarios),
+        'filmes': len(grafo.filmes),
+        'arestas': grafo.total_arestas(),
+        'media_filmes_por_usuario': round(media, 4),
+    })
+    return 0
+
+
+def comando_recommend(grafo, args):
+    """Emite as top-k recomendações de cada usuário consultado, uma linha por usuário"""
+    if args.users_file is not None:
+        usuarios = ler_usuarios(args.users_file)
+    elif args.usuario:
+        usuarios = args.usuario
+    else:
+        usuarios = iter(grafo.usuarios)
+
+    limites = LimitesRecomendacao(max_espectadores=args.max_espectadores, idf=args.idf,
+                                  orcamento=args.orcamento)
+    desconhecidos = 0
+    for usuario in usuarios:
+        if usuario not in grafo.usuarios:
+            escrever({'usuario': usuario, 'erro': 'usuário desconhecido'})
+            desconhecidos += 1
+            continue
+        escrever({
+            'usuario': usuario,
+            'recomendacoes': [{'filme': filme, 'pontuacao': pontuacao}
+                              for filme, pontuacao in grafo.ranquear_filmes(usuario, args.k, limites)],
+        })
+    return 4 if desconhecidos else 0
+
+
+def comando_convert(grafo, args):
+    """Converte o grafo para outro formato"""
+    saida = args.saida
+    if saida is None:
+        if args.grafo == '-':
+            raise ValueError("informe o arquivo de saída com -o ao ler da entrada padrão")
+        saida = os.path.splitext(args.grafo)[0] + '.snap'
+    grafo.salvar_snapshot(saida)
+    escrever({'saida': saida, 'formato': args.to,
+              'vertices': len(grafo.vertices), 'arestas': grafo.total_arestas()})
+    return 0
+
+
+COMANDOS = {
+    'check': comando_check,
+    'stats': comando_stats,
+    'recommend': comando_recommend,
+    'convert': comando_convert,
+}
+
+
+def criar_parser():
+    """Monta o parser de argumentos com um subcomando por operação"""
+    parser = argparse.ArgumentParser(
+        description="Grafo bipartido usuários-filmes em modo não interativo (saída JSON Lines)")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    def subcomando(nome, ajuda):
+        sub = subparsers.add_parser(nome, help=ajuda, description=ajuda)
+        sub.add_argument('grafo', help="arquivo do grafo (texto, snapshot ou banco SQLite) "
+                                       "ou '-' para a entrada padrão")
+        sub.add_argument('--janela-dias', type=float, metavar='DIAS',
+                         help="usa só as arestas dos últimos DIAS (arquivo USUARIO,FILME,INSTANTE)")
+        sub.add_argument('--metricas', metavar='ARQUIVO',
+                         help="acrescenta ao ARQUIVO uma linha JSON com os tempos por fase e contadores")
+        return sub
+
+    check = subcomando('check', "verifica se o grafo é bipartido "
+                                "(código de saída 3 se não for)")
+    check.add_argument('--coloracao', action='store_true',
+                       help="emite também a cor de cada vértice visitado")
+    check.add_argument('--streaming', action='store_true',
+                       help="verifica em uma passada sobre o arquivo texto, sem carregar o grafo "
+                            "(para arquivos maiores que a memória; para na primeira aresta em conflito)")
+
+    subcomando('stats', "estatísticas do grafo")
+
+    recommend = subcomando('recommend', "recomendações top-k para vários usuários "
+                                        "(código de saída 4 se algum for desconhecido)")
+    recommend.add_argument('--users-file', metavar='ARQUIVO',
+                           help="arquivo com um usuário por linha, ou '-' para a entrada padrão")
+    recommend.add_argument('-u', '--usuario', action='append',
+                           help="usuário a consultar (pode repetir)")
+    recommend.add_argument('-k', type=int, default=10, help="recomendações por usuário (padrão: 10)")
+    recommend.add_argument('--max-espectadores', type=int, metavar='N',
+                           help="usa uma amostra de N espectadores dos filmes mais populares que isso")
+    recommend.add_argument('--idf', action='store_true',
+                           help="pondera os filmes em comum pelo inverso da popularidade (IDF)")
+    recommend.add_argument('--orcamento', type=int, metavar='N',
+                           help="lê no máximo N entradas de adjacência por usuário "
+                                "(devolve o resultado parcial)")
+
+    convert = subcomando('convert', "converte o grafo para um snapshot binário")
+    convert.add_argument('--to', choices=['snapshot'], default='snapshot', help="formato de saída")
+    convert.add_argument('-o', '--saida', help="arquivo de saída (padrão: <grafo>.snap)")
+
+    return parser
+
+
+def main(argv=None):
+    """Função principal"""
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+
+    if args.comando == 'recommend':
+        if args.users_file is not None and args.usuario:
+            parser.error("use --users-file ou --usuario, não ambos")
+        if args.grafo == '-' and args.users_file == '-':
+            parser.error("o grafo e os usuários não podem vir ambos da entrada padrão")
+        if args.k < 1:
+            parser.error("-k deve ser positivo")
+        if args.max_espectadores is not None and args.max_espectadores < 1:
+            parser.error("--max-espectadores deve ser positivo")
+        if args.orcamento is not None and args.orcamento < 1:
+            parser.error("--orcamento deve ser positivo")
+    if args.janela_dias is not None and args.janela_dias <= 0:
+        parser.error("--janela-dias deve ser positivo")
+    if args.comando == 'check' and args.streaming:
+        if args.coloracao:
+            parser.error("--coloracao não se aplica a --streaming")
+        if args.janela_dias is not None:
+            parser.error("--janela-dias não se aplica a --streaming")
+
+    metricas = None
+    if args.metricas is not None:
+        from instrumentacao import Metricas, SaidaJSON
+        metricas = Metricas(SaidaJSON(args.metricas))
+
+    try:
+        if args.comando == 'check' and args.streaming:
+            codigo = comando_check_streaming(args, metricas or METRICAS_NULAS)
+        else:
+            grafo = carregar_grafo(args.grafo, args.janela_dias, metricas)
+            codigo = COMANDOS[args.comando](grafo, args)
+        sys.stdout.flush()
+        if metricas is not None:
+            metricas.publicar()
+        return codigo
+    except BrokenPipeError:
+        # Leitor do pipe encerrou antes (ex.: `| head`); descarta o restante da saída
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+"""
+Leitura Concorrente com Versões Imutáveis (cópia na escrita)
+Permite consultar o grafo em várias threads enquanto outra thread carrega
+arestas, sem travas para os leitores e sem que uma consulta veja o grafo
+pela metade
+
+O GrafoBipartido altera o dicionário e os conjuntos no próprio lugar: um BFS
+que percorre `vertices` enquanto outra thread chama adicionar_aresta pode
+falhar com "Set changed size during iteration" ou misturar dois estados.
+
+Aqui o grafo passa por versões (épocas):
+- os leitores pegam a versão publicada com versao() e fazem nela quantas
+  consultas quiserem; ela nunca muda, mesmo que novas versões sejam
+  publicadas (a versão antiga é liberada quando ninguém mais a usa);
+- os escritores alteram um rascunho, que copia o dicionário e os conjuntos
+  da versão publicada na primeira escrita e cada lista de adjacência só
+  quando ela é alterada (as demais são compartilhadas);
+- publicar() congela o rascunho como a nova versão; a troca é uma única
+  atribuição, atômica para os leitores.
+
+Publicar custa uma cópia do dicionário e dos conjuntos (O(V), feita em C)
+mais as listas alteradas, então as escritas devem ser agrupadas: publique a
+cada lote (publicar_a_cada) e não a cada aresta.
+
+Uso:
+    python concorrencia.py arquivo_grafo [leitores]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import instrumentacao
+from grafo_bipartido import SEM_LIMITES, GrafoBipartido, ler_campos
+from instrumentacao import METRICAS_NULAS
+
+
+# Operações de escrita entre publicações automáticas, no carregamento
+PUBLICAR_A_CADA_PADRAO = 10000
+
+
+class VersaoGrafo(GrafoBipartido):
+    """
+    Versão publicada (imutável) do grafo, identificada pela época
+
+    Tem toda a leitura do GrafoBipartido (BFS, recomendações, projeções...)
+    e nenhuma lápide: as remoções já foram aplicadas às listas.
+    """
+
+    def __init__(self, epoca: int = 0, metricas=None):
+        super().__init__(metricas)
+        # Dicionário comum: uma leitura de vértice inexistente não cria entradas
+        self.grafo = {}
+        self.epoca = epoca
+
+    def _somente_leitura(self, *args):
+        raise ValueError("uma VersaoGrafo é somente leitura; altere o GrafoConcorrente e publique")
+
+    adicionar_aresta = remover_aresta = remover_vertice = _somente_leitura
+    carregar_de_linhas = carregar_snapshot = _somente_leitura
+
+
+class _Rascunho:
+    """
+    Alterações ainda não publicadas, aplicadas sobre cópias rasas da versão base
+
+    Remoções de arestas são anotadas em `descartes` e aplicadas às listas só
+    em congelar() (ou antes de a aresta ser adicionada de novo), para que
+    várias remoções em um filme popular reescrevam a lista dele uma vez só.
+    """
+
+    def __init__(self, base: VersaoGrafo):
+        self.grafo = base.grafo.copy()
+        self.vertices = base.vertices.copy()
+        self.usuarios = base.usuarios.copy()
+        self.filmes = base.filmes.copy()
+        self.entradas = base.entradas
+        self.proprias = set()    # vértices cujas listas já são cópias do rascunho
+        self.descartes = {}      # vértice -> vizinhos a retirar da sua lista
+
+    def _lista(self, vertice: str) -> List[str]:
+        """Lista de adjacência do vértice, copiada na primeira alteração"""
+        if vertice not in self.proprias:
+            self.grafo[vertice] = list(self.grafo.get(vertice, ()))
+            self.proprias.add(vertice)
+        return self.grafo[vertice]
+
+    def _aplicar_descartes(self, vertice: str):
+        descartados = self.descartes.pop(vertice)
+        antiga = self.grafo.get(vertice)
+        if antiga is None:
+            return
+        nova = [v for v in antiga if v not in descartados]
+        self.entradas -= len(antiga) - len(nova)
+        self.grafo[vertice] = nova
+        self.proprias.add(vertice)
+
+    def adicionar_aresta(self, usuario: str, filme: str):
+        if self.descartes:
+            for vertice, vizinho in ((usuario, filme), (filme, usuario)):
+                if vizinho in self.descartes.get(vertice, ()):
+                    self._aplicar_descartes(vertice)
+        grafo, proprias = self.grafo, self.proprias
+        if usuario in proprias:
+            grafo[usuario].append(filme)
+        else:
+            self._lista(usuario).append(filme)
+        if filme in proprias:
+            grafo[filme].append(usuario)
+        else:
+            self._lista(filme).append(usuario)
+        self.entradas += 2
+        self.vertices.add(usuario)
+        self.vertices.add(filme)
+        self.usuarios.add(usuario)
+        self.filmes.add(filme)
+
+    def remover_aresta(self, usuario: str, filme: str) -> bool:
+        if usuario not in self.usuarios and filme in self.usuarios:
+            usuario, filme = filme, usuario
+        if usuario not in self.vertices or filme not in self.vertices:
+            return False
+        if filme in self.descartes.get(usuario, ()) or filme not in self.grafo.get(usuario, ()):
+            return False
+        self.descartes.setdefault(usuario, set()).add(filme)
+        self.descartes.setdefault(filme, set()).add(usuario)
+        return True
+
+    def remover_vertice(self, vertice: str) -> bool:
+        if vertice not in self.vertices:
+            return False
+        self.vertices.discard(vertice)
+        self.usuarios.discard(vertice)
+        self.filmes.discard(vertice)
+        self.descartes.pop(vertice, None)
+        self.proprias.discard(vertice)
+        adjacencia = self.grafo.pop(vertice, [])
+        self.entradas -= len(adjacencia)
+        for vizinho in set(adjacencia):
+            self.descartes.setdefault(vizinho, set()).add(vertice)
+        return True
+
+    def congelar(self, epoca: int, metricas, limites) -> VersaoGrafo:
+        """Aplica os descartes pendentes e cria a versão (o rascunho não deve mais ser usado)"""
+        for vertice in list(self.descartes):
+            self._aplicar_descartes(vertice)
+        versao = VersaoGrafo(epoca, metricas)
+        versao.grafo = self.grafo
+        versao.vertices = self.vertices
+        versao.usuarios = self.usuarios
+        versao.filmes = self.filmes
+        versao.entradas = self.entradas
+        versao.limites_recomendacao = limites
+        return versao
+
+
+class GrafoConcorrente:
+    """
+    Grafo para leitura em várias threads durante a escrita
+
+    Leitores: versao() devolve a versão publicada, sem esperar por nada. Os
+    métodos de leitura deste objeto (ranquear_filmes, eh_bipartido_bfs...)
+    usam a versão publicada no momento da chamada; consultas que precisam ver
+    o mesmo grafo (como o BFS e depois recomendar_filmes com a sua cor)
+    devem usar uma mesma versão.
+
+    Escritores: adicionar_aresta, remover_aresta e remover_vertice alteram o
+    rascunho e só ficam visíveis após publicar(), ou automaticamente a cada
+    `publicar_a_cada` operações. Os escritores são serializados entre si.
+    """
+
+    def __init__(self, metricas=None, publicar_a_cada: Optional[int] = None):
+        if publicar_a_cada is not None and publicar_a_cada < 1:
+            raise ValueError("publicar_a_cada deve ser positivo")
+        self.metricas = metricas or METRICAS_NULAS
+        self.publicar_a_cada = publicar_a_cada
+        self.limites_recomendacao = SEM_LIMITES
+        self._publicada = VersaoGrafo(0, self.metricas)
+        self._rascunho = None
+        self._pendentes = 0
+        self._trava = threading.Lock()
+
+    @classmethod
+    def de_grafo(cls, grafo: GrafoBipartido, **opcoes) -> 'GrafoConcorrente':
+        """Cria um GrafoConcorrente com uma cópia de um GrafoBipartido como primeira versão"""
+        concorrente = cls(grafo.metricas, **opcoes)
+        concorrente.limites_recomendacao = grafo.limites_recomendacao
+        versao = VersaoGrafo(1, grafo.metricas)
+        versao.grafo = {v: list(grafo.vizinhos(v)) for v in grafo.vertices}
+        versao.vertices = set(grafo.vertices)
+        versao.usuarios = set(grafo.usuarios)
+        versao.filmes = set(grafo.filmes)
+        versao.entradas = sum(map(len, versao.grafo.values()))
+        versao.limites_recomendacao = grafo.limites_recomendacao
+        concorrente._publicada = versao
+        return concorrente
+
+    # Leitura
+
+    def versao(self) -> VersaoGrafo:
+        """Versão publicada mais recente; continua válida e imutável enquanto for usada"""
+        return self._publicada
+
+    @property
+    def epoca(self) -> int:
+        """Época da versão publicada (começa em 0, o grafo vazio)"""
+        return self._publicada.epoca
+
+    def vizinhos(self, vertice: str) -> List[str]:
+        return self._publicada.vizinhos(vertice)
+
+    def total_arestas(self) -> int:
+        return self._publicada.total_arestas()
+
+    def eh_bipartido_bfs(self, registrar_passos: bool = True) -> Tuple[bool, Dict[str, int], List[str]]:
+        return self._publicada.eh_bipartido_bfs(registrar_passos)
+
+    def pontuar_recomendacoes(self, usuario: str, limites=None) -> Dict[str, float]:
+        return self._publicada.pontuar_recomendacoes(usuario, limites)
+
+    def ranquear_filmes(self, usuario: str, k: Optional[int] = None, limites=None) -> List[Tuple[str, float]]:
+        return self._publicada.ranquear_filmes(usuario, k, limites)
+
+    # Escrita
+
+    def _escrever(self) -> _Rascunho:
+        """Rascunho atual, criado a partir da versão publicada na primeira escrita (com a trava)"""
+        if self._rascunho is None:
+            self._rascunho = _Rascunho(self._publicada)
+        return self._rascunho
+
+    def _apos_escrita(self):
+        self._pendentes += 1
+        if self.publicar_a_cada and self._pendentes >= self.publicar_a_cada:
+            self._publicar()
+
+    def adicionar_aresta(self, usuario: str, filme: str):
+        """Adiciona uma aresta entre usuário e filme (visível após a publicação)"""
+        with self._trava:
+            self._escrever().adicionar_aresta(usuario, filme)
+            self._apos_escrita()
+
+    def remover_aresta(self, usuario: str, filme: str) -> bool:
+        """
+        Remove a aresta entre usuário e filme (visível após a publicação);
+        retorna False se a aresta não existir ou já tiver sido removida,
+        como GrafoBipartido.remover_aresta
+        """
+        with self._trava:
+            removida = self._escrever().remover_aresta(usuario, filme)
+            if removida:
+                self._apos_escrita()
+            return removida
+
+    def remover_vertice(self, vertice: str) -> bool:
+        """Remove o vértice e suas arestas (visível após a publicação); False se não existir"""
+        with self._trava:
+            removido = self._escrever().remover_vertice(vertice)
+            if removido:
+                self._apos_escrita()
+            return removido
+
+    def carregar_de_linhas(self, linhas: Iterable[str]) -> int:
+        """
+        Carrega arestas no formato USUARIO,FILME, publicando a cada
+        `publicar_a_cada` arestas (PUBLICAR_A_CADA_PADRAO se não definido) e
+        ao final; retorna o número de arestas adicionadas
+        """
+        lote = self.publicar_a_cada or PUBLICAR_A_CADA_PADRAO
+        total = 0
+        with self.metricas.cronometro(instrumentacao.CARGA):
+            campos_linhas = ler_campos(linhas)
+            while True:
+                with self._trava:
+                    rascunho = self._escrever()
+                    lidas = 0
+                    for campos in campos_linhas:
+                        rascunho.adicionar_aresta(campos[0], campos[1])
+                        lidas += 1
+                        if lidas == lote:
+                            break
+                    self._pendentes += lidas
+                    self._publicar()
+                total += lidas
+                if lidas < lote:
+                    break
+        self.metricas.contar(instrumentacao.ARESTAS_CARREGADAS, total)
+        return total
+
+    def publicar(self) -> VersaoGrafo:
+        """Torna visíveis as escritas pendentes e retorna a versão publicada"""
+        with self._trava:
+            return self._publicar()
+
+    def _publicar(self) -> VersaoGrafo:
+        if self._rascunho is None:
+            return self._publicada
+        with self.metricas.cronometro(instrumentacao.PUBLICACAO):
+            versao = self._rascunho.congelar(self._publicada.epoca + 1, self.metricas,
+                                             self.limites_recomendacao)
+        self._rascunho = None
+        self._pendentes = 0
+        # Uma única atribuição: os leitores veem a versão antiga ou a nova, inteira
+        self._publicada = versao
+        self.metricas.contar(instrumentacao.VERSOES_PUBLICADAS)
+        return versao
+
+    @property
+    def escritas_pendentes(self) -> int:
+        """Operações de escrita ainda não publicadas"""
+        return self._pendentes
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python concorrencia.py arquivo_grafo [leitores]")
+        return 1
+
+    arquivo = sys.argv[1]
+    num_leitores = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            linhas = f.readlines()
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{arquivo}' não encontrado!")
+        return 1
+
+    # A escrita publica em lotes de 1/20 do arquivo enquanto os leitores consultam
+    grafo = GrafoConcorrente(publicar_a_cada=max(1, len(linhas) // 20))
+    terminou = threading.Event()
+    consultas = [0] * num_leitores
+    epocas: List[Set[int]] = [set() for _ in range(num_leitores)]
+    erros = []
+
+    def ler(indice):
+        while not terminou.is_set():
+            versao = grafo.versao()
+            try:
+                bipartido, cor, _ = versao.eh_bipartido_bfs(registrar_passos=False)
+                for usuario in list(versao.usuarios)[:5]:
+                    versao.recomendar_filmes(usuario, cor, k=3)
+                if versao.total_arestas() != sum(map(len, versao.grafo.values())) // 2:
+                    erros.append(f"versão {versao.epoca} inconsistente")
+            except Exception as e:
+                erros.append(f"{type(e).__name__}: {e}")
+            consultas[indice] += 1
+            epocas[indice].add(versao.epoca)
+
+    leitores = [threading.Thread(target=ler, args=(i,)) for i in range(num_leitores)]
+    inicio = time.perf_counter()
+    for leitor in leitores:
+        leitor.start()
+    total = grafo.carregar_de_linhas(linhas)
+    terminou.set()
+    for leitor in leitores:
+        leitor.join()
+    duracao = time.perf_counter() - inicio
+
+    print("\n" + "="*50)
+    print("LEITURA CONCORRENTE COM VERSÕES")
+    print("="*50)
+    print(f"Arestas carregadas: {total} em {duracao:.2f} s, {grafo.epoca} versões publicadas")
+    for i in range(num_leitores):
+        print(f"  Leitor {i}: {consultas[i]} consultas em {len(epocas[i])} versões diferentes")
+    if erros:
+        print(f"\n✗ {len(erros)} consultas falharam; a primeira: {erros[0]}")
+        return 1
+    print("\n✓ Todas as consultas viram versões consistentes do grafo")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
-# -*- coding: utf-8 -*-
 """
 Cria arquivo Excel completo com as 4 planilhas do teste de mesa
+a partir de uma execução real do algoritmo sobre um grafo
 Requer: pip install openpyxl
+
+Uso:
+    python criar_excel_completo.py [arquivo_grafo] [arquivo_saida]
 """
 """
 Autoras: Larissa Paganini e Bruna Cedro
@@ -12,301 +15,286 @@ Ano: 2024
 
 
 
-try:
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    OPENPYXL_DISPONIVEL = True
-except ImportError:
-    OPENPYXL_DISPONIVEL = False
-    print("AVISO: openpyxl nao instalado. Instalando...")
-    import subprocess
-    import sys
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "openpyxl"])
-    from openpyxl import Workbook
-    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    OPENPYXL_DISPONIVEL = True
-
-
-def criar_estilos():
-    """Define estilos de formatação"""
-    estilos = {
-        'cabecalho': {
-            'font': Font(name='Arial', size=11, bold=True, color='FFFFFF'),
-            'fill': PatternFill(start_color='1F4E78', end_color='1F4E78', fill_type='solid'),
-            'alignment': Alignment(horizontal='center', vertical='center'),
-            'border': Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thick')
-            )
-        },
-        'v1': {
-            'fill': PatternFill(start_color='FF6B6B', end_color='FF6B6B', fill_type='solid'),
-        },
-        'v2': {
-            'fill': PatternFill(start_color='4ECDC4', end_color='4ECDC4', fill_type='solid'),
-        },
-        'nao_visitado': {
-            'fill': PatternFill(start_color='D3D3D3', end_color='D3D3D3', fill_type='solid'),
-        },
-        'normal': {
-            'font': Font(name='Arial', size=10),
-            'border': Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-        }
-    }
-    return estilos
-
-
-def aplicar_estilo(celula, estilo_dict):
-    """Aplica um estilo a uma célula"""
-    if 'font' in estilo_dict:
-        celula.font = estilo_dict['font']
-    if 'fill' in estilo_dict:
-        celula.fill = estilo_dict['fill']
-    if 'alignment' in estilo_dict:
-        celula.alignment = estilo_dict['alignment']
-    if 'border' in estilo_dict:
-        celula.border = estilo_dict['border']
-
-
-def criar_planilha1_entrada(wb, estilos):
-    """Cria Planilha 1: Grafo de Entrada"""
-    ws = wb.create_sheet("1. Grafo de Entrada", 0)
-
-    # Título
-    ws['A1'] = 'TABELA 1: LISTA DE ARESTAS'
-    ws['A1'].font = Font(name='Arial', size=12, bold=True)
-
-    # Cabeçalho tabela 1
-    headers1 = ['#', 'Usuário', 'Filme']
-    for col, header in enumerate(headers1, 1):
-        cell = ws.cell(row=2, column=col, value=header)
-        aplicar_estilo(cell, estilos['cabecalho'])
-
-    # Dados tabela 1
-    dados1 = [
-        (1, 'Alice', 'Matrix'),
-        (2, 'Alice', 'Inception'),
-        (3, 'Alice', 'Interstellar'),
-        (4, 'Bob', 'Matrix'),
-        (5, 'Bob', 'Avatar'),
-        (6, 'Bob', 'Titanic'),
-        (7, 'Carlos', 'Inception'),
-        (8, 'Carlos', 'Avatar'),
-        (9, 'Diana', 'Interstellar'),
-        (10, 'Diana', 'Titanic'),
-        (11, 'Eduardo', 'Matrix'),
-        (12, 'Eduardo', 'Inception'),
-    ]
+import importlib.util
+import sys
 
-    for row_idx, row_data in enumerate(dados1, 3):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            aplicar_estilo(cell, estilos['normal'])
-
-    # Tabela 2
-    ws['A16'] = 'TABELA 2: LISTA DE ADJACÊNCIAS'
-    ws['A16'].font = Font(name='Arial', size=12, bold=True)
-
-    headers2 = ['Vértice', 'Tipo', 'Adjacentes']
-    for col, header in enumerate(headers2, 1):
-        cell = ws.cell(row=17, column=col, value=header)
-        aplicar_estilo(cell, estilos['cabecalho'])
-
-    dados2 = [
-        ('Alice', 'Usuário', 'Matrix, Inception, Interstellar'),
-        ('Bob', 'Usuário', 'Matrix, Avatar, Titanic'),
-        ('Carlos', 'Usuário', 'Inception, Avatar'),
-        ('Diana', 'Usuário', 'Interstellar, Titanic'),
-        ('Eduardo', 'Usuário', 'Matrix, Inception'),
-        ('Matrix', 'Filme', 'Alice, Bob, Eduardo'),
-        ('Inception', 'Filme', 'Alice, Carlos, Eduardo'),
-        ('Interstellar', 'Filme', 'Alice, Diana'),
-        ('Avatar', 'Filme', 'Bob, Carlos'),
-        ('Titanic', 'Filme', 'Bob, Diana'),
-    ]
+from grafo_bipartido import (COLORIR, CONFLITO, DESENFILEIRAR, FIM, INICIO_COMPONENTE,
+                             GrafoBipartido)
 
-    for row_idx, row_data in enumerate(dados2, 18):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            aplicar_estilo(cell, estilos['normal'])
+# openpyxl só é importado ao exportar; aqui apenas verificamos se existe
+OPENPYXL_DISPONIVEL = importlib.util.find_spec('openpyxl') is not None
 
-    # Ajustar larguras
-    ws.column_dimensions['A'].width = 12
-    ws.column_dimensions['B'].width = 15
-    ws.column_dimensions['C'].width = 35
 
+# Linhas por aba antes de continuar em uma nova aba (limite do Excel: 1.048.576)
+MAX_LINHAS_POR_ABA = 1000000
 
-def criar_planilha2_inicializacao(wb, estilos):
-    """Cria Planilha 2: Inicialização"""
-    ws = wb.create_sheet("2. Inicializacao", 1)
-
-    ws['A1'] = 'ESTADO INICIAL DO ALGORITMO'
-    ws['A1'].font = Font(name='Arial', size=12, bold=True)
-
-    headers = ['Vértice', 'Cor Inicial', 'Tipo']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=2, column=col, value=header)
-        aplicar_estilo(cell, estilos['cabecalho'])
-
-    dados = [
-        ('Alice', 0, 'Usuário'),
-        ('Bob', 0, 'Usuário'),
-        ('Carlos', 0, 'Usuário'),
-        ('Diana', 0, 'Usuário'),
-        ('Eduardo', 0, 'Usuário'),
-        ('Matrix', 0, 'Filme'),
-        ('Inception', 0, 'Filme'),
-        ('Interstellar', 0, 'Filme'),
-        ('Avatar', 0, 'Filme'),
-        ('Titanic', 0, 'Filme'),
-    ]
+# Limite de caracteres de uma célula do Excel
+MAX_CARACTERES_CELULA = 32767
 
-    for row_idx, row_data in enumerate(dados, 3):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            aplicar_estilo(cell, estilos['normal'])
-            if col_idx == 2:  # Coluna de cor
-                aplicar_estilo(cell, estilos['nao_visitado'])
-
-    # Legenda
-    ws['A15'] = 'LEGENDA'
-    ws['A15'].font = Font(name='Arial', size=12, bold=True)
-
-    headers_leg = ['Código', 'Significado', 'Cor']
-    for col, header in enumerate(headers_leg, 1):
-        cell = ws.cell(row=16, column=col, value=header)
-        aplicar_estilo(cell, estilos['cabecalho'])
-
-    ws.cell(row=17, column=1, value=0)
-    ws.cell(row=17, column=2, value='Não visitado')
-    aplicar_estilo(ws.cell(row=17, column=3), estilos['nao_visitado'])
-
-    ws.cell(row=18, column=1, value=1)
-    ws.cell(row=18, column=2, value='Conjunto V1')
-    aplicar_estilo(ws.cell(row=18, column=3), estilos['v1'])
-
-    ws.cell(row=19, column=1, value=2)
-    ws.cell(row=19, column=2, value='Conjunto V2')
-    aplicar_estilo(ws.cell(row=19, column=3), estilos['v2'])
-
-    ws.column_dimensions['A'].width = 15
-    ws.column_dimensions['B'].width = 20
-    ws.column_dimensions['C'].width = 15
-
-
-def criar_planilha3_execucao(wb, estilos):
-    """Cria Planilha 3: Execução BFS"""
-    ws = wb.create_sheet("3. Execucao BFS", 2)
-
-    ws['A1'] = 'EXECUÇÃO DO ALGORITMO BFS (26 PASSOS)'
-    ws['A1'].font = Font(name='Arial', size=12, bold=True)
-
-    headers = ['Passo', 'Ação', 'Vértice Atual', 'Vértice Visitado', 'Cor', 'Fila', 'Observação']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=2, column=col, value=header)
-        aplicar_estilo(cell, estilos['cabecalho'])
-
-    # Dados simplificados (primeiros passos importantes)
-    dados = [
-        (0, 'Inicializar', '-', '-', '-', '[]', 'Todos não visitados'),
-        (1, 'Iniciar BFS', 'Alice', 'Alice', 1, '[Alice]', 'Primeiro vértice'),
-        (2, 'Processar', 'Alice', 'Matrix', 2, '[Matrix]', 'Adjacente de Alice'),
-        (3, 'Processar', 'Alice', 'Inception', 2, '[Matrix, Inception]', 'Adjacente de Alice'),
-        (4, 'Processar', 'Alice', 'Interstellar', 2, '[Matrix, Inception, Interstellar]', 'Adjacente de Alice'),
-        (5, 'Processar', 'Matrix', 'Alice', '-', '[Inception, Interstellar]', 'Já visitado OK'),
-        (6, 'Processar', 'Matrix', 'Bob', 1, '[Inception, Interstellar, Bob]', 'Adjacente de Matrix'),
-        (7, 'Processar', 'Matrix', 'Eduardo', 1, '[Inception, Interstellar, Bob, Eduardo]', 'Adjacente de Matrix'),
-        (8, 'Processar', 'Inception', 'Alice', '-', '[Interstellar, Bob, Eduardo]', 'Já visitado OK'),
-        (9, 'Processar', 'Inception', 'Carlos', 1, '[Interstellar, Bob, Eduardo, Carlos]', 'Adjacente de Inception'),
-        (10, 'Processar', 'Inception', 'Eduardo', '-', '[Interstellar, Bob, Eduardo, Carlos]', 'Já visitado OK'),
-        (11, 'Processar', 'Interstellar', 'Alice', '-', '[Bob, Eduardo, Carlos]', 'Já visitado OK'),
-        (12, 'Processar', 'Interstellar', 'Diana', 1, '[Bob, Eduardo, Carlos, Diana]', 'Adjacente de Interstellar'),
-        (13, 'Processar', 'Bob', 'Matrix', '-', '[Eduardo, Carlos, Diana]', 'Já visitado OK'),
-        (14, 'Processar', 'Bob', 'Avatar', 2, '[Eduardo, Carlos, Diana, Avatar]', 'Adjacente de Bob'),
-        (15, 'Processar', 'Bob', 'Titanic', 2, '[Eduardo, Carlos, Diana, Avatar, Titanic]', 'Adjacente de Bob'),
-        (16, 'Processar', 'Eduardo', 'Matrix', '-', '[Carlos, Diana, Avatar, Titanic]', 'Já visitado OK'),
-        (17, 'Processar', 'Eduardo', 'Inception', '-', '[Carlos, Diana, Avatar, Titanic]', 'Já visitado OK'),
-        (18, 'Processar', 'Carlos', 'Inception', '-', '[Diana, Avatar, Titanic]', 'Já visitado OK'),
-        (19, 'Processar', 'Carlos', 'Avatar', '-', '[Diana, Avatar, Titanic]', 'Já visitado OK'),
-        (20, 'Processar', 'Diana', 'Interstellar', '-', '[Avatar, Titanic]', 'Já visitado OK'),
-        (21, 'Processar', 'Diana', 'Titanic', '-', '[Avatar, Titanic]', 'Já visitado OK'),
-        (22, 'Processar', 'Avatar', 'Bob', '-', '[Titanic]', 'Já visitado OK'),
-        (23, 'Processar', 'Avatar', 'Carlos', '-', '[Titanic]', 'Já visitado OK'),
-        (24, 'Processar', 'Titanic', 'Bob', '-', '[]', 'Já visitado OK'),
-        (25, 'Processar', 'Titanic', 'Diana', '-', '[]', 'Já visitado OK'),
-        (26, 'Finalizar', '-', '-', '-', '[]', 'ALGORITMO COMPLETO'),
-    ]
+# Estilo nomeado da coluna de cor para cada cor do algoritmo
+ESTILO_COR = {0: 'nao_visitado', 1: 'v1', 2: 'v2'}
+
+
+def criar_estilos(wb):
+    """Registra os estilos nomeados de formatação no workbook"""
+    from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+
+    borda_fina = Side(style='thin')
+
+    cabecalho = NamedStyle(name='cabecalho')
+    cabecalho.font = Font(name='Arial', size=11, bold=True, color='FFFFFF')
+    cabecalho.fill = PatternFill(start_color='1F4E78', end_color='1F4E78', fill_type='solid')
+    cabecalho.alignment = Alignment(horizontal='center', vertical='center')
+    cabecalho.border = Border(left=borda_fina, right=borda_fina, top=borda_fina,
+                              bottom=Side(style='thick'))
+
+    normal = NamedStyle(name='normal')
+    normal.font = Font(name='Arial', size=10)
+    normal.border = Border(left=borda_fina, right=borda_fina, top=borda_fina, bottom=borda_fina)
+
+    titulo = NamedStyle(name='titulo')
+    titulo.font = Font(name='Arial', size=12, bold=True)
+
+    resultado_sim = NamedStyle(name='resultado_sim')
+    resultado_sim.font = Font(name='Arial', size=14, bold=True, color='008000')
+
+    resultado_nao = NamedStyle(name='resultado_nao')
+    resultado_nao.font = Font(name='Arial', size=14, bold=True, color='C00000')
+
+    estilos = [cabecalho, normal, titulo, resultado_sim, resultado_nao]
+    for nome, cor in (('v1', 'FF6B6B'), ('v2', '4ECDC4'), ('nao_visitado', 'D3D3D3')):
+        estilo = NamedStyle(name=nome)
+        estilo.font = normal.font
+        estilo.border = normal.border
+        estilo.fill = PatternFill(start_color=cor, end_color=cor, fill_type='solid')
+        estilos.append(estilo)
+
+    for estilo in estilos:
+        wb.add_named_style(estilo)
+
+
+class AbaContinua:
+    """
+    Aba em modo write_only que continua em novas abas ao atingir o limite
+    de linhas, repetindo o cabeçalho da tabela em andamento
+    """
 
-    for row_idx, row_data in enumerate(dados, 3):
-        for col_idx, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_idx, column=col_idx, value=value)
-            aplicar_estilo(cell, estilos['normal'])
+    def __init__(self, wb, titulo, larguras):
+        from openpyxl.cell import WriteOnlyCell
 
-    ws.column_dimensions['A'].width = 8
-    ws.column_dimensions['B'].width = 12
-    ws.column_dimensions['C'].width = 15
-    ws.column_dimensions['D'].width = 18
-    ws.column_dimensions['E'].width = 8
-    ws.column_dimensions['F'].width = 40
-    ws.column_dimensions['G'].width = 25
+        self.celula = WriteOnlyCell
+        self.wb = wb
+        self.titulo = titulo
+        self.larguras = larguras
+        self.numero = 0
+        self.cabecalho = None
+        self._nova_aba()
 
+    def _nova_aba(self):
+        self.numero += 1
+        titulo = self.titulo if self.numero == 1 else f"{self.titulo} ({self.numero})"
+        self.ws = self.wb.create_sheet(titulo[:31])
+        for coluna, largura in zip('ABCDEFGHIJ', self.larguras):
+            self.ws.column_dimensions[coluna].width = largura
+        self.linhas = 0
+        if self.cabecalho:
+            self._escrever(self.cabecalho, 'cabecalho')
 
-def criar_planilha4_resultado(wb, estilos):
+    def _escrever(self, valores, estilo, estilos_colunas=None):
+        linha = []
+        for i, valor in enumerate(valores):
+            if isinstance(valor, str) and len(valor) > MAX_CARACTERES_CELULA:
+                valor = valor[:MAX_CARACTERES_CELULA - 3] + '...'
+            celula = self.celula(self.ws, value=valor)
+            celula.style = (estilos_colunas or {}).get(i, estilo)
+            linha.append(celula)
+        self.ws.append(linha)
+        self.linhas += 1
+
+    def titulo_tabela(self, texto):
+        """Escreve o título de uma tabela"""
+        self.cabecalho = None
+        self._escrever([texto], 'titulo')
+
+    def iniciar_tabela(self, cabecalho):
+        """Escreve o cabeçalho de uma tabela (repetido nas abas de continuação)"""
+        self.cabecalho = cabecalho
+        self._escrever(cabecalho, 'cabecalho')
+
+    def linha(self, valores, estilo='normal', estilos_colunas=None):
+        """Escreve uma linha de dados"""
+        if self.linhas >= MAX_LINHAS_POR_ABA:
+            self._nova_aba()
+        self._escrever(valores, estilo, estilos_colunas)
+
+    def linha_vazia(self):
+        self.cabecalho = None
+        self.ws.append([])
+        self.linhas += 1
+
+
+def tipo_vertice(grafo, vertice):
+    """Descreve o tipo do vértice"""
+    if vertice in grafo.usuarios:
+        return 'Usuário/Filme' if vertice in grafo.filmes else 'Usuário'
+    return 'Filme'
+
+
+def criar_planilha1_entrada(wb, grafo):
+    """Cria Planilha 1: Grafo de Entrada"""
+    aba = AbaContinua(wb, "1. Grafo de Entrada", [12, 15, 35])
+
+    aba.titulo_tabela('TABELA 1: LISTA DE ARESTAS')
+    aba.iniciar_tabela(['#', 'Usuário', 'Filme'])
+    num = 0
+    for usuario in grafo.usuarios:
+        for filme in grafo.vizinhos(usuario):
+            num += 1
+            aba.linha((num, usuario, filme))
+
+    aba.linha_vazia()
+    aba.titulo_tabela('TABELA 2: LISTA DE ADJACÊNCIAS')
+    aba.iniciar_tabela(['Vértice', 'Tipo', 'Adjacentes'])
+    for vertice in grafo.vertices:
+        aba.linha((vertice, tipo_vertice(grafo, vertice), ', '.join(grafo.vizinhos(vertice))))
+
+
+def criar_planilha2_inicializacao(wb, grafo):
+    """Cria Planilha 2: Inicialização"""
+    aba = AbaContinua(wb, "2. Inicializacao", [15, 20, 15])
+
+    aba.titulo_tabela('LEGENDA')
+    aba.iniciar_tabela(['Código', 'Significado', 'Cor'])
+    aba.linha((0, 'Não visitado', ''), estilos_colunas={2: 'nao_visitado'})
+    aba.linha((1, 'Conjunto V1', ''), estilos_colunas={2: 'v1'})
+    aba.linha((2, 'Conjunto V2', ''), estilos_colunas={2: 'v2'})
+
+    aba.linha_vazia()
+    aba.titulo_tabela('ESTADO INICIAL DO ALGORITMO')
+    aba.iniciar_tabela(['Vértice', 'Cor Inicial', 'Tipo'])
+    for vertice in grafo.vertices:
+        aba.linha((vertice, 0, tipo_vertice(grafo, vertice)), estilos_colunas={1: 'nao_visitado'})
+
+
+def criar_planilha3_execucao(wb, eventos, cores):
+    """
+    Cria Planilha 3: Execução BFS
+
+    As linhas são escritas conforme os eventos são consumidos; `cores` é
+    preenchido com a cor de cada vértice visitado. Retorna o último evento
+    (FIM) e o número de componentes percorridos.
+    """
+    aba = AbaContinua(wb, "3. Execucao BFS", [10, 12, 15, 18, 8, 16, 35])
+
+    aba.titulo_tabela('EXECUÇÃO DO ALGORITMO BFS')
+    aba.iniciar_tabela(['Passo', 'Ação', 'Vértice Atual', 'Vértice Visitado', 'Cor',
+                        'Tamanho da Fila', 'Observação'])
+    aba.linha((0, 'Inicializar', '-', '-', '-', 0, 'Todos não visitados'))
+
+    passo = 0
+    fila = 0
+    componentes = 0
+    for evento in eventos:
+        passo += 1
+        if evento.tipo == INICIO_COMPONENTE:
+            componentes += 1
+            fila += 1
+            cores[evento.vertice] = evento.cor
+            linha = (passo, 'Iniciar BFS', evento.vertice, evento.vertice, evento.cor, fila,
+                     f'Início do componente {componentes}')
+        elif evento.tipo == DESENFILEIRAR:
+            fila -= 1
+            linha = (passo, 'Processar', evento.vertice, '-', evento.cor, fila, 'Removido da fila')
+        elif evento.tipo == COLORIR:
+            fila += 1
+            cores[evento.vertice] = evento.cor
+            linha = (passo, 'Colorir', evento.origem, evento.vertice, evento.cor, fila,
+                     f'Adjacente de {evento.origem}')
+        elif evento.tipo == CONFLITO:
+            linha = (passo, 'Conflito', evento.origem, evento.vertice, evento.cor, fila,
+                     'Mesma cor do adjacente: ciclo ímpar')
+        else:
+            linha = (passo, 'Finalizar', '-', '-', '-', fila,
+                     'ALGORITMO COMPLETO' if evento.bipartido else 'GRAFO NÃO É BIPARTIDO')
+
+        estilo_cor = ESTILO_COR.get(linha[4]) if isinstance(linha[4], int) else None
+        aba.linha(linha, estilos_colunas={4: estilo_cor} if estilo_cor else None)
+
+        if evento.tipo == FIM:
+            return evento, componentes
+
+    return None, componentes
+
+
+def criar_planilha4_resultado(wb, grafo, fim, cores, componentes):
     """Cria Planilha 4: Resultado"""
-    ws = wb.create_sheet("4. Resultado", 3)
+    aba = AbaContinua(wb, "4. Resultado", [20, 15, 50, 12])
+
+    eh_bipartido = fim is not None and fim.bipartido
+    if eh_bipartido:
+        aba.linha(['RESULTADO: O GRAFO É BIPARTIDO'], estilo='resultado_sim')
+    else:
+        aba.linha(['RESULTADO: O GRAFO NÃO É BIPARTIDO'], estilo='resultado_nao')
+    aba.linha_vazia()
 
-    ws['A1'] = 'RESULTADO: O GRAFO É BIPARTIDO'
-    ws['A1'].font = Font(name='Arial', size=14, bold=True, color='008000')
+    tamanho_v1 = sum(1 for c in cores.values() if c == 1)
+    tamanho_v2 = sum(1 for c in cores.values() if c == 2)
 
     # Partição
-    ws['A3'] = 'PARTIÇÃO BIPARTIDA'
-    ws['A3'].font = Font(name='Arial', size=12, bold=True)
-
-    headers1 = ['Conjunto', 'Cor', 'Vértices', 'Quantidade']
-    for col, header in enumerate(headers1, 1):
-        cell = ws.cell(row=4, column=col, value=header)
-        aplicar_estilo(cell, estilos['cabecalho'])
-
-    ws.cell(row=5, column=1, value='V1')
-    ws.cell(row=5, column=2, value='1 (Vermelho)')
-    ws.cell(row=5, column=3, value='Alice, Bob, Carlos, Diana, Eduardo')
-    ws.cell(row=5, column=4, value=5)
-    aplicar_estilo(ws.cell(row=5, column=2), estilos['v1'])
-
-    ws.cell(row=6, column=1, value='V2')
-    ws.cell(row=6, column=2, value='2 (Azul)')
-    ws.cell(row=6, column=3, value='Matrix, Inception, Interstellar, Avatar, Titanic')
-    ws.cell(row=6, column=4, value=5)
-    aplicar_estilo(ws.cell(row=6, column=2), estilos['v2'])
+    aba.titulo_tabela('PARTIÇÃO BIPARTIDA')
+    aba.iniciar_tabela(['Conjunto', 'Cor', 'Quantidade'])
+    aba.linha(('V1', '1 (Vermelho)', tamanho_v1), estilos_colunas={1: 'v1'})
+    aba.linha(('V2', '2 (Azul)', tamanho_v2), estilos_colunas={1: 'v2'})
+    aba.linha_vazia()
 
     # Estatísticas
-    ws['A9'] = 'ESTATÍSTICAS'
-    ws['A9'].font = Font(name='Arial', size=12, bold=True)
-
+    aba.titulo_tabela('ESTATÍSTICAS')
     stats = [
-        ('Total de vértices', 10),
-        ('Total de arestas', 12),
-        ('Vértices em V1', 5),
-        ('Vértices em V2', 5),
-        ('É bipartido?', 'SIM'),
-        ('Componentes conexos', 1),
+        ('Total de vértices', len(grafo.vertices)),
+        ('Total de arestas', grafo.total_arestas()),
+        ('Vértices em V1', tamanho_v1),
+        ('Vértices em V2', tamanho_v2),
+        ('É bipartido?', 'SIM' if eh_bipartido else 'NÃO'),
+        ('Componentes conexos', componentes if eh_bipartido else f'{componentes} (parcial)'),
     ]
+    for metrica, valor in stats:
+        aba.linha((metrica, valor))
+    aba.linha_vazia()
+
+    # Vértices por conjunto
+    aba.titulo_tabela('VÉRTICES POR CONJUNTO')
+    aba.iniciar_tabela(['Vértice', 'Conjunto', 'Tipo'])
+    for vertice, cor in cores.items():
+        aba.linha((vertice, f'V{cor}', tipo_vertice(grafo, vertice)),
+                  estilos_colunas={1: ESTILO_COR[cor]})
+
 
-    for row_idx, (metrica, valor) in enumerate(stats, 10):
-        ws.cell(row=row_idx, column=1, value=metrica)
-        ws.cell(row=row_idx, column=2, value=valor)
+def exportar_teste_de_mesa(grafo, arquivo, eventos=None):
+    """
+    Exporta o teste de mesa de uma execução do BFS em 4 planilhas
 
-    ws.column_dimensions['A'].width = 20
-    ws.column_dimensions['B'].width = 15
-    ws.column_dimensions['C'].width = 50
-    ws.column_dimensions['D'].width = 12
+    `eventos` é o fluxo de GrafoBipartido.eventos_bfs (executado aqui se
+    não for informado). As linhas são gravadas em modo write_only conforme
+    os eventos chegam, então a memória não cresce com o tamanho do trace.
+    """
+    if not OPENPYXL_DISPONIVEL:
+        raise ImportError("openpyxl não instalado. Instale com: pip install openpyxl")
+
+    from openpyxl import Workbook
+
+    if eventos is None:
+        eventos = grafo.eventos_bfs()
+
+    wb = Workbook(write_only=True)
+    criar_estilos(wb)
+
+    criar_planilha1_entrada(wb, grafo)
+    criar_planilha2_inicializacao(wb, grafo)
+    cores = {}
+    fim, componentes = criar_planilha3_execucao(wb, eventos, cores)
+    criar_planilha4_resultado(wb, grafo, fim, cores, componentes)
+
+    wb.save(arquivo)
 
 
 def main():
@@ -315,30 +303,20 @@ def main():
     print("CRIANDO ARQUIVO EXCEL COMPLETO")
     print("="*60)
 
-    # Criar workbook
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove planilha padrão
-
-    # Criar estilos
-    estilos = criar_estilos()
-
-    # Criar planilhas
-    print("\n1. Criando planilha: Grafo de Entrada...")
-    criar_planilha1_entrada(wb, estilos)
+    if not OPENPYXL_DISPONIVEL:
+        print("\nERRO: openpyxl nao instalado.")
+        print("Instale com: pip install openpyxl")
+        return 1
 
-    print("2. Criando planilha: Inicializacao...")
-    criar_planilha2_inicializacao(wb, estilos)
+    arquivo_grafo = sys.argv[1] if len(sys.argv) > 1 else 'exemplo1.txt'
+    arquivo = sys.argv[2] if len(sys.argv) > 2 else 'teste_de_mesa_completo.xlsx'
 
-    print("3. Criando planilha: Execucao BFS...")
-    criar_planilha3_execucao(wb, estilos)
+    print(f"\n1. Carregando grafo: {arquivo_grafo}...")
+    grafo = GrafoBipartido()
+    grafo.carregar_de_arquivo(arquivo_grafo)
 
-    print("4. Criando planilha: Resultado...")
-    criar_planilha4_resultado(wb, estilos)
-
-    # Salvar
-    arquivo = 'teste_de_mesa_completo.xlsx'
-    print(f"\n5. Salvando arquivo: {arquivo}...")
-    wb.save(arquivo)
+    print(f"\n2. Executando BFS e gravando planilhas em: {arquivo}...")
+    exportar_teste_de_mesa(grafo, arquivo)
 
     print("\n" + "="*60)
     print("SUCESSO! Arquivo Excel criado!")
@@ -347,11 +325,12 @@ def main():
     print("\nConteudo:")
     print("  - Aba 1: Grafo de Entrada (arestas e adjacencias)")
     print("  - Aba 2: Inicializacao (estado inicial)")
-    print("  - Aba 3: Execucao BFS (26 passos)")
+    print("  - Aba 3: Execucao BFS (passo a passo)")
     print("  - Aba 4: Resultado (particao e estatisticas)")
     print("\nAbra o arquivo no Excel/LibreOffice!")
     print("="*60)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+"""
+Grafo Particionado em Vários Processos
+Divide os vértices entre N processos (cada um fazendo o papel de uma
+máquina), para grafos que não cabem na memória de um único processo
+
+- Cada vértice pertence à partição crc32(nome) % N, que guarda a sua
+  lista de adjacência e o seu papel (usuário/filme).
+- Um coordenador conversa com as partições por pipes, sempre em lotes:
+  uma mensagem por partição a cada etapa, nunca uma por vértice.
+- Bipartição: BFS sincronizado por nível. A cada nível, cada partição
+  colore os vértices propostos, semeia novos componentes, detecta
+  conflitos e devolve as propostas de cor para os vizinhos agrupadas pela
+  partição de destino. Vários componentes são explorados na mesma rodada:
+  cada vértice guarda a semente que o alcançou e a paridade da distância
+  até ela, e o coordenador une as sementes cujos BFS se encontram.
+- Recomendações: um lote de usuários é resolvido em três rodadas (filmes
+  dos usuários, usuários desses filmes, contagens parciais por partição).
+
+Como no restante do recomendador, usuários e filmes devem ser disjuntos.
+
+Uso:
+    python distribuido.py arquivo_grafo [num_particoes]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import heapq
+import multiprocessing
+import sys
+import zlib
+from collections import defaultdict
+from typing import NamedTuple, Optional, Tuple
+
+from grafo_bipartido import ler_campos
+
+
+# Arestas acumuladas por partição antes de enviar
+TAMANHO_LOTE = 10000
+
+# Vértices coloridos por partição a cada nível do BFS a partir dos quais ela
+# não inicia novos componentes
+VERTICES_POR_NIVEL = 1000
+
+
+def particao_de(vertice, num_particoes):
+    """Partição dona do vértice (estável entre processos e execuções)"""
+    return zlib.crc32(vertice.encode('utf-8')) % num_particoes
+
+
+class ResultadoBFS(NamedTuple):
+    """Resultado da verificação distribuída de bipartição"""
+    bipartido: bool
+    componentes: int
+    niveis: int
+    mensagens: int
+    conflito: Optional[Tuple[str, str]] = None
+
+
+class UniaoParidade:
+    """
+    Union-find das sementes do BFS distribuído que guarda, para cada semente,
+    a paridade entre a cor dela e a do seu pai
+
+    O coordenador decide as ligações e as repassa às partições, que mantêm
+    uma cópia para reconhecer sementes já unidas sem consultá-lo.
+    """
+
+    def __init__(self):
+        self.pai = {}
+        self.paridade = {}
+
+    def raiz(self, semente):
+        """Raiz da semente e a paridade entre as duas (com compressão de caminho)"""
+        pai, paridade = self.pai, self.paridade
+        caminho = []
+        while semente in pai:
+            caminho.append(semente)
+            semente = pai[semente]
+        total = 0
+        for anterior in reversed(caminho):
+            total ^= paridade[anterior]
+            pai[anterior], paridade[anterior] = semente, total
+        return semente, total
+
+    def ligar(self, raiz, nova_raiz, paridade):
+        self.pai[raiz] = nova_raiz
+        self.paridade[raiz] = paridade
+
+
+class Particao:
+    """Estado de uma partição, mantido dentro do seu processo"""
+
+    def __init__(self, indice, num_particoes):
+        self.indice = indice
+        self.num_particoes = num_particoes
+        self.grafo = defaultdict(list)
+        self.usuarios = set()
+        self.filmes = set()
+        self.cor = {}
+        self.pendentes = []
+        self.sementes = 0
+        self.uniao = UniaoParidade()
+
+    def adicionar(self, meias_arestas):
+        """Recebe (vertice, vizinho, eh_usuario) para vértices desta partição"""
+        for vertice, vizinho, eh_usuario in meias_arestas:
+            self.grafo[vertice].append(vizinho)
+            (self.usuarios if eh_usuario else self.filmes).add(vertice)
+
+    def estatisticas(self):
+        vertices = len(self.usuarios | self.filmes)
+        graus = sum(len(adj) for adj in self.grafo.values())
+        graus_usuarios = sum(len(self.grafo[u]) for u in self.usuarios)
+        return vertices, len(self.usuarios), len(self.filmes), graus, graus_usuarios
+
+    def iniciar_bfs(self):
+        self.cor = {}
+        self.pendentes = list(self.grafo)
+        self.sementes = 0
+        self.uniao = UniaoParidade()
+
+    def _semear(self, limite):
+        """Inicia um componente em até `limite` vértices ainda sem cor"""
+        cor = self.cor
+        novos = []
+        while self.pendentes and len(novos) < limite:
+            vertice = self.pendentes.pop()
+            if vertice not in cor:
+                # Identificador único entre as partições, com paridade 0
+                cor[vertice] = (self.sementes * self.num_particoes + self.indice) << 1
+                self.sementes += 1
+                novos.append(vertice)
+        while self.pendentes and self.pendentes[-1] in cor:
+            self.pendentes.pop()
+        return novos
+
+    def expandir(self, propostas, ligacoes, max_vertices):
+        """
+        Aplica as `ligacoes` de sementes decididas pelo coordenador e as
+        propostas (vertice, rotulo, origem) de um nível do BFS, e inicia novos
+        componentes até colorir `max_vertices` vértices no nível
+
+        O rótulo de um vértice é semente << 1 | paridade: uma semente do seu
+        componente e a paridade da distância até ela. Retorna (conflito, saida,
+        encontros, sementes, restantes):
+        - conflito: (origem, vertice) se o vértice já tinha a paridade da
+          origem em relação à mesma raiz de sementes (ciclo ímpar);
+        - saida: propostas para os vizinhos dos vértices recém-coloridos,
+          agrupadas pela partição de destino;
+        - encontros: {(raiz_a, raiz_b, diferenca): (origem, vertice)} para
+          vértices alcançados por sementes ainda não unidas, cujas paridades
+          devem diferir de `diferenca`;
+        - sementes: quantos componentes foram iniciados;
+        - restantes: se ainda há vértices sem cor.
+        """
+        uniao = self.uniao
+        for ligacao in ligacoes:
+            uniao.ligar(*ligacao)
+
+        # Rótulo da raiz de cada semente (raiz << 1 | paridade), fixo até o próximo nível
+        raizes = {}
+
+        def na_raiz(rotulo):
+            """Mesmo rótulo, em relação à raiz atual da semente"""
+            semente = rotulo >> 1
+            base = raizes.get(semente)
+            if base is None:
+                raiz, paridade = uniao.raiz(semente)
+                base = raizes[semente] = raiz << 1 | paridade
+            return base ^ rotulo & 1
+
+        cor = self.cor
+        novos = []
+        encontros = {}
+        for vertice, rotulo, origem in propostas:
+            atual = cor.get(vertice)
+            if atual is None:
+                cor[vertice] = rotulo
+                novos.append(vertice)
+            elif atual != rotulo:
+                # Compara os rótulos em relação às raízes atuais; o do vértice
+                # fica atualizado para as próximas propostas
+                atual = cor[vertice] = na_raiz(atual)
+                rotulo = na_raiz(rotulo)
+                if atual == rotulo:
+                    continue
+                a, b, diferenca = atual >> 1, rotulo >> 1, (atual ^ rotulo) & 1
+                if a == b:
+                    return (origem, vertice), {}, {}, 0, True
+                encontros.setdefault((a, b, diferenca) if a < b else (b, a, diferenca),
+                                     (origem, vertice))
+        semeados = self._semear(max_vertices - len(novos))
+
+        saida = defaultdict(list)
+        n = self.num_particoes
+        for u in novos + semeados:
+            rotulo = cor[u] = na_raiz(cor[u])
+            rotulo ^= 1
+            for w in self.grafo[u]:
+                saida[zlib.crc32(w.encode('utf-8')) % n].append((w, rotulo, u))
+        return None, dict(saida), encontros, len(semeados), bool(self.pendentes)
+
+    def vizinhos(self, vertices, apenas_usuarios=False):
+        """Listas de adjacência dos vértices pedidos (ignora os desconhecidos)"""
+        return {v: self.grafo[v] for v in vertices
+                if v in self.grafo and (not apenas_usuarios or v in self.usuarios)}
+
+    def listar_usuarios(self, limite):
+        return sorted(self.usuarios)[:limite]
+
+    def pontuar(self, consultas):
+        """
+        Contagens parciais de recomendação
+
+        Para cada (usuario, similares, assistidos), conta em quantos dos
+        similares desta partição aparece cada filme não assistido.
+        """
+        resultado = []
+        for usuario, similares, assistidos in consultas:
+            contagem = defaultdict(int)
+            for outro in similares:
+                if outro in self.usuarios:
+                    for filme in set(self.grafo[outro]):
+                        if filme not in assistidos:
+                            contagem[filme] += 1
+            resultado.append((usuario, dict(contagem)))
+        return resultado
+
+
+def _executar_particao(indice, num_particoes, conexao):
+    """Laço do processo de uma partição: executa os comandos recebidos pelo pipe"""
+    particao = Particao(indice, num_particoes)
+    while True:
+        comando, argumentos = conexao.recv()
+        if comando == 'sair':
+            break
+        conexao.send(getattr(particao, comando)(*argumentos))
+    conexao.close()
+
+
+class GrafoDistribuido:
+    """
+    Coordenador do grafo particionado em `num_particoes` processos
+
+    As arestas são acumuladas e enviadas em lotes; qualquer consulta envia
+    antes as pendentes. Use com `with` ou chame fechar() ao final.
+    """
+
+    def __init__(self, num_particoes=4):
+        self.num_particoes = num_particoes
+        self.conexoes = []
+        self.processos = []
+        self.buffers = [[] for _ in range(num_particoes)]
+        self.mensagens = 0
+
+        for indice in range(num_particoes):
+            conexao, conexao_filho = multiprocessing.Pipe()
+            processo = multiprocessing.Process(target=_executar_particao,
+                                               args=(indice, num_particoes, conexao_filho),
+                                               daemon=True)
+            processo.start()
+            conexao_filho.close()
+            self.conexoes.append(conexao)
+            self.processos.append(processo)
+
+    def particao_de(self, vertice):
+        return particao_de(vertice, self.num_particoes)
+
+    def _requisitar(self, pedidos):
+        """
+        Envia {particao: (comando, argumentos)} a todas as partições e só
+        depois recebe as respostas, para que trabalhem em paralelo
+        """
+        for particao, pedido in pedidos.items():
+            self.conexoes[particao].send(pedido)
+        self.mensagens += len(pedidos)
+        return {particao: self.conexoes[particao].recv() for particao in pedidos}
+
+    def _para_todas(self, comando, *argumentos):
+        return self._requisitar({p: (comando, argumentos) for p in range(self.num_particoes)})
+
+    def adicionar_aresta(self, usuario, filme):
+        """Adiciona uma aresta entre usuário e filme (enviada em lote)"""
+        for vertice, vizinho, eh_usuario in ((usuario, filme, True), (filme, usuario, False)):
+            buffer = self.buffers[self.particao_de(vertice)]
+            buffer.append((vertice, vizinho, eh_usuario))
+            if len(buffer) >= TAMANHO_LOTE:
+                self._enviar_arestas()
+
+    def _enviar_arestas(self):
+        pedidos = {p: ('adicionar', (buffer,)) for p, buffer in enumerate(self.buffers) if buffer}
+        if pedidos:
+            self._requisitar(pedidos)
+            self.buffers = [[] for _ in range(self.num_particoes)]
+
+    def carregar_de_linhas(self, linhas):
+        """Carrega arestas no formato USUARIO,FILME; retorna quantas foram lidas"""
+        total = 0
+        for campos in ler_campos(linhas):
+            self.adicionar_aresta(campos[0], campos[1])
+            total += 1
+        self._enviar_arestas()
+        return total
+
+    def carregar_de_arquivo(self, arquivo):
+        """Carrega o grafo de um arquivo texto (USUARIO,FILME)"""
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            return self.carregar_de_linhas(f)
+
+    def estatisticas(self):
+        """Retorna um dicionário com os totais do grafo, somados entre as partições"""
+        self._enviar_arestas()
+        totais = [sum(valores) for valores in zip(*self._para_todas('estatisticas').values())]
+        vertices, usuarios, filmes, graus, graus_usuarios = totais
+        return {
+            'vertices': vertices,
+            'usuarios': usuarios,
+            'filmes': filmes,
+            'arestas': graus // 2,
+            'media_filmes_por_usuario': graus_usuarios / usuarios if usuarios else 0,
+        }
+
+    def eh_bipartido(self) -> ResultadoBFS:
+        """
+        Verifica a bipartição com um BFS sincronizado por nível entre as partições
+
+        A cada nível, cada partição inicia novos componentes até colorir um
+        limite de vértices, que começa em 1 e dobra a cada nível até
+        VERTICES_POR_NIVEL: o número de rodadas não cresce com o número de
+        componentes, e um componente grande recebe poucas sementes. Duas sementes podem estar no mesmo
+        componente: quando os BFS delas se encontram, o coordenador as une em
+        uma UniaoParidade e repassa a ligação às partições no nível seguinte;
+        uma paridade incompatível entre sementes unidas é um ciclo ímpar.
+        """
+        self._enviar_arestas()
+        mensagens_inicio = self.mensagens
+        self._para_todas('iniciar_bfs')
+
+        uniao = UniaoParidade()
+        ligacoes = [[] for _ in range(self.num_particoes)]  # ainda não enviadas a cada partição
+        sementes = unioes = niveis = 0
+        ativas = set(range(self.num_particoes))
+        propostas = {}
+        while ativas or propostas:
+            niveis += 1
+            limite = min(VERTICES_POR_NIVEL, 1 << min(niveis - 1, 30))
+            pedidos = {}
+            for p in ativas | propostas.keys():
+                pedidos[p] = ('expandir', (propostas.get(p, []), ligacoes[p], limite))
+                ligacoes[p] = []
+            respostas = self._requisitar(pedidos)
+            propostas = defaultdict(list)
+            ativas = set()
+            encontros = {}
+            for particao, (conflito, saida, encontrados, semeadas, restantes) in respostas.items():
+                if conflito is not None:
+                    return ResultadoBFS(False, sementes - unioes, niveis,
+                                        self.mensagens - mensagens_inicio, conflito)
+                sementes += semeadas
+                if restantes:
+                    ativas.add(particao)
+                encontros.update(encontrados)
+                for destino, lote in saida.items():
+                    propostas[destino].extend(lote)
+
+            for (a, b, diferenca), aresta in encontros.items():
+                raiz_a, paridade_a = uniao.raiz(a)
+                raiz_b, paridade_b = uniao.raiz(b)
+                if raiz_a == raiz_b:
+                    if paridade_a ^ paridade_b != diferenca:
+                        return ResultadoBFS(False, sementes - unioes, niveis,
+                                            self.mensagens - mensagens_inicio, aresta)
+                    continue
+                ligacao = (raiz_a, raiz_b, paridade_a ^ paridade_b ^ diferenca)
+                uniao.ligar(*ligacao)
+                for lista in ligacoes:
+                    lista.append(ligacao)
+                unioes += 1
+
+        return ResultadoBFS(True, sementes - unioes, niveis, self.mensagens - mensagens_inicio)
+
+    def _agrupar(self, vertices):
+        grupos = defaultdict(list)
+        for vertice in vertices:
+            grupos[self.particao_de(vertice)].append(vertice)
+        return grupos
+
+    def recomendar_lote(self, usuarios, k=10):
+        """
+        Top-k recomendações de vários usuários, com a mesma pontuação de
+        GrafoBipartido.ranquear_filmes, em três rodadas de mensagens
+
+        Retorna um dicionário usuario -> [(filme, pontuacao), ...]; usuários
+        desconhecidos recebem lista vazia.
+        """
+        self._enviar_arestas()
+        usuarios = list(dict.fromkeys(usuarios))
+
+        # 1. Filmes de cada usuário consultado
+        filmes_de = {}
+        for resposta in self._requisitar({p: ('vizinhos', (grupo, True))
+                                          for p, grupo in self._agrupar(usuarios).items()}).values():
+            filmes_de.update(resposta)
+
+        # 2. Usuários de cada um desses filmes
+        filmes = {filme for lista in filmes_de.values() for filme in lista}
+        usuarios_de = {}
+        for resposta in self._requisitar({p: ('vizinhos', (grupo,))
+                                          for p, grupo in self._agrupar(filmes).items()}).values():
+            usuarios_de.update(resposta)
+
+        # 3. Contagens parciais nas partições dos usuários similares
+        consultas = defaultdict(list)
+        for usuario, lista in filmes_de.items():
+            assistidos = set(lista)
+            similares = {outro for filme in assistidos for outro in usuarios_de.get(filme, ())}
+            similares.discard(usuario)
+            for particao, grupo in self._agrupar(similares).items():
+                consultas[particao].append((usuario, grupo, assistidos))
+
+        pontuacao = defaultdict(lambda: defaultdict(int))
+        for resposta in self._requisitar({p: ('pontuar', (lote,))
+                                          for p, lote in consultas.items()}).values():
+            for usuario, contagem in resposta:
+                total = pontuacao[usuario]
+                for filme, valor in contagem.items():
+                    total[filme] += valor
+
+        chave = lambda item: (-item[1], item[0])
+        return {usuario: heapq.nsmallest(k, pontuacao[usuario].items(), key=chave)
+                if usuario in pontuacao else [] for usuario in usuarios}
+
+    def listar_usuarios(self, limite):
+        """Os `limite` primeiros usuários em ordem alfabética"""
+        self._enviar_arestas()
+        listas = self._para_todas('listar_usuarios', limite).values()
+        return list(heapq.merge(*listas))[:limite]
+
+    def ranquear_filmes(self, usuario, k=10):
+        """Top-k recomendações de um usuário"""
+        return self.recomendar_lote([usuario], k)[usuario]
+
+    def fechar(self):
+        """Encerra os processos das partições"""
+        for conexao in self.conexoes:
+            try:
+                conexao.send(('sair', ()))
+            except (BrokenPipeError, OSError):
+                pass
+            conexao.close()
+        for processo in self.processos:
+            processo.join()
+        self.conexoes, self.processos = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python distribuido.py arquivo_grafo [num_particoes]")
+        return 1
+
+    num_particoes = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    with GrafoDistribuido(num_particoes) as grafo:
+        grafo.carregar_de_arquivo(sys.argv[1])
+
+        print("\n" + "="*50)
+        print(f"GRAFO DISTRIBUÍDO ({num_particoes} partições)")
+        print("="*50)
+        estatisticas = grafo.estatisticas()
+        print(f"Total de vértices: {estatisticas['vertices']}")
+        print(f"  - Usuários: {estatisticas['usuarios']}")
+        print(f"  - Filmes: {estatisticas['filmes']}")
+        print(f"Total de arestas: {estatisticas['arestas']}")
+
+        resultado = grafo.eh_bipartido()
+        print(f"\nBipartido: {'SIM' if resultado.bipartido else 'NÃO'}")
+        print(f"  {resultado.componentes} componente(s), {resultado.niveis} nível(is), "
+              f"{resultado.mensagens} mensagens")
+        if resultado.conflito:
+            print(f"  Conflito: '{resultado.conflito[0]}' e '{resultado.conflito[1]}' com a mesma cor")
+            return 0
+
+        print("\nRecomendações:")
+        for usuario, recomendacoes in grafo.recomendar_lote(grafo.listar_usuarios(5), 3).items():
+            print(f"  {usuario}: {', '.join(f'{filme} ({p})' for filme, p in recomendacoes) or '(nenhuma)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
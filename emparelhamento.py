@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Emparelhamento Máximo (Hopcroft-Karp)
+Atribui a cada usuário no máximo um filme, respeitando o número de vagas
+(capacidade) de cada filme, de forma a maximizar o total de usuários atendidos
+
+Aplicação: distribuir usuários entre sessões promocionais com vagas limitadas,
+em que cada usuário só pode ir a uma sessão de um filme que já assistiu/avaliou.
+
+Os dois lados vêm da partição V1/V2 verificada pelo BFS. O algoritmo trabalha
+sobre uma adjacência indexada por inteiros (formato CSR: vizinhos do usuário i
+em destinos[inicio[i]:inicio[i + 1]]) em tempo O(E·√V), alternando fases de
+BFS e DFS, sem recursão.
+
+Uso:
+    python emparelhamento.py arquivo_grafo [capacidade]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import sys
+from array import array
+from collections import deque
+
+import instrumentacao
+from grafo_bipartido import COLORIR, INICIO_COMPONENTE, GrafoBipartido
+
+
+INFINITO = float('inf')
+
+
+def indexar_grafo(grafo, lados=None):
+    """
+    Converte o grafo para a adjacência em inteiros usada pelo Hopcroft-Karp
+
+    `lados` = (esquerda, direita), como os de lados_da_particao, define os
+    dois lados. Sem ele, os usuários formam o lado esquerdo e os filmes o
+    direito, ambos em ordem alfabética, e é lançado ValueError se algum
+    vértice for usuário e filme ao mesmo tempo: nesse caso usuários e filmes
+    não formam a partição V1/V2 do grafo.
+    Retorna (esquerda, direita, inicio, destinos).
+    """
+    if lados is None:
+        ambiguos = grafo.usuarios & grafo.filmes
+        if ambiguos:
+            exemplo = sorted(ambiguos)[0]
+            raise ValueError(f"'{exemplo}' é usuário e filme ao mesmo tempo; o emparelhamento "
+                             f"exige usuários e filmes em lados opostos da partição")
+
+    with grafo.metricas.cronometro(instrumentacao.INTERNACAO):
+        if lados is None:
+            usuarios, filmes = sorted(grafo.usuarios), sorted(grafo.filmes)
+        else:
+            usuarios, filmes = lados
+        indice_filme = {filme: i for i, filme in enumerate(filmes)}
+
+        inicio = array('i', [0])
+        destinos = array('i')
+        for usuario in usuarios:
+            destinos.extend(map(indice_filme.__getitem__, grafo.vizinhos(usuario)))
+            inicio.append(len(destinos))
+    return usuarios, filmes, inicio, destinos
+
+
+def hopcroft_karp(num_esquerda, num_direita, inicio, destinos, capacidade):
+    """
+    Emparelhamento máximo com capacidades no lado direito
+
+    `capacidade[r]` é o número de vértices da esquerda que o vértice r da
+    direita pode receber. Retorna a lista `par` com o vértice da direita
+    atribuído a cada vértice da esquerda (-1 se nenhum).
+
+    Cada fase visita cada vértice da direita (e seus ocupantes) uma única
+    vez no BFS, e a DFS avança ponteiros que nunca voltam, tanto nas
+    adjacências da esquerda quanto nos ocupantes de cada vértice da direita,
+    então a fase custa O(E) qualquer que seja a capacidade.
+    """
+    par = [-1] * num_esquerda
+    carga = [0] * num_direita
+
+    # Atribuição gulosa inicial: reduz bastante o número de fases
+    for u in range(num_esquerda):
+        for r in destinos[inicio[u]:inicio[u + 1]]:
+            if carga[r] < capacidade[r]:
+                par[u] = r
+                carga[r] += 1
+                break
+
+    while True:
+        ocupantes = [[] for _ in range(num_direita)]
+        for u, r in enumerate(par):
+            if r != -1:
+                ocupantes[r].append(u)
+
+        # BFS: camadas a partir dos usuários livres, até o primeiro filme com vaga.
+        # Cada filme entra na camada do primeiro usuário que o alcança, e só seus
+        # ocupantes descobertos por ele (filhos) formam a camada seguinte
+        dist = [INFINITO] * num_esquerda
+        camada_filme = [INFINITO] * num_direita
+        filhos = {}
+        fila = deque()
+        for u in range(num_esquerda):
+            if par[u] == -1 and inicio[u] < inicio[u + 1]:
+                dist[u] = 0
+                fila.append(u)
+
+        limite = INFINITO
+        while fila:
+            u = fila.popleft()
+            nivel = dist[u]
+            if nivel >= limite:
+                break
+            for r in destinos[inicio[u]:inicio[u + 1]]:
+                if camada_filme[r] != INFINITO:
+                    continue
+                camada_filme[r] = nivel
+                if carga[r] < capacidade[r]:
+                    limite = nivel + 1
+                elif limite == INFINITO:
+                    novos = [w for w in ocupantes[r] if dist[w] == INFINITO]
+                    for w in novos:
+                        dist[w] = nivel + 1
+                    fila.extend(novos)
+                    filhos[r] = novos
+
+        if limite == INFINITO:
+            return par
+
+        # DFS iterativa: caminhos aumentantes de comprimento `limite` pelas camadas
+        proxima = list(inicio[:num_esquerda])
+        proximo_filho = dict.fromkeys(filhos, 0)
+        for raiz in range(num_esquerda):
+            if par[raiz] != -1 or dist[raiz] != 0:
+                continue
+
+            pilha = [raiz]   # vértices da esquerda no caminho
+            filmes = []      # filme pelo qual se chegou a cada vértice seguinte
+            while pilha:
+                u = pilha[-1]
+                nivel = dist[u]
+                i, fim = proxima[u], inicio[u + 1]
+                seguinte = -1
+                while i < fim:
+                    r = destinos[i]
+                    if camada_filme[r] == nivel:
+                        if carga[r] < capacidade[r]:
+                            if nivel + 1 == limite:
+                                break
+                        elif nivel + 1 < limite and r in filhos:
+                            candidatos, j = filhos[r], proximo_filho[r]
+                            while j < len(candidatos) and dist[candidatos[j]] == INFINITO:
+                                j += 1
+                            proximo_filho[r] = j
+                            if j < len(candidatos):
+                                seguinte = candidatos[j]
+                                break
+                    i += 1
+                proxima[u] = i
+
+                if i == fim:
+                    # Sem caminho a partir de u nesta fase: remove das camadas
+                    dist[u] = INFINITO
+                    pilha.pop()
+                    if filmes:
+                        filmes.pop()
+                elif seguinte == -1:
+                    _aumentar(pilha, filmes, r, par, carga)
+                    # Cada usuário do caminho trocou de filme: não serve a outro caminho nesta fase
+                    for v in pilha:
+                        dist[v] = INFINITO
+                    break
+                else:
+                    pilha.append(seguinte)
+                    filmes.append(r)
+
+
+def _aumentar(pilha, filmes, filme_livre, par, carga):
+    """Aplica o caminho aumentante: cada usuário do caminho passa para o filme seguinte"""
+    carga[filme_livre] += 1
+    for u, filme in zip(pilha, filmes + [filme_livre]):
+        par[u] = filme
+
+
+def lados_da_particao(grafo):
+    """
+    Lados esquerdo (usuários) e direito (filmes) do emparelhamento, a partir
+    da partição V1/V2 verificada pelo BFS (eventos_bfs + obter_particao)
+
+    O BFS colore cada componente a partir de um vértice qualquer, então o
+    lado dos usuários é escolhido por componente. Vértices que são usuário e
+    filme ao mesmo tempo ficam no lado que a partição lhes dá. Lança
+    ValueError se o grafo não for bipartido ou se, em algum componente,
+    usuários e filmes não estiverem em lados opostos. Retorna (esquerda, direita).
+    """
+    cor = {}
+    componente = {}
+    with grafo.metricas.cronometro(instrumentacao.BFS):
+        for evento in grafo.eventos_bfs(cor):
+            if evento.tipo == INICIO_COMPONENTE:
+                atual = evento.vertice
+                componente[atual] = atual
+            elif evento.tipo == COLORIR:
+                componente[evento.vertice] = atual
+    if not evento.bipartido:
+        raise ValueError("O grafo não é bipartido (há um ciclo ímpar); o emparelhamento "
+                         "exige a partição V1/V2")
+    v1, _ = grafo.obter_particao(cor)
+
+    # Cor do lado dos usuários em cada componente
+    cor_usuarios = {}
+    for vertice in grafo.usuarios - grafo.filmes:
+        if cor_usuarios.setdefault(componente[vertice], cor[vertice]) != cor[vertice]:
+            raise ValueError(f"Usuários do componente de '{vertice}' estão nos dois lados da partição")
+    for vertice in grafo.filmes - grafo.usuarios:
+        if cor_usuarios.setdefault(componente[vertice], 3 - cor[vertice]) == cor[vertice]:
+            raise ValueError(f"O filme '{vertice}' está no mesmo lado da partição que os usuários")
+
+    esquerda, direita = [], []
+    for vertice in grafo.vertices:
+        lado_usuarios = cor_usuarios.get(componente[vertice], 1)
+        (esquerda if (vertice in v1) == (lado_usuarios == 1) else direita).append(vertice)
+    return sorted(esquerda), sorted(direita)
+
+
+def emparelhamento_maximo(grafo, capacidades=None, capacidade_padrao=1):
+    """
+    Calcula um emparelhamento máximo usuário -> filme
+
+    `capacidades` mapeia filme -> número de vagas; filmes ausentes recebem
+    `capacidade_padrao`. Retorna um dicionário com o filme atribuído a cada
+    usuário emparelhado (usuários sem filme não aparecem).
+
+    Os lados vêm da partição verificada pelo BFS (lados_da_particao), então
+    grafos não bipartidos são recusados com ValueError.
+    """
+    usuarios, filmes, inicio, destinos = indexar_grafo(grafo, lados_da_particao(grafo))
+    capacidades = capacidades or {}
+    capacidade = [capacidades.get(filme, capacidade_padrao) for filme in filmes]
+    if any(c < 0 for c in capacidade):
+        raise ValueError("Capacidades não podem ser negativas")
+
+    par = hopcroft_karp(len(usuarios), len(filmes), inicio, destinos, capacidade)
+    return {usuarios[u]: filmes[r] for u, r in enumerate(par) if r != -1}
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python emparelhamento.py arquivo_grafo [capacidade]")
+        return 1
+
+    capacidade = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    grafo = GrafoBipartido()
+    grafo.carregar_de_arquivo(sys.argv[1])
+
+    try:
+        atribuicao = emparelhamento_maximo(grafo, capacidade_padrao=capacidade)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        return 1
+
+    print("\n" + "="*50)
+    print(f"EMPARELHAMENTO MÁXIMO ({capacidade} vaga(s) por filme)")
+    print("="*50)
+    for usuario in sorted(atribuicao):
+        print(f"  {usuario} → {atribuicao[usuario]}")
+    print(f"\nUsuários atendidos: {len(atribuicao)} de {len(grafo.usuarios)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+# -*- coding: utf-8 -*-
+"""
+Exportação Colunar dos Resultados
+Grava a coloração, a partição V1/V2, o componente de cada vértice e as
+recomendações top-k em arquivos colunares, em lotes
+
+Formatos (escolhidos pela extensão do arquivo):
+- .npz: NumPy
+- .arrow / .feather: Arrow IPC (pyarrow)
+- .parquet: Parquet (pyarrow)
+- .csv: CSV (sempre disponível; usado também quando a biblioteca do
+  formato pedido não está instalada)
+
+Uso:
+    python exportacao.py arquivo_grafo [prefixo_saida] [extensao]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import csv
+import os
+import sys
+import tempfile
+import zipfile
+from itertools import islice
+
+from grafo_bipartido import COLORIR, FIM, INICIO_COMPONENTE, GrafoBipartido
+
+
+# Linhas convertidas e gravadas por vez
+TAMANHO_LOTE = 65536
+
+# Extensões e a biblioteca que cada uma exige
+BIBLIOTECA_FORMATO = {
+    '.npz': 'numpy',
+    '.arrow': 'pyarrow',
+    '.feather': 'pyarrow',
+    '.parquet': 'pyarrow',
+    '.csv': None,
+}
+
+
+class EscritorCSV:
+    """Grava lotes de colunas em CSV"""
+
+    def __init__(self, caminho, colunas):
+        self.arquivo = open(caminho, 'w', encoding='utf-8', newline='')
+        self.escritor = csv.writer(self.arquivo)
+        self.escritor.writerow([nome for nome, _ in colunas])
+
+    def escrever(self, lote):
+        self.escritor.writerows(zip(*lote))
+
+    def fechar(self):
+        self.arquivo.close()
+
+
+class EscritorArrow:
+    """Grava lotes de colunas em Parquet ou Arrow IPC"""
+
+    def __init__(self, caminho, colunas):
+        import pyarrow as pa
+
+        tipos = {'str': pa.string(), 'int': pa.int64(), 'float': pa.float64()}
+        self.pa = pa
+        self.schema = pa.schema([(nome, tipos[tipo]) for nome, tipo in colunas])
+        if caminho.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            self.escritor = pq.ParquetWriter(caminho, self.schema)
+            self._gravar = self.escritor.write_table
+            self._converter = lambda lote: self.pa.Table.from_arrays(lote, schema=self.schema)
+        else:
+            self.escritor = pa.ipc.new_file(caminho, self.schema)
+            self._gravar = self.escritor.write_batch
+            self._converter = lambda lote: self.pa.RecordBatch.from_arrays(lote, schema=self.schema)
+
+    def escrever(self, lote):
+        arrays = [self.pa.array(coluna, type=campo.type) for coluna, campo in zip(lote, self.schema)]
+        self._gravar(self._converter(arrays))
+
+    def fechar(self):
+        self.escritor.close()
+
+
+class EscritorNPZ:
+    """
+    Grava colunas em um .npz (um .npy por coluna dentro de um zip)
+
+    O cabeçalho de cada .npy precisa do número de linhas e, nas colunas de
+    texto, da maior largura, que só são conhecidos no fim. Por isso cada lote
+    é convertido para NumPy e acrescentado a um arquivo temporário da
+    coluna; ao fechar, os .npy são montados no zip a partir dos temporários,
+    um lote por vez, e a memória fica limitada ao tamanho do lote.
+    """
+
+    def __init__(self, caminho, colunas):
+        import numpy as np
+
+        self.np = np
+        self.caminho = caminho
+        self.colunas = colunas
+        self.tipos = {'str': np.str_, 'int': np.int64, 'float': np.float64}
+        self.temporarios = {nome: tempfile.TemporaryFile() for nome, _ in colunas}
+        self.lotes = {nome: [] for nome, _ in colunas}  # (linhas, dtype) de cada lote
+
+    def escrever(self, lote):
+        for (nome, tipo), coluna in zip(self.colunas, lote):
+            array = self.np.array(coluna, dtype=self.tipos[tipo])
+            self.temporarios[nome].write(array.tobytes())
+            self.lotes[nome].append((len(array), array.dtype))
+
+    def _gravar_coluna(self, saida, nome, tipo):
+        np = self.np
+        lotes = self.lotes[nome]
+        # Textos de lotes diferentes podem ter larguras diferentes: usa a maior
+        dtype = max((dtype for _, dtype in lotes), key=lambda dtype: dtype.itemsize,
+                    default=np.array([], dtype=self.tipos[tipo]).dtype)
+        temporario = self.temporarios[nome]
+        temporario.seek(0)
+        with saida.open(nome + '.npy', 'w', force_zip64=True) as destino:
+            np.lib.format.write_array_header_1_0(destino, {
+                'descr': np.lib.format.dtype_to_descr(dtype),
+                'fortran_order': False,
+                'shape': (sum(linhas for linhas, _ in lotes),),
+            })
+            for linhas, dtype_lote in lotes:
+                dados = temporario.read(linhas * dtype_lote.itemsize)
+                if dtype_lote != dtype:
+                    dados = np.frombuffer(dados, dtype=dtype_lote).astype(dtype).tobytes()
+                destino.write(dados)
+
+    def fechar(self):
+        try:
+            with zipfile.ZipFile(self.caminho, 'w', allowZip64=True) as saida:
+                for nome, tipo in self.colunas:
+                    self._gravar_coluna(saida, nome, tipo)
+        finally:
+            for temporario in self.temporarios.values():
+                temporario.close()
+
+
+def _biblioteca_disponivel(nome):
+    if nome is None:
+        return True
+    try:
+        __import__(nome)
+        return True
+    except ImportError:
+        return False
+
+
+def abrir_escritor(caminho, colunas):
+    """
+    Abre o escritor adequado à extensão do caminho
+
+    Se a biblioteca do formato não estiver instalada, grava em CSV com o
+    mesmo nome e extensão .csv. Retorna (escritor, caminho_efetivo).
+    """
+    base, extensao = os.path.splitext(caminho)
+    extensao = extensao.lower()
+    if extensao not in BIBLIOTECA_FORMATO:
+        raise ValueError(f"Formato não suportado: '{extensao}' "
+                         f"(use {', '.join(BIBLIOTECA_FORMATO)})")
+
+    if not _biblioteca_disponivel(BIBLIOTECA_FORMATO[extensao]):
+        print(f"AVISO: {BIBLIOTECA_FORMATO[extensao]} não instalado, gravando em CSV")
+        caminho, extensao = base + '.csv', '.csv'
+
+    if extensao == '.npz':
+        return EscritorNPZ(caminho, colunas), caminho
+    if extensao == '.csv':
+        return EscritorCSV(caminho, colunas), caminho
+    return EscritorArrow(caminho, colunas), caminho
+
+
+def exportar_linhas(caminho, colunas, linhas, tamanho_lote=TAMANHO_LOTE):
+    """
+    Grava um iterável de linhas (tuplas) em formato colunar
+
+    `colunas` é uma lista de (nome, tipo) com tipo 'str', 'int' ou 'float'. As
+    linhas são consumidas em lotes de `tamanho_lote`, transpostas em
+    colunas e gravadas, sem materializar todo o resultado.
+    Retorna o caminho efetivamente gravado.
+    """
+    escritor, caminho = abrir_escritor(caminho, colunas)
+    linhas = iter(linhas)
+    try:
+        while True:
+            lote = list(islice(linhas, tamanho_lote))
+            if not lote:
+                break
+            escritor.escrever(list(zip(*lote)))
+    finally:
+        escritor.fechar()
+    return caminho
+
+
+def linhas_coloracao(grafo, resultado=None):
+    """
+    Gera (vértice, cor, conjunto, componente) conforme o BFS avança
+
+    O componente é numerado a partir de 0 na ordem em que o BFS os
+    encontra. Se `resultado` for um dicionário, recebe 'bipartido' ao final.
+    """
+    componente = -1
+    for evento in grafo.eventos_bfs():
+        if evento.tipo == INICIO_COMPONENTE:
+            componente += 1
+        if evento.tipo in (INICIO_COMPONENTE, COLORIR):
+            yield evento.vertice, evento.cor, f'V{evento.cor}', componente
+        elif evento.tipo == FIM and resultado is not None:
+            resultado['bipartido'] = evento.bipartido
+
+
+def linhas_recomendacoes(grafo, usuarios=None, k=10):
+    """Gera (usuário, posição, filme, pontuação) das top-k recomendações de cada usuário"""
+    for usuario in (grafo.usuarios if usuarios is None else usuarios):
+        for posicao, (filme, pontuacao) in enumerate(grafo.ranquear_filmes(usuario, k), 1):
+            yield usuario, posicao, filme, pontuacao
+
+
+def exportar_coloracao(grafo, caminho):
+    """
+    Exporta coloração, partição e componente de cada vértice
+
+    Colunas: vertice, cor (1/2), conjunto (V1/V2), componente.
+    Se o grafo não for bipartido, contém apenas os vértices coloridos até o
+    conflito. Retorna (caminho_gravado, eh_bipartido).
+    """
+    resultado = {}
+    colunas = [('vertice', 'str'), ('cor', 'int'), ('conjunto', 'str'), ('componente', 'int')]
+    caminho = exportar_linhas(caminho, colunas, linhas_coloracao(grafo, resultado))
+    return caminho, resultado.get('bipartido', True)
+
+
+def exportar_recomendacoes(grafo, caminho, usuarios=None, k=10):
+    """
+    Exporta as top-k recomendações de cada usuário (todos, se não informados)
+
+    Colunas: usuario, posicao, filme, pontuacao (real: com IDF a pontuação
+    não é inteira). Retorna o caminho gravado.
+    """
+    colunas = [('usuario', 'str'), ('posicao', 'int'), ('filme', 'str'), ('pontuacao', 'float')]
+    return exportar_linhas(caminho, colunas, linhas_recomendacoes(grafo, usuarios, k))
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python exportacao.py arquivo_grafo [prefixo_saida] [extensao]")
+        return 1
+
+    arquivo = sys.argv[1]
+    prefixo = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(arquivo)[0]
+    extensao = sys.argv[3] if len(sys.argv) > 3 else '.npz'
+    if not extensao.startswith('.'):
+        extensao = '.' + extensao
+
+    grafo = GrafoBipartido()
+    grafo.carregar_de_arquivo(arquivo)
+
+    caminho, eh_bipartido = exportar_coloracao(grafo, f"{prefixo}_coloracao{extensao}")
+    print(f"✓ Coloração salva em: {caminho}")
+    if not eh_bipartido:
+        print("⚠ Grafo não é bipartido: coloração parcial até o conflito")
+
+    caminho = exportar_recomendacoes(grafo, f"{prefixo}_recomendacoes{extensao}")
+    print(f"✓ Recomendações salvas em: {caminho}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
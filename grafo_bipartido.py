@@ -19,62 +19,431 @@ Ano: 2024
 
 
 
+import heapq
+import math
+import random
+import sys
+from array import array
 from collections import deque, defaultdict
-from typing import Dict, List, Tuple, Set
+from itertools import accumulate, repeat
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple, Union
+
+import instrumentacao
+from instrumentacao import METRICAS_NULAS
+
+
+# Tipos de evento emitidos pelo BFS
+INICIO_COMPONENTE = 'inicio_componente'
+DESENFILEIRAR = 'desenfileirar'
+COLORIR = 'colorir'
+CONFLITO = 'conflito'
+FIM = 'fim'
+
+# Fração de entradas de adjacência removidas a partir da qual o grafo é compactado
+LIMIAR_COMPACTACAO = 0.25
+
+# Assinatura do formato binário de snapshot e marcador da ordem de bytes
+MAGICO_SNAPSHOT = b'GRAFOBP\x01'
+ORDEM_BYTES = b'L' if sys.byteorder == 'little' else b'B'
+
+
+class EventoBFS(NamedTuple):
+    """
+    Evento da execução do BFS
+
+    - INICIO_COMPONENTE: `vertice` inicia um novo componente com cor 1
+    - DESENFILEIRAR: `vertice` (com `cor`) sai da fila para ser processado
+    - COLORIR: `vertice` recebe `cor` ao processar `origem`
+    - CONFLITO: `vertice` tem a mesma `cor` que seu adjacente `origem`
+    - FIM: fim da execução, `bipartido` indica o resultado
+    """
+    tipo: str
+    vertice: Optional[str] = None
+    cor: int = 0
+    origem: Optional[str] = None
+    bipartido: Optional[bool] = None
+
+
+class LimitesRecomendacao(NamedTuple):
+    """
+    Controle do trabalho de pontuar_recomendacoes para usuários ligados a
+    filmes muito populares (hubs)
+
+    - max_espectadores: de um filme com mais espectadores que isso, só uma
+      amostra aleatória desse tamanho é usada para achar usuários similares;
+    - idf: pondera cada filme em comum por log(1 + usuários / espectadores do
+      filme), para que hubs pesem pouco na semelhança (a pontuação de um
+      candidato passa a ser a soma das semelhanças de quem o assistiu);
+    - orcamento: máximo de entradas de adjacência lidas por consulta; ao
+      esgotar, devolve a pontuação parcial. Os filmes do usuário são
+      percorridos dos menos populares para os mais populares, e os usuários
+      similares dos mais semelhantes para os menos, então o que fica de fora
+      é o que menos informa;
+    - semente: semente da amostragem, para que a mesma consulta dê o mesmo resultado.
+
+    Com os valores padrão (sem limites), a pontuação é a original.
+    """
+    max_espectadores: Optional[int] = None
+    idf: bool = False
+    orcamento: Optional[int] = None
+    semente: int = 0
+
+
+SEM_LIMITES = LimitesRecomendacao()
+
+
+def descrever_evento(evento: EventoBFS) -> str:
+    """Descreve um evento do BFS em texto, para exibição do passo a passo"""
+    if evento.tipo == INICIO_COMPONENTE:
+        return (f"Iniciando BFS a partir de '{evento.vertice}'\n"
+                f"Colorindo '{evento.vertice}' com cor 1 (Conjunto V1)")
+    if evento.tipo == DESENFILEIRAR:
+        return f"\nProcessando vértice '{evento.vertice}' (cor {evento.cor})"
+    if evento.tipo == COLORIR:
+        return f"  → Colorindo '{evento.vertice}' com cor {evento.cor} (Conjunto V{evento.cor})"
+    if evento.tipo == CONFLITO:
+        return f"  ✗ CONFLITO: '{evento.vertice}' tem a mesma cor que '{evento.origem}'!"
+    if evento.bipartido:
+        return "\n✓ GRAFO É BIPARTIDO!"
+    return "\n⚠ GRAFO NÃO É BIPARTIDO!"
+
+
+def ler_campos(linhas: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Gera os campos de cada linha no formato USUARIO,FILME[,INSTANTE]
+
+    Linhas vazias, comentários (#) e linhas fora do formato são ignorados.
+    """
+    for linha in linhas:
+        linha = linha.strip()
+        if linha and not linha.startswith('#'):
+            partes = linha.split(',')
+            if 2 <= len(partes) <= 3:
+                yield [parte.strip() for parte in partes]
+
+
+def eh_snapshot(arquivo: str) -> bool:
+    """Indica se o arquivo é um snapshot binário gerado por salvar_snapshot"""
+    with open(arquivo, 'rb') as f:
+        return f.read(len(MAGICO_SNAPSHOT)) == MAGICO_SNAPSHOT
 
 
 class GrafoBipartido:
     """
     Implementação de um Grafo Bipartido usando lista de adjacências
+
+    Remoções marcam lápides (vértices e arestas removidos) em vez de alterar
+    as listas; vizinhos() ignora as marcadas, e compactar() reconstrói as
+    listas quando as lápides passam de LIMIAR_COMPACTACAO das entradas.
+
+    `metricas` recebe os tempos das fases e os contadores (veja
+    instrumentacao.py); por padrão as métricas ficam desligadas.
     """
 
-    def __init__(self):
+    def __init__(self, metricas=None):
+        self.metricas = metricas or METRICAS_NULAS
         self.grafo = defaultdict(list)
         self.vertices = set()
         self.usuarios = set()
         self.filmes = set()
+        self.observadores = []
+        self.vertices_removidos = set()
+        self.arestas_removidas = set()
+        self.entradas = 0             # entradas nas listas de adjacência
+        self.entradas_removidas = 0   # estimativa das entradas marcadas como removidas
+        self.limites_recomendacao = SEM_LIMITES
+
+    def registrar_observador(self, observador):
+        """
+        Registra um objeto a ser notificado das mudanças no grafo
+
+        O observador deve ter os métodos aresta_adicionada(usuario, filme),
+        aresta_removida(usuario, filme) e vertice_removido(vertice, vizinhos),
+        que recebe os vizinhos que o vértice tinha antes de ser removido.
+        """
+        self.observadores.append(observador)
+
+    def remover_observador(self, observador):
+        """Deixa de notificar o observador"""
+        self.observadores.remove(observador)
 
     def adicionar_aresta(self, usuario: str, filme: str):
         """Adiciona uma aresta entre usuário e filme"""
+        if self.vertices_removidos or self.arestas_removidas:
+            self._reviver(usuario, filme)
         self.grafo[usuario].append(filme)
         self.grafo[filme].append(usuario)
+        self.entradas += 2
         self.vertices.add(usuario)
         self.vertices.add(filme)
         self.usuarios.add(usuario)
         self.filmes.add(filme)
+        for observador in self.observadores:
+            observador.aresta_adicionada(usuario, filme)
+
+    def _reviver(self, usuario: str, filme: str):
+        """
+        Apaga das listas as entradas antigas de vértices/arestas removidos que
+        estão sendo adicionados de novo, para que não voltem junto
+        """
+        for vertice in (usuario, filme):
+            if vertice in self.vertices_removidos:
+                antigos = self.grafo.pop(vertice, [])
+                for vizinho in set(antigos):
+                    self._descartar_entradas(vizinho, vertice)
+                self.entradas -= len(antigos)
+                self.entradas_removidas -= len(antigos)
+                self.vertices_removidos.discard(vertice)
+
+        for aresta in ((usuario, filme), (filme, usuario)):
+            if aresta in self.arestas_removidas:
+                self.arestas_removidas.discard(aresta)
+                self._descartar_entradas(usuario, filme)
+                self._descartar_entradas(filme, usuario)
+        self.entradas_removidas = max(0, self.entradas_removidas)
+
+    def _descartar_entradas(self, vertice: str, vizinho: str):
+        adjacencia = self.grafo.get(vertice)
+        if adjacencia and vizinho in adjacencia:
+            restantes = [v for v in adjacencia if v != vizinho]
+            removidas = len(adjacencia) - len(restantes)
+            self.grafo[vertice] = restantes
+            self.entradas -= removidas
+            self.entradas_removidas -= removidas
+
+    def remover_aresta(self, usuario: str, filme: str) -> bool:
+        """
+        Remove a aresta entre usuário e filme em O(1), marcando uma lápide
+
+        As entradas continuam nas listas até a próxima compactação, mas
+        vizinhos(), o BFS e as recomendações passam a ignorá-las. Os vértices
+        continuam no grafo. Aceita as pontas em qualquer ordem (a lápide e os
+        observadores recebem sempre (usuario, filme)). Retorna False se a
+        aresta não existir ou já tiver sido removida.
+        """
+        if usuario not in self.usuarios and filme in self.usuarios:
+            usuario, filme = filme, usuario
+        if usuario not in self.vertices or filme not in self.vertices:
+            return False
+        if (usuario, filme) in self.arestas_removidas or (filme, usuario) in self.arestas_removidas:
+            return False
+        # Vértices vivos não têm entradas antigas de remoções (_reviver as apaga)
+        ocorrencias = self.grafo.get(usuario, ()).count(filme)
+        if not ocorrencias:
+            return False
+        self.arestas_removidas.add((usuario, filme))
+        self.entradas_removidas += 2 * ocorrencias
+        for observador in self.observadores:
+            observador.aresta_removida(usuario, filme)
+        self._compactar_se_necessario()
+        return True
+
+    def remover_vertice(self, vertice: str) -> bool:
+        """
+        Remove o vértice e todas as suas arestas em O(1), marcando uma lápide
+
+        Retorna False se o vértice não existir. Com observadores, a lista de
+        vizinhos enviada a eles custa O(grau).
+        """
+        if vertice not in self.vertices:
+            return False
+        vizinhos = self.vizinhos(vertice) if self.observadores else ()
+        self.vertices.discard(vertice)
+        self.usuarios.discard(vertice)
+        self.filmes.discard(vertice)
+        self.vertices_removidos.add(vertice)
+        self.entradas_removidas += 2 * len(self.grafo.get(vertice, ()))
+        for observador in self.observadores:
+            observador.vertice_removido(vertice, vizinhos)
+        self._compactar_se_necessario()
+        return True
+
+    def vizinhos(self, vertice: str) -> List[str]:
+        """Adjacentes do vértice, ignorando vértices e arestas removidos (não alterar a lista)"""
+        adjacencia = self.grafo.get(vertice, [])
+        if not (self.vertices_removidos or self.arestas_removidas):
+            return adjacencia
+        if vertice in self.vertices_removidos:
+            return []
+        removidos, arestas = self.vertices_removidos, self.arestas_removidas
+        return [v for v in adjacencia
+                if v not in removidos and (vertice, v) not in arestas and (v, vertice) not in arestas]
+
+    def _leitor_vizinhos(self):
+        """
+        Função de leitura de adjacência para laços internos: acesso direto às
+        listas quando não há lápides, vizinhos() caso contrário
+        """
+        if self.vertices_removidos or self.arestas_removidas:
+            return self.vizinhos
+        return self.grafo.__getitem__
+
+    def _compactar_se_necessario(self):
+        if self.entradas_removidas > LIMIAR_COMPACTACAO * max(self.entradas, 1):
+            self.compactar()
+
+    def compactar(self):
+        """
+        Reescreve, sem as entradas removidas, as listas de adjacência afetadas
+        pelas lápides e apaga as lápides. Executada automaticamente quando as
+        remoções passam de LIMIAR_COMPACTACAO, o que mantém o custo amortizado
+        de cada remoção em O(1)
+        """
+        if not (self.vertices_removidos or self.arestas_removidas):
+            return
+        # Só as listas dos vértices removidos, de seus vizinhos e das pontas
+        # das arestas removidas têm entradas a descartar
+        afetados = set(self.vertices_removidos)
+        for vertice in self.vertices_removidos:
+            afetados.update(self.grafo.get(vertice, ()))
+        for usuario, filme in self.arestas_removidas:
+            afetados.add(usuario)
+            afetados.add(filme)
+
+        novas = {v: self.vizinhos(v) for v in afetados if v in self.grafo}
+        for vertice, adjacencia in novas.items():
+            self.entradas -= len(self.grafo[vertice]) - len(adjacencia)
+            if adjacencia:
+                self.grafo[vertice] = adjacencia
+            else:
+                del self.grafo[vertice]
+        self.vertices_removidos = set()
+        self.arestas_removidas = set()
+        self.entradas_removidas = 0
 
     def carregar_de_arquivo(self, arquivo: str):
         """
         Carrega o grafo de um arquivo texto
-        Formato: USUARIO,FILME
+        Formato: USUARIO,FILME (opcionalmente USUARIO,FILME,INSTANTE)
         """
         try:
             with open(arquivo, 'r', encoding='utf-8') as f:
-                for linha in f:
-                    linha = linha.strip()
-                    if linha and not linha.startswith('#'):
-                        partes = linha.split(',')
-                        if len(partes) == 2:
-                            usuario, filme = partes[0].strip(), partes[1].strip()
-                            self.adicionar_aresta(usuario, filme)
-            print(f"Grafo carregado com sucesso!")
+                self.carregar_de_linhas(f)
+            print("Grafo carregado com sucesso!")
             print(f"Usuários: {len(self.usuarios)}, Filmes: {len(self.filmes)}")
         except FileNotFoundError:
             print(f"Erro: Arquivo '{arquivo}' não encontrado!")
         except Exception as e:
             print(f"Erro ao carregar arquivo: {e}")
 
-    def eh_bipartido_bfs(self) -> Tuple[bool, Dict[str, int]]:
+    def carregar_de_linhas(self, linhas: Iterable[str]) -> int:
         """
-        Verifica se o grafo é bipartido usando BFS (Busca em Largura)
+        Carrega arestas de linhas no formato USUARIO,FILME (arquivo aberto,
+        sys.stdin, lista...), sem exibir mensagens
+
+        Linhas vazias, comentários (#) e linhas fora do formato são ignorados;
+        uma terceira coluna (instante, usada por GrafoTemporal) é aceita e
+        ignorada. Retorna o número de arestas adicionadas.
+        """
+        total = 0
+        with self.metricas.cronometro(instrumentacao.CARGA):
+            for campos in ler_campos(linhas):
+                self.adicionar_aresta(campos[0], campos[1])
+                total += 1
+        self.metricas.contar(instrumentacao.ARESTAS_CARREGADAS, total)
+        return total
+
+    def salvar_snapshot(self, arquivo: str):
+        """
+        Salva o grafo em um snapshot binário, muito mais rápido de carregar que o texto
+
+        Cada nome é gravado uma única vez; listas de adjacência, vértices,
+        usuários e filmes são gravados como arrays de índices. O grafo é
+        compactado antes, para não gravar entradas removidas.
+        """
+        self.compactar()
+        nomes = list(self.grafo)
+        nomes.extend(self.vertices.difference(self.grafo))
+        bloco = '\n'.join(nomes).encode('utf-8')
+        if bloco.count(b'\n') != max(len(nomes) - 1, 0):
+            raise ValueError("Nomes de vértices com quebra de linha não cabem no snapshot")
+
+        with self.metricas.cronometro(instrumentacao.INTERNACAO):
+            indice = {nome: i for i, nome in enumerate(nomes)}
+            adjacencias = [self.grafo.get(nome, ()) for nome in nomes]
+            vizinhos = array('i', [indice[v] for adj in adjacencias for v in adj])
+            vertices = array('i', map(indice.__getitem__, self.vertices))
+            usuarios = array('i', map(indice.__getitem__, self.usuarios))
+            filmes = array('i', map(indice.__getitem__, self.filmes))
+
+        with open(arquivo, 'wb') as f:
+            f.write(MAGICO_SNAPSHOT + ORDEM_BYTES)
+            array('q', [len(nomes), len(bloco), len(vizinhos), len(vertices),
+                        len(usuarios), len(filmes)]).tofile(f)
+            f.write(bloco)
+            for dados in (array('i', map(len, adjacencias)), vizinhos, vertices, usuarios, filmes):
+                dados.tofile(f)
+
+    def carregar_snapshot(self, arquivo: str):
+        """
+        Carrega um snapshot gerado por salvar_snapshot, somando ao grafo atual
+
+        Lança ValueError se o arquivo não for um snapshot válido.
+        """
+        with self.metricas.cronometro(instrumentacao.CARGA):
+            self._carregar_snapshot(arquivo)
+
+    def _carregar_snapshot(self, arquivo: str):
+        self.compactar()
+        with open(arquivo, 'rb') as f:
+            if f.read(len(MAGICO_SNAPSHOT)) != MAGICO_SNAPSHOT:
+                raise ValueError(f"'{arquivo}' não é um snapshot de grafo")
+            inverter = f.read(1) != ORDEM_BYTES
+
+            def ler(quantidade, tipo='i'):
+                dados = array(tipo)
+                try:
+                    dados.fromfile(f, quantidade)
+                except EOFError:
+                    raise ValueError(f"Snapshot '{arquivo}' incompleto") from None
+                if inverter:
+                    dados.byteswap()
+                return dados
+
+            num_nomes, tamanho_bloco, num_vizinhos, num_vertices, num_usuarios, num_filmes = ler(6, 'q')
+            bloco = f.read(tamanho_bloco)
+            graus = ler(num_nomes)
+            indices_vizinhos = ler(num_vizinhos)
+            vertices, usuarios, filmes = ler(num_vertices), ler(num_usuarios), ler(num_filmes)
+
+        # Cada nome é criado uma única vez e compartilhado por todas as listas
+        with self.metricas.cronometro(instrumentacao.INTERNACAO):
+            nomes = bloco.decode('utf-8').split('\n') if num_nomes else []
+            vizinhos = list(map(nomes.__getitem__, indices_vizinhos))
+
+        self.entradas += num_vizinhos
+        fins = list(accumulate(graus))
+        adjacencias = map(vizinhos.__getitem__, map(slice, [0] + fins[:-1], fins))
+        if self.grafo:
+            for nome, adj in zip(nomes, adjacencias):
+                self.grafo[nome].extend(adj)
+        else:
+            self.grafo.update(zip(nomes, adjacencias))
+        self.vertices.update(map(nomes.__getitem__, vertices))
+        self.usuarios.update(map(nomes.__getitem__, usuarios))
+        self.filmes.update(map(nomes.__getitem__, filmes))
+
+    def total_arestas(self) -> int:
+        """Retorna o número de arestas do grafo"""
+        if not (self.vertices_removidos or self.arestas_removidas):
+            return self.entradas // 2
+        return sum(len(self.vizinhos(v)) for v in self.vertices) // 2
+
+    def eventos_bfs(self, cor: Optional[Dict[str, int]] = None) -> Iterator[EventoBFS]:
+        """
+        Executa o BFS de forma preguiçosa, emitindo um EventoBFS a cada ação
         Usa coloração de vértices: 0 (não visitado), 1 (cor A), 2 (cor B)
 
-        Retorna:
-            - bool: True se é bipartido, False caso contrário
-            - dict: Mapeamento de vértice -> cor
+        O último evento é sempre FIM. Se `cor` for informado, o dicionário é
+        preenchido com as cores dos vértices conforme a travessia avança.
         """
-        cor = {vertice: 0 for vertice in self.vertices}
-        passos = []  # Para demonstração do algoritmo
+        if cor is None:
+            cor = {}
+        for vertice in self.vertices:
+            cor[vertice] = 0
+
+        vizinhos = self._leitor_vizinhos()
+        desenfileirados = percorridas = 0
 
         # Pode ter componentes desconexos, então verificamos todos os vértices
         for vertice_inicial in self.vertices:
@@ -82,64 +451,294 @@ class GrafoBipartido:
                 # Inicializa BFS
                 fila = deque([vertice_inicial])
                 cor[vertice_inicial] = 1  # Primeira cor
-
-                passos.append(f"Iniciando BFS a partir de '{vertice_inicial}'")
-                passos.append(f"Colorindo '{vertice_inicial}' com cor 1 (Conjunto V1)")
+                yield EventoBFS(INICIO_COMPONENTE, vertice_inicial, 1)
 
                 while fila:
                     u = fila.popleft()
-                    passos.append(f"\nProcessando vértice '{u}' (cor {cor[u]})")
+                    yield EventoBFS(DESENFILEIRAR, u, cor[u])
+                    adjacentes = vizinhos(u)
+                    desenfileirados += 1
+                    percorridas += len(adjacentes)
 
                     # Verifica todos os adjacentes
-                    for v in self.grafo[u]:
+                    for v in adjacentes:
                         if cor[v] == 0:  # Ainda não visitado
                             # Atribui cor oposta
                             cor[v] = 3 - cor[u]  # Se u=1, então v=2; se u=2, então v=1
                             fila.append(v)
-                            passos.append(f"  → Colorindo '{v}' com cor {cor[v]} (Conjunto V{cor[v]})")
+                            yield EventoBFS(COLORIR, v, cor[v], u)
                         elif cor[v] == cor[u]:
                             # Mesma cor que o adjacente = NÃO é bipartido
-                            passos.append(f"  ✗ CONFLITO: '{v}' tem a mesma cor que '{u}'!")
-                            passos.append(f"\n⚠ GRAFO NÃO É BIPARTIDO!")
-                            return False, cor, passos
+                            yield EventoBFS(CONFLITO, v, cor[v], u)
+                            self._contar_bfs(desenfileirados, percorridas)
+                            yield EventoBFS(FIM, bipartido=False)
+                            return
+
+        self._contar_bfs(desenfileirados, percorridas)
+        yield EventoBFS(FIM, bipartido=True)
+
+    def _contar_bfs(self, desenfileirados: int, percorridas: int):
+        self.metricas.contar(instrumentacao.BFS_VERTICES_DESENFILEIRADOS, desenfileirados)
+        self.metricas.contar(instrumentacao.BFS_ARESTAS_PERCORRIDAS, percorridas)
+
+    def eh_bipartido_bfs(self, registrar_passos: bool = True) -> Tuple[bool, Dict[str, int], List[str]]:
+        """
+        Verifica se o grafo é bipartido usando BFS (Busca em Largura)
 
-        passos.append(f"\n✓ GRAFO É BIPARTIDO!")
-        return True, cor, passos
+        Retorna:
+            - bool: True se é bipartido, False caso contrário
+            - dict: Mapeamento de vértice -> cor
+            - list: Descrição dos passos (vazia se registrar_passos=False)
+        """
+        cor = {}
+        passos = []  # Para demonstração do algoritmo
+
+        with self.metricas.cronometro(instrumentacao.BFS):
+            for evento in self.eventos_bfs(cor):
+                if registrar_passos:
+                    passos.append(descrever_evento(evento))
+
+        return evento.bipartido, cor, passos
 
     def obter_particao(self, cor: Dict[str, int]) -> Tuple[Set[str], Set[str]]:
         """
         Retorna os dois conjuntos da partição bipartida
         """
-        v1 = {v for v, c in cor.items() if c == 1}
-        v2 = {v for v, c in cor.items() if c == 2}
+        with self.metricas.cronometro(instrumentacao.PARTICAO):
+            v1 = {v for v, c in cor.items() if c == 1}
+            v2 = {v for v, c in cor.items() if c == 2}
         return v1, v2
 
-    def recomendar_filmes(self, usuario: str, cor: Dict[str, int]) -> List[str]:
+    def pontuar_recomendacoes(self, usuario: str,
+                              limites: Optional[LimitesRecomendacao] = None) -> Dict[str, float]:
+        """
+        Pontua os filmes candidatos a recomendação para um usuário
+        A pontuação de um filme é o número de usuários similares
+        (que assistiram algum filme em comum) que o assistiram
+
+        `limites` (por padrão, self.limites_recomendacao) controla a amostragem
+        dos filmes populares, a ponderação IDF e o orçamento de trabalho.
+        """
+        if usuario not in self.usuarios:
+            return {}
+        return self._pontuar(usuario, self._leitor_vizinhos(), self.usuarios, self.filmes,
+                             limites or self.limites_recomendacao)
+
+    def _pontuar(self, usuario, vizinhos, usuarios, filmes_validos,
+                 limites: LimitesRecomendacao) -> Dict:
+        """
+        Pontuação de pontuar_recomendacoes sobre uma função de vizinhos e
+        contêineres de usuários e filmes quaisquer (nomes e conjuntos no
+        GrafoBipartido, índices e intervalos no GrafoComprimido)
+        """
+        max_espectadores, idf, orcamento = limites.max_espectadores, limites.idf, limites.orcamento
+        limite = sys.maxsize if orcamento is None else orcamento
+        esgotado = False
+        amostradas = 0
+
+        with self.metricas.cronometro(instrumentacao.RECOMENDACAO):
+            # Filmes que o usuário já assistiu, na ordem da adjacência: a ordem de
+            # um conjunto de nomes muda entre processos (PYTHONHASHSEED) e mudaria
+            # a amostra e o corte do orçamento
+            ordem_assistidos = list(dict.fromkeys(vizinhos(usuario)))
+            filmes_assistidos = set(ordem_assistidos)
+            percorridas = len(ordem_assistidos)
+
+            # Encontra usuários que assistiram filmes em comum, com a semelhança
+            # de cada um (filmes em comum, ou a soma dos pesos IDF deles)
+            listas = [vizinhos(filme) for filme in ordem_assistidos]
+            limite_fase = limite
+            if orcamento is not None:
+                listas.sort(key=len)
+                # No máximo metade do orçamento restante nesta fase
+                limite_fase = percorridas + (limite - percorridas) // 2
+            total_usuarios = len(usuarios) if idf else 0
+            # Sem IDF nem orçamento a semelhança não é usada: basta o conjunto
+            ponderar = idf or orcamento is not None
+            semelhanca = defaultdict(int)
+            usuarios_similares = set()
+            rng = None
+            for espectadores in listas:
+                peso = math.log(1 + total_usuarios / len(espectadores)) if idf else 1
+                if max_espectadores is not None and len(espectadores) > max_espectadores:
+                    rng = rng or random.Random(limites.semente)
+                    espectadores = rng.sample(espectadores, max_espectadores)
+                    amostradas += 1
+                disponivel = limite_fase - percorridas
+                if len(espectadores) > disponivel:
+                    espectadores = espectadores[:max(disponivel, 0)]
+                    esgotado = True
+                percorridas += len(espectadores)
+                if ponderar:
+                    for outro_usuario in espectadores:
+                        if outro_usuario != usuario and outro_usuario in usuarios:
+                            semelhanca[outro_usuario] += peso
+                else:
+                    for outro_usuario in espectadores:
+                        if outro_usuario != usuario and outro_usuario in usuarios:
+                            usuarios_similares.add(outro_usuario)
+                if esgotado:
+                    break
+
+            # Conta os usuários similares que assistiram cada filme que o
+            # usuário não viu (com IDF, soma as semelhanças deles)
+            similares = semelhanca.items() if ponderar else zip(usuarios_similares, repeat(1))
+            if orcamento is not None:
+                similares = sorted(similares, key=lambda item: -item[1])
+            pontuacao = defaultdict(int)
+            for outro_usuario, peso in similares:
+                disponivel = limite - percorridas
+                if disponivel <= 0:
+                    esgotado = True
+                    break
+                filmes = vizinhos(outro_usuario)
+                if len(filmes) > disponivel:
+                    filmes = filmes[:disponivel]
+                    esgotado = True
+                filmes = set(filmes)
+                percorridas += len(filmes)
+                contribuicao = peso if idf else 1
+                for filme in filmes.difference(filmes_assistidos):
+                    if filme in filmes_validos:
+                        pontuacao[filme] += contribuicao
+
+        self.metricas.contar(instrumentacao.RECOMENDACAO_ARESTAS_PERCORRIDAS, percorridas)
+        self.metricas.contar(instrumentacao.RECOMENDACAO_CANDIDATOS_PONTUADOS, len(pontuacao))
+        if amostradas:
+            self.metricas.contar(instrumentacao.RECOMENDACAO_LISTAS_AMOSTRADAS, amostradas)
+        if esgotado:
+            self.metricas.contar(instrumentacao.RECOMENDACAO_ORCAMENTO_ESGOTADO)
+        return pontuacao
+
+    def ranquear_filmes(self, usuario: str, k: Optional[int] = None,
+                        limites: Optional[LimitesRecomendacao] = None) -> List[Tuple[str, float]]:
+        """
+        Retorna os k filmes mais recomendados para o usuário com suas pontuações,
+        em ordem decrescente de pontuação (empates em ordem alfabética)
+        """
+        pontuacao = self.pontuar_recomendacoes(usuario, limites)
+        chave = lambda item: (-item[1], item[0])
+        if k is None:
+            return sorted(pontuacao.items(), key=chave)
+        return heapq.nsmallest(k, pontuacao.items(), key=chave)
+
+    def recomendar_filmes(self, usuario: str, cor: Dict[str, int], k: Optional[int] = None,
+                          limites: Optional[LimitesRecomendacao] = None) -> List[str]:
         """
         Recomenda filmes para um usuário baseado em usuários similares
         (usuários que assistiram filmes em comum)
+        Se k for informado, retorna apenas os k mais bem pontuados, em ordem
         """
-        if usuario not in self.usuarios:
-            return []
+        if k is None:
+            return list(self.pontuar_recomendacoes(usuario, limites))
+        return [filme for filme, _ in self.ranquear_filmes(usuario, k, limites)]
 
-        # Filmes que o usuário já assistiu
-        filmes_assistidos = set(self.grafo[usuario])
+    def subgrafo_ego(self, centro: str, saltos: int = 2,
+                     max_vizinhos_por_salto: Union[None, int, Sequence[Optional[int]]] = None,
+                     semente: int = 0) -> 'GrafoBipartido':
+        """
+        Novo GrafoBipartido com a vizinhança de até `saltos` saltos de um
+        usuário ou filme, para analisar ou desenhar só essa parte do grafo
+
+        `max_vizinhos_por_salto` limita quantos vizinhos cada vértice expande
+        em cada salto: um número para todos os saltos ou uma sequência com um
+        limite (ou None) por salto. Vértices com mais vizinhos que o limite
+        expandem uma amostra aleatória (reproduzível pela `semente`), então o
+        custo é proporcional ao tamanho do resultado, e não ao grau dos
+        vértices populares. Sem limites, o resultado é o subgrafo induzido,
+        inclusive as arestas entre vértices do último salto (que fecham ciclos
+        ímpares em grafos não bipartidos); com limites, contém só as arestas
+        amostradas.
+
+        Usuários e filmes mantêm seus papéis. Lança ValueError se o centro
+        não estiver no grafo.
+        """
+        if centro not in self.vertices:
+            raise ValueError(f"'{centro}' não está no grafo")
+        if saltos < 0:
+            raise ValueError("saltos não pode ser negativo")
+        if max_vizinhos_por_salto is None or isinstance(max_vizinhos_por_salto, int):
+            limites = [max_vizinhos_por_salto] * saltos
+        else:
+            limites = list(max_vizinhos_por_salto)[:saltos]
+            limites += [None] * (saltos - len(limites))
+
+        rng = random.Random(semente)
+        vizinhos = self._leitor_vizinhos()
+        sub = GrafoBipartido(self.metricas)
+        adjacencias = sub.grafo
+        adjacencias[centro] = []
+        arestas = set()
+        fronteira = [centro]
+        for limite in limites:
+            proxima = []
+            for vertice in fronteira:
+                lista = vizinhos(vertice)
+                if limite is not None and len(lista) > limite:
+                    lista = rng.sample(lista, limite)
+                for vizinho in lista:
+                    if vizinho not in adjacencias:
+                        proxima.append(vizinho)
+                    elif (vertice, vizinho) in arestas:
+                        continue  # aresta repetida ou já vinda do outro lado
+                    arestas.add((vertice, vizinho))
+                    arestas.add((vizinho, vertice))
+                    adjacencias[vertice].append(vizinho)
+                    adjacencias[vizinho].append(vertice)
+                    sub.entradas += 2
+            fronteira = proxima
+            if not fronteira:
+                break
+
+        if fronteira and all(limite is None for limite in limites):
+            # Subgrafo induzido: arestas entre os vértices do último salto
+            ultimo_salto = set(fronteira)
+            for vertice in fronteira:
+                for vizinho in vizinhos(vertice):
+                    if vizinho in ultimo_salto and (vertice, vizinho) not in arestas:
+                        arestas.add((vertice, vizinho))
+                        arestas.add((vizinho, vertice))
+                        adjacencias[vertice].append(vizinho)
+                        adjacencias[vizinho].append(vertice)
+                        sub.entradas += 2
+
+        sub.vertices.update(adjacencias)
+        sub.usuarios.update(v for v in adjacencias if v in self.usuarios)
+        sub.filmes.update(v for v in adjacencias if v in self.filmes)
+        return sub
+
+    def projetar(self, lado: str = 'usuarios', **opcoes):
+        """
+        Constrói a projeção ponderada usuário-usuário ('usuarios') ou
+        filme-filme ('filmes'); as opções são as de projecao.construir_projecao
+        """
+        from projecao import construir_projecao
+        return construir_projecao(self, lado, **opcoes)
 
-        # Encontra usuários que assistiram filmes em comum
-        usuarios_similares = set()
-        for filme in filmes_assistidos:
-            for outro_usuario in self.grafo[filme]:
-                if outro_usuario != usuario and outro_usuario in self.usuarios:
-                    usuarios_similares.add(outro_usuario)
+    def comprimir(self):
+        """
+        Cópia somente leitura do grafo com nomes e listas de adjacência
+        comprimidos, muito menor em memória (veja adjacencia_comprimida.py)
+        """
+        from adjacencia_comprimida import GrafoComprimido
+        return GrafoComprimido.de_grafo(self)
 
-        # Encontra filmes que usuários similares assistiram mas o usuário não
-        recomendacoes = set()
-        for outro_usuario in usuarios_similares:
-            for filme in self.grafo[outro_usuario]:
-                if filme not in filmes_assistidos and filme in self.filmes:
-                    recomendacoes.add(filme)
+    def recomendador_pagerank(self, **opcoes):
+        """
+        Recomendador por PageRank personalizado sobre uma cópia indexada do
+        grafo (veja pagerank.py); as opções são as de RecomendadorPageRank
+        """
+        from pagerank import RecomendadorPageRank
+        return RecomendadorPageRank(self, **opcoes)
 
-        return list(recomendacoes)
+    def relatorio_memoria(self, cor: Optional[Dict[str, int]] = None,
+                          passos: Optional[List[str]] = None, **opcoes):
+        """
+        Bytes ocupados por cada estrutura interna do grafo (e por `cor` e
+        `passos`, se informados); as opções são as de memoria.relatorio_memoria
+        """
+        from memoria import relatorio_memoria
+        return relatorio_memoria(self, cor, passos, **opcoes)
 
     def exibir_estatisticas(self):
         """Exibe estatísticas do grafo"""
@@ -150,11 +749,10 @@ class GrafoBipartido:
         print(f"  - Usuários: {len(self.usuarios)}")
         print(f"  - Filmes: {len(self.filmes)}")
 
-        total_arestas = sum(len(adj) for adj in self.grafo.values()) // 2
-        print(f"Total de arestas: {total_arestas}")
+        print(f"Total de arestas: {self.total_arestas()}")
 
         if self.usuarios:
-            media = sum(len(self.grafo[u]) for u in self.usuarios) / len(self.usuarios)
+            media = sum(len(self.vizinhos(u)) for u in self.usuarios) / len(self.usuarios)
             print(f"Média de filmes por usuário: {media:.2f}")
 
 
@@ -183,13 +781,13 @@ def main():
     print("EXECUTANDO ALGORITMO DE VERIFICAÇÃO")
     print("="*50)
 
-    eh_bipartido, cor, passos = grafo.eh_bipartido_bfs()
-
-    # Exibe os passos do algoritmo
+    # Exibe os passos do algoritmo conforme são executados
     print("\nPASSOS DO ALGORITMO:")
     print("-"*50)
-    for passo in passos:
-        print(passo)
+    cor = {}
+    for evento in grafo.eventos_bfs(cor):
+        print(descrever_evento(evento))
+    eh_bipartido = evento.bipartido
 
     # Resultado
     print("\n" + "="*50)
@@ -207,7 +805,7 @@ def main():
         usuarios_v2 = v2 & grafo.usuarios
         filmes_v2 = v2 & grafo.filmes
 
-        print(f"\nDivisão correta:")
+        print("\nDivisão correta:")
         print(f"  V1: {len(usuarios_v1)} usuários, {len(filmes_v1)} filmes")
         print(f"  V2: {len(usuarios_v2)} usuários, {len(filmes_v2)} filmes")
 
@@ -219,7 +817,7 @@ def main():
         if grafo.usuarios:
             usuario_teste = list(grafo.usuarios)[0]
             print(f"\nFilmes assistidos por '{usuario_teste}':")
-            print(f"  {list(grafo.grafo[usuario_teste])}")
+            print(f"  {list(grafo.vizinhos(usuario_teste))}")
 
             recomendacoes = grafo.recomendar_filmes(usuario_teste, cor)
             print(f"\nRecomendações para '{usuario_teste}':")
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+"""
+Grafo Bipartido com Janela de Tempo
+Mantém apenas as arestas dos últimos N dias, para que as recomendações
+reflitam o que os usuários assistiram recentemente e o grafo não cresça
+indefinidamente
+
+Cada aresta tem um instante (terceira coluna do arquivo: segundos desde
+1970 ou data ISO 8601, como 2024-03-15 ou 2024-03-15T20:30:00). As arestas
+são agrupadas em baldes de tempo (um por dia, por padrão); quando o relógio
+avança, os baldes que saíram da janela são expirados de uma vez, removendo
+suas arestas com as lápides do GrafoBipartido. Vértices que ficam sem
+arestas na janela também são removidos.
+
+A expiração não é uma visão da janela: ela apaga do próprio grafo as
+arestas e os vértices antigos, que não podem ser recuperados (para analisar
+outra janela, recarregue o arquivo). Em troca, eh_bipartido_bfs, as
+estatísticas e recomendar_filmes já consideram só a janela, sem cópias.
+
+Uso:
+    python grafo_temporal.py arquivo_grafo [dias]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import heapq
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+
+from grafo_bipartido import GrafoBipartido, ler_campos
+
+
+DIA = 86400
+
+
+def converter_instante(texto: str) -> float:
+    """
+    Converte o instante de uma linha em segundos desde 1970 (UTC)
+
+    Aceita um número ou uma data ISO 8601; datas sem fuso são tomadas como
+    UTC. Lança ValueError se o texto não for nenhum dos dois.
+    """
+    try:
+        return float(texto)
+    except ValueError:
+        data = datetime.fromisoformat(texto)
+        if data.tzinfo is None:
+            data = data.replace(tzinfo=timezone.utc)
+        return data.timestamp()
+
+
+def formatar_instante(instante: float) -> str:
+    """Data e hora (UTC) de um instante em segundos desde 1970"""
+    return datetime.fromtimestamp(instante, timezone.utc).strftime('%Y-%m-%d %H:%M')
+
+
+class GrafoTemporal(GrafoBipartido):
+    """
+    GrafoBipartido que guarda só as arestas dentro de uma janela de tempo
+
+    Uma aresta vale a partir do instante mais recente em que foi vista e é
+    expirada quando todo o seu balde fica mais antigo que `janela` segundos
+    em relação ao relógio (o maior instante visto). Assim cada aresta
+    permanece entre `janela` e `janela + largura_balde` segundos. A
+    expiração apaga os dados do grafo: arestas e vértices expirados não
+    voltam, nem se a janela for ampliada depois.
+    """
+
+    def __init__(self, janela: float = 30 * DIA, largura_balde: float = DIA, metricas=None):
+        super().__init__(metricas)
+        if janela <= 0 or largura_balde <= 0:
+            raise ValueError("janela e largura_balde devem ser positivos")
+        self.janela = janela
+        self.largura_balde = largura_balde
+        self.agora = None               # relógio: maior instante visto
+        self.baldes = defaultdict(list) # balde -> arestas vistas nele (pode haver repetidas)
+        self.fila_baldes = []           # heap com os índices dos baldes existentes
+        self.balde_aresta = {}          # aresta na janela -> balde mais recente
+        self.grau_janela = defaultdict(int)
+
+    def _balde(self, instante: float) -> int:
+        return int(instante // self.largura_balde)
+
+    def primeiro_balde_valido(self) -> Optional[int]:
+        """Índice do balde mais antigo que ainda está na janela"""
+        if self.agora is None:
+            return None
+        return self._balde(self.agora - self.janela)
+
+    def adicionar_aresta(self, usuario: str, filme: str, instante: Optional[float] = None) -> bool:
+        """
+        Adiciona (ou renova) a aresta no instante dado e avança o relógio
+
+        Sem instante, usa o relógio atual (ou a hora do sistema, se o grafo
+        ainda não tiver relógio). Arestas anteriores à janela são ignoradas:
+        retorna False nesse caso.
+        """
+        if instante is None:
+            instante = self.agora if self.agora is not None else time.time()
+        balde = self._balde(instante)
+        primeiro = self.primeiro_balde_valido()
+        if primeiro is not None and balde < primeiro:
+            return False
+
+        aresta = (usuario, filme)
+        anterior = self.balde_aresta.get(aresta)
+        if anterior is None:
+            super().adicionar_aresta(usuario, filme)
+            self.grau_janela[usuario] += 1
+            self.grau_janela[filme] += 1
+        if anterior is None or balde > anterior:
+            self.balde_aresta[aresta] = balde
+            if balde not in self.baldes:
+                heapq.heappush(self.fila_baldes, balde)
+            self.baldes[balde].append(aresta)
+
+        self.avancar_relogio(instante)
+        return True
+
+    def avancar_relogio(self, instante: float) -> int:
+        """
+        Avança o relógio até o instante (nunca volta) e expira os baldes
+        que saíram da janela; retorna quantas arestas foram expiradas
+        """
+        if self.agora is not None and instante <= self.agora:
+            return 0
+        self.agora = instante
+        return self.expirar()
+
+    def expirar(self) -> int:
+        """Remove todas as arestas dos baldes fora da janela; retorna quantas"""
+        primeiro = self.primeiro_balde_valido()
+        if primeiro is None:
+            return 0
+        expiradas = 0
+        while self.fila_baldes and self.fila_baldes[0] < primeiro:
+            balde = heapq.heappop(self.fila_baldes)
+            for aresta in self.baldes.pop(balde):
+                # Arestas renovadas em um balde posterior continuam na janela
+                if self.balde_aresta.get(aresta) == balde:
+                    self._expirar_aresta(aresta)
+                    expiradas += 1
+        return expiradas
+
+    def _expirar_aresta(self, aresta):
+        usuario, filme = aresta
+        self._descontar(aresta)
+        GrafoBipartido.remover_aresta(self, usuario, filme)
+        for vertice in aresta:
+            if vertice in self.vertices and not self.grau_janela.get(vertice):
+                self._descartar_vertice(vertice)
+
+    def _descartar_vertice(self, vertice):
+        """
+        Retira um vértice sem arestas na janela; todas as suas entradas já
+        estão marcadas como removidas, então não precisa de lápide própria
+        """
+        self.grau_janela.pop(vertice, None)
+        self.vertices.discard(vertice)
+        self.usuarios.discard(vertice)
+        self.filmes.discard(vertice)
+        for observador in self.observadores:
+            observador.vertice_removido(vertice, ())
+
+    def _descontar(self, aresta):
+        del self.balde_aresta[aresta]
+        for vertice in aresta:
+            self.grau_janela[vertice] -= 1
+
+    def remover_aresta(self, usuario: str, filme: str) -> bool:
+        """Remove a aresta antes de ela expirar (os vértices continuam no grafo)"""
+        removida = super().remover_aresta(usuario, filme)
+        if removida:
+            for aresta in ((usuario, filme), (filme, usuario)):
+                if aresta in self.balde_aresta:
+                    self._descontar(aresta)
+        return removida
+
+    def remover_vertice(self, vertice: str) -> bool:
+        """
+        Remove o vértice e suas arestas antes de elas expirarem; os vizinhos
+        que ficam sem arestas na janela também são removidos
+        """
+        if vertice not in self.vertices:
+            return False
+        vizinhos = set(self.vizinhos(vertice))
+        for vizinho in vizinhos:
+            for aresta in ((vertice, vizinho), (vizinho, vertice)):
+                if aresta in self.balde_aresta:
+                    self._descontar(aresta)
+        self.grau_janela.pop(vertice, None)
+        super().remover_vertice(vertice)
+        for vizinho in vizinhos:
+            if vizinho in self.vertices and not self.grau_janela.get(vizinho):
+                self._descartar_vertice(vizinho)
+        return True
+
+    def carregar_de_linhas(self, linhas: Iterable[str]) -> int:
+        """
+        Carrega arestas no formato USUARIO,FILME,INSTANTE, sem exibir mensagens
+
+        Linhas sem instante usam o relógio atual; linhas com instante
+        inválido são ignoradas. Retorna o número de arestas aceitas na janela.
+        """
+        total = 0
+        for campos in ler_campos(linhas):
+            instante = None
+            if len(campos) == 3:
+                try:
+                    instante = converter_instante(campos[2])
+                except ValueError:
+                    continue
+            if self.adicionar_aresta(campos[0], campos[1], instante):
+                total += 1
+        return total
+
+    def exibir_estatisticas(self):
+        """Exibe as estatísticas da janela"""
+        super().exibir_estatisticas()
+        if self.agora is not None:
+            inicio = self.primeiro_balde_valido() * self.largura_balde
+            print(f"Janela: {formatar_instante(inicio)} a {formatar_instante(self.agora)} (UTC), "
+                  f"{len(self.baldes)} balde(s)")
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python grafo_temporal.py arquivo_grafo [dias]")
+        return 1
+
+    dias = float(sys.argv[2]) if len(sys.argv) > 2 else 30
+    grafo = GrafoTemporal(janela=dias * DIA)
+    grafo.carregar_de_arquivo(sys.argv[1])
+    grafo.exibir_estatisticas()
+
+    eh_bipartido, cor, _ = grafo.eh_bipartido_bfs(registrar_passos=False)
+    print("\n" + "="*50)
+    print(f"ÚLTIMOS {dias:g} DIAS: {'BIPARTIDO' if eh_bipartido else 'NÃO BIPARTIDO'}")
+    print("="*50)
+    for usuario in sorted(grafo.usuarios):
+        recomendacoes = grafo.recomendar_filmes(usuario, cor, k=3)
+        print(f"  {usuario}: {', '.join(recomendacoes) or '(nenhuma recomendação)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,326 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação: Tempos por Fase e Contadores
+Mede onde o tempo é gasto (carga, internação dos nomes, BFS, partição,
+recomendação) e conta o trabalho feito (arestas percorridas, vértices
+desenfileirados, candidatos pontuados, acertos de cache)
+
+Por padrão o grafo usa METRICAS_NULAS, cujos métodos não fazem nada: os
+laços internos acumulam contagens em variáveis locais e só as entregam às
+métricas no fim de cada operação, então o custo desligado é praticamente nulo.
+
+Para ligar, passe um objeto Metricas com uma ou mais saídas:
+    metricas = Metricas(SaidaLog(), SaidaJSON('metricas.jsonl'), SaidaPrometheus(9464))
+    grafo = GrafoBipartido(metricas=metricas)
+    ...
+    metricas.publicar()
+
+Uso:
+    python instrumentacao.py arquivo_grafo [porta]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict
+
+
+# Fases cronometradas
+CARGA = 'carga'
+INTERNACAO = 'internacao'
+BFS = 'bfs'
+PARTICAO = 'particao'
+RECOMENDACAO = 'recomendacao'
+PUBLICACAO = 'publicacao'
+RECUPERACAO = 'recuperacao'
+CHECKPOINT = 'checkpoint'
+
+# Contadores
+ARESTAS_CARREGADAS = 'carga.arestas'
+BFS_VERTICES_DESENFILEIRADOS = 'bfs.vertices_desenfileirados'
+BFS_ARESTAS_PERCORRIDAS = 'bfs.arestas_percorridas'
+RECOMENDACAO_ARESTAS_PERCORRIDAS = 'recomendacao.arestas_percorridas'
+RECOMENDACAO_CANDIDATOS_PONTUADOS = 'recomendacao.candidatos_pontuados'
+RECOMENDACAO_LISTAS_AMOSTRADAS = 'recomendacao.listas_amostradas'
+RECOMENDACAO_ORCAMENTO_ESGOTADO = 'recomendacao.orcamento_esgotado'
+CACHE_ACERTOS = 'cache.acertos'
+CACHE_FALHAS = 'cache.falhas'
+VERSOES_PUBLICADAS = 'versoes.publicadas'
+WAL_REGISTROS = 'wal.registros'
+WAL_FSYNCS = 'wal.fsyncs'
+SEGUIDOR_BYTES = 'seguidor.bytes'
+SEGUIDOR_ROTACOES = 'seguidor.rotacoes'
+SEGUIDOR_TRUNCAMENTOS = 'seguidor.truncamentos'
+
+
+class _CronometroNulo:
+    """Gerenciador de contexto que não mede nada"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        return False
+
+
+_CRONOMETRO_NULO = _CronometroNulo()
+
+
+class MetricasNulas:
+    """Métricas desligadas: todas as operações são vazias"""
+
+    ativa = False
+
+    def cronometro(self, fase):
+        """Gerenciador de contexto que mede o tempo de uma fase"""
+        return _CRONOMETRO_NULO
+
+    def contar(self, nome, quantidade=1):
+        """Soma `quantidade` ao contador `nome`"""
+
+    def publicar(self):
+        """Envia as métricas atuais às saídas"""
+
+
+METRICAS_NULAS = MetricasNulas()
+
+
+class Cronometro:
+    """Mede o tempo de um bloco `with` e o registra nas métricas ao sair"""
+
+    __slots__ = ('metricas', 'fase', 'inicio')
+
+    def __init__(self, metricas, fase):
+        self.metricas = metricas
+        self.fase = fase
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao):
+        self.metricas.registrar_tempo(self.fase, time.perf_counter() - self.inicio)
+        return False
+
+
+class Metricas(MetricasNulas):
+    """
+    Acumula tempos por fase (chamadas, total e máximo, em segundos) e
+    contadores, e os entrega às saídas em publicar()
+
+    Cada saída tem o método publicar(instantaneo); saídas com o método
+    conectar(metricas) são avisadas ao serem adicionadas, para lerem as
+    métricas a qualquer momento (como o endpoint Prometheus).
+
+    Pode ser compartilhada entre threads (como os leitores de concorrencia.py):
+    as atualizações e as cópias são feitas sob uma trava.
+    """
+
+    ativa = True
+
+    def __init__(self, *saidas):
+        self.trava = threading.Lock()
+        self.tempos = {}
+        self.contadores = defaultdict(int)
+        self.saidas = []
+        for saida in saidas:
+            self.adicionar_saida(saida)
+
+    def adicionar_saida(self, saida):
+        self.saidas.append(saida)
+        conectar = getattr(saida, 'conectar', None)
+        if conectar is not None:
+            conectar(self)
+
+    def cronometro(self, fase):
+        return Cronometro(self, fase)
+
+    def registrar_tempo(self, fase, segundos):
+        with self.trava:
+            tempo = self.tempos.get(fase)
+            if tempo is None:
+                self.tempos[fase] = [1, segundos, segundos]
+            else:
+                tempo[0] += 1
+                tempo[1] += segundos
+                if segundos > tempo[2]:
+                    tempo[2] = segundos
+
+    def contar(self, nome, quantidade=1):
+        with self.trava:
+            self.contadores[nome] += quantidade
+
+    def instantaneo(self):
+        """
+        Cópia das métricas atuais:
+        {'tempos': {fase: {'chamadas', 'total_s', 'max_s'}}, 'contadores': {nome: valor}}
+        """
+        with self.trava:
+            tempos = {fase: tuple(tempo) for fase, tempo in self.tempos.items()}
+            contadores = dict(self.contadores)
+        return {
+            'tempos': {fase: {'chamadas': chamadas, 'total_s': total, 'max_s': maximo}
+                       for fase, (chamadas, total, maximo) in tempos.items()},
+            'contadores': contadores,
+        }
+
+    def publicar(self):
+        instantaneo = self.instantaneo()
+        for saida in self.saidas:
+            saida.publicar(instantaneo)
+
+    def zerar(self):
+        """Descarta os tempos e contadores acumulados"""
+        with self.trava:
+            self.tempos = {}
+            self.contadores = defaultdict(int)
+
+
+class SaidaLog:
+    """Escreve uma linha de log por fase e por contador"""
+
+    def __init__(self, logger=None, nivel=None):
+        import logging
+        self.logger = logger or logging.getLogger('grafo_bipartido')
+        self.nivel = logging.INFO if nivel is None else nivel
+
+    def publicar(self, instantaneo):
+        for fase, tempo in sorted(instantaneo['tempos'].items()):
+            self.logger.log(self.nivel, "%s: %d chamada(s), %.6f s no total, %.6f s no máximo",
+                            fase, tempo['chamadas'], tempo['total_s'], tempo['max_s'])
+        for nome, valor in sorted(instantaneo['contadores'].items()):
+            self.logger.log(self.nivel, "%s: %d", nome, valor)
+
+
+class SaidaJSON:
+    """Acrescenta ao arquivo uma linha JSON (JSON Lines) com o instante e as métricas"""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def publicar(self, instantaneo):
+        registro = dict(instantaneo, instante=time.time())
+        with open(self.caminho, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+def formatar_prometheus(instantaneo, prefixo='grafo'):
+    """Converte as métricas para o formato texto de exposição do Prometheus"""
+    linhas = []
+    tempos = sorted(instantaneo['tempos'].items())
+    for sufixo, campo, tipo, ajuda in (
+            ('fase_chamadas_total', 'chamadas', 'counter', 'Execuções de cada fase'),
+            ('fase_segundos_total', 'total_s', 'counter', 'Tempo acumulado em cada fase'),
+            ('fase_segundos_max', 'max_s', 'gauge', 'Maior tempo de uma execução da fase')):
+        if tempos:
+            linhas.append(f"# HELP {prefixo}_{sufixo} {ajuda}")
+            linhas.append(f"# TYPE {prefixo}_{sufixo} {tipo}")
+            linhas.extend(f'{prefixo}_{sufixo}{{fase="{fase}"}} {tempo[campo]}' for fase, tempo in tempos)
+
+    for nome, valor in sorted(instantaneo['contadores'].items()):
+        metrica = f"{prefixo}_{nome.replace('.', '_')}_total"
+        linhas.append(f"# TYPE {metrica} counter")
+        linhas.append(f"{metrica} {valor}")
+    return '\n'.join(linhas) + '\n'
+
+
+class SaidaPrometheus:
+    """
+    Expõe as métricas em http://host:porta/metrics, no formato texto do
+    Prometheus, a partir de uma thread em segundo plano
+
+    O servidor responde com as métricas do momento da requisição, então
+    publicar() não é necessário. Por segurança escuta só em 127.0.0.1 por
+    padrão; porta 0 escolhe uma porta livre (veja o atributo `porta`).
+    """
+
+    def __init__(self, porta=9464, host='127.0.0.1'):
+        self.host = host
+        self.porta = porta
+        self.metricas = None
+        self.servidor = None
+
+    def conectar(self, metricas):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        self.metricas = metricas
+        saida = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                corpo = formatar_prometheus(saida.metricas.instantaneo()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self.servidor = ThreadingHTTPServer((self.host, self.porta), Manipulador)
+        self.servidor.daemon_threads = True
+        self.porta = self.servidor.server_address[1]
+        threading.Thread(target=self.servidor.serve_forever, daemon=True).start()
+
+    def publicar(self, instantaneo):
+        pass
+
+    def fechar(self):
+        """Encerra o servidor"""
+        if self.servidor is not None:
+            self.servidor.shutdown()
+            self.servidor.server_close()
+            self.servidor = None
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python instrumentacao.py arquivo_grafo [porta]")
+        return 1
+
+    import logging
+    from grafo_bipartido import GrafoBipartido
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    metricas = Metricas(SaidaLog())
+    if len(sys.argv) > 2:
+        prometheus = SaidaPrometheus(int(sys.argv[2]))
+        metricas.adicionar_saida(prometheus)
+
+    grafo = GrafoBipartido(metricas=metricas)
+    grafo.carregar_de_arquivo(sys.argv[1])
+    eh_bipartido, cor, _ = grafo.eh_bipartido_bfs(registrar_passos=False)
+    grafo.obter_particao(cor)
+    for usuario in grafo.usuarios:
+        grafo.ranquear_filmes(usuario, 10)
+
+    print("\n" + "="*50)
+    print("MÉTRICAS")
+    print("="*50)
+    metricas.publicar()
+
+    if len(sys.argv) > 2:
+        print(f"\nMétricas em http://127.0.0.1:{prometheus.porta}/metrics (Ctrl+C para sair)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            prometheus.fechar()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Contabilidade de Memória do Grafo
+Mostra quantos bytes cada estrutura interna do GrafoBipartido ocupa e
+projeta o consumo para um número maior de arestas, para planejar a
+capacidade da máquina antes de carregar um grafo grande
+
+Estruturas contabilizadas:
+- grafo: o dicionário de listas de adjacência (tabela e listas);
+- nomes: os nomes dos vértices (chaves do dicionário);
+- nomes repetidos: cópias de um mesmo nome nas listas de adjacência (o
+  carregamento do texto cria um objeto por linha; o snapshot, um por nome);
+- vertices, usuarios e filmes: as tabelas dos três conjuntos (vertices
+  repete usuarios ∪ filmes);
+- lápides, cor e passos, quando houver.
+
+Contêineres com mais de `amostra` elementos são medidos por amostragem
+(média da amostra vezes o total). O modo tracemalloc (medir_pico) mede o
+pico real durante a carga e o BFS.
+
+Uso:
+    python memoria.py arquivo_grafo [arestas_alvo] [--tracemalloc]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import random
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+from grafo_bipartido import GrafoBipartido, eh_snapshot
+
+
+# Elementos medidos um a um por contêiner antes de passar a usar amostragem
+AMOSTRA_PADRAO = 10000
+
+
+class ItemMemoria(NamedTuple):
+    """Memória de uma estrutura: bytes, número de elementos e se foi estimada por amostragem"""
+    estrutura: str
+    bytes: int
+    elementos: int
+    estimado: bool = False
+
+
+class PicoMemoria(NamedTuple):
+    """Memória alocada (tracemalloc) em bytes: ao fim e no pico de cada fase"""
+    apos_carga: int
+    pico_carga: int
+    apos_bfs: int
+    pico_bfs: int
+
+
+def formatar_bytes(num_bytes):
+    """Formata um número de bytes em unidade legível"""
+    for unidade in ('B', 'KB', 'MB', 'GB'):
+        if num_bytes < 1024 or unidade == 'GB':
+            return f"{num_bytes:.1f} {unidade}"
+        num_bytes /= 1024
+
+
+def _amostrar(elementos, total, amostra, rng):
+    """Retorna (elementos a medir, fator de escala, estimado)"""
+    if total <= amostra:
+        return elementos, 1.0, False
+    escolhidos = sorted(rng.sample(range(total), amostra))
+    selecao, proximo = [], 0
+    for i, elemento in enumerate(elementos):
+        if i == escolhidos[proximo]:
+            selecao.append(elemento)
+            proximo += 1
+            if proximo == amostra:
+                break
+    return selecao, total / amostra, True
+
+
+def _tamanho_elementos(elementos, total, amostra, rng):
+    """Soma de sys.getsizeof dos elementos (estimada se forem mais que `amostra`)"""
+    selecao, escala, estimado = _amostrar(elementos, total, amostra, rng)
+    return round(sum(map(sys.getsizeof, selecao)) * escala), estimado
+
+
+def _tamanho_profundo(nome, conteiner, amostra, rng):
+    """Tabela do contêiner mais o tamanho de cada elemento"""
+    elementos, estimado = _tamanho_elementos(conteiner, len(conteiner), amostra, rng)
+    return ItemMemoria(nome, sys.getsizeof(conteiner) + elementos, len(conteiner), estimado)
+
+
+def relatorio_memoria(grafo: GrafoBipartido, cor: Optional[Dict[str, int]] = None,
+                      passos: Optional[List[str]] = None, amostra: int = AMOSTRA_PADRAO,
+                      semente: int = 0) -> List[ItemMemoria]:
+    """
+    Mede os bytes de cada estrutura interna do grafo (e de `cor` e `passos`,
+    se informados), sem contar duas vezes objetos compartilhados
+    """
+    rng = random.Random(semente)
+    adjacencias = grafo.grafo
+    itens = []
+
+    # Dicionário: tabela + listas (só os ponteiros; os nomes vêm a seguir)
+    listas, estimado = _tamanho_elementos(adjacencias.values(), len(adjacencias), amostra, rng)
+    itens.append(ItemMemoria('grafo (dicionário + listas)', sys.getsizeof(adjacencias) + listas,
+                             len(adjacencias), estimado))
+
+    nomes, estimado = _tamanho_elementos(adjacencias.keys(), len(adjacencias), amostra, rng)
+    itens.append(ItemMemoria('nomes', nomes, len(adjacencias), estimado))
+
+    itens.append(_nomes_repetidos(adjacencias, amostra, rng))
+
+    for nome in ('vertices', 'usuarios', 'filmes'):
+        conjunto = getattr(grafo, nome)
+        itens.append(ItemMemoria(nome, sys.getsizeof(conjunto), len(conjunto)))
+
+    if grafo.vertices_removidos or grafo.arestas_removidas:
+        itens.append(ItemMemoria('lápides (vértices)', sys.getsizeof(grafo.vertices_removidos),
+                                 len(grafo.vertices_removidos)))
+        itens.append(_tamanho_profundo('lápides (arestas)', grafo.arestas_removidas, amostra, rng))
+
+    itens.extend(itens_execucao(cor, passos, amostra, semente))
+    return itens
+
+
+def itens_execucao(cor: Optional[Dict[str, int]] = None, passos: Optional[List[str]] = None,
+                   amostra: int = AMOSTRA_PADRAO, semente: int = 0) -> List[ItemMemoria]:
+    """Bytes de `cor` e `passos` (os que forem informados), para somar ao relatório de um grafo"""
+    itens = []
+    if cor is not None:
+        # As cores 0, 1 e 2 são inteiros pequenos compartilhados pelo Python
+        itens.append(ItemMemoria('cor', sys.getsizeof(cor), len(cor)))
+    if passos is not None:
+        itens.append(_tamanho_profundo('passos', passos, amostra, random.Random(semente)))
+    return itens
+
+
+def _nomes_repetidos(adjacencias, amostra, rng):
+    """
+    Bytes das entradas das listas que são cópias (objetos distintos) do nome
+    já usado como chave, estimados a partir das listas de uma amostra de vértices
+    """
+    selecao, escala, estimado = _amostrar(adjacencias.values(), len(adjacencias),
+                                          max(1, amostra // 8), rng)
+    entradas = [v for adjacencia in selecao for v in adjacencia]
+    procurados = set(entradas)
+    canonicos = {}
+    for nome in adjacencias:
+        if nome in procurados:
+            canonicos[nome] = nome
+            if len(canonicos) == len(procurados):
+                break
+
+    repetidos = [v for v in entradas if canonicos.get(v) is not v]
+    return ItemMemoria('nomes repetidos nas listas', round(sum(map(sys.getsizeof, repetidos)) * escala),
+                       round(len(repetidos) * escala), estimado)
+
+
+def projetar_memoria(itens: List[ItemMemoria], arestas_atuais: int, arestas_alvo: int) -> int:
+    """
+    Projeta os bytes das estruturas do grafo para `arestas_alvo` arestas,
+    supondo o mesmo grau médio (vértices crescendo na mesma proporção)
+
+    cor e passos também crescem com o grafo e entram na projeção se estiverem nos itens.
+    """
+    if arestas_atuais <= 0:
+        raise ValueError("o grafo precisa ter arestas para projetar o consumo")
+    total = sum(item.bytes for item in itens)
+    return round(total * arestas_alvo / arestas_atuais)
+
+
+def medir_pico(arquivo: str, registrar_passos: bool = False) -> PicoMemoria:
+    """
+    Carrega o grafo (texto ou snapshot) e executa o BFS sob o tracemalloc,
+    medindo a memória ao fim e no pico de cada fase
+
+    O tracemalloc deixa a execução algumas vezes mais lenta.
+    """
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        grafo = GrafoBipartido()
+        if eh_snapshot(arquivo):
+            grafo.carregar_snapshot(arquivo)
+        else:
+            with open(arquivo, 'r', encoding='utf-8') as f:
+                grafo.carregar_de_linhas(f)
+        apos_carga, pico_carga = tracemalloc.get_traced_memory()
+
+        tracemalloc.reset_peak()
+        resultado = grafo.eh_bipartido_bfs(registrar_passos)
+        apos_bfs, pico_bfs = tracemalloc.get_traced_memory()
+        del resultado, grafo
+    finally:
+        tracemalloc.stop()
+    return PicoMemoria(apos_carga, pico_carga, apos_bfs, pico_bfs)
+
+
+def exibir_relatorio(itens: List[ItemMemoria], arestas: int, arestas_alvo: Optional[int] = None):
+    """Exibe o relatório de memória e, se pedido, a projeção"""
+    total = sum(item.bytes for item in itens)
+    print("\n" + "="*50)
+    print("MEMÓRIA DO GRAFO")
+    print("="*50)
+    for item in sorted(itens, key=lambda item: -item.bytes):
+        fracao = item.bytes / total * 100 if total else 0
+        marca = ' (estimado)' if item.estimado else ''
+        print(f"  {item.estrutura:<28} {formatar_bytes(item.bytes):>10} {fracao:5.1f}%  "
+              f"{item.elementos} elementos{marca}")
+    print(f"  {'Total':<28} {formatar_bytes(total):>10}")
+    if arestas:
+        print(f"  {total / arestas:.0f} bytes por aresta")
+    if arestas_alvo:
+        projecao = projetar_memoria(itens, arestas, arestas_alvo)
+        print(f"\nProjeção para {arestas_alvo} arestas: {formatar_bytes(projecao)}")
+
+
+def main():
+    """Função principal"""
+    argumentos = [a for a in sys.argv[1:] if a != '--tracemalloc']
+    if not argumentos:
+        print("Uso: python memoria.py arquivo_grafo [arestas_alvo] [--tracemalloc]")
+        return 1
+
+    arquivo = argumentos[0]
+    arestas_alvo = int(argumentos[1]) if len(argumentos) > 1 else None
+
+    grafo = GrafoBipartido()
+    if eh_snapshot(arquivo):
+        grafo.carregar_snapshot(arquivo)
+    else:
+        grafo.carregar_de_arquivo(arquivo)
+    _, cor, passos = grafo.eh_bipartido_bfs(registrar_passos=True)
+    arestas = grafo.total_arestas()
+    exibir_relatorio(relatorio_memoria(grafo, cor, passos), arestas, arestas_alvo)
+
+    if '--tracemalloc' in sys.argv:
+        pico = medir_pico(arquivo)
+        print("\n" + "="*50)
+        print("PICO DE MEMÓRIA (tracemalloc)")
+        print("="*50)
+        print(f"  Carga: pico {formatar_bytes(pico.pico_carga)}, ao final {formatar_bytes(pico.apos_carga)}")
+        print(f"  BFS:   pico {formatar_bytes(pico.pico_bfs)}, ao final {formatar_bytes(pico.apos_bfs)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,379 @@
+# -*- coding: utf-8 -*-
+"""
+Projeção do Grafo Bipartido
+Constrói a projeção ponderada de um dos lados do grafo: dois usuários são
+ligados com peso igual ao número de filmes em comum (ou dois filmes, ao
+número de usuários em comum)
+
+A projeção é esparsa: cada vértice guarda apenas os vizinhos com peso mínimo
+`peso_minimo`, limitados aos `top_n` maiores. A construção respeita um
+orçamento de memória, do qual são descontadas as adjacências (em inteiros):
+- os vértices são processados em blocos com trabalho limitado;
+- vértices ligados a hubs (muito trabalho) têm os vizinhos contados em
+  fatias, uma de cada vez, lendo cada entrada uma única vez; sem `top_n`,
+  as fatias prontas esperam em disco;
+- quando o resultado ultrapassa o orçamento, as linhas prontas vão para um
+  arquivo temporário em disco.
+Os blocos podem ser executados em paralelo, em vários processos.
+
+Uso:
+    python projecao.py arquivo_grafo [usuarios|filmes] [top_n]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import heapq
+import pickle
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
+from itertools import accumulate
+
+from grafo_bipartido import GrafoBipartido
+
+
+# Orçamento de memória padrão da construção (bytes)
+MEMORIA_PADRAO = 256 * 1024 * 1024
+
+# Estimativa de bytes por entrada (vizinho, peso) mantida em memória,
+# tanto nos contadores quanto no resultado
+BYTES_POR_ENTRADA = 100
+
+# Itens por lote ao gravar em disco as fatias de um vértice (top_n=None)
+ITENS_POR_LOTE_DISCO = 4096
+
+LADOS = ('usuarios', 'filmes')
+
+
+class ProjecaoEsparsa:
+    """
+    Resultado da projeção: linhas (vértice, [(vizinho, peso), ...]) com os
+    vizinhos em ordem decrescente de peso (empates em ordem alfabética)
+
+    As linhas ficam em memória até `limite_entradas` entradas; a partir daí
+    são gravadas em um arquivo temporário, apagado ao fechar.
+    """
+
+    def __init__(self, lado, limite_entradas):
+        self.lado = lado
+        self.limite_entradas = limite_entradas
+        self.linhas = []
+        self.entradas_em_memoria = 0
+        self.total_linhas = 0
+        self.total_entradas = 0
+        self.arquivo_disco = None
+        self.linhas_em_disco = 0
+
+    def adicionar(self, vertice, vizinhos):
+        """Acrescenta a linha de um vértice, gravando em disco se passar do limite"""
+        self.linhas.append((vertice, vizinhos))
+        self.entradas_em_memoria += len(vizinhos)
+        self.total_linhas += 1
+        self.total_entradas += len(vizinhos)
+        if self.entradas_em_memoria > self.limite_entradas:
+            self._gravar_em_disco()
+
+    def _gravar_em_disco(self):
+        if self.arquivo_disco is None:
+            self.arquivo_disco = tempfile.TemporaryFile(prefix='projecao_')
+        self.arquivo_disco.seek(0, 2)
+        pickle.dump(self.linhas, self.arquivo_disco, protocol=pickle.HIGHEST_PROTOCOL)
+        self.linhas_em_disco += len(self.linhas)
+        self.linhas = []
+        self.entradas_em_memoria = 0
+
+    def __len__(self):
+        return self.total_linhas
+
+    def __iter__(self):
+        """Percorre as linhas na ordem em que foram adicionadas (primeiro as do disco)"""
+        if self.arquivo_disco is not None:
+            self.arquivo_disco.seek(0)
+            lidas = 0
+            while lidas < self.linhas_em_disco:
+                lote = pickle.load(self.arquivo_disco)
+                lidas += len(lote)
+                yield from lote
+        yield from self.linhas
+
+    def arestas(self):
+        """Gera (vertice, vizinho, peso) para cada entrada da projeção"""
+        for vertice, vizinhos in self:
+            for vizinho, peso in vizinhos:
+                yield vertice, vizinho, peso
+
+    def para_dict(self):
+        """Carrega toda a projeção em um dicionário vértice -> [(vizinho, peso), ...]"""
+        return dict(self)
+
+    def fechar(self):
+        """Apaga o arquivo temporário, se houver"""
+        if self.arquivo_disco is not None:
+            self.arquivo_disco.close()
+            self.arquivo_disco = None
+            self.linhas_em_disco = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+
+def adjacencias_do_lado(grafo, lado):
+    """
+    Retorna (fontes, adjacencias) para projetar o lado indicado
+
+    `fontes` são os vértices do lado em ordem alfabética (cada um é
+    identificado pela sua posição) e `adjacencias` = (inicio_fonte, meios,
+    inicio_meio, fontes_do_meio) está no formato CSR de inteiros: os vértices
+    do outro lado ligados à fonte i são meios[inicio_fonte[i]:inicio_fonte[i + 1]]
+    (sem repetição) e as fontes ligadas ao vértice m do outro lado são
+    fontes_do_meio[inicio_meio[m]:inicio_meio[m + 1]], em ordem crescente.
+    """
+    if lado not in LADOS:
+        raise ValueError(f"Lado inválido: '{lado}' (use {' ou '.join(LADOS)})")
+    if lado == 'usuarios':
+        lado_fonte, lado_meio = grafo.usuarios, grafo.filmes
+    else:
+        lado_fonte, lado_meio = grafo.filmes, grafo.usuarios
+
+    fontes = sorted(lado_fonte)
+    indice_meio = {}
+    inicio_fonte = array('i', [0])
+    meios = array('i')
+    for fonte in fontes:
+        meios.extend(indice_meio.setdefault(m, len(indice_meio))
+                     for m in dict.fromkeys(grafo.vizinhos(fonte)) if m in lado_meio)
+        inicio_fonte.append(len(meios))
+
+    # Transposta: percorrer as fontes em ordem deixa cada lista do meio ordenada
+    graus = [0] * len(indice_meio)
+    for m in meios:
+        graus[m] += 1
+    inicio_meio = array('i', [0])
+    inicio_meio.extend(accumulate(graus))
+    proxima = inicio_meio.tolist()
+    fontes_do_meio = array('i', bytes(meios.itemsize * len(meios)))
+    for i in range(len(fontes)):
+        for m in meios[inicio_fonte[i]:inicio_fonte[i + 1]]:
+            fontes_do_meio[proxima[m]] = i
+            proxima[m] += 1
+    return fontes, (inicio_fonte, meios, inicio_meio, fontes_do_meio)
+
+
+def _chave(item):
+    """Ordem das linhas: peso decrescente e, nos empates, a ordem alfabética (índice)"""
+    return -item[1], item[0]
+
+
+def _gravar_sequencia(arquivo, itens):
+    """Grava `itens` no fim do arquivo em lotes; retorna (posição inicial, quantidade)"""
+    arquivo.seek(0, 2)
+    posicao = arquivo.tell()
+    for inicio in range(0, len(itens), ITENS_POR_LOTE_DISCO):
+        pickle.dump(itens[inicio:inicio + ITENS_POR_LOTE_DISCO], arquivo,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+    return posicao, len(itens)
+
+
+def _ler_sequencia(arquivo, posicao, quantidade):
+    """Relê, lote a lote, uma sequência gravada por _gravar_sequencia"""
+    while quantidade > 0:
+        arquivo.seek(posicao)
+        lote = pickle.load(arquivo)
+        posicao = arquivo.tell()
+        quantidade -= len(lote)
+        yield from lote
+
+
+def projetar_vertice(i, adjacencias, num_fontes, peso_minimo, top_n, orcamento):
+    """
+    Calcula os vizinhos (índice, peso) da fonte i na projeção
+
+    Se o trabalho (soma dos graus dos vértices do meio) passar de `orcamento`
+    entradas, os vizinhos são contados em fatias de índices consecutivos.
+    Como as listas do meio estão ordenadas, cada fatia continua de onde a
+    anterior parou em cada lista, e o conjunto das fatias lê cada entrada uma
+    única vez. Com `top_n`, cada fatia guarda só os seus melhores; sem ele,
+    cada fatia vai ordenada para um arquivo temporário e as fatias são
+    intercaladas no fim.
+    """
+    inicio_fonte, meios, inicio_meio, fontes_do_meio = adjacencias
+    listas = [(inicio_meio[m], inicio_meio[m + 1]) for m in meios[inicio_fonte[i]:inicio_fonte[i + 1]]]
+    trabalho = sum(fim - inicio for inicio, fim in listas)
+    fatias = max(1, -(-trabalho // orcamento))
+
+    if fatias == 1:
+        contagem = Counter()
+        for inicio, fim in listas:
+            contagem.update(fontes_do_meio[inicio:fim])
+        contagem.pop(i, None)
+        itens = [item for item in contagem.items() if item[1] >= peso_minimo]
+        if top_n is None:
+            return sorted(itens, key=_chave)
+        return heapq.nsmallest(top_n, itens, key=_chave)
+
+    cursores = [inicio for inicio, _ in listas]
+    candidatos = []
+    sequencias = []
+    with tempfile.TemporaryFile(prefix='projecao_fatias_') as arquivo:
+        for fatia in range(1, fatias + 1):
+            limite = num_fontes * fatia // fatias
+            contagem = Counter()
+            for posicao, (_, fim) in enumerate(listas):
+                inicio = cursores[posicao]
+                corte = bisect_left(fontes_do_meio, limite, inicio, fim)
+                contagem.update(fontes_do_meio[inicio:corte])
+                cursores[posicao] = corte
+            contagem.pop(i, None)
+
+            itens = [item for item in contagem.items() if item[1] >= peso_minimo]
+            del contagem
+            if top_n is not None:
+                candidatos.extend(heapq.nsmallest(top_n, itens, key=_chave))
+            elif itens:
+                itens.sort(key=_chave)
+                sequencias.append(_gravar_sequencia(arquivo, itens))
+
+        if top_n is not None:
+            return heapq.nsmallest(top_n, candidatos, key=_chave)
+        return list(heapq.merge(*(_ler_sequencia(arquivo, posicao, quantidade)
+                                  for posicao, quantidade in sequencias), key=_chave))
+
+
+def projetar_bloco(inicio, fim, adjacencias, num_fontes, peso_minimo, top_n, orcamento):
+    """Projeta as fontes inicio..fim-1; omite as que ficam sem vizinhos"""
+    linhas = []
+    for i in range(inicio, fim):
+        vizinhos = projetar_vertice(i, adjacencias, num_fontes, peso_minimo, top_n, orcamento)
+        if vizinhos:
+            linhas.append((i, vizinhos))
+    return linhas
+
+
+# Adjacências recebidas por cada processo auxiliar uma única vez
+_adjacencias_processo = None
+
+
+def _inicializar_processo(adjacencias, num_fontes):
+    global _adjacencias_processo
+    _adjacencias_processo = (adjacencias, num_fontes)
+
+
+def _projetar_bloco_processo(inicio, fim, peso_minimo, top_n, orcamento):
+    """Executado em um processo separado, com as adjacências do inicializador"""
+    adjacencias, num_fontes = _adjacencias_processo
+    return projetar_bloco(inicio, fim, adjacencias, num_fontes, peso_minimo, top_n, orcamento)
+
+
+def dividir_em_blocos(adjacencias, num_fontes, orcamento):
+    """Agrupa as fontes em intervalos (inicio, fim) com trabalho total de até `orcamento`"""
+    inicio_fonte, meios, inicio_meio, _ = adjacencias
+    inicio_bloco, trabalho_bloco = 0, 0
+    for i in range(num_fontes):
+        trabalho = sum(inicio_meio[m + 1] - inicio_meio[m]
+                       for m in meios[inicio_fonte[i]:inicio_fonte[i + 1]])
+        if i > inicio_bloco and trabalho_bloco + trabalho > orcamento:
+            yield inicio_bloco, i
+            inicio_bloco, trabalho_bloco = i, 0
+        trabalho_bloco += trabalho
+    if num_fontes > inicio_bloco:
+        yield inicio_bloco, num_fontes
+
+
+def construir_projecao(grafo, lado='usuarios', peso_minimo=1, top_n=None,
+                       memoria_maxima=MEMORIA_PADRAO, processos=1):
+    """
+    Constrói a projeção ponderada de um lado do grafo ('usuarios' ou 'filmes')
+
+    As adjacências em inteiros (uma cópia no processo principal e uma em cada
+    processo auxiliar) são descontadas de `memoria_maxima`; do restante,
+    metade é reservada para as contagens (dividida entre os processos) e
+    metade para o resultado em memória, cujo excedente vai para disco. Lança
+    ValueError se as adjacências não couberem no orçamento. Retorna uma
+    ProjecaoEsparsa.
+    """
+    if peso_minimo < 1:
+        raise ValueError("peso_minimo deve ser pelo menos 1")
+    if top_n is not None and top_n < 1:
+        raise ValueError("top_n deve ser positivo")
+
+    fontes, adjacencias = adjacencias_do_lado(grafo, lado)
+    processos = max(1, processos)
+    bytes_adjacencias = sum(a.itemsize * len(a) for a in adjacencias)
+    copias = 1 if processos == 1 else 1 + processos
+    disponivel = memoria_maxima - copias * bytes_adjacencias - sys.getsizeof(fontes)
+    entradas = disponivel // BYTES_POR_ENTRADA
+    if entradas < 2 * processos:
+        raise ValueError(f"memoria_maxima insuficiente: as adjacências ocupam {copias} x "
+                         f"{bytes_adjacencias} bytes ({processos} processo(s))")
+
+    orcamento = entradas // 2 // processos
+    projecao = ProjecaoEsparsa(lado, entradas // 2)
+    blocos = dividir_em_blocos(adjacencias, len(fontes), orcamento)
+
+    def adicionar(linhas):
+        for i, vizinhos in linhas:
+            projecao.adicionar(fontes[i], [(fontes[j], peso) for j, peso in vizinhos])
+
+    if processos == 1:
+        for inicio, fim in blocos:
+            adicionar(projetar_bloco(inicio, fim, adjacencias, len(fontes),
+                                     peso_minimo, top_n, orcamento))
+        return projecao
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(processos, initializer=_inicializar_processo,
+                             initargs=(adjacencias, len(fontes))) as executor:
+        # Poucos blocos em andamento por vez, para os resultados não se acumularem
+        pendentes = deque()
+        for inicio, fim in blocos:
+            pendentes.append(executor.submit(_projetar_bloco_processo, inicio, fim,
+                                             peso_minimo, top_n, orcamento))
+            if len(pendentes) >= 2 * processos:
+                adicionar(pendentes.popleft().result())
+        while pendentes:
+            adicionar(pendentes.popleft().result())
+    return projecao
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python projecao.py arquivo_grafo [usuarios|filmes] [top_n]")
+        return 1
+
+    lado = sys.argv[2] if len(sys.argv) > 2 else 'usuarios'
+    top_n = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+    grafo = GrafoBipartido()
+    grafo.carregar_de_arquivo(sys.argv[1])
+
+    try:
+        projecao = construir_projecao(grafo, lado, top_n=top_n)
+    except ValueError as e:
+        print(f"Erro: {e}")
+        return 1
+
+    with projecao:
+        print("\n" + "="*50)
+        print(f"PROJEÇÃO DOS {lado.upper()} (top {top_n})")
+        print("="*50)
+        for vertice, vizinhos in projecao:
+            descricao = ', '.join(f"{vizinho} ({peso})" for vizinho, peso in vizinhos)
+            print(f"  {vertice}: {descricao}")
+        print(f"\n{len(projecao)} vértices, {projecao.total_entradas} entradas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
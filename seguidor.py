@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+Acompanhamento de Arquivo em Crescimento (modo "tail -F")
+Incorpora ao grafo as linhas USUARIO,FILME que os coletores acrescentam a um
+arquivo, lendo só os bytes novos, em vez de recarregar o arquivo do início
+
+O SeguidorArquivo guarda a posição já lida e, a cada atualizar(), lê o que
+o arquivo cresceu em lotes de `tamanho_lote` bytes. Só linhas completas são
+aplicadas (com carregar_de_linhas, ou seja, adicionar_aresta); uma linha
+ainda sem quebra de linha espera pela próxima leitura. Assim os
+observadores do grafo (índice de similaridade, log de escrita antecipada,
+EstatisticasIncrementais...) são atualizados só com as arestas novas.
+
+Também trata:
+- truncamento: se o arquivo ficar menor que a posição lida, volta ao início;
+- rotação: se outro arquivo passar a ter o mesmo nome (logrotate), termina
+  de ler o antigo e passa ao novo, desde o início.
+
+Uso:
+    python seguidor.py arquivo_grafo [intervalo_segundos]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import os
+import sys
+import threading
+import time
+from typing import Callable, Optional
+
+import instrumentacao
+from grafo_bipartido import GrafoBipartido
+
+
+# Bytes lidos (e aplicados ao grafo) por lote
+TAMANHO_LOTE = 1 << 20
+
+# Espera entre verificações no modo seguir()
+INTERVALO_PADRAO = 1.0
+
+
+class EstatisticasIncrementais:
+    """
+    Observador que mantém as estatísticas do grafo (as de `cli.py stats`) a
+    cada aresta adicionada, sem percorrer o grafo
+
+    Remoções, e um vértice que era só filme passar a ser usuário, marcam as
+    estatísticas para serem recalculadas (percorrendo o grafo) na próxima
+    leitura; na ingestão elas são raras.
+    """
+
+    def __init__(self, grafo: GrafoBipartido, acompanhar: bool = True):
+        self.grafo = grafo
+        self._recalcular()
+        if acompanhar:
+            grafo.registrar_observador(self)
+
+    def _recalcular(self):
+        grafo = self.grafo
+        self.arestas = grafo.total_arestas()
+        # Soma dos graus dos usuários, para a média de filmes por usuário
+        self.entradas_usuarios = sum(len(grafo.vizinhos(u)) for u in grafo.usuarios)
+        self.num_usuarios = len(grafo.usuarios)
+        self.desatualizada = False
+
+    def aresta_adicionada(self, usuario, filme):
+        self.arestas += 1
+        self.entradas_usuarios += 1 + (filme in self.grafo.usuarios)
+        if len(self.grafo.usuarios) != self.num_usuarios:
+            self.num_usuarios = len(self.grafo.usuarios)
+            if usuario in self.grafo.filmes:
+                # Era só filme e virou usuário: o grau que já tinha não está na soma
+                self.desatualizada = True
+
+    def aresta_removida(self, usuario, filme):
+        self.desatualizada = True
+
+    def vertice_removido(self, vertice, vizinhos):
+        self.desatualizada = True
+
+    def como_dicionario(self) -> dict:
+        """Estatísticas atuais: vértices, usuários, filmes, arestas e média de filmes por usuário"""
+        if self.desatualizada:
+            self._recalcular()
+        grafo = self.grafo
+        usuarios = len(grafo.usuarios)
+        return {
+            'vertices': len(grafo.vertices),
+            'usuarios': usuarios,
+            'filmes': len(grafo.filmes),
+            'arestas': self.arestas,
+            'media_filmes_por_usuario': round(self.entradas_usuarios / usuarios, 4) if usuarios else 0,
+        }
+
+
+class SeguidorArquivo:
+    """
+    Lê incrementalmente as linhas acrescentadas a um arquivo USUARIO,FILME
+    e as adiciona ao grafo
+
+    `posicao` permite retomar de um ponto já processado (veja posicao_aplicada).
+    Use como gerenciador de contexto, ou chame fechar(), ao terminar.
+    """
+
+    def __init__(self, caminho: str, grafo: GrafoBipartido, tamanho_lote: int = TAMANHO_LOTE,
+                 posicao: int = 0):
+        if tamanho_lote < 1:
+            raise ValueError("tamanho_lote deve ser positivo")
+        self.caminho = caminho
+        self.grafo = grafo
+        self.tamanho_lote = tamanho_lote
+        self.arquivo = None
+        self.posicao = 0
+        self.resto = b''             # linha incompleta no fim do que já foi lido
+        self.linhas_lidas = 0
+        self.arestas_adicionadas = 0
+        self.rotacoes = 0
+        self.truncamentos = 0
+        if self._abrir() and posicao:
+            self.arquivo.seek(posicao)
+            self.posicao = posicao
+
+    @property
+    def posicao_aplicada(self) -> int:
+        """Bytes do arquivo atual já aplicados ao grafo (sem a linha incompleta)"""
+        return self.posicao - len(self.resto)
+
+    def _abrir(self) -> bool:
+        try:
+            self.arquivo = open(self.caminho, 'rb', buffering=0)
+        except FileNotFoundError:
+            self.arquivo = None
+            return False
+        self.posicao = 0
+        self.resto = b''
+        return True
+
+    def _aplicar(self, dados: bytes) -> int:
+        linhas = dados.decode('utf-8', 'replace').splitlines()
+        self.linhas_lidas += len(linhas)
+        adicionadas = self.grafo.carregar_de_linhas(linhas)
+        self.arestas_adicionadas += adicionadas
+        return adicionadas
+
+    def _ler_disponivel(self) -> int:
+        """Lê e aplica tudo o que o arquivo aberto cresceu desde a última leitura"""
+        total = 0
+        while True:
+            bloco = self.arquivo.read(self.tamanho_lote)
+            if not bloco:
+                return total
+            self.posicao += len(bloco)
+            self.grafo.metricas.contar(instrumentacao.SEGUIDOR_BYTES, len(bloco))
+            dados = self.resto + bloco
+            corte = dados.rfind(b'\n') + 1
+            self.resto = dados[corte:]
+            if corte:
+                total += self._aplicar(dados[:corte])
+
+    def _foi_rotacionado(self) -> bool:
+        """O nome passou a apontar para outro arquivo (o atual foi renomeado ou apagado)"""
+        try:
+            atual = os.stat(self.caminho)
+        except FileNotFoundError:
+            return False  # o novo arquivo ainda não foi criado: continua no antigo
+        aberto = os.fstat(self.arquivo.fileno())
+        return (atual.st_ino, atual.st_dev) != (aberto.st_ino, aberto.st_dev)
+
+    def atualizar(self) -> int:
+        """Aplica ao grafo as linhas completas novas; retorna quantas arestas foram adicionadas"""
+        if self.arquivo is None and not self._abrir():
+            return 0
+
+        total = 0
+        if os.fstat(self.arquivo.fileno()).st_size < self.posicao:
+            # Truncado (ex.: copytruncate): o conteúdo atual é novo
+            self.arquivo.seek(0)
+            self.posicao = 0
+            self.resto = b''
+            self.truncamentos += 1
+            self.grafo.metricas.contar(instrumentacao.SEGUIDOR_TRUNCAMENTOS)
+        total += self._ler_disponivel()
+
+        if self._foi_rotacionado():
+            # O arquivo antigo não recebe mais linhas: a última, mesmo sem quebra, está completa
+            if self.resto:
+                total += self._aplicar(self.resto)
+            self.arquivo.close()
+            self.rotacoes += 1
+            self.grafo.metricas.contar(instrumentacao.SEGUIDOR_ROTACOES)
+            if self._abrir():
+                total += self._ler_disponivel()
+        return total
+
+    def seguir(self, intervalo: float = INTERVALO_PADRAO, parar: Optional[threading.Event] = None,
+               ao_atualizar: Optional[Callable[[int], None]] = None):
+        """
+        Chama atualizar() a cada `intervalo` segundos até `parar` ser sinalizado
+        (ou para sempre); `ao_atualizar(arestas)` é chamada após cada lote com arestas novas
+        """
+        parar = parar or threading.Event()
+        while not parar.is_set():
+            adicionadas = self.atualizar()
+            if adicionadas and ao_atualizar is not None:
+                ao_atualizar(adicionadas)
+            parar.wait(intervalo)
+
+    def fechar(self):
+        if self.arquivo is not None:
+            self.arquivo.close()
+            self.arquivo = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+        return False
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python seguidor.py arquivo_grafo [intervalo_segundos]")
+        return 1
+
+    intervalo = float(sys.argv[2]) if len(sys.argv) > 2 else INTERVALO_PADRAO
+    grafo = GrafoBipartido()
+    estatisticas = EstatisticasIncrementais(grafo)
+
+    print("\n" + "="*50)
+    print(f"ACOMPANHANDO '{sys.argv[1]}' (Ctrl+C para sair)")
+    print("="*50)
+
+    def exibir(adicionadas):
+        atual = estatisticas.como_dicionario()
+        print(f"[{time.strftime('%H:%M:%S')}] +{adicionadas} arestas | usuários: {atual['usuarios']}, "
+              f"filmes: {atual['filmes']}, arestas: {atual['arestas']}, "
+              f"média de filmes por usuário: {atual['media_filmes_por_usuario']:.2f}")
+
+    with SeguidorArquivo(sys.argv[1], grafo) as seguidor:
+        try:
+            seguidor.seguir(intervalo, ao_atualizar=exibir)
+        except KeyboardInterrupt:
+            pass
+        print(f"\nLinhas lidas: {seguidor.linhas_lidas}, rotações: {seguidor.rotacoes}, "
+              f"truncamentos: {seguidor.truncamentos}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
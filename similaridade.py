@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Índice de Similaridade Aproximada (MinHash + LSH)
+Encontra rapidamente os usuários com conjuntos de filmes parecidos, sem
+percorrer todos os usuários que têm algum filme em comum
+
+Cada usuário recebe uma assinatura MinHash do seu conjunto de filmes: a
+fração de posições iguais em duas assinaturas estima a similaridade de
+Jaccard |A ∩ B| / |A ∪ B|. As assinaturas são divididas em bandas e cada
+banda é usada como chave de um balde (LSH): usuários que coincidem em pelo
+menos uma banda viram candidatos, e só eles são comparados.
+
+Com `bandas` bandas de `linhas` posições, pares com Jaccard acima de
+aproximadamente (1 / bandas) ** (1 / linhas) quase sempre colidem.
+
+O índice acompanha o grafo: cada adicionar_aresta atualiza a assinatura do
+usuário e os baldes afetados; remoções recalculam as assinaturas afetadas.
+
+Uso:
+    python similaridade.py arquivo_grafo [limiar]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import hashlib
+import heapq
+import random
+import sys
+from array import array
+from collections import defaultdict
+from operator import eq
+
+from grafo_bipartido import GrafoBipartido
+
+
+# Primo de Mersenne usado nas permutações (a·x + b) mod PRIMO
+PRIMO = (1 << 31) - 1
+
+
+def hash_estavel(nome):
+    """Hash de 31 bits que não muda entre execuções (ao contrário de hash())"""
+    digest = hashlib.blake2b(nome.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') % PRIMO
+
+
+class IndiceMinHash:
+    """
+    Índice MinHash/LSH dos usuários de um GrafoBipartido
+
+    As assinaturas ficam em arrays de inteiros de 32 bits (4 bytes por
+    posição) e cada balde guarda o conjunto de usuários com a mesma banda.
+    """
+
+    def __init__(self, grafo, num_permutacoes=72, bandas=24, semente=1, acompanhar=True):
+        if num_permutacoes % bandas:
+            raise ValueError("num_permutacoes deve ser múltiplo de bandas")
+
+        self.grafo = grafo
+        self.num_permutacoes = num_permutacoes
+        self.bandas = bandas
+        self.linhas = num_permutacoes // bandas
+
+        rng = random.Random(semente)
+        self.coeficientes = [(rng.randrange(1, PRIMO), rng.randrange(PRIMO))
+                             for _ in range(num_permutacoes)]
+
+        self.assinaturas = {}
+        self.baldes = [defaultdict(set) for _ in range(bandas)]
+
+        self._indexar_grafo()
+        if acompanhar:
+            grafo.registrar_observador(self)
+
+    @property
+    def limiar_lsh(self):
+        """Jaccard a partir do qual um par passa a colidir com alta probabilidade"""
+        return (1 / self.bandas) ** (1 / self.linhas)
+
+    def assinatura_filme(self, filme):
+        """Valores do filme em cada permutação"""
+        x = hash_estavel(filme)
+        return array('I', [(a * x + b) % PRIMO for a, b in self.coeficientes])
+
+    def _chaves(self, assinatura):
+        r = self.linhas
+        return [assinatura[i * r:(i + 1) * r].tobytes() for i in range(self.bandas)]
+
+    def _indexar_grafo(self):
+        """Calcula a assinatura de todos os usuários, calculando cada filme uma única vez"""
+        grafo = self.grafo
+        valores = {filme: self.assinatura_filme(filme) for filme in grafo.filmes}
+        for usuario in grafo.usuarios:
+            filmes = [valores[filme] for filme in set(grafo.vizinhos(usuario)) if filme in valores]
+            if not filmes:
+                continue
+            assinatura = array('I', map(min, *filmes)) if len(filmes) > 1 else filmes[0]
+            self.assinaturas[usuario] = assinatura
+            for banda, chave in enumerate(self._chaves(assinatura)):
+                self.baldes[banda][chave].add(usuario)
+
+    def aresta_adicionada(self, usuario, filme):
+        """Observador do grafo: incorpora o novo filme à assinatura do usuário"""
+        valores = self.assinatura_filme(filme)
+        atual = self.assinaturas.get(usuario)
+        if atual is None:
+            nova, chaves_antigas = valores, [None] * self.bandas
+        else:
+            nova = array('I', map(min, atual, valores))
+            if nova == atual:
+                return
+            chaves_antigas = self._chaves(atual)
+
+        self.assinaturas[usuario] = nova
+        for banda, (antiga, chave) in enumerate(zip(chaves_antigas, self._chaves(nova))):
+            if antiga == chave:
+                continue
+            baldes = self.baldes[banda]
+            if antiga is not None:
+                balde = baldes[antiga]
+                balde.discard(usuario)
+                if not balde:
+                    del baldes[antiga]
+            baldes[chave].add(usuario)
+
+    def _recalcular(self, usuario):
+        """Refaz a assinatura do usuário a partir dos filmes atuais (após remoções)"""
+        atual = self.assinaturas.pop(usuario, None)
+        if atual is not None:
+            for baldes, chave in zip(self.baldes, self._chaves(atual)):
+                balde = baldes[chave]
+                balde.discard(usuario)
+                if not balde:
+                    del baldes[chave]
+
+        grafo = self.grafo
+        if usuario not in grafo.usuarios:
+            return
+        filmes = [self.assinatura_filme(filme) for filme in set(grafo.vizinhos(usuario))
+                  if filme in grafo.filmes]
+        if not filmes:
+            return
+        assinatura = array('I', map(min, *filmes)) if len(filmes) > 1 else filmes[0]
+        self.assinaturas[usuario] = assinatura
+        for baldes, chave in zip(self.baldes, self._chaves(assinatura)):
+            baldes[chave].add(usuario)
+
+    def aresta_removida(self, usuario, filme):
+        """Observador do grafo: o mínimo não se desfaz, então a assinatura é recalculada"""
+        self._recalcular(usuario)
+
+    def vertice_removido(self, vertice, vizinhos):
+        """Observador do grafo: descarta o usuário ou recalcula quem tinha o filme"""
+        self._recalcular(vertice)
+        for usuario in set(vizinhos):
+            if usuario in self.assinaturas:
+                self._recalcular(usuario)
+
+    def estimar_jaccard(self, usuario_a, usuario_b):
+        """Estimativa da similaridade de Jaccard entre os filmes de dois usuários"""
+        a = self.assinaturas.get(usuario_a)
+        b = self.assinaturas.get(usuario_b)
+        if a is None or b is None:
+            return 0.0
+        return sum(map(eq, a, b)) / self.num_permutacoes
+
+    def candidatos(self, usuario):
+        """Usuários que coincidem com o usuário em pelo menos uma banda"""
+        assinatura = self.assinaturas.get(usuario)
+        if assinatura is None:
+            return set()
+        encontrados = set()
+        for baldes, chave in zip(self.baldes, self._chaves(assinatura)):
+            encontrados.update(baldes[chave])
+        encontrados.discard(usuario)
+        return encontrados
+
+    def similares(self, usuario, limiar=None, k=None, exato=False):
+        """
+        Usuários com Jaccard estimado de pelo menos `limiar` (padrão: o
+        limiar do LSH), em ordem decrescente de similaridade; k limita a quantidade
+
+        Com exato=True, os candidatos são comparados pelo Jaccard exato dos
+        conjuntos de filmes: mais lento, mas sem o erro da estimativa.
+        Retorna uma lista de (usuario, jaccard).
+        """
+        if limiar is None:
+            limiar = self.limiar_lsh
+        assinatura = self.assinaturas.get(usuario)
+        if assinatura is None:
+            return []
+
+        resultado = []
+        if exato:
+            filmes = set(self.grafo.vizinhos(usuario)) & self.grafo.filmes
+            for outro in self.candidatos(usuario):
+                outros_filmes = set(self.grafo.vizinhos(outro)) & self.grafo.filmes
+                similaridade = len(filmes & outros_filmes) / len(filmes | outros_filmes)
+                if similaridade >= limiar:
+                    resultado.append((outro, similaridade))
+        else:
+            for outro in self.candidatos(usuario):
+                similaridade = sum(map(eq, assinatura, self.assinaturas[outro])) / self.num_permutacoes
+                if similaridade >= limiar:
+                    resultado.append((outro, similaridade))
+
+        chave = lambda item: (-item[1], item[0])
+        if k is None:
+            return sorted(resultado, key=chave)
+        return heapq.nsmallest(k, resultado, key=chave)
+
+    def ranquear_filmes(self, usuario, k=None, limiar=None):
+        """
+        Como GrafoBipartido.ranquear_filmes, mas contando apenas os usuários
+        similares encontrados pelo índice
+        """
+        grafo = self.grafo
+        if usuario not in grafo.usuarios:
+            return []
+
+        filmes_assistidos = set(grafo.vizinhos(usuario))
+        pontuacao = defaultdict(int)
+        for outro, _ in self.similares(usuario, limiar):
+            for filme in set(grafo.vizinhos(outro)):
+                if filme not in filmes_assistidos and filme in grafo.filmes:
+                    pontuacao[filme] += 1
+
+        chave = lambda item: (-item[1], item[0])
+        if k is None:
+            return sorted(pontuacao.items(), key=chave)
+        return heapq.nsmallest(k, pontuacao.items(), key=chave)
+
+
+def jaccard_exato(grafo, usuario_a, usuario_b):
+    """Similaridade de Jaccard exata entre os filmes de dois usuários"""
+    a = set(grafo.vizinhos(usuario_a)) & grafo.filmes
+    b = set(grafo.vizinhos(usuario_b)) & grafo.filmes
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def similares_exatos(grafo, usuario, limiar):
+    """
+    Método exato: compara o usuário com todos que têm algum filme em comum
+    (os "usuários similares" de pontuar_recomendacoes)
+    """
+    filmes = set(grafo.vizinhos(usuario)) & grafo.filmes
+    vizinhos = {outro for filme in filmes for outro in grafo.vizinhos(filme)
+                if outro != usuario and outro in grafo.usuarios}
+    resultado = []
+    for outro in vizinhos:
+        similaridade = jaccard_exato(grafo, usuario, outro)
+        if similaridade >= limiar:
+            resultado.append((outro, similaridade))
+    return sorted(resultado, key=lambda item: (-item[1], item[0]))
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python similaridade.py arquivo_grafo [limiar]")
+        return 1
+
+    grafo = GrafoBipartido()
+    grafo.carregar_de_arquivo(sys.argv[1])
+    indice = IndiceMinHash(grafo)
+    limiar = float(sys.argv[2]) if len(sys.argv) > 2 else indice.limiar_lsh
+
+    print("\n" + "="*50)
+    print(f"USUÁRIOS SIMILARES (Jaccard estimado ≥ {limiar:.2f})")
+    print("="*50)
+    for usuario in sorted(grafo.usuarios):
+        similares = indice.similares(usuario, limiar)
+        descricao = ', '.join(f"{outro} ({similaridade:.2f})" for outro, similaridade in similares)
+        print(f"  {usuario}: {descricao or '(nenhum)'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
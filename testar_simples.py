@@ -24,6 +24,24 @@ def verificar_arquivo(arquivo, descricao):
     return existe
 
 
+def verificar(condicao, descricao):
+    """Exibe o resultado de uma verificação e o retorna"""
+    status = "[OK]" if condicao else "[FALHOU]"
+    print(f"  {status} {descricao}")
+    return bool(condicao)
+
+
+def grafo_aleatorio(rng, usuarios=30, filmes=15, grau=4):
+    """Grafo bipartido aleatório (usuários U*, filmes F*) para os testes de equivalência"""
+    from grafo_bipartido import GrafoBipartido
+
+    grafo = GrafoBipartido()
+    for u in range(rng.randrange(1, usuarios)):
+        for f in rng.sample(range(filmes), rng.randrange(1, grau + 1)):
+            grafo.adicionar_aresta(f"U{u}", f"F{f}")
+    return grafo
+
+
 def testar_imports():
     """Testa se todas as bibliotecas necessárias estão instaladas"""
     print("\n" + "="*60)
@@ -174,6 +192,1705 @@ def testar_estrutura_dados():
         return False
 
 
+def testar_eventos_bfs():
+    """Testa o fluxo de eventos do BFS e os estados da animação (deltas e keyframes)"""
+    print("\n" + "="*60)
+    print("TESTANDO EVENTOS DO BFS E ESTADOS DA ANIMACAO")
+    print("="*60)
+
+    try:
+        from animacao import COR_CONFLITO, construir_estados_animacao
+        from grafo_bipartido import (COLORIR, CONFLITO, FIM, INICIO_COMPONENTE,
+                                     GrafoBipartido)
+
+        bipartido = GrafoBipartido()
+        for usuario, filme in [("U1", "F1"), ("U1", "F2"), ("U2", "F2"), ("U3", "F3")]:
+            bipartido.adicionar_aresta(usuario, filme)
+        cor = {}
+        eventos = list(bipartido.eventos_bfs(cor))
+        tipos = [evento.tipo for evento in eventos]
+
+        triangulo = GrafoBipartido()
+        for usuario, filme in [("A", "B"), ("B", "C"), ("C", "A")]:
+            triangulo.adicionar_aresta(usuario, filme)
+        eventos_triangulo = list(triangulo.eventos_bfs())
+
+        resultados = [
+            verificar(tipos.count(INICIO_COMPONENTE) == 2, "um inicio por componente"),
+            verificar(tipos.count(COLORIR) == len(bipartido.vertices) - 2,
+                      "um evento de coloracao por vertice alcancado"),
+            verificar(tipos[-1] == FIM and tipos.count(FIM) == 1 and eventos[-1].bipartido,
+                      "termina com um unico FIM bipartido"),
+            verificar(all(cor[e.vertice] != cor[e.origem] for e in eventos if e.tipo == COLORIR),
+                      "adjacentes recebem cores diferentes"),
+            verificar([e.tipo for e in eventos_triangulo[-2:]] == [CONFLITO, FIM]
+                      and eventos_triangulo[-1].bipartido is False,
+                      "ciclo impar emite CONFLITO antes do FIM"),
+        ]
+
+        # Cada frame reconstruído pelos keyframes é igual a aplicar todos os deltas
+        grafo = GrafoBipartido()
+        for i in range(60):
+            grafo.adicionar_aresta(f"U{i}", f"F{i % 7}")
+            grafo.adicionar_aresta(f"U{i}", f"F{(i * 3) % 11 + 7}")
+        estados = construir_estados_animacao(grafo, intervalo_keyframe=5)
+        cores = bytearray(len(estados.vertices))
+        iguais = estados.cores_no_frame(0) == cores
+        for frame in range(1, len(estados)):
+            delta = estados.delta_do_frame(frame)
+            if delta is not None:
+                cores[delta[0]] = delta[1]
+            iguais = iguais and estados.cores_no_frame(frame) == cores
+        resultados += [
+            verificar(iguais, "keyframes + deltas reconstroem todos os frames"),
+            verificar(len(estados) == len(grafo.vertices) + 2 and estados.eh_bipartido,
+                      "um delta por vertice e frames inicial e final"),
+        ]
+
+        # A interface consome no máximo EVENTOS_POR_LOTE eventos por chamada,
+        # mesmo depois de atingir o limite de passos exibidos
+        import types
+        import visualizador
+        caminho = GrafoBipartido()
+        for i in range(1500):
+            caminho.adicionar_aresta(f"U{i}", f"F{i}")
+            caminho.adicionar_aresta(f"U{i + 1}", f"F{i}")
+        consumidos, lotes, pendente = [0], [], []
+
+        def contar(eventos):
+            for evento in eventos:
+                consumidos[0] += 1
+                yield evento
+
+        tela = types.SimpleNamespace(passos_exibidos=0, resultado=None)
+        tela.after = lambda _atraso, funcao, *args: pendente.append((funcao, args))
+        tela.root = tela
+        tela._inserir_passos = lambda linhas: None
+        tela._exibir_resultado = lambda bipartido: setattr(tela, 'resultado', bipartido)
+        tela._processar_eventos = types.MethodType(
+            visualizador.VisualizadorGrafoBipartido._processar_eventos, tela)
+        tela.eventos_em_andamento = contar(caminho.eventos_bfs())
+        pendente.append((tela._processar_eventos, (tela.eventos_em_andamento,)))
+        limite_exibidos = visualizador.MAX_PASSOS_EXIBIDOS
+        visualizador.MAX_PASSOS_EXIBIDOS = 10
+        try:
+            while pendente:
+                funcao, args = pendente.pop()
+                antes = consumidos[0]
+                funcao(*args)
+                lotes.append(consumidos[0] - antes)
+        finally:
+            visualizador.MAX_PASSOS_EXIBIDOS = limite_exibidos
+        resultados.append(verificar(
+            tela.resultado is True and len(lotes) > 1 and max(lotes) <= visualizador.EVENTOS_POR_LOTE,
+            "interface processa o BFS em lotes limitados"))
+
+        estados = construir_estados_animacao(triangulo)
+        resultados.append(verificar(
+            estados.delta_do_frame(len(estados) - 2)[1] == COR_CONFLITO
+            and "CONFLITO" in estados.texto_do_frame(len(estados) - 2)
+            and estados.eh_bipartido is False,
+            "conflito aparece como passo da animacao"))
+        return all(resultados)
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def cores_dos_vertices(cena, quadro, cores_no_frame):
+    """Confere se cada vértice do quadro RGBA está pintado com a cor do seu estado no frame"""
+    import numpy as np
+    from matplotlib.colors import to_rgb
+    from animacao import CORES_ANIMACAO
+
+    paleta = np.array([to_rgb(CORES_ANIMACAO[c]) for c in range(len(CORES_ANIMACAO))]) * 255
+    altura = quadro.shape[0]
+    # Um ponto dentro do círculo, acima do rótulo centralizado
+    for (x, y), cor in zip(cena.ax1.transData.transform(cena._xy), cores_no_frame):
+        pixel = quadro[int(round(altura - y)) - 12, int(round(x))][:3].astype(float)
+        if np.abs(paleta - pixel).sum(axis=1).argmin() != cor:
+            return False
+    return True
+
+
+def testar_animacao():
+    """Testa a renderização com blit da animação contra o redesenho completo de cada frame"""
+    print("\n" + "="*60)
+    print("TESTANDO ANIMACAO")
+    print("="*60)
+
+    try:
+        import random
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import numpy as np
+        from animacao import CenaAnimacao, construir_estados_animacao
+
+        rng = random.Random(27)
+        grafo = grafo_aleatorio(rng, 8, 5, 3)
+        grafo.adicionar_aresta("U0", "U1")
+        vertices = sorted(grafo.vertices)
+        pos = {v: (5 * (v in grafo.filmes), 1.5 * i) for i, v in enumerate(vertices)}
+        arestas = [(u, f) for u in grafo.usuarios for f in grafo.vizinhos(u)]
+
+        # Keyframes pequenos e grandes reconstroem as mesmas cores
+        estados = construir_estados_animacao(grafo, intervalo_keyframe=3)
+        sem_keyframes = construir_estados_animacao(grafo, intervalo_keyframe=10 ** 6)
+        keyframes = len(estados.keyframes) > 1 and all(
+            estados.cores_no_frame(f) == sem_keyframes.cores_no_frame(f) for f in range(len(estados)))
+
+        cena = CenaAnimacao(estados, pos, arestas)
+        referencia = CenaAnimacao(estados, pos, arestas)
+        try:
+            blit = [np.array(quadro) for quadro in cena.renderizar(range(len(estados)))]
+            cores_ok = texto_ok = aneis = True
+            altura, largura = blit[0].shape[:2]
+            linhas, colunas = np.mgrid[0:altura, 0:largura]
+            centros = referencia.ax1.transData.transform(referencia._xy)
+            for frame, quadro in enumerate(blit):
+                # Redesenho completo do frame (salto), sem reaproveitar o fundo
+                referencia.frame = None
+                completo = np.array(next(referencia.renderizar([frame])))
+                cores_ok = cores_ok and cores_dos_vertices(cena, quadro, estados.cores_no_frame(frame))
+                diferentes = np.abs(completo.astype(int) - quadro).max(axis=2) > 0
+                # Só a borda suavizada dos vértices recoloridos pode diferir
+                perto = np.zeros_like(diferentes)
+                for i in set(estados.delta_vertice[:frame]):
+                    x, y = centros[i]
+                    perto |= (colunas - x) ** 2 + (linhas - (altura - y)) ** 2 <= 30 ** 2
+                aneis = aneis and not (diferentes & ~perto).any()
+                painel = referencia.ax2.bbox
+                texto_ok = texto_ok and not diferentes[int(altura - painel.y1):int(altura - painel.y0),
+                                                       int(painel.x0):int(painel.x1)].any()
+        finally:
+            plt.close(cena.fig)
+            plt.close(referencia.fig)
+
+        return all([
+            verificar(keyframes, "keyframes reconstroem as mesmas cores dos deltas"),
+            verificar(len(blit) == len(estados), "um quadro por frame"),
+            verificar(cores_ok, "cada vertice com a cor do seu estado em todo quadro"),
+            verificar(aneis, "quadros com blit iguais ao redesenho fora das bordas dos vertices"),
+            verificar(texto_ok, "painel de explicacao igual ao redesenho"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_animacao_paralela():
+    """Testa a gravação da animação em trechos paralelos contra a gravação em um processo"""
+    print("\n" + "="*60)
+    print("TESTANDO ANIMACAO EM PARALELO")
+    print("="*60)
+
+    try:
+        import contextlib
+        import io
+        import os
+        import tempfile
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        import numpy as np
+        from PIL import Image
+        from animacao import AnimadorBipartido, CenaAnimacao
+
+        def quadros_gif(arquivo):
+            with Image.open(arquivo) as imagem:
+                quadros = []
+                for i in range(imagem.n_frames):
+                    imagem.seek(i)
+                    quadros.append(np.array(imagem.convert('RGB')))
+            return quadros
+
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo_grafo = os.path.join(pasta, "grafo.txt")
+            with open(arquivo_grafo, "w", encoding="utf-8") as f:
+                f.write("Ana,Matrix\nBia,Matrix\nBia,Duna\nCris,Duna\nCris,Her\nDani,Up\nDani,Her\n")
+            with contextlib.redirect_stdout(io.StringIO()):
+                animador = AnimadorBipartido(arquivo_grafo)
+            estados = animador.estados
+
+            gravados = {}
+            for processos in (1, 3):
+                arquivo = os.path.join(pasta, f"animacao_{processos}.gif")
+                animador._salvar(arquivo, 2, processos)
+                gravados[processos] = quadros_gif(arquivo)
+            sobras = sorted(os.listdir(pasta))
+
+        cena = CenaAnimacao(estados, animador.pos, animador.arestas)
+        try:
+            contagem = all(len(quadros) == len(estados) for quadros in gravados.values())
+            cores = all(cores_dos_vertices(cena, quadro, estados.cores_no_frame(frame))
+                        for quadros in gravados.values() for frame, quadro in enumerate(quadros))
+        finally:
+            plt.close(cena.fig)
+        primeiro = all(np.array_equal(quadros[0], gravados[1][0]) for quadros in gravados.values())
+
+        return all([
+            verificar(contagem, "todos os frames gravados, com 1 ou 3 processos"),
+            verificar(cores, "trechos concatenados na ordem dos frames"),
+            verificar(primeiro, "primeiro quadro igual ao da gravacao serial"),
+            verificar(sobras == ["animacao_1.gif", "animacao_3.gif", "grafo.txt"], "trechos temporarios apagados"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_excel():
+    """Testa o teste de mesa em Excel contra a execução do BFS e a continuação em novas abas"""
+    print("\n" + "="*60)
+    print("TESTANDO TESTE DE MESA EM EXCEL")
+    print("="*60)
+
+    try:
+        import os
+        import random
+        import tempfile
+        import networkx as nx
+        from openpyxl import load_workbook
+        import criar_excel_completo
+        from grafo_bipartido import COLORIR, FIM, INICIO_COMPONENTE
+
+        def abas(arquivo):
+            livro = load_workbook(arquivo, read_only=True)
+            conteudo = {aba.title: [list(linha) for linha in aba.iter_rows(values_only=True)]
+                        for aba in livro.worksheets}
+            livro.close()
+            return conteudo
+
+        def juntar(conteudo, cabecalhos):
+            # Abas de continuação viram uma só, sem os cabeçalhos repetidos
+            juntas = {}
+            for titulo, linhas in conteudo.items():
+                base = titulo.split(" (")[0]
+                if base in juntas and linhas and linhas[0] in cabecalhos:
+                    linhas = linhas[1:]
+                juntas.setdefault(base, []).extend(linhas)
+            return juntas
+
+        def tabela(linhas, titulo, cabecalho=True):
+            inicio = next(i for i, linha in enumerate(linhas) if linha[:1] == [titulo]) + 1 + cabecalho
+            fim = next((i for i in range(inicio, len(linhas)) if not linhas[i]), len(linhas))
+            return linhas[inicio:fim]
+
+        rng = random.Random(30)
+        entrada = execucao = resultado = continuacao = True
+        limite_original = criar_excel_completo.MAX_LINHAS_POR_ABA
+        with tempfile.TemporaryDirectory() as pasta:
+            for rodada in range(6):
+                grafo = grafo_aleatorio(rng, 12, 8, 3)
+                if rodada % 2:
+                    grafo.adicionar_aresta("U0", "U1")
+                arquivo = os.path.join(pasta, f"mesa{rodada}.xlsx")
+                criar_excel_completo.exportar_teste_de_mesa(grafo, arquivo)
+                conteudo = abas(arquivo)
+
+                arestas = {(linha[1], linha[2]) for linha in tabela(conteudo["1. Grafo de Entrada"],
+                                                                    'TABELA 1: LISTA DE ARESTAS')}
+                adjacencias = {linha[0]: linha[2] for linha in tabela(conteudo["1. Grafo de Entrada"],
+                                                                      'TABELA 2: LISTA DE ADJACÊNCIAS')}
+                entrada = entrada and arestas == {(u, f) for u in grafo.usuarios for f in grafo.vizinhos(u)} \
+                    and adjacencias == {v: ', '.join(grafo.vizinhos(v)) for v in grafo.vertices}
+
+                eventos = []
+                for evento in grafo.eventos_bfs():
+                    eventos.append(evento)
+                    if evento.tipo == FIM:
+                        break
+                passos = tabela(conteudo["3. Execucao BFS"], 'EXECUÇÃO DO ALGORITMO BFS')
+                coloridos = [(linha[3], linha[4]) for linha in passos if linha[1] in ('Iniciar BFS', 'Colorir')]
+                execucao = execucao and len(passos) == len(eventos) + 1 and coloridos == [
+                    (e.vertice, e.cor) for e in eventos if e.tipo in (INICIO_COMPONENTE, COLORIR)]
+
+                bipartido, cor, _ = grafo.eh_bipartido_bfs(registrar_passos=False)
+                estatisticas = dict(tabela(conteudo["4. Resultado"], 'ESTATÍSTICAS', cabecalho=False))
+                g = nx.Graph([(u, f) for u in grafo.usuarios for f in grafo.vizinhos(u)])
+                resultado = resultado and eventos[-1].bipartido == bipartido and (
+                    estatisticas['É bipartido?'] == ('SIM' if bipartido else 'NÃO')
+                    and estatisticas['Total de arestas'] == grafo.total_arestas()
+                    and (not bipartido or (
+                        estatisticas['Componentes conexos'] == nx.number_connected_components(g)
+                        and estatisticas['Vértices em V1'] == sum(1 for c in cor.values() if c == 1))))
+
+                # Abas pequenas: o conteúdo continua em novas abas sem perder linhas
+                cabecalhos = [linha for linhas in conteudo.values() for i, linha in enumerate(linhas)
+                              if i and len(linhas[i - 1]) == 1 and linha and all(isinstance(c, str) for c in linha)]
+                criar_excel_completo.MAX_LINHAS_POR_ABA = 5
+                try:
+                    dividido = os.path.join(pasta, f"dividido{rodada}.xlsx")
+                    criar_excel_completo.exportar_teste_de_mesa(grafo, dividido)
+                finally:
+                    criar_excel_completo.MAX_LINHAS_POR_ABA = limite_original
+                partes = abas(dividido)
+                # A aba da execução é uma tabela só: toda continuação repete o cabeçalho
+                repetido = all(linhas[0] == conteudo["3. Execucao BFS"][1] for titulo, linhas in partes.items()
+                               if titulo.startswith("3. Execucao BFS ("))
+                continuacao = continuacao and len(partes) > len(conteudo) and repetido \
+                    and juntar(partes, cabecalhos) == conteudo
+
+        return all([
+            verificar(entrada, "aba 1 com as arestas e adjacencias do grafo"),
+            verificar(execucao, "aba 3 com um passo por evento do BFS, nas mesmas cores"),
+            verificar(resultado, "aba 4 com o resultado e as estatisticas do BFS"),
+            verificar(continuacao, "abas de continuacao guardam as mesmas linhas"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_importacao_preguicosa():
+    """Testa que os módulos do projeto só carregam bibliotecas de terceiros ao usá-las"""
+    print("\n" + "="*60)
+    print("TESTANDO IMPORTACAO PREGUICOSA")
+    print("="*60)
+
+    try:
+        import os
+        import subprocess
+
+        diretorio = os.path.dirname(os.path.abspath(__file__))
+        modulos = sorted(os.path.splitext(nome)[0] for nome in os.listdir(diretorio)
+                         if nome.endswith('.py') and nome != 'testar_simples.py')
+
+        def terceiros(codigo):
+            # Módulos de terceiros carregados por `codigo` em um interpretador novo
+            verificacao = (
+                "import os, sys\n"
+                "locais = {os.path.splitext(n)[0] for n in os.listdir('.') if n.endswith('.py')}\n"
+                "inicio = set(sys.modules)\n"
+                f"{codigo}\n"
+                "novos = {n.split('.')[0] for n in set(sys.modules) - inicio if not n.startswith('__')}\n"
+                "print(' '.join(sorted(novos - locais - set(sys.stdlib_module_names))))\n")
+            saida = subprocess.run([sys.executable, '-c', verificacao], capture_output=True, text=True,
+                                   cwd=diretorio, check=True)
+            return saida.stdout.split()
+
+        importacao = terceiros("\n".join(f"import {modulo}" for modulo in modulos))
+        # Caminhos sem desenho nem NumPy continuam sem carregá-los
+        uso = terceiros(
+            "import animacao, exportacao, grafo_bipartido, tempfile\n"
+            "g = grafo_bipartido.GrafoBipartido()\n"
+            "g.carregar_de_linhas(['Ana,Matrix', 'Bia,Matrix', 'Bia,Duna'])\n"
+            "animacao.construir_estados_animacao(g)\n"
+            "exportacao.exportar_coloracao(g, os.path.join(tempfile.mkdtemp(), 'cores.csv'))")
+        # E quem precisa do NumPy o importa na hora
+        numpy_sob_demanda = terceiros(
+            "import grafo_bipartido, pagerank\n"
+            "g = grafo_bipartido.GrafoBipartido()\n"
+            "g.carregar_de_linhas(['Ana,Matrix', 'Bia,Matrix', 'Bia,Duna'])\n"
+            "pagerank.RecomendadorPageRank(g, usar_numpy=True).pagerank_lote(['Ana'])")
+
+        return all([
+            verificar(len(modulos) > 10 and not importacao,
+                      f"importar os {len(modulos)} modulos nao carrega terceiros" + (f" {importacao}" if importacao else "")),
+            verificar(not uso, "BFS, estados da animacao e CSV sem terceiros" + (f" {uso}" if uso else "")),
+            verificar('numpy' in numpy_sob_demanda, "NumPy importado ao ser usado"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_recomendacao():
+    """Testa a pontuação das recomendações, os limites para hubs e a exportação colunar"""
+    print("\n" + "="*60)
+    print("TESTANDO RECOMENDACAO")
+    print("="*60)
+
+    try:
+        import random
+        import subprocess
+        import tempfile
+        from grafo_bipartido import LimitesRecomendacao
+        from exportacao import exportar_coloracao, exportar_recomendacoes
+
+        def pontuacao_direta(grafo, usuario):
+            # Definição: filmes não vistos, contados uma vez por usuário similar que os viu
+            assistidos = set(grafo.vizinhos(usuario))
+            similares = {outro for filme in assistidos for outro in grafo.vizinhos(filme)} - {usuario}
+            pontuacao = {}
+            for outro in similares:
+                for filme in set(grafo.vizinhos(outro)) - assistidos:
+                    pontuacao[filme] = pontuacao.get(filme, 0) + 1
+            return pontuacao
+
+        rng = random.Random(11)
+        iguais = amostra_total = True
+        for _ in range(50):
+            grafo = grafo_aleatorio(rng)
+            maior_grau = max(len(grafo.vizinhos(f)) for f in grafo.filmes)
+            for usuario in grafo.usuarios:
+                esperado = pontuacao_direta(grafo, usuario)
+                iguais &= grafo.pontuar_recomendacoes(usuario) == esperado
+                amostra_total &= grafo.pontuar_recomendacoes(
+                    usuario, LimitesRecomendacao(max_espectadores=maior_grau)) == esperado
+
+        # A amostragem não pode depender da ordem de conjuntos de nomes (PYTHONHASHSEED)
+        programa = ("import random, testar_simples as t; from grafo_bipartido import LimitesRecomendacao as L\n"
+                    "g = t.grafo_aleatorio(random.Random(5), 200, 30, 8)\n"
+                    "print([g.ranquear_filmes(u, 5, L(max_espectadores=3, semente=7, orcamento=60)) "
+                    "for u in sorted(g.usuarios)])")
+        saidas = {subprocess.run([sys.executable, '-c', programa], capture_output=True, text=True,
+                                 env=dict(os.environ, PYTHONHASHSEED=str(semente))).stdout
+                  for semente in range(1, 4)}
+
+        grafo = grafo_aleatorio(random.Random(3), 40, 10, 5)
+        grafo.limites_recomendacao = LimitesRecomendacao(idf=True)
+        ranking = {(u, f): p for u in grafo.usuarios for f, p in grafo.ranquear_filmes(u, 10)}
+        exportados = True
+        with tempfile.TemporaryDirectory() as pasta:
+            for extensao in ('.npz', '.parquet', '.arrow', '.csv'):
+                colunas = colunas_exportadas(exportar_recomendacoes(grafo, os.path.join(pasta, 'rec' + extensao)))
+                exportados &= colunas['pontuacao'] == [ranking[chave]
+                                                       for chave in zip(colunas['usuario'], colunas['filme'])]
+                caminho, _ = exportar_coloracao(grafo, os.path.join(pasta, 'cor' + extensao))
+                exportados &= len(colunas_exportadas(caminho)['vertice']) == len(grafo.vertices)
+
+        return all([
+            verificar(iguais, "pontuacao igual a definicao em 50 grafos aleatorios"),
+            verificar(amostra_total, "amostra do tamanho do maior grau nao muda a pontuacao"),
+            verificar(len(saidas) == 1 and saidas != {''}, "amostragem igual com PYTHONHASHSEED diferentes"),
+            verificar(any(p != int(p) for p in ranking.values()), "pontuacao IDF nao inteira"),
+            verificar(exportados, "exportacao colunar preserva as pontuacoes reais"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_exportacao():
+    """Testa a exportação colunar em lotes (NumPy, Arrow, Parquet e CSV)"""
+    print("\n" + "="*60)
+    print("TESTANDO EXPORTACAO COLUNAR")
+    print("="*60)
+
+    try:
+        import tempfile
+        from exportacao import exportar_coloracao, exportar_linhas
+        from grafo_bipartido import GrafoBipartido
+
+        # Textos de larguras diferentes em cada lote e um lote incompleto no fim
+        linhas = [(f"v{i}" + "x" * (i % 13), i, i / 7) for i in range(2500)]
+        colunas = [('nome', 'str'), ('numero', 'int'), ('real', 'float')]
+        grafo = GrafoBipartido()
+        grafo.carregar_de_arquivo('exemplo3.txt')
+        _, cor, _ = grafo.eh_bipartido_bfs(registrar_passos=False)
+        lotes = coloracoes = vazios = True
+        with tempfile.TemporaryDirectory() as pasta:
+            for extensao in ('.npz', '.parquet', '.arrow', '.csv'):
+                lido = colunas_exportadas(exportar_linhas(os.path.join(pasta, 'linhas' + extensao),
+                                                          colunas, iter(linhas), tamanho_lote=300))
+                lotes &= [lido['nome'], [int(n) for n in lido['numero']], [float(r) for r in lido['real']]] \
+                    == [list(coluna) for coluna in zip(*linhas)]
+                caminho, bipartido = exportar_coloracao(grafo, os.path.join(pasta, 'cor' + extensao))
+                lido = colunas_exportadas(caminho)
+                coloracoes &= bipartido and {v: int(c) for v, c in zip(lido['vertice'], lido['cor'])} == cor
+                if extensao != '.csv':
+                    caminho = exportar_linhas(os.path.join(pasta, 'vazio' + extensao), colunas, iter([]))
+                    vazios &= all(len(coluna) == 0 for coluna in colunas_exportadas(caminho).values())
+
+        return all([
+            verificar(lotes, "colunas iguais as linhas em todos os formatos, em varios lotes"),
+            verificar(coloracoes, "coloracao exportada igual a do BFS"),
+            verificar(vazios, "exportacao sem linhas"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def colunas_exportadas(caminho):
+    """Lê de volta as colunas de um arquivo gravado por exportacao.py"""
+    if caminho.endswith('.npz'):
+        import numpy as np
+        with np.load(caminho) as arquivo:
+            return {nome: arquivo[nome].tolist() for nome in arquivo.files}
+    if caminho.endswith('.csv'):
+        import csv
+        with open(caminho, encoding='utf-8', newline='') as arquivo:
+            linhas = list(csv.DictReader(arquivo))
+        return {nome: [float(l[nome]) if nome == 'pontuacao' else l[nome] for l in linhas]
+                for nome in (linhas[0] if linhas else {})}
+    import pyarrow as pa
+    if caminho.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.read_table(caminho).to_pydict()
+    with pa.ipc.open_file(caminho) as leitor:
+        return leitor.read_all().to_pydict()
+
+
+def testar_projecao():
+    """Compara a projeção com orçamento de memória (fatias e disco) à definição direta"""
+    print("\n" + "="*60)
+    print("TESTANDO PROJECAO")
+    print("="*60)
+
+    try:
+        import random
+        import sys as sistema
+        from projecao import BYTES_POR_ENTRADA, adjacencias_do_lado, construir_projecao
+
+        def projecao_direta(grafo, lado, peso_minimo, top_n):
+            fontes = grafo.usuarios if lado == 'usuarios' else grafo.filmes
+            resultado = {}
+            for fonte in sorted(fontes):
+                pesos = {}
+                for meio in set(grafo.vizinhos(fonte)):
+                    for outro in set(grafo.vizinhos(meio)) - {fonte}:
+                        pesos[outro] = pesos.get(outro, 0) + 1
+                vizinhos = sorted(((v, p) for v, p in pesos.items() if p >= peso_minimo),
+                                  key=lambda item: (-item[1], item[0]))[:top_n]
+                if vizinhos:
+                    resultado[fonte] = vizinhos
+            return resultado
+
+        def memoria_minima(grafo, lado, processos=1):
+            fontes, adjacencias = adjacencias_do_lado(grafo, lado)
+            copias = 1 if processos == 1 else 1 + processos
+            return (copias * sum(a.itemsize * len(a) for a in adjacencias)
+                    + sistema.getsizeof(fontes) + 2 * processos * BYTES_POR_ENTRADA)
+
+        rng = random.Random(23)
+        iguais, em_disco = True, False
+        for i in range(40):
+            grafo = grafo_aleatorio(rng, 40, 12, 6)
+            lado = ('usuarios', 'filmes')[i % 2]
+            peso_minimo, top_n = rng.choice([1, 2]), rng.choice([None, 1, 3])
+            esperado = projecao_direta(grafo, lado, peso_minimo, top_n)
+            # Folga de poucas entradas: força fatias por vértice e resultado em disco
+            for folga in (0, 20 * BYTES_POR_ENTRADA, 10 ** 8):
+                with construir_projecao(grafo, lado, peso_minimo, top_n,
+                                        memoria_minima(grafo, lado) + folga) as projecao:
+                    iguais &= projecao.para_dict() == esperado
+                    em_disco |= projecao.linhas_em_disco > 0
+
+        grafo = grafo_aleatorio(rng, 40, 12, 6)
+        with construir_projecao(grafo, 'usuarios', memoria_maxima=memoria_minima(grafo, 'usuarios', 2) + 4000,
+                                processos=2) as projecao:
+            paralela = projecao.para_dict() == projecao_direta(grafo, 'usuarios', 1, None)
+        try:
+            construir_projecao(grafo, 'usuarios', memoria_maxima=memoria_minima(grafo, 'usuarios') - 1)
+            recusada = False
+        except ValueError:
+            recusada = True
+
+        return all([
+            verificar(iguais, "igual a definicao em 40 grafos, com orcamento minimo e folgado"),
+            verificar(em_disco, "orcamento pequeno grava o resultado em disco"),
+            verificar(paralela, "igual com 2 processos"),
+            verificar(recusada, "orcamento menor que as adjacencias e recusado"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_similaridade():
+    """Testa o índice MinHash/LSH contra o Jaccard exato e contra um índice refeito do zero"""
+    print("\n" + "="*60)
+    print("TESTANDO SIMILARIDADE (MINHASH)")
+    print("="*60)
+
+    try:
+        import random
+        from similaridade import IndiceMinHash, jaccard_exato, similares_exatos
+
+        def estado(indice):
+            baldes = [{chave: frozenset(balde) for chave, balde in banda.items()} for banda in indice.baldes]
+            return dict(indice.assinaturas), baldes
+
+        rng = random.Random(29)
+        grafo = grafo_aleatorio(rng, 120, 40, 10)
+        # Pares de usuários com os mesmos filmes
+        for u in range(10):
+            for filme in grafo.vizinhos(f"U{u}"):
+                grafo.adicionar_aresta(f"Copia{u}", filme)
+        indice = IndiceMinHash(grafo)
+
+        definicao = all(list(indice.assinaturas[u]) == [min(valores) for valores in zip(
+            *(indice.assinatura_filme(f) for f in set(grafo.vizinhos(u))))] for u in grafo.usuarios)
+        copias = all(indice.estimar_jaccard(f"U{u}", f"Copia{u}") == 1.0
+                     and f"Copia{u}" in indice.candidatos(f"U{u}") for u in range(10))
+        pares = [(a, b) for a in sorted(grafo.usuarios)[:40] for b in sorted(grafo.usuarios)[40:80]]
+        erro = sum(abs(indice.estimar_jaccard(a, b) - jaccard_exato(grafo, a, b)) for a, b in pares) / len(pares)
+        limiar = 0.5
+        exatos = all({u for u, _ in indice.similares(usuario, limiar, exato=True)}
+                     <= {u for u, _ in similares_exatos(grafo, usuario, limiar)}
+                     for usuario in grafo.usuarios)
+
+        # O índice acompanha o grafo: igual a um índice refeito após as alterações
+        for _ in range(200):
+            grafo.adicionar_aresta(f"U{rng.randrange(150)}", f"F{rng.randrange(45)}")
+        for _ in range(40):
+            usuario = rng.choice(sorted(grafo.usuarios))
+            grafo.remover_aresta(usuario, rng.choice(grafo.vizinhos(usuario) or ["F0"]))
+        grafo.remover_vertice("F3")
+        grafo.remover_vertice("U7")
+        acompanha = estado(indice) == estado(IndiceMinHash(grafo, acompanhar=False))
+
+        return all([
+            verificar(definicao, "assinatura e o minimo dos valores dos filmes"),
+            verificar(copias, "usuarios com os mesmos filmes colidem com Jaccard 1"),
+            verificar(erro < 0.1, f"erro medio da estimativa pequeno ({erro:.3f})"),
+            verificar(exatos, "similares exatos do indice estao entre os exatos"),
+            verificar(acompanha, "indice atualizado igual a um indice refeito"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_sqlite():
+    """Testa o GrafoSQLite contra o GrafoBipartido em memória com as mesmas operações"""
+    print("\n" + "="*60)
+    print("TESTANDO ARMAZENAMENTO SQLITE")
+    print("="*60)
+
+    try:
+        import os
+        import random
+        import tempfile
+        from armazenamento_sqlite import GrafoSQLite
+        from similaridade import IndiceMinHash
+
+        def retrato(grafo):
+            vertices = sorted(grafo.vertices)
+            return (vertices, sorted(grafo.usuarios), sorted(grafo.filmes), grafo.total_arestas(),
+                    {v: sorted(grafo.vizinhos(v)) for v in vertices})
+
+        def coloracao_valida(grafo, cor):
+            return all(cor[v] != cor[w] for v in grafo.vertices for w in grafo.vizinhos(v))
+
+        def mesmo_comportamento(grafo, banco):
+            bip_grafo, _, _ = grafo.eh_bipartido_bfs(registrar_passos=False)
+            bip_banco, cor, _ = banco.eh_bipartido_bfs(registrar_passos=False)
+            return (retrato(grafo) == retrato(banco) and bip_grafo == bip_banco
+                    and (not bip_banco or coloracao_valida(banco, cor))
+                    and all(grafo.ranquear_filmes(u) == banco.ranquear_filmes(u) for u in grafo.usuarios))
+
+        rng = random.Random(42)
+        iguais = removidos = reaberto = indice_ok = True
+        with tempfile.TemporaryDirectory() as pasta:
+            for rodada in range(8):
+                grafo = grafo_aleatorio(rng, 40, 20, 5)
+                if rodada % 2:
+                    # Um vértice usuário e filme fecha um ciclo ímpar
+                    grafo.adicionar_aresta("U0", "U1")
+                linhas = [f"{u},{f}" for u in sorted(grafo.usuarios) for f in grafo.vizinhos(u)
+                          if f in grafo.filmes and (u, f) != ("U1", "U0")]
+                caminho = os.path.join(pasta, f"grafo{rodada}.db")
+                # Cache pequeno para exercitar o LRU; metade carrega em lote, metade aresta a aresta
+                banco = GrafoSQLite(caminho, cache_entradas=8)
+                if rodada < 4:
+                    banco.carregar_de_linhas(linhas)
+                else:
+                    for linha in linhas:
+                        banco.adicionar_aresta(*linha.split(","))
+                iguais = iguais and mesmo_comportamento(grafo, banco)
+
+                indice = IndiceMinHash(banco)
+                for _ in range(10):
+                    usuario = rng.choice(sorted(grafo.usuarios))
+                    filme = rng.choice(grafo.vizinhos(usuario) + ["F99"])
+                    mesmo = grafo.remover_aresta(usuario, filme) == banco.remover_aresta(usuario, filme)
+                    removidos = removidos and mesmo
+                for vertice in (f"F{rng.randrange(20)}", f"U{rng.randrange(5)}", "Inexistente"):
+                    removidos = removidos and grafo.remover_vertice(vertice) == banco.remover_vertice(vertice)
+                grafo.compactar()
+                removidos = removidos and mesmo_comportamento(grafo, banco)
+                novo = IndiceMinHash(banco, acompanhar=False)
+                indice_ok = indice_ok and dict(indice.assinaturas) == dict(novo.assinaturas)
+                banco.fechar()
+
+                with GrafoSQLite(caminho, cache_entradas=8) as banco:
+                    reaberto = reaberto and mesmo_comportamento(grafo, banco)
+
+            cache = GrafoSQLite(os.path.join(pasta, "cache.db"), cache_entradas=8)
+            cache.carregar_de_linhas([f"U{u},F{f}" for u in range(10) for f in range(3)])
+            for u in range(10):
+                cache.vizinhos(f"U{u}")
+                cache.vizinhos(f"U{u}")
+            limitado = cache.entradas_cache <= 8 and cache.acertos_cache > 0 and cache.falhas_cache >= 10
+            cache.fechar()
+
+        return all([
+            verificar(iguais, "mesmos vertices, papeis, vizinhos, BFS e recomendacoes"),
+            verificar(removidos, "remocoes iguais as do grafo em memoria"),
+            verificar(reaberto, "banco reaberto guarda o mesmo grafo"),
+            verificar(indice_ok, "indice MinHash sobre o banco igual a um refeito"),
+            verificar(limitado, "cache LRU respeita o limite de entradas"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_streaming():
+    """Testa a verificação em uma passada contra o BFS do GrafoBipartido e o networkx"""
+    print("\n" + "="*60)
+    print("TESTANDO VERIFICACAO EM FLUXO")
+    print("="*60)
+
+    try:
+        import io
+        import os
+        import random
+        import tempfile
+        import networkx as nx
+        from grafo_bipartido import GrafoBipartido
+        from verificacao_streaming import verificar_arquivo, verificar_fluxo
+
+        def bfs(linhas):
+            grafo = GrafoBipartido()
+            grafo.carregar_de_linhas(linhas)
+            return grafo.eh_bipartido_bfs(registrar_passos=False)[0]
+
+        def fluxo(linhas, parar=True):
+            return verificar_fluxo(io.BytesIO("".join(l + "\n" for l in linhas).encode()), parar)
+
+        rng = random.Random(43)
+        iguais = completos = primeira = True
+        for rodada in range(150):
+            # Nomes de um só conjunto, para que apareçam ciclos ímpares
+            nomes = [f"V{i}" for i in range(rng.randrange(2, 25))]
+            linhas = []
+            for _ in range(rng.randrange(1, 40)):
+                a, b = rng.sample(nomes, 2)
+                linhas.append(rng.choice([f"{a},{b}", f" {a} , {b} ", f"{a},{b},{rodada}"]))
+                if rng.random() < 0.1:
+                    linhas.append(rng.choice(["", "# comentario", "so_um_campo", "a,b,c,d"]))
+            arestas = [tuple(c.strip() for c in l.split(",")[:2]) for l in linhas
+                       if 2 <= len(l.split(",")) <= 3 and not l.lstrip().startswith("#")]
+            g = nx.Graph(arestas)
+
+            resultado = fluxo(linhas, parar=False)
+            iguais = iguais and resultado.bipartido == nx.is_bipartite(g) == bfs(linhas)
+            completos = completos and (resultado.linhas_lidas, resultado.arestas, resultado.vertices,
+                                       resultado.componentes) == (
+                len(linhas), len(arestas), g.number_of_nodes(), nx.number_connected_components(g))
+
+            # A linha informada é a primeira cujo prefixo deixa de ser bipartido
+            parcial = fluxo(linhas)
+            if parcial.bipartido:
+                primeira = primeira and parcial.linha is None and parcial.aresta is None
+            else:
+                linha = linhas[parcial.linha - 1]
+                primeira = primeira and (
+                    bfs(linhas[:parcial.linha]) is False and bfs(linhas[:parcial.linha - 1])
+                    and parcial.aresta == tuple(c.strip() for c in linha.split(",")[:2])
+                    and parcial.linhas_lidas == parcial.linha == resultado.linha)
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "grafo.txt")
+            with open(caminho, "w", encoding="utf-8") as f:
+                f.write("Ana,Matrix\nBia,Matrix\nAna,Bia\nCris,Duna\n")
+            arquivo = verificar_arquivo(caminho, parar_no_conflito=False)
+
+        return all([
+            verificar(iguais, "mesma resposta do BFS e do networkx"),
+            verificar(completos, "linhas, arestas, vertices e componentes como no networkx"),
+            verificar(primeira, "informa a primeira aresta que fecha um ciclo impar"),
+            verificar(arquivo == (False, 3, ("Ana", "Bia"), 4, 4, 5, 2), "verifica um arquivo em disco"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_pagerank():
+    """Testa o PageRank personalizado: NumPy contra Python puro, contra a solução exata e o Monte Carlo"""
+    print("\n" + "="*60)
+    print("TESTANDO PAGERANK PERSONALIZADO")
+    print("="*60)
+
+    try:
+        import random
+        import numpy as np
+        from pagerank import RecomendadorPageRank
+
+        def exato(recomendador, usuario):
+            # Com todos os usuários assistindo algum filme: pu = alfa * e (I - (1 - alfa) P)^-1
+            alfa = recomendador.alfa
+            usuarios, filmes = recomendador.usuarios, recomendador.filmes
+            biadjacencia = np.zeros((len(usuarios), len(filmes)))
+            for u in range(len(usuarios)):
+                for f in recomendador._filmes_assistidos(u):
+                    biadjacencia[u, f] = 1.0
+            usuario_filme = biadjacencia / biadjacencia.sum(axis=1)[:, None]
+            filme_usuario = (biadjacencia / biadjacencia.sum(axis=0)).T
+            recomeco = np.zeros(len(usuarios))
+            recomeco[recomendador.indice_usuario[usuario]] = 1.0
+            transicao = usuario_filme @ filme_usuario
+            pu = alfa * np.linalg.solve((np.eye(len(usuarios)) - (1 - alfa) * transicao).T, recomeco)
+            return (1 - alfa) * pu @ usuario_filme
+
+        rng = random.Random(46)
+        paridade = definicao = lote_ok = True
+        for _ in range(15):
+            grafo = grafo_aleatorio(rng, 40, 25, 5)
+            usuarios = sorted(grafo.usuarios)
+            alfa = rng.choice([0.15, 0.3, 0.6])
+            com_numpy = RecomendadorPageRank(grafo, alfa, usar_numpy=True)
+            sem_numpy = RecomendadorPageRank(grafo, alfa, usar_numpy=False)
+            rapido = np.array(com_numpy.pagerank_lote(usuarios, tolerancia=1e-12))
+            lento = np.array(sem_numpy.pagerank_lote(usuarios, tolerancia=1e-12))
+            paridade = paridade and np.abs(rapido - lento).max() < 1e-9
+            definicao = definicao and all(
+                np.abs(rapido[i] - exato(com_numpy, usuario)).max() < 1e-8
+                and abs(rapido[i].sum() - (1 - alfa)) < 1e-8 for i, usuario in enumerate(usuarios))
+
+            listas = com_numpy.recomendar_lote(usuarios + ["Ninguem"], k=3, tolerancia=1e-12)
+            listas_python = sem_numpy.recomendar_lote(usuarios, k=3, tolerancia=1e-12)
+            for i, usuario in enumerate(usuarios):
+                assistidos = set(grafo.vizinhos(usuario))
+                esperado = sorted(((filme, rapido[i][f]) for f, filme in enumerate(com_numpy.filmes)
+                                   if filme not in assistidos and rapido[i][f] > 0),
+                                  key=lambda item: (-item[1], item[0]))[:3]
+                obtido, python = listas[usuario], listas_python[usuario]
+                lote_ok = lote_ok and (
+                    [filme for filme, _ in obtido] == [filme for filme, _ in esperado]
+                    == [filme for filme, _ in python]
+                    and all(abs(a[1] - b[1]) < 1e-9 for a, b in zip(obtido, esperado)))
+            lote_ok = lote_ok and listas["Ninguem"] == []
+
+        # Monte Carlo: estimativa próxima da solução exata, com segmentos de NumPy ou de Python
+        grafo = grafo_aleatorio(random.Random(7), 60, 30, 6)
+        usuario = sorted(grafo.usuarios)[0]
+        monte_carlo = True
+        for usar_numpy in (True, False):
+            recomendador = RecomendadorPageRank(grafo, usar_numpy=usar_numpy)
+            pontuacoes = dict(zip(recomendador.filmes, exato(recomendador, usuario)))
+            estimativa = recomendador.recomendar_monte_carlo(usuario, k=5, passeios=40000, semente=3)
+            monte_carlo = monte_carlo and len(estimativa) == 5 and all(
+                abs(pontuacao - pontuacoes[filme]) < 0.01 for filme, pontuacao in estimativa)
+            monte_carlo = monte_carlo and estimativa == recomendador.recomendar_monte_carlo(
+                usuario, k=5, passeios=40000, semente=3)
+
+        try:
+            com_numpy.pagerank_lote(["Ninguem"])
+            desconhecido = False
+        except KeyError:
+            desconhecido = True
+
+        return all([
+            verificar(paridade, "NumPy e Python puro dao as mesmas pontuacoes"),
+            verificar(definicao, "pontuacoes iguais a solucao exata do sistema linear"),
+            verificar(lote_ok, "recomendar_lote traz o top-k dos filmes nao assistidos"),
+            verificar(monte_carlo, "Monte Carlo proximo do exato e reproduzivel"),
+            verificar(desconhecido, "pagerank_lote rejeita usuario desconhecido"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_concorrencia():
+    """Testa as versões imutáveis do GrafoConcorrente contra o GrafoBipartido e com leitores em threads"""
+    print("\n" + "="*60)
+    print("TESTANDO VERSOES CONCORRENTES")
+    print("="*60)
+
+    try:
+        import random
+        import threading
+        from concorrencia import GrafoConcorrente
+        from grafo_bipartido import GrafoBipartido
+
+        def retrato(grafo):
+            vertices = sorted(grafo.vertices)
+            return (vertices, sorted(grafo.usuarios), sorted(grafo.filmes), grafo.total_arestas(),
+                    {v: sorted(grafo.vizinhos(v)) for v in vertices},
+                    grafo.eh_bipartido_bfs(registrar_passos=False)[0],
+                    {u: grafo.ranquear_filmes(u) for u in sorted(grafo.usuarios)})
+
+        rng = random.Random(47)
+        iguais = retornos = isoladas = invisiveis = True
+        for _ in range(20):
+            inicial = grafo_aleatorio(rng, 20, 12, 4)
+            grafo = GrafoBipartido()
+            for usuario in sorted(inicial.usuarios):
+                for filme in inicial.vizinhos(usuario):
+                    grafo.adicionar_aresta(usuario, filme)
+            concorrente = GrafoConcorrente.de_grafo(inicial)
+            publicadas = [(concorrente.versao(), retrato(grafo))]
+            iguais = iguais and publicadas[0][1] == retrato(concorrente.versao())
+
+            for _ in range(60):
+                operacao = rng.random()
+                usuario, filme = f"U{rng.randrange(25)}", f"F{rng.randrange(14)}"
+                if operacao < 0.5:
+                    if filme not in grafo.vizinhos(usuario):
+                        grafo.adicionar_aresta(usuario, filme)
+                        concorrente.adicionar_aresta(usuario, filme)
+                elif operacao < 0.85:
+                    if rng.random() < 0.5:
+                        usuario, filme = filme, usuario
+                    retornos = retornos and (grafo.remover_aresta(usuario, filme)
+                                             == concorrente.remover_aresta(usuario, filme))
+                else:
+                    vertice = rng.choice([usuario, filme])
+                    retornos = retornos and grafo.remover_vertice(vertice) == concorrente.remover_vertice(vertice)
+                # Escritas pendentes não aparecem na versão publicada
+                invisiveis = invisiveis and concorrente.versao() is publicadas[-1][0]
+                if rng.random() < 0.15:
+                    publicadas.append((concorrente.publicar(), retrato(grafo)))
+                    iguais = iguais and publicadas[-1][1] == retrato(concorrente.versao())
+
+            publicadas.append((concorrente.publicar(), retrato(grafo)))
+            iguais = iguais and publicadas[-1][1] == retrato(concorrente.versao())
+            # As versões antigas continuam como eram quando foram publicadas
+            isoladas = isoladas and all(retrato(versao) == esperado for versao, esperado in publicadas)
+
+        # Leitores em threads durante a carga só veem lotes inteiros e adjacências simétricas
+        linhas = [f"U{i % 300},F{(i * 7) % 101}" for i in range(6000)]
+        concorrente = GrafoConcorrente(publicar_a_cada=500)
+        erros, vistas = [], []
+
+        def ler():
+            try:
+                anterior = -1
+                while True:
+                    versao = concorrente.versao()
+                    arestas = versao.total_arestas()
+                    simetrica = all(v in versao.vizinhos(w) for v in versao.vertices for w in versao.vizinhos(v))
+                    if versao.epoca < anterior or arestas % 500 or not simetrica:
+                        erros.append(versao.epoca)
+                    anterior = versao.epoca
+                    vistas.append(arestas)
+                    if arestas == len(linhas):
+                        break
+            except Exception as erro:
+                erros.append(erro)
+
+        leitores = [threading.Thread(target=ler) for _ in range(3)]
+        for leitor in leitores:
+            leitor.start()
+        concorrente.carregar_de_linhas(linhas)
+        for leitor in leitores:
+            leitor.join(timeout=60)
+
+        try:
+            concorrente.versao().adicionar_aresta("U0", "F0")
+            somente_leitura = False
+        except ValueError:
+            somente_leitura = True
+
+        return all([
+            verificar(iguais, "versoes publicadas iguais ao GrafoBipartido com as mesmas operacoes"),
+            verificar(retornos, "remocoes retornam o mesmo que no GrafoBipartido"),
+            verificar(invisiveis, "escritas pendentes nao alteram a versao publicada"),
+            verificar(isoladas, "versoes antigas nao mudam apos novas publicacoes"),
+            verificar(not erros and vistas and not any(l.is_alive() for l in leitores),
+                      "leitores em threads so veem versoes inteiras durante a carga"),
+            verificar(somente_leitura, "versao publicada e somente leitura"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_remocao():
+    """Testa a remoção de arestas e vértices (lápides) e a compactação"""
+    print("\n" + "="*60)
+    print("TESTANDO REMOCAO")
+    print("="*60)
+
+    try:
+        from grafo_bipartido import GrafoBipartido
+
+        grafo = GrafoBipartido()
+        for usuario, filme in [("U1", "F1"), ("U1", "F2"), ("U2", "F1"), ("U2", "F3")]:
+            grafo.adicionar_aresta(usuario, filme)
+
+        resultados = [
+            verificar(not grafo.remover_aresta("U1", "F3"), "aresta inexistente nao e removida"),
+            verificar(grafo.entradas_removidas == 0, "aresta inexistente nao conta para a compactacao"),
+            verificar(grafo.remover_aresta("F1", "U1"), "remove com as pontas invertidas"),
+            verificar(not grafo.remover_aresta("U1", "F1"), "aresta ja removida nao e removida de novo"),
+            verificar(("U1", "F1") in grafo.arestas_removidas, "lapide na ordem (usuario, filme)"),
+            verificar(grafo.vizinhos("U1") == ["F2"] and grafo.vizinhos("F1") == ["U2"],
+                      "vizinhos ignoram a aresta removida"),
+            verificar(grafo.remover_vertice("U2") and not grafo.remover_vertice("U2"),
+                      "remove o vertice uma unica vez"),
+            verificar(grafo.vizinhos("F3") == [] and "U2" not in grafo.usuarios,
+                      "vertice removido sai do grafo e das adjacencias"),
+        ]
+        grafo.compactar()
+        resultados += [
+            verificar(not grafo.arestas_removidas and not grafo.vertices_removidos,
+                      "compactacao apaga as lapides"),
+            verificar(grafo.grafo["U1"] == ["F2"] and "U2" not in grafo.grafo,
+                      "compactacao reescreve as listas afetadas"),
+            verificar(grafo.total_arestas() == 1 and grafo.entradas == 2,
+                      "contagem de arestas apos compactar"),
+        ]
+        grafo.adicionar_aresta("U2", "F1")
+        resultados.append(verificar(sorted(grafo.vizinhos("F1")) == ["U2"],
+                                    "vertice readicionado volta sem as arestas antigas"))
+        return all(resultados)
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_janela_temporal():
+    """Testa a expiração das arestas e dos vértices fora da janela de tempo"""
+    print("\n" + "="*60)
+    print("TESTANDO JANELA TEMPORAL")
+    print("="*60)
+
+    try:
+        from grafo_temporal import DIA, GrafoTemporal
+
+        grafo = GrafoTemporal(janela=10 * DIA)
+        grafo.adicionar_aresta("U1", "F1", 0)
+        grafo.adicionar_aresta("U2", "F1", 5 * DIA)
+        grafo.adicionar_aresta("U2", "F2", 5 * DIA)
+        grafo.adicionar_aresta("U3", "F3", 6 * DIA)
+        expiradas = grafo.avancar_relogio(12 * DIA)
+        resultados = [
+            verificar(expiradas == 1, "aresta fora da janela expira"),
+            verificar("U1" not in grafo.vertices and "F1" in grafo.vertices,
+                      "so vertices sem arestas na janela saem"),
+            verificar(not grafo.adicionar_aresta("U4", "F4", DIA), "aresta antiga e ignorada"),
+        ]
+
+        grafo.remover_vertice("U3")
+        resultados.append(verificar("F3" not in grafo.vertices and "F3" not in grafo.filmes,
+                                    "vizinho sem arestas na janela sai ao remover o vertice"))
+        grafo.remover_vertice("F1")
+        resultados += [
+            verificar("U2" in grafo.usuarios, "vizinho com outras arestas na janela continua"),
+            verificar(grafo.vertices == {"U2", "F2"} and grafo.total_arestas() == 1,
+                      "grafo final so com a janela"),
+        ]
+        grafo.avancar_relogio(30 * DIA)
+        resultados.append(verificar(not grafo.vertices and not grafo.grau_janela,
+                                    "janela vazia apos o relogio avancar"))
+        return all(resultados)
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_wal():
+    """Testa a recuperação do grafo pelo log de escrita antecipada (WAL) e snapshots"""
+    print("\n" + "="*60)
+    print("TESTANDO LOG DE ESCRITA ANTECIPADA")
+    print("="*60)
+
+    try:
+        import glob
+        import tempfile
+        import time
+        from wal import GrafoDuravel, ler_wal
+
+        def estado(grafo):
+            return {v: sorted(grafo.vizinhos(v)) for v in grafo.vertices}
+
+        with tempfile.TemporaryDirectory() as pasta:
+            with GrafoDuravel(pasta) as grafo:
+                grafo.carregar_de_arquivo('exemplo3.txt')
+                grafo.remover_aresta("Alice", "Matrix")
+                esperado = estado(grafo)
+            with GrafoDuravel(pasta) as grafo:
+                resultados = [verificar(estado(grafo) == esperado, "recupera pelo log apos reiniciar")]
+                grafo.checkpoint()
+                grafo.adicionar_aresta("Zeca", "Matrix")
+                esperado = estado(grafo)
+            with GrafoDuravel(pasta) as grafo:
+                resultados += [
+                    verificar(estado(grafo) == esperado and grafo.reaplicadas == 1,
+                              "recupera pelo snapshot + final do log"),
+                ]
+
+            # Queda no meio de uma gravação: o registro incompleto é descartado
+            caminho_log = glob.glob(os.path.join(pasta, 'wal-*.log'))[0]
+            with open(caminho_log, 'ab') as arquivo:
+                arquivo.write(b'\x40\x00\x00\x00lixo')
+            # Sem novas alterações, o buffer é sincronizado pelo prazo
+            with GrafoDuravel(pasta, fsync_a_cada=10 ** 6, intervalo_fsync=0.2) as grafo:
+                resultados.append(verificar(estado(grafo) == esperado,
+                                            "descarta o registro incompleto no fim do log"))
+                grafo.adicionar_aresta("Yara", "Matrix")
+                time.sleep(0.6)
+                with open(grafo.wal.caminho, 'rb') as arquivo:
+                    nomes = [nomes for _, nomes, _ in ler_wal(arquivo.read())]
+                resultados.append(verificar(["Yara", "Matrix"] in nomes,
+                                            "log sincronizado apos o prazo sem novas alteracoes"))
+        return all(resultados)
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_seguidor():
+    """Testa a leitura incremental de arquivo em crescimento e as estatísticas incrementais"""
+    print("\n" + "="*60)
+    print("TESTANDO SEGUIDOR DE ARQUIVO")
+    print("="*60)
+
+    try:
+        import tempfile
+        from grafo_bipartido import GrafoBipartido
+        from seguidor import EstatisticasIncrementais, SeguidorArquivo
+
+        def media_recalculada(grafo):
+            # Mesmo cálculo de `cli.py stats`
+            usuarios = grafo.usuarios
+            return round(sum(len(grafo.vizinhos(u)) for u in usuarios) / len(usuarios), 4)
+
+        def acrescentar(caminho, texto, modo='a'):
+            with open(caminho, modo, encoding='utf-8') as arquivo:
+                arquivo.write(texto)
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, 'arestas.txt')
+            acrescentar(caminho, "Alice,Matrix\nBob,Matrix\n", 'w')
+            grafo = GrafoBipartido()
+            estatisticas = EstatisticasIncrementais(grafo)
+            with SeguidorArquivo(caminho, grafo) as seguidor:
+                resultados = [verificar(seguidor.atualizar() == 2, "le as linhas iniciais")]
+
+                acrescentar(caminho, "Carol,Matrix\nDavi,Tit")
+                resultados.append(verificar(seguidor.atualizar() == 1 and "Tit" not in grafo.filmes,
+                                            "linha sem quebra espera a proxima leitura"))
+                acrescentar(caminho, "anic\n")
+                resultados.append(verificar(seguidor.atualizar() == 1 and "Titanic" in grafo.filmes,
+                                            "completa a linha na leitura seguinte"))
+
+                # Filme que já tinha espectadores passa a ser também usuário
+                acrescentar(caminho, "Matrix,Titanic\n")
+                seguidor.atualizar()
+                resultados.append(verificar(
+                    estatisticas.como_dicionario()['media_filmes_por_usuario'] == media_recalculada(grafo),
+                    "estatisticas incrementais iguais as recalculadas"))
+
+                acrescentar(caminho, "Eva,Avatar\n", 'w')
+                resultados.append(verificar(seguidor.atualizar() == 1 and seguidor.truncamentos == 1,
+                                            "arquivo truncado e relido do inicio"))
+
+                acrescentar(caminho, "Fabio,Avatar")
+                os.rename(caminho, caminho + '.1')
+                acrescentar(caminho, "Gabi,Avatar\n", 'w')
+                resultados.append(verificar(seguidor.atualizar() == 2 and seguidor.rotacoes == 1,
+                                            "termina o arquivo rotacionado e passa ao novo"))
+                resultados.append(verificar(estatisticas.como_dicionario()['arestas'] == grafo.total_arestas(),
+                                            "contagem de arestas incremental"))
+        return all(resultados)
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_emparelhamento():
+    """Compara o emparelhamento com capacidades ao fluxo máximo do NetworkX"""
+    print("\n" + "="*60)
+    print("TESTANDO EMPARELHAMENTO")
+    print("="*60)
+
+    try:
+        import random
+        import networkx as nx
+        from grafo_bipartido import GrafoBipartido
+        from emparelhamento import emparelhamento_maximo
+
+        rng = random.Random(7)
+        iguais = validos = True
+        for _ in range(100):
+            grafo = GrafoBipartido()
+            for u in range(rng.randrange(1, 25)):
+                for f in rng.sample(range(12), rng.randrange(1, 5)):
+                    grafo.adicionar_aresta(f"U{u}", f"F{f}")
+            capacidades = {filme: rng.randrange(0, 4) for filme in grafo.filmes}
+            atribuicao = emparelhamento_maximo(grafo, capacidades)
+
+            rede = nx.DiGraph()
+            for usuario in grafo.usuarios:
+                rede.add_edge('origem', usuario, capacity=1)
+                for filme in grafo.vizinhos(usuario):
+                    rede.add_edge(usuario, filme, capacity=1)
+            for filme in grafo.filmes:
+                rede.add_edge(filme, 'destino', capacity=capacidades[filme])
+            iguais &= len(atribuicao) == nx.maximum_flow_value(rede, 'origem', 'destino')
+
+            ocupacao = {}
+            for usuario, filme in atribuicao.items():
+                validos &= filme in grafo.vizinhos(usuario)
+                ocupacao[filme] = ocupacao.get(filme, 0) + 1
+            validos &= all(ocupacao[filme] <= capacidades[filme] for filme in ocupacao)
+
+        grafo2 = GrafoBipartido()
+        for usuario, filme in [("A", "B"), ("B", "C"), ("C", "A")]:
+            grafo2.adicionar_aresta(usuario, filme)
+        try:
+            emparelhamento_maximo(grafo2)
+            recusado = False
+        except ValueError:
+            recusado = True
+
+        return all([
+            verificar(iguais, "tamanho igual ao fluxo maximo em 100 grafos aleatorios"),
+            verificar(validos, "so usa arestas do grafo e respeita as vagas"),
+            verificar(recusado, "grafo nao bipartido e recusado"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_adjacencia_comprimida():
+    """Compara o GrafoComprimido (listas em varint) ao GrafoBipartido de origem"""
+    print("\n" + "="*60)
+    print("TESTANDO ADJACENCIA COMPRIMIDA")
+    print("="*60)
+
+    try:
+        import random
+        from adjacencia_comprimida import GrafoComprimido, codificar_lista, decodificar_lista
+        from grafo_bipartido import GrafoBipartido, LimitesRecomendacao
+
+        rng = random.Random(13)
+        listas = [[], [0], [5, 5, 6], [127, 128, 2 ** 31], sorted(rng.sample(range(10 ** 6), 300))]
+        listas += [sorted(rng.choices(range(rng.choice([200, 10 ** 5])), k=rng.randrange(1, 50)))
+                   for _ in range(200)]
+        codec = all(decodificar_lista(codificar_lista(lista)) == lista for lista in listas)
+
+        iguais = bipartidos = recomendacoes = carga = deterministico = True
+        limites = LimitesRecomendacao(max_espectadores=2, orcamento=15, idf=True)
+        for i in range(100):
+            if i % 2:
+                arestas = [(f"U{u}", f"F{f}") for u in range(rng.randrange(1, 30))
+                           for f in rng.sample(range(15), rng.randrange(1, 5))]
+            else:
+                # Nomes que aparecem dos dois lados e arestas repetidas
+                arestas = [(f"V{rng.randrange(12)}", f"V{rng.randrange(6, 20)}")
+                           for _ in range(rng.randrange(1, 40))]
+            grafo = GrafoBipartido()
+            for usuario, filme in arestas:
+                grafo.adicionar_aresta(usuario, filme)
+            comprimido = grafo.comprimir()
+            lido = GrafoComprimido()
+            lido.carregar_de_linhas(f"{usuario},{filme}" for usuario, filme in arestas)
+            volta = comprimido.para_grafo()
+            iguais &= (set(comprimido.vertices) == grafo.vertices
+                       and set(comprimido.usuarios) == grafo.usuarios
+                       and set(comprimido.filmes) == grafo.filmes
+                       and comprimido.total_arestas() == grafo.total_arestas()
+                       and all(sorted(comprimido.vizinhos(v)) == sorted(grafo.vizinhos(v))
+                               and sorted(volta.vizinhos(v)) == sorted(grafo.vizinhos(v))
+                               for v in grafo.vertices))
+            bipartidos &= comprimido.eh_bipartido_bfs()[0] == grafo.eh_bipartido_bfs()[0]
+            for usuario in grafo.usuarios:
+                recomendacoes &= comprimido.ranquear_filmes(usuario) == grafo.ranquear_filmes(usuario)
+                deterministico &= (comprimido.ranquear_filmes(usuario, 5, limites)
+                                   == comprimido.ranquear_filmes(usuario, 5, limites))
+            carga &= (set(lido.usuarios) == grafo.usuarios and set(lido.filmes) == grafo.filmes
+                      and all(lido.vizinhos(v) == comprimido.vizinhos(v) for v in grafo.vertices))
+
+        try:
+            comprimido.adicionar_aresta("U0", "F0")
+            somente_leitura = False
+        except ValueError:
+            somente_leitura = True
+
+        return all([
+            verificar(codec, "varint + diferencas decodifica as listas codificadas"),
+            verificar(iguais, "mesmos vertices, papeis e vizinhos do GrafoBipartido"),
+            verificar(bipartidos, "mesmo resultado do BFS"),
+            verificar(recomendacoes, "mesmas recomendacoes sem limites"),
+            verificar(deterministico, "recomendacoes com limites deterministicas"),
+            verificar(carga, "carrega arestas direto do texto"),
+            verificar(somente_leitura, "alteracoes sao recusadas"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_subgrafo_ego():
+    """Compara a visão ego (subgrafo_ego) ao ego_graph do NetworkX"""
+    print("\n" + "="*60)
+    print("TESTANDO SUBGRAFO EGO")
+    print("="*60)
+
+    try:
+        import random
+        import networkx as nx
+        from grafo_bipartido import GrafoBipartido
+
+        def arestas(grafo):
+            return {frozenset((v, w)) for v in grafo.vertices for w in grafo.vizinhos(v)}
+
+        rng = random.Random(17)
+        iguais = amostradas = True
+        for _ in range(60):
+            # Nomes dos dois lados: inclui grafos com ciclos ímpares
+            grafo = GrafoBipartido()
+            for _ in range(rng.randrange(1, 40)):
+                grafo.adicionar_aresta(f"V{rng.randrange(15)}", f"V{rng.randrange(5, 25)}")
+            rede = nx.Graph([(v, w) for v in grafo.vertices for w in grafo.vizinhos(v)])
+            centro = rng.choice(sorted(grafo.vertices))
+            for saltos in range(4):
+                ego = grafo.subgrafo_ego(centro, saltos)
+                esperado = nx.ego_graph(rede, centro, radius=saltos)
+                iguais &= (ego.vertices == set(esperado.nodes)
+                           and arestas(ego) == {frozenset(a) for a in esperado.edges}
+                           and ego.eh_bipartido_bfs()[0] == nx.is_bipartite(esperado))
+                limitado = grafo.subgrafo_ego(centro, saltos, max_vizinhos_por_salto=2)
+                amostradas &= arestas(limitado) <= arestas(grafo) and limitado.vertices <= ego.vertices
+
+        triangulo = GrafoBipartido()
+        for usuario, filme in [("A", "B"), ("B", "C"), ("C", "A")]:
+            triangulo.adicionar_aresta(usuario, filme)
+
+        return all([
+            verificar(iguais, "subgrafo induzido igual ao ego_graph em 60 grafos aleatorios"),
+            verificar(amostradas, "com limite, so arestas do grafo a ate `saltos` saltos"),
+            verificar(not triangulo.subgrafo_ego("A", 1).eh_bipartido_bfs()[0],
+                      "visao ego de um salto mostra o triangulo"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_distribuido():
+    """Compara o grafo particionado entre processos ao GrafoBipartido e ao NetworkX"""
+    print("\n" + "="*60)
+    print("TESTANDO GRAFO DISTRIBUIDO")
+    print("="*60)
+
+    try:
+        import random
+        import networkx as nx
+        import distribuido
+        from distribuido import GrafoDistribuido
+
+        rng = random.Random(19)
+        bipartidos = componentes = conflitos = True
+        limite = distribuido.VERTICES_POR_NIVEL
+        try:
+            for i in range(40):
+                # Poucas sementes por nível forçam encontros entre BFS de sementes diferentes
+                distribuido.VERTICES_POR_NIVEL = (1, 2, limite)[i % 3]
+                arestas = [(f"V{rng.randrange(30)}", f"V{rng.randrange(10, 60)}")
+                           for _ in range(rng.randrange(1, 50))]
+                rede = nx.Graph(arestas)
+                with GrafoDistribuido(rng.randrange(1, 5)) as grafo:
+                    grafo.carregar_de_linhas(f"{u},{f}" for u, f in arestas)
+                    resultado = grafo.eh_bipartido()
+                esperado = nx.is_bipartite(rede)
+                bipartidos &= resultado.bipartido == esperado
+                if esperado:
+                    componentes &= resultado.componentes == nx.number_connected_components(rede)
+                else:
+                    conflitos &= rede.has_edge(*resultado.conflito)
+        finally:
+            distribuido.VERTICES_POR_NIVEL = limite
+
+        grafo = grafo_aleatorio(rng, 60, 20, 5)
+        with GrafoDistribuido(3) as distribuido_grafo:
+            for usuario in grafo.usuarios:
+                for filme in grafo.vizinhos(usuario):
+                    distribuido_grafo.adicionar_aresta(usuario, filme)
+            estatisticas = distribuido_grafo.estatisticas()
+            recomendacoes = distribuido_grafo.recomendar_lote(sorted(grafo.usuarios) + ["Ninguem"], 5)
+
+        # Muitos componentes pequenos não exigem uma rodada por componente
+        with GrafoDistribuido(2) as pequenos:
+            for u in range(500):
+                pequenos.adicionar_aresta(f"U{u}", f"F{u}")
+            resultado = pequenos.eh_bipartido()
+
+        return all([
+            verificar(bipartidos, "mesmo resultado do NetworkX em 40 grafos aleatorios"),
+            verificar(componentes, "mesmo numero de componentes"),
+            verificar(conflitos, "conflito e uma aresta do grafo"),
+            verificar(estatisticas['arestas'] == grafo.total_arestas()
+                      and estatisticas['usuarios'] == len(grafo.usuarios)
+                      and estatisticas['filmes'] == len(grafo.filmes), "estatisticas somadas entre particoes"),
+            verificar(all(recomendacoes[u] == grafo.ranquear_filmes(u, 5) for u in grafo.usuarios)
+                      and recomendacoes["Ninguem"] == [], "recomendacoes iguais as do GrafoBipartido"),
+            verificar(resultado.componentes == 500 and resultado.niveis < 50,
+                      "varios componentes por rodada"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_instrumentacao():
+    """Testa os tempos e contadores das métricas contra o trabalho feito e as saídas"""
+    print("\n" + "="*60)
+    print("TESTANDO INSTRUMENTACAO")
+    print("="*60)
+
+    try:
+        import json
+        import logging
+        import os
+        import random
+        import tempfile
+        import threading
+        import urllib.error
+        import urllib.request
+        import instrumentacao
+        from grafo_bipartido import GrafoBipartido, LimitesRecomendacao
+        from instrumentacao import Metricas, SaidaJSON, SaidaLog, SaidaPrometheus, formatar_prometheus
+
+        rng = random.Random(40)
+        base = grafo_aleatorio(rng, 60, 30, 6)
+        linhas = [f"{u},{f}" for u in sorted(base.usuarios) for f in base.vizinhos(u)]
+        usuarios = sorted(base.usuarios)
+        limites = LimitesRecomendacao(max_espectadores=2)
+
+        def executar(metricas):
+            grafo = GrafoBipartido(metricas)
+            grafo.carregar_de_linhas(linhas)
+            resultado = grafo.eh_bipartido_bfs(registrar_passos=False)
+            pontuacoes = [grafo.pontuar_recomendacoes(u) for u in usuarios]
+            limitadas = [grafo.pontuar_recomendacoes(u, limites) for u in usuarios]
+            return grafo, (resultado, pontuacoes, limitadas)
+
+        grafo, medido = executar(Metricas())
+        _, desligado = executar(None)
+        instantaneo = grafo.metricas.instantaneo()
+        contadores, tempos = instantaneo['contadores'], instantaneo['tempos']
+        _, pontuacoes, limitadas = medido
+
+        # Grafo bipartido: o BFS desenfileira cada vértice e lê cada aresta pelas duas pontas
+        contagens = (
+            contadores[instrumentacao.ARESTAS_CARREGADAS] == len(linhas)
+            and contadores[instrumentacao.BFS_VERTICES_DESENFILEIRADOS] == len(grafo.vertices)
+            and contadores[instrumentacao.BFS_ARESTAS_PERCORRIDAS] == 2 * grafo.total_arestas()
+            and contadores[instrumentacao.RECOMENDACAO_CANDIDATOS_PONTUADOS]
+            == sum(map(len, pontuacoes)) + sum(map(len, limitadas))
+            and contadores.get(instrumentacao.RECOMENDACAO_LISTAS_AMOSTRADAS, 0) == sum(
+                sum(len(grafo.vizinhos(f)) > 2 for f in grafo.vizinhos(u)) for u in usuarios))
+        fases = (tempos[instrumentacao.BFS]['chamadas'] == 1
+                 and tempos[instrumentacao.RECOMENDACAO]['chamadas'] == 2 * len(usuarios)
+                 and all(0 <= t['max_s'] <= t['total_s'] for t in tempos.values()))
+
+        # Atualizações de várias threads não se perdem
+        metricas = Metricas()
+
+        def trabalhar():
+            for _ in range(5000):
+                metricas.contar('teste.itens')
+                metricas.contar('teste.pares', 2)
+                with metricas.cronometro('teste'):
+                    pass
+
+        threads = [threading.Thread(target=trabalhar) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        concorrente = metricas.instantaneo()
+        threads_ok = (concorrente['contadores'] == {'teste.itens': 20000, 'teste.pares': 40000}
+                      and concorrente['tempos']['teste']['chamadas'] == 20000)
+
+        # Saídas: JSON Lines, log e Prometheus recebem o mesmo instantâneo
+        registros = []
+        logger = logging.getLogger('testar_instrumentacao')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        manipulador = logging.Handler()
+        manipulador.emit = registros.append
+        logger.addHandler(manipulador)
+        prometheus = SaidaPrometheus(porta=0)
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho = os.path.join(pasta, "metricas.jsonl")
+            saidas = Metricas(SaidaJSON(caminho), SaidaLog(logger), prometheus)
+            try:
+                saidas.contar('teste.itens', 3)
+                with saidas.cronometro('teste'):
+                    pass
+                saidas.publicar()
+                saidas.contar('teste.itens')
+                saidas.publicar()
+                with urllib.request.urlopen(f"http://127.0.0.1:{prometheus.porta}/metrics") as resposta:
+                    exposto = resposta.read().decode('utf-8')
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{prometheus.porta}/outro")
+                    inexistente = False
+                except urllib.error.HTTPError as erro:
+                    inexistente = erro.code == 404
+            finally:
+                prometheus.fechar()
+            with open(caminho, encoding='utf-8') as f:
+                publicados = [json.loads(linha) for linha in f]
+        atual = saidas.instantaneo()
+        saidas_ok = (
+            [p['contadores'] for p in publicados] == [{'teste.itens': 3}, {'teste.itens': 4}]
+            and publicados[-1]['tempos'] == atual['tempos']
+            and len(registros) == 4 and registros[-1].getMessage() == "teste.itens: 4"
+            and exposto == formatar_prometheus(atual) and "grafo_teste_itens_total 4" in exposto
+            and inexistente)
+        saidas.zerar()
+
+        return all([
+            verificar(medido == desligado, "metricas ligadas nao alteram os resultados"),
+            verificar(contagens, "contadores iguais ao trabalho feito (carga, BFS, recomendacao)"),
+            verificar(fases, "uma medida por chamada de cada fase"),
+            verificar(threads_ok, "contagens de varias threads nao se perdem"),
+            verificar(saidas_ok, "JSON Lines, log e Prometheus com as mesmas metricas"),
+            verificar(saidas.instantaneo() == {'tempos': {}, 'contadores': {}}, "zerar descarta as metricas"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_memoria():
+    """Testa o relatório de memória contra as medidas diretas, a amostragem e o tracemalloc"""
+    print("\n" + "="*60)
+    print("TESTANDO RELATORIO DE MEMORIA")
+    print("="*60)
+
+    try:
+        import os
+        import random
+        import tempfile
+        from grafo_bipartido import GrafoBipartido
+        from memoria import itens_execucao, medir_pico, projetar_memoria, relatorio_memoria
+
+        rng = random.Random(41)
+        linhas = [f"Usuario{rng.randrange(3000)},Filme{rng.randrange(800)}" for _ in range(30000)]
+        grafo = GrafoBipartido()
+        grafo.carregar_de_linhas(linhas)
+        adjacencias = grafo.grafo
+
+        # Sem amostragem: as mesmas somas de sys.getsizeof feitas aqui
+        exato = {item.estrutura: item for item in relatorio_memoria(grafo, amostra=10 ** 9)}
+        canonicos = {nome: nome for nome in adjacencias}
+        repetidos = [v for lista in adjacencias.values() for v in lista if canonicos[v] is not v]
+        medidas = (
+            exato['grafo (dicionário + listas)'].bytes
+            == sys.getsizeof(adjacencias) + sum(map(sys.getsizeof, adjacencias.values()))
+            and exato['nomes'].bytes == sum(map(sys.getsizeof, adjacencias))
+            and exato['nomes repetidos nas listas'][1:3] == (sum(map(sys.getsizeof, repetidos)), len(repetidos))
+            and all(exato[nome].bytes == sys.getsizeof(getattr(grafo, nome))
+                    for nome in ('vertices', 'usuarios', 'filmes'))
+            and not any(item.estimado for item in exato.values()))
+
+        # Com amostragem: dicionário, nomes e repetidos estimados, próximos das medidas exatas
+        estimado = relatorio_memoria(grafo, amostra=2000)
+        amostragem = all(abs(item.bytes - exato[item.estrutura].bytes) <= 0.15 * exato[item.estrutura].bytes
+                         for item in estimado) and [item.estimado for item in estimado[:3]] == [True] * 3
+
+        total = sum(item.bytes for item in exato.values())
+        with tempfile.TemporaryDirectory() as pasta:
+            arquivo = os.path.join(pasta, "grafo.txt")
+            with open(arquivo, "w", encoding="utf-8") as f:
+                f.write("\n".join(linhas) + "\n")
+            snapshot = os.path.join(pasta, "grafo.bin")
+            grafo.salvar_snapshot(snapshot)
+            pico_texto = medir_pico(arquivo)
+            pico_snapshot = medir_pico(snapshot)
+            carregado = GrafoBipartido()
+            carregado.carregar_snapshot(snapshot)
+        # O relatório explica quase toda a memória alocada pela carga do texto
+        tracemalloc_ok = (0.9 * pico_texto.apos_carga <= total <= 1.1 * pico_texto.apos_carga
+                          and pico_snapshot.apos_carga < pico_texto.apos_carga
+                          and pico_texto.pico_bfs >= pico_texto.apos_bfs >= pico_texto.apos_carga)
+        snapshot_ok = {item.estrutura: item for item in relatorio_memoria(carregado)}[
+            'nomes repetidos nas listas'].bytes == 0
+
+        grafo.remover_aresta("Usuario1", grafo.vizinhos("Usuario1")[0])
+        grafo.remover_vertice("Filme1")
+        lapides = {item.estrutura for item in relatorio_memoria(grafo)} >= {'lápides (vértices)', 'lápides (arestas)'}
+        cor = grafo.eh_bipartido_bfs(registrar_passos=False)[1]
+        execucao = [item.estrutura for item in itens_execucao(cor, ["passo"])] == ['cor', 'passos']
+
+        try:
+            projetar_memoria(list(exato.values()), 0, 10)
+            sem_arestas = False
+        except ValueError:
+            sem_arestas = True
+        projecao = projetar_memoria(list(exato.values()), 30000, 300000) == round(total * 10) and sem_arestas
+
+        return all([
+            verificar(medidas, "estruturas medidas como sys.getsizeof, sem amostragem"),
+            verificar(amostragem, "estimativas por amostragem a menos de 15% das exatas"),
+            verificar(tracemalloc_ok, "total proximo da memoria medida pelo tracemalloc"),
+            verificar(snapshot_ok, "snapshot compartilha os nomes das listas"),
+            verificar(lapides and execucao, "lapides, cor e passos entram no relatorio"),
+            verificar(projecao, "projecao proporcional as arestas"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
+def testar_cli():
+    """Testa os códigos de saída da linha de comando (cli.py)"""
+    print("\n" + "="*60)
+    print("TESTANDO CLI")
+    print("="*60)
+
+    try:
+        import json
+        import subprocess
+        import tempfile
+
+        def executar(*argumentos):
+            return subprocess.run([sys.executable, 'cli.py', *argumentos],
+                                  capture_output=True, text=True).returncode
+
+        with tempfile.TemporaryDirectory() as pasta:
+            caminho_metricas = os.path.join(pasta, 'metricas.jsonl')
+            codigo_metricas = executar('check', 'exemplo1.txt', '--metricas', caminho_metricas)
+            with open(caminho_metricas, encoding='utf-8') as arquivo:
+                tempos = json.loads(arquivo.readline())['tempos']
+
+        return all([
+            verificar(executar('check', 'exemplo1.txt') == 0, "check de grafo bipartido sai com 0"),
+            verificar(executar('check', 'exemplo2.txt') == 3, "check de grafo nao bipartido sai com 3"),
+            verificar(executar('check', 'exemplo2.txt', '--streaming') == 3,
+                      "check --streaming de grafo nao bipartido sai com 3"),
+            verificar(executar('stats', 'exemplo3.txt') == 0, "stats sai com 0"),
+            verificar(executar('recommend', 'exemplo3.txt', '-u', 'Ninguem') == 4,
+                      "recommend de usuario desconhecido sai com 4"),
+            verificar(executar('stats', 'nao_existe.txt') == 2, "arquivo inexistente sai com 2"),
+            verificar(executar('recommend', 'exemplo3.txt', '-k', '0') == 2, "argumento invalido sai com 2"),
+            verificar(codigo_metricas == 0 and 'bfs' in tempos, "metricas registram a fase bfs"),
+        ])
+
+    except Exception as e:
+        print(f"  [FALHOU] ERRO: {e}")
+        return False
+
+
 def gerar_relatorio():
     """Gera relatório final"""
     print("\n" + "="*60)
@@ -184,7 +1901,31 @@ def gerar_relatorio():
         'Imports': testar_imports(),
         'Arquivos': testar_arquivos(),
         'Estruturas de Dados': testar_estrutura_dados(),
-        'Algoritmo': testar_algoritmo()
+        'Algoritmo': testar_algoritmo(),
+        'Eventos do BFS': testar_eventos_bfs(),
+        'Animacao': testar_animacao(),
+        'Animacao em Paralelo': testar_animacao_paralela(),
+        'Teste de Mesa em Excel': testar_excel(),
+        'Importacao Preguicosa': testar_importacao_preguicosa(),
+        'Recomendacao': testar_recomendacao(),
+        'Exportacao Colunar': testar_exportacao(),
+        'Projecao': testar_projecao(),
+        'Similaridade': testar_similaridade(),
+        'Armazenamento SQLite': testar_sqlite(),
+        'Verificacao em Fluxo': testar_streaming(),
+        'PageRank': testar_pagerank(),
+        'Versoes Concorrentes': testar_concorrencia(),
+        'Remocao': testar_remocao(),
+        'Janela Temporal': testar_janela_temporal(),
+        'Log de Escrita Antecipada': testar_wal(),
+        'Seguidor de Arquivo': testar_seguidor(),
+        'Emparelhamento': testar_emparelhamento(),
+        'Adjacencia Comprimida': testar_adjacencia_comprimida(),
+        'Subgrafo Ego': testar_subgrafo_ego(),
+        'Grafo Distribuido': testar_distribuido(),
+        'Instrumentacao': testar_instrumentacao(),
+        'Relatorio de Memoria': testar_memoria(),
+        'CLI': testar_cli(),
     }
 
     print("\n" + "-"*60)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Verificação de Bipartição em Fluxo (uma passada)
+Valida um arquivo USUARIO,FILME sem carregar o grafo: lê o arquivo uma
+única vez e guarda apenas O(V) de estado, nunca as listas de adjacência
+
+Cada nome recebe um número inteiro e os vértices são agrupados em uma
+union-find com paridade: além do representante, cada vértice guarda se tem a
+mesma cor (0) ou a cor oposta (1) à do pai. Uma aresta u-v exige cores
+opostas; se u e v já estão no mesmo grupo com a mesma paridade, a aresta
+fecha um ciclo ímpar e o grafo não é bipartido. A linha dessa aresta é
+informada.
+
+Os nomes são mantidos como bytes (sem decodificar o texto). A união por
+tamanho mantém as árvores rasas, e cada vértice consultado passa a apontar
+direto para o representante, então cada aresta custa quase O(1).
+
+Uso:
+    python verificacao_streaming.py arquivo_grafo
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import sys
+from typing import BinaryIO, NamedTuple, Optional, Tuple
+
+
+# Tamanho do buffer de leitura do arquivo
+TAMANHO_BUFFER = 1 << 20
+
+
+class ResultadoStreaming(NamedTuple):
+    """
+    Resultado da verificação: `linha` e `aresta` identificam a primeira
+    aresta que fecha um ciclo ímpar (None se o grafo for bipartido)
+    """
+    bipartido: bool
+    linha: Optional[int]
+    aresta: Optional[Tuple[str, str]]
+    linhas_lidas: int
+    arestas: int
+    vertices: int
+    componentes: int
+
+
+def verificar_fluxo(arquivo: BinaryIO, parar_no_conflito: bool = True) -> ResultadoStreaming:
+    """
+    Verifica a bipartição lendo as linhas de um arquivo binário uma única vez
+
+    Linhas vazias, comentários (#) e linhas fora do formato são ignorados,
+    como em GrafoBipartido.carregar_de_linhas. Com parar_no_conflito=False
+    a leitura continua até o fim, para contar arestas e vértices do arquivo todo.
+    """
+    ids = {}
+    pai = []
+    paridade = []
+    tamanho = []
+    arestas = 0
+    componentes = 0
+    numero = 0
+    conflito = None
+
+    for numero, linha in enumerate(arquivo, 1):
+        partes = linha.split(b',')
+        if not 2 <= len(partes) <= 3 or partes[0].lstrip().startswith(b'#'):
+            continue
+        usuario, filme = partes[0].strip(), partes[1].strip()
+        arestas += 1
+
+        u = ids.get(usuario)
+        if u is None:
+            u = ids[usuario] = len(pai)
+            pai.append(u)
+            paridade.append(0)
+            tamanho.append(1)
+            componentes += 1
+        f = ids.get(filme)
+        if f is None:
+            f = ids[filme] = len(pai)
+            pai.append(f)
+            paridade.append(0)
+            tamanho.append(1)
+            componentes += 1
+
+        # Representantes e paridades de u e f; cada ponta passa a apontar
+        # direto para o representante (compressão do primeiro nó do caminho)
+        ru, pu = u, 0
+        while pai[ru] != ru:
+            pu ^= paridade[ru]
+            ru = pai[ru]
+        if pai[u] != ru:
+            pai[u], paridade[u] = ru, pu
+        rf, pf = f, 0
+        while pai[rf] != rf:
+            pf ^= paridade[rf]
+            rf = pai[rf]
+        if pai[f] != rf:
+            pai[f], paridade[f] = rf, pf
+
+        if ru == rf:
+            if pu == pf and conflito is None:
+                conflito = (numero, usuario, filme)
+                if parar_no_conflito:
+                    break
+            continue
+
+        # u e f devem ter cores opostas: ajusta a paridade da raiz anexada
+        if tamanho[ru] < tamanho[rf]:
+            ru, rf = rf, ru
+        pai[rf] = ru
+        paridade[rf] = pu ^ pf ^ 1
+        tamanho[ru] += tamanho[rf]
+        componentes -= 1
+
+    if conflito is None:
+        return ResultadoStreaming(True, None, None, numero, arestas, len(pai), componentes)
+    numero_conflito, usuario, filme = conflito
+    aresta = (usuario.decode('utf-8', 'replace'), filme.decode('utf-8', 'replace'))
+    return ResultadoStreaming(False, numero_conflito, aresta, numero, arestas, len(pai), componentes)
+
+
+def verificar_arquivo(caminho: str, parar_no_conflito: bool = True) -> ResultadoStreaming:
+    """Verifica a bipartição de um arquivo USUARIO,FILME em uma passada"""
+    with open(caminho, 'rb', buffering=TAMANHO_BUFFER) as f:
+        return verificar_fluxo(f, parar_no_conflito)
+
+
+def main():
+    """Função principal"""
+    if len(sys.argv) < 2:
+        print("Uso: python verificacao_streaming.py arquivo_grafo")
+        return 1
+
+    try:
+        resultado = verificar_arquivo(sys.argv[1])
+    except FileNotFoundError:
+        print(f"Erro: Arquivo '{sys.argv[1]}' não encontrado!")
+        return 1
+
+    print("\n" + "="*50)
+    if resultado.bipartido:
+        print("✓ RESULTADO: O grafo É BIPARTIDO")
+    else:
+        print("✗ RESULTADO: O grafo NÃO É BIPARTIDO")
+    print("="*50)
+    print(f"Linhas lidas: {resultado.linhas_lidas}")
+    print(f"Arestas: {resultado.arestas}, vértices: {resultado.vertices}, "
+          f"componentes: {resultado.componentes}")
+    if not resultado.bipartido:
+        usuario, filme = resultado.aresta
+        print(f"\n⚠ A aresta {usuario},{filme} (linha {resultado.linha}) fecha um ciclo ímpar")
+    return 0 if resultado.bipartido else 3
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,11 +13,17 @@ Ano: 2024
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import networkx as nx
-from grafo_bipartido import GrafoBipartido
+# matplotlib e NetworkX são importados ao montar a interface e ao desenhar,
+# para que importar este módulo não carregue as bibliotecas de desenho
+from grafo_bipartido import FIM, GrafoBipartido, descrever_evento
+
+
+# Eventos do BFS processados por chamada do laço de eventos do Tkinter
+EVENTOS_POR_LOTE = 500
+# Máximo de passos exibidos no painel; além disso o BFS continua sem exibir
+MAX_PASSOS_EXIBIDOS = 20000
+# Limite padrão de vizinhos por vértice em cada salto da visão ego
+MAX_VIZINHOS_EGO = 15
 
 
 class VisualizadorGrafoBipartido:
@@ -29,9 +35,11 @@ class VisualizadorGrafoBipartido:
         self.root.geometry("1200x800")
 
         self.grafo = None
+        self.grafo_completo = None
         self.eh_bipartido = None
         self.cor = None
-        self.passos = []
+        self.passos_exibidos = 0
+        self.eventos_em_andamento = None
 
         self.criar_interface()
 
@@ -52,6 +60,27 @@ class VisualizadorGrafoBipartido:
         ttk.Button(frame_controles, text="Carregar Grafo", command=self.carregar_grafo).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_controles, text="Verificar Bipartição", command=self.verificar_bipartido).pack(side=tk.LEFT, padx=5)
 
+        # Visão ego: só a vizinhança de um usuário ou filme, para arquivos grandes
+        frame_ego = ttk.Frame(self.root, padding=(10, 0, 10, 10))
+        frame_ego.pack(side=tk.TOP, fill=tk.X)
+
+        ttk.Label(frame_ego, text="Centro:", font=('Arial', 10, 'bold')).pack(side=tk.LEFT, padx=5)
+        self.entry_centro = ttk.Entry(frame_ego, width=20)
+        self.entry_centro.pack(side=tk.LEFT, padx=5)
+
+        ttk.Label(frame_ego, text="Saltos:").pack(side=tk.LEFT, padx=5)
+        self.spin_saltos = ttk.Spinbox(frame_ego, from_=0, to=10, width=4)
+        self.spin_saltos.pack(side=tk.LEFT, padx=5)
+        self.spin_saltos.set(2)
+
+        ttk.Label(frame_ego, text="Máx. vizinhos por salto:").pack(side=tk.LEFT, padx=5)
+        self.entry_max_vizinhos = ttk.Entry(frame_ego, width=6)
+        self.entry_max_vizinhos.pack(side=tk.LEFT, padx=5)
+        self.entry_max_vizinhos.insert(0, str(MAX_VIZINHOS_EGO))
+
+        ttk.Button(frame_ego, text="Visão Ego", command=self.mostrar_ego).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_ego, text="Grafo Inteiro", command=self.mostrar_grafo_inteiro).pack(side=tk.LEFT, padx=5)
+
         # Frame principal - dividido em 2 colunas
         frame_principal = ttk.Frame(self.root)
         frame_principal.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -60,6 +89,9 @@ class VisualizadorGrafoBipartido:
         frame_esquerdo = ttk.LabelFrame(frame_principal, text="Visualização do Grafo", padding="10")
         frame_esquerdo.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(0, 5))
 
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
         self.figura = Figure(figsize=(6, 6))
         self.canvas = FigureCanvasTkAgg(self.figura, master=frame_esquerdo)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
@@ -109,24 +141,58 @@ class VisualizadorGrafoBipartido:
             messagebox.showerror("Erro", "Por favor, especifique um arquivo!")
             return
 
-        self.grafo = GrafoBipartido()
+        self.grafo_completo = GrafoBipartido()
         try:
-            self.grafo.carregar_de_arquivo(arquivo)
-            self.atualizar_estatisticas()
-            self.desenhar_grafo()
+            self.grafo_completo.carregar_de_arquivo(arquivo)
+            if self.entry_centro.get().strip():
+                self.mostrar_ego()
+            else:
+                self._exibir(self.grafo_completo)
             messagebox.showinfo("Sucesso", "Grafo carregado com sucesso!")
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao carregar grafo:\n{e}")
 
+    def _exibir(self, grafo):
+        """Passa a exibir e analisar o grafo (inteiro ou uma visão ego)"""
+        self.grafo = grafo
+        self.cor = None
+        self.eh_bipartido = None
+        self.eventos_em_andamento = None
+        self.label_resultado.config(text="")
+        self.atualizar_estatisticas()
+        self.desenhar_grafo()
+
+    def mostrar_ego(self):
+        """Exibe só a vizinhança do centro informado (GrafoBipartido.subgrafo_ego)"""
+        if not self.grafo_completo:
+            messagebox.showerror("Erro", "Por favor, carregue um grafo primeiro!")
+            return
+        centro = self.entry_centro.get().strip()
+        if not centro:
+            messagebox.showerror("Erro", "Informe o usuário ou filme do centro!")
+            return
+        try:
+            saltos = int(self.spin_saltos.get())
+            texto_max = self.entry_max_vizinhos.get().strip()
+            max_vizinhos = int(texto_max) if texto_max else None
+            self._exibir(self.grafo_completo.subgrafo_ego(centro, saltos, max_vizinhos))
+        except ValueError as e:
+            messagebox.showerror("Erro", f"Visão ego inválida:\n{e}")
+
+    def mostrar_grafo_inteiro(self):
+        """Volta a exibir o grafo carregado inteiro"""
+        if self.grafo_completo:
+            self._exibir(self.grafo_completo)
+
     def atualizar_estatisticas(self):
         """Atualiza as estatísticas exibidas"""
         if not self.grafo:
             return
 
-        total_arestas = sum(len(adj) for adj in self.grafo.grafo.values()) // 2
+        total_arestas = self.grafo.total_arestas()
         media_filmes = 0
         if self.grafo.usuarios:
-            media_filmes = sum(len(self.grafo.grafo[u]) for u in self.grafo.usuarios) / len(self.grafo.usuarios)
+            media_filmes = sum(len(self.grafo.vizinhos(u)) for u in self.grafo.usuarios) / len(self.grafo.usuarios)
 
         stats = f"""Total de vértices: {len(self.grafo.vertices)}
   • Usuários: {len(self.grafo.usuarios)}
@@ -141,6 +207,8 @@ Média de filmes/usuário: {media_filmes:.2f}"""
         if not self.grafo:
             return
 
+        import networkx as nx
+
         self.figura.clear()
         ax = self.figura.add_subplot(111)
 
@@ -148,8 +216,8 @@ Média de filmes/usuário: {media_filmes:.2f}"""
         G = nx.Graph()
         for vertice in self.grafo.vertices:
             G.add_node(vertice)
-        for u in self.grafo.grafo:
-            for v in self.grafo.grafo[u]:
+        for u in self.grafo.vertices:
+            for v in self.grafo.vizinhos(u):
                 G.add_edge(u, v)
 
         # Layout bipartido
@@ -206,8 +274,45 @@ Média de filmes/usuário: {media_filmes:.2f}"""
             messagebox.showerror("Erro", "Por favor, carregue um grafo primeiro!")
             return
 
-        # Executa o algoritmo
-        self.eh_bipartido, self.cor, self.passos = self.grafo.eh_bipartido_bfs()
+        # Consome os eventos do BFS aos poucos, sem travar a interface
+        self.cor = {}
+        self.passos_exibidos = 0
+        self.text_passos.delete(1.0, tk.END)
+        self.label_resultado.config(text="Executando BFS...", fg='black')
+        self.eventos_em_andamento = self.grafo.eventos_bfs(self.cor)
+        self._processar_eventos(self.eventos_em_andamento)
+
+    def _processar_eventos(self, eventos):
+        """Processa um lote de eventos do BFS e agenda o próximo"""
+        if eventos is not self.eventos_em_andamento:
+            return  # Execução substituída por uma nova verificação
+
+        linhas = []
+        for consumidos, evento in enumerate(eventos, 1):
+            if self.passos_exibidos < MAX_PASSOS_EXIBIDOS:
+                linhas.append(descrever_evento(evento))
+                self.passos_exibidos += 1
+                if self.passos_exibidos == MAX_PASSOS_EXIBIDOS:
+                    linhas.append("\n... (demais passos omitidos)")
+            if evento.tipo == FIM:
+                self._inserir_passos(linhas)
+                self._exibir_resultado(evento.bipartido)
+                return
+            if consumidos >= EVENTOS_POR_LOTE:
+                break
+
+        self._inserir_passos(linhas)
+        self.root.after(1, self._processar_eventos, eventos)
+
+    def _inserir_passos(self, linhas):
+        if linhas:
+            if self.text_passos.index('end-1c') != '1.0':
+                self.text_passos.insert(tk.END, "\n")
+            self.text_passos.insert(tk.END, "\n".join(linhas))
+
+    def _exibir_resultado(self, eh_bipartido):
+        """Atualiza o resultado e redesenha o grafo com as cores do BFS"""
+        self.eh_bipartido = eh_bipartido
 
         # Atualiza resultado
         if self.eh_bipartido:
@@ -224,10 +329,6 @@ Média de filmes/usuário: {media_filmes:.2f}"""
                 fg='red'
             )
 
-        # Atualiza passos
-        self.text_passos.delete(1.0, tk.END)
-        self.text_passos.insert(tk.END, "\n".join(self.passos))
-
         # Redesenha com cores
         self.desenhar_grafo(destacar_cores=True)
 
@@ -235,7 +336,7 @@ Média de filmes/usuário: {media_filmes:.2f}"""
 def main():
     """Função principal"""
     root = tk.Tk()
-    app = VisualizadorGrafoBipartido(root)
+    VisualizadorGrafoBipartido(root)
     root.mainloop()
 
 
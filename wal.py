@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+Log de Escrita Antecipada (WAL) com Snapshot e Recuperação
+Torna persistentes as alterações feitas com adicionar_aresta, remover_aresta
+e remover_vertice, para que um processo de ingestão possa reiniciar sem
+reler todos os arquivos de origem
+
+O GrafoDuravel grava cada alteração em um log binário só de acréscimo
+(wal-N.log) e, de tempos em tempos, faz um checkpoint: salva um snapshot do
+grafo (snapshot-N+1.bin, no formato de salvar_snapshot) e começa um log
+novo, apagando os antigos. Ao reiniciar, carrega o snapshot mais recente e
+reaplica o log dele; o tempo de recuperação depende só das alterações desde
+o último checkpoint, e não de todo o histórico.
+
+Durabilidade: o log é gravado e sincronizado com o disco (fsync) a cada
+`fsync_a_cada` alterações ou `intervalo_fsync` segundos, o que vier antes;
+uma thread em segundo plano sincroniza o que ficar no buffer quando a
+ingestão para. Uma queda pode perder no máximo essas alterações. Cada registro tem um
+CRC32: um registro gravado pela metade no fim do log é descartado na
+recuperação.
+
+Os arquivos de cada checkpoint levam o número da geração, e o snapshot novo
+só aparece (por renomeação atômica) depois de completo, então uma queda no
+meio de um checkpoint nunca reaplica um log sobre um snapshot que já o contém.
+
+Uso:
+    python wal.py diretorio [arquivo_grafo] [--checkpoint]
+"""
+"""
+Autoras: Larissa Paganini e Bruna Cedro
+Disciplina: Tópicos de Programação Avançada
+Ano: 2024
+"""
+
+
+
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+import instrumentacao
+from grafo_bipartido import GrafoBipartido
+
+
+MAGICO_WAL = b'GRAFOWAL\x01'
+
+# Tipos de registro
+ADICIONAR_ARESTA = 1
+REMOVER_ARESTA = 2
+REMOVER_VERTICE = 3
+
+# Cada registro: tamanho e CRC32 do conteúdo; o conteúdo é o tipo (1 byte)
+# seguido dos nomes em UTF-8 separados por quebras de linha, como no snapshot
+CABECALHO_REGISTRO = struct.Struct('<II')
+
+# Sincronização do log com o disco: a cada N alterações ou T segundos
+FSYNC_A_CADA = 1000
+INTERVALO_FSYNC = 1.0
+
+# Alterações no log que disparam um checkpoint automático
+CHECKPOINT_A_CADA = 1000000
+
+_ARQUIVO_GERACAO = re.compile(r'^(snapshot|wal)-(\d+)\.(bin|log)$')
+
+
+def _sincronizar_diretorio(diretorio: str):
+    """Garante que criações, renomeações e remoções no diretório cheguem ao disco"""
+    try:
+        descritor = os.open(diretorio, os.O_RDONLY)
+    except OSError:
+        return  # sistemas sem fsync de diretório (Windows)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+
+def codificar_registro(tipo: int, *nomes: str) -> bytes:
+    """Registro do log para uma alteração: cabeçalho (tamanho, CRC32) e conteúdo"""
+    conteudo = bytes((tipo,)) + '\n'.join(nomes).encode('utf-8')
+    return CABECALHO_REGISTRO.pack(len(conteudo), zlib.crc32(conteudo)) + conteudo
+
+
+def ler_wal(dados: bytes) -> Iterator[Tuple[int, List[str], int]]:
+    """
+    Registros de um log (conteúdo completo do arquivo): (tipo, nomes, fim do
+    registro no arquivo)
+
+    Para no primeiro registro incompleto ou com CRC inválido (gravação
+    interrompida no fim do log). Lança ValueError se o arquivo não for um log.
+    """
+    if not dados.startswith(MAGICO_WAL):
+        raise ValueError("o arquivo não é um log de escrita antecipada do grafo")
+    posicao = len(MAGICO_WAL)
+    visao = memoryview(dados)
+    total = len(dados)
+    cabecalho, tamanho_cabecalho = CABECALHO_REGISTRO.unpack_from, CABECALHO_REGISTRO.size
+    crc32 = zlib.crc32
+    while posicao + tamanho_cabecalho <= total:
+        tamanho, crc = cabecalho(dados, posicao)
+        inicio = posicao + tamanho_cabecalho
+        posicao = inicio + tamanho
+        if tamanho == 0 or posicao > total or crc32(visao[inicio:posicao]) != crc:
+            return
+        yield dados[inicio], str(visao[inicio + 1:posicao], 'utf-8').split('\n'), posicao
+
+
+def reproduzir_wal(grafo: GrafoBipartido, caminho: str) -> Tuple[int, int]:
+    """
+    Reaplica ao grafo as alterações do log; retorna (alterações reaplicadas,
+    bytes válidos do arquivo)
+    """
+    with open(caminho, 'rb') as f:
+        dados = f.read()
+    aplicadas, valido = 0, len(MAGICO_WAL)
+    operacoes = {ADICIONAR_ARESTA: grafo.adicionar_aresta, REMOVER_ARESTA: grafo.remover_aresta,
+                 REMOVER_VERTICE: grafo.remover_vertice}
+    for tipo, nomes, valido in ler_wal(dados):
+        operacoes[tipo](*nomes)
+        aplicadas += 1
+    return aplicadas, min(valido, len(dados))
+
+
+class RegistroWAL:
+    """
+    Observador do grafo que acrescenta cada alteração ao log, em lotes
+
+    Os registros ficam em um buffer e são gravados e sincronizados com o
+    disco a cada `fsync_a_cada` alterações ou `intervalo_fsync` segundos, ou
+    ao chamar sincronizar(). O prazo é verificado a cada alteração e por uma
+    thread em segundo plano, para que registros não fiquem no buffer quando
+    as alterações param; fechar() encerra essa thread.
+    """
+
+    def __init__(self, caminho: str, fsync_a_cada: int = FSYNC_A_CADA,
+                 intervalo_fsync: float = INTERVALO_FSYNC, metricas=None):
+        if fsync_a_cada < 1:
+            raise ValueError("fsync_a_cada deve ser positivo")
+        self.caminho = caminho
+        self.fsync_a_cada = fsync_a_cada
+        self.intervalo_fsync = intervalo_fsync
+        self.metricas = metricas or instrumentacao.METRICAS_NULAS
+        self.trava = threading.Lock()
+        self.buffer = []
+        self.pendentes = 0
+        self.operacoes = 0
+        self.ultimo_fsync = time.monotonic()
+        novo = not os.path.exists(caminho) or os.path.getsize(caminho) == 0
+        self.arquivo = open(caminho, 'ab')
+        if novo:
+            self.arquivo.write(MAGICO_WAL)
+            self.sincronizar(forcar=True)
+        self._parar = threading.Event()
+        self._temporizador = threading.Thread(target=self._sincronizar_periodicamente,
+                                              name='wal-fsync', daemon=True)
+        self._temporizador.start()
+
+    def _gravar(self, registro: bytes):
+        with self.trava:
+            self.buffer.append(registro)
+            self.pendentes += 1
+            self.operacoes += 1
+            if self.pendentes >= self.fsync_a_cada or \
+                    time.monotonic() - self.ultimo_fsync >= self.intervalo_fsync:
+                self._sincronizar()
+
+    def _sincronizar_periodicamente(self):
+        """Thread em segundo plano: sincroniza o buffer quando o prazo vence sem novas alterações"""
+        espera = self.intervalo_fsync
+        while not self._parar.wait(espera):
+            with self.trava:
+                restante = self.ultimo_fsync + self.intervalo_fsync - time.monotonic()
+                if self.buffer and restante <= 0:
+                    self._sincronizar()
+                    restante = self.intervalo_fsync
+            espera = max(restante, 0.001) if self.buffer else self.intervalo_fsync
+
+    def aresta_adicionada(self, usuario, filme):
+        self._gravar(codificar_registro(ADICIONAR_ARESTA, usuario, filme))
+
+    def aresta_removida(self, usuario, filme):
+        self._gravar(codificar_registro(REMOVER_ARESTA, usuario, filme))
+
+    def vertice_removido(self, vertice, vizinhos):
+        self._gravar(codificar_registro(REMOVER_VERTICE, vertice))
+
+    def sincronizar(self, forcar: bool = False):
+        """Grava o buffer e sincroniza o log com o disco"""
+        with self.trava:
+            self._sincronizar(forcar)
+
+    def _sincronizar(self, forcar: bool = False):
+        if not (self.buffer or forcar):
+            return
+        self.arquivo.write(b''.join(self.buffer))
+        self.arquivo.flush()
+        os.fsync(self.arquivo.fileno())
+        self.metricas.contar(instrumentacao.WAL_REGISTROS, len(self.buffer))
+        self.metricas.contar(instrumentacao.WAL_FSYNCS)
+        self.buffer = []
+        self.pendentes = 0
+        self.ultimo_fsync = time.monotonic()
+
+    def fechar(self):
+        """Sincroniza o que estiver pendente, encerra a thread de sincronização e fecha o arquivo"""
+        self._parar.set()
+        self._temporizador.join()
+        if not self.arquivo.closed:
+            self.sincronizar()
+            self.arquivo.close()
+
+
+class GrafoDuravel(GrafoBipartido):
+    """
+    GrafoBipartido cujas alterações sobrevivem a reinícios (snapshot + log)
+
+    Ao ser criado, recupera o estado salvo no diretório (se houver). Use-o
+    como gerenciador de contexto, ou chame fechar(), para sincronizar o log
+    ao terminar. Um único processo deve usar o diretório de cada vez.
+    """
+
+    def __init__(self, diretorio: str, fsync_a_cada: int = FSYNC_A_CADA,
+                 intervalo_fsync: float = INTERVALO_FSYNC,
+                 checkpoint_a_cada: Optional[int] = CHECKPOINT_A_CADA, metricas=None):
+        super().__init__(metricas)
+        self.diretorio = diretorio
+        self.fsync_a_cada = fsync_a_cada
+        self.intervalo_fsync = intervalo_fsync
+        self.checkpoint_a_cada = checkpoint_a_cada
+        self.wal = None
+        self.geracao = 0
+        self.reaplicadas = 0
+        os.makedirs(diretorio, exist_ok=True)
+        with self.metricas.cronometro(instrumentacao.RECUPERACAO):
+            self._recuperar()
+
+    def _caminho(self, tipo: str, geracao: int) -> str:
+        extensao = 'bin' if tipo == 'snapshot' else 'log'
+        return os.path.join(self.diretorio, f"{tipo}-{geracao:08d}.{extensao}")
+
+    def _recuperar(self):
+        """Carrega o snapshot mais recente, reaplica o seu log e apaga os arquivos antigos"""
+        geracoes = {'snapshot': [], 'wal': []}
+        for nome in os.listdir(self.diretorio):
+            encontrado = _ARQUIVO_GERACAO.match(nome)
+            if encontrado:
+                geracoes[encontrado.group(1)].append(int(encontrado.group(2)))
+            elif nome.endswith('.tmp'):
+                os.remove(os.path.join(self.diretorio, nome))  # checkpoint interrompido
+
+        self.geracao = max(geracoes['snapshot'], default=0)
+        if self.geracao:
+            GrafoBipartido.carregar_snapshot(self, self._caminho('snapshot', self.geracao))
+        caminho_wal = self._caminho('wal', self.geracao)
+        if os.path.exists(caminho_wal) and os.path.getsize(caminho_wal) < len(MAGICO_WAL):
+            os.remove(caminho_wal)  # queda antes de o cabeçalho ser gravado
+        if os.path.exists(caminho_wal):
+            self.reaplicadas, valido = reproduzir_wal(self, caminho_wal)
+            if valido < os.path.getsize(caminho_wal):
+                # Descarta o registro incompleto, para acrescentar depois dos válidos
+                with open(caminho_wal, 'r+b') as f:
+                    f.truncate(valido)
+
+        for tipo, numeros in geracoes.items():
+            for numero in numeros:
+                if numero < self.geracao:
+                    os.remove(self._caminho(tipo, numero))
+
+        self.wal = RegistroWAL(caminho_wal, self.fsync_a_cada, self.intervalo_fsync, self.metricas)
+        self.wal.operacoes = self.reaplicadas
+        self.registrar_observador(self.wal)
+        _sincronizar_diretorio(self.diretorio)
+
+    def _apos_alteracao(self):
+        if self.wal is not None and self.checkpoint_a_cada and self.wal.operacoes >= self.checkpoint_a_cada:
+            self.checkpoint()
+
+    def adicionar_aresta(self, usuario: str, filme: str):
+        if '\n' in usuario or '\n' in filme:
+            raise ValueError("Nomes de vértices com quebra de linha não cabem no log")
+        super().adicionar_aresta(usuario, filme)
+        self._apos_alteracao()
+
+    def remover_aresta(self, usuario: str, filme: str) -> bool:
+        removida = super().remover_aresta(usuario, filme)
+        if removida:
+            self._apos_alteracao()
+        return removida
+
+    def remover_vertice(self, vertice: str) -> bool:
+        removido = super().remover_vertice(vertice)
+        if removido:
+            self._apos_alteracao()
+        return removido
+
+    def carregar_snapshot(self, arquivo: str):
+        """Não suportado: as arestas do snapshot não passariam pelo log"""
+        raise ValueError("o GrafoDuravel não carrega snapshots avulsos: as arestas não iriam para o log")
+
+    def checkpoint(self):
+        """
+        Salva um snapshot do grafo atual e começa um log vazio, apagando o
+        snapshot e o log anteriores
+        """
+        nova = self.geracao + 1
+        with self.metricas.cronometro(instrumentacao.CHECKPOINT):
+            self.wal.sincronizar()
+            destino = self._caminho('snapshot', nova)
+            temporario = destino + '.tmp'
+            self.salvar_snapshot(temporario)
+            with open(temporario, 'rb') as f:
+                os.fsync(f.fileno())
+            os.replace(temporario, destino)
+            _sincronizar_diretorio(self.diretorio)
+
+            # A partir daqui a recuperação usa o snapshot novo
+            self.remover_observador(self.wal)
+            self.wal.fechar()
+            antigos = (self._caminho('snapshot', self.geracao), self.wal.caminho)
+            self.geracao = nova
+            self.wal = RegistroWAL(self._caminho('wal', nova), self.fsync_a_cada,
+                                   self.intervalo_fsync, self.metricas)
+            self.registrar_observador(self.wal)
+            for caminho in antigos:
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+            _sincronizar_diretorio(self.diretorio)
+
+    def sincronizar(self):
+        """Grava e sincroniza com o disco as alterações ainda no buffer do log"""
+        self.wal.sincronizar()
+
+    def fechar(self):
+        """Sincroniza e fecha o log"""
+        if self.wal is not None:
+            self.wal.fechar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+        return False
+
+
+def main():
+    """Função principal"""
+    argumentos = [a for a in sys.argv[1:] if a != '--checkpoint']
+    if not argumentos:
+        print("Uso: python wal.py diretorio [arquivo_grafo] [--checkpoint]")
+        return 1
+
+    inicio = time.perf_counter()
+    with GrafoDuravel(argumentos[0]) as grafo:
+        recuperacao = time.perf_counter() - inicio
+        print("\n" + "="*50)
+        print("GRAFO DURÁVEL (SNAPSHOT + LOG)")
+        print("="*50)
+        print(f"Recuperado em {recuperacao:.2f} s: geração {grafo.geracao}, "
+              f"{grafo.reaplicadas} alterações reaplicadas do log")
+
+        if len(argumentos) > 1:
+            try:
+                with open(argumentos[1], 'r', encoding='utf-8') as f:
+                    total = grafo.carregar_de_linhas(f)
+            except FileNotFoundError:
+                print(f"Erro: Arquivo '{argumentos[1]}' não encontrado!")
+                return 1
+            print(f"Arestas adicionadas de '{argumentos[1]}': {total}")
+        if '--checkpoint' in sys.argv:
+            grafo.checkpoint()
+            print(f"Checkpoint feito: geração {grafo.geracao}")
+
+        print(f"Usuários: {len(grafo.usuarios)}, Filmes: {len(grafo.filmes)}, "
+              f"Arestas: {grafo.total_arestas()}")
+        print(f"Alterações no log desde o último checkpoint: {grafo.wal.operacoes}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())